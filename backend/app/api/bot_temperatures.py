@@ -86,10 +86,10 @@ def get_bot_temperature(bot_id: int, db: Session = Depends(get_db)):
     
     evaluator = get_bot_evaluator(db)
     
-    # Get real market data from Coinbase
+    # Get real market data (served from the ticker-fed candle store when current)
     try:
-        from ..services.coinbase_service import coinbase_service
-        market_data = coinbase_service.get_historical_data(bot.pair, granularity=3600, limit=100)
+        from ..services.market_data_service import get_market_data_service
+        market_data = get_market_data_service().get_historical_data(bot.pair, granularity=3600, limit=100)
         
         if market_data.empty:
             # Use fallback data if API returns empty result
@@ -118,5 +118,6 @@ def get_bot_temperature(bot_id: int, db: Session = Depends(get_db)):
         "bot_name": bot.name,
         "pair": bot.pair,
         "status": bot.status,
+        "market_data_stale": bool(market_data.attrs.get('stale', False)),
         **temperature_data
     }
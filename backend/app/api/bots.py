@@ -7,6 +7,7 @@ from ..core.database import get_db
 from ..models.models import Bot
 from ..api.schemas import BotCreate, BotUpdate, BotResponse, BotStatusResponse, EnhancedBotStatusResponse, TradingThresholds
 from ..utils.temperature import calculate_bot_temperature
+from ..services.evaluation_plan import get_evaluation_plan_cache
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +39,15 @@ def extract_trading_thresholds(signal_config: dict) -> Optional[TradingThreshold
         )
 
 
+def refresh_running_bot_index(db: Session):
+    """Keep the streaming evaluator's running-bots-by-pair index in step with bot changes."""
+    try:
+        from ..services.streaming_bot_evaluator import get_streaming_bot_evaluator
+        get_streaming_bot_evaluator().refresh_bot_index(db)
+    except Exception as e:
+        logger.warning(f"Failed to refresh running bot index: {e}")
+
+
 def prepare_bot_response(bot: Bot) -> dict:
     """Prepare bot for response by converting signal_config and adding trading_thresholds."""
     # Convert signal_config from JSON string to dict
@@ -150,6 +160,7 @@ def create_bot(bot: BotCreate, db: Session = Depends(get_db)):
     db.add(db_bot)
     db.commit()
     db.refresh(db_bot)
+    refresh_running_bot_index(db)
     
     # Convert signal_config back to dict for response
     db_bot.signal_config = json.loads(db_bot.signal_config) if db_bot.signal_config else {}
@@ -185,6 +196,10 @@ def update_bot(bot_id: int, bot_update: BotUpdate, db: Session = Depends(get_db)
     db.commit()
     db.refresh(bot)
     
+    # Recompile the evaluation plan on next use (updated_at alone can collide within a second)
+    get_evaluation_plan_cache().invalidate(bot_id)
+    refresh_running_bot_index(db)
+    
     # Convert signal_config back to dict for response
     bot.signal_config = json.loads(bot.signal_config) if bot.signal_config else {}
     
@@ -200,6 +215,8 @@ def delete_bot(bot_id: int, db: Session = Depends(get_db)):
     
     db.delete(bot)
     db.commit()
+    get_evaluation_plan_cache().invalidate(bot_id)
+    refresh_running_bot_index(db)
     
     return {"message": "Bot deleted successfully"}
 
@@ -213,6 +230,7 @@ def start_bot(bot_id: int, db: Session = Depends(get_db)):
     
     bot.status = "RUNNING"
     db.commit()
+    refresh_running_bot_index(db)
     
     return {"message": f"Bot '{bot.name}' started successfully", "status": bot.status}
 
@@ -226,6 +244,7 @@ def stop_bot(bot_id: int, db: Session = Depends(get_db)):
     
     bot.status = "STOPPED"
     db.commit()
+    refresh_running_bot_index(db)
     
     return {"message": f"Bot '{bot.name}' stopped successfully", "status": bot.status}
 
@@ -239,6 +258,7 @@ def stop_all_bots(db: Session = Depends(get_db)):
         bot.status = "STOPPED"
     
     db.commit()
+    refresh_running_bot_index(db)
     
     return {"message": f"Stopped {len(running_bots)} running bots"}
 
@@ -379,6 +399,13 @@ def get_enhanced_bots_status(db: Session = Depends(get_db)):
     unique_pairs = list(set(bot.pair for bot in bots))
     market_data_cache = create_market_data_cache(unique_pairs, granularity=3600, limit=100)
     
+    # Evaluate every bot in one batch so shared pairs/parameters compute indicators once
+    evaluable_data = {
+        pair: data for pair, data in market_data_cache.items()
+        if data is not None and not data.empty
+    }
+    batch_evaluations = evaluator.evaluate_bots_batch(bots, evaluable_data)
+    
     enhanced_status_list = []
     
     for bot in bots:
@@ -388,7 +415,9 @@ def get_enhanced_bots_status(db: Session = Depends(get_db)):
                 # Get market data for this bot's pair
                 market_data = market_data_cache.get(bot.pair)
                 if market_data is not None and not market_data.empty:
-                    evaluation_result = evaluator.evaluate_bot(bot, market_data)
+                    evaluation_result = batch_evaluations.get(bot.id)
+                    if evaluation_result is None:
+                        raise ValueError("batch evaluation failed")
                     fresh_score = evaluation_result.get('overall_score', 0.0)
                     next_action = evaluation_result.get('action', 'hold')
                     confidence = evaluation_result.get('confidence', 0.0)
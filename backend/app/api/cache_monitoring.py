@@ -8,6 +8,9 @@ from typing import Dict, Any
 import time
 import logging
 from ..services.market_data_service import get_market_data_service
+from ..services.indicator_cache import get_indicator_cache
+from ..services.evaluation_plan import get_evaluation_plan_cache
+from ..services.signals.incremental import get_indicator_state_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -103,4 +106,43 @@ async def clear_cache() -> Dict[str, Any]:
             "status": "error",
             "error": str(e),
             "timestamp": time.time()
-        }
\ No newline at end of file
+        }
+
+
+@router.get("/cache/indicators")
+async def get_indicator_cache_statistics() -> Dict[str, Any]:
+    """Get indicator result cache, incremental state and evaluation plan statistics."""
+    try:
+        return {
+            "indicator_cache": get_indicator_cache().get_stats(),
+            "incremental_state": get_indicator_state_store().get_stats(),
+            "evaluation_plans": get_evaluation_plan_cache().get_stats(),
+            "timestamp": time.time()
+        }
+    except Exception as e:
+        logger.error(f"Error getting indicator cache statistics: {e}")
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": time.time()
+        }
+
+
+@router.post("/cache/indicators/clear")
+async def clear_indicator_cache() -> Dict[str, Any]:
+    """Clear cached indicator results (admin operation)."""
+    try:
+        cleared = get_indicator_cache().invalidate()
+        
+        return {
+            "status": "success",
+            "cleared_items": cleared,
+            "timestamp": time.time()
+        }
+    except Exception as e:
+        logger.error(f"Error clearing indicator cache: {e}")
+        return {
+            "status": "error",
+            "error": str(e),
+            "timestamp": time.time()
+        }
@@ -108,11 +108,7 @@ async def get_all_tickers(
         active_bots = db.query(Bot).filter(Bot.status == 'RUNNING').limit(limit).all()
         product_ids = [bot.pair for bot in active_bots if bot.pair]
         
-        tickers = []
-        for product_id in product_ids:
-            ticker = market_service.get_ticker(product_id)
-            if ticker:
-                tickers.append(ticker.to_dict())
+        tickers = [ticker.to_dict() for ticker in market_service.get_tickers(product_ids).values()]
         
         return {
             "success": True,
@@ -256,7 +252,7 @@ async def get_historical_data(
     """
     try:
         market_service = get_market_data_service()
-        df = market_service.get_historical_data(product_id, granularity, limit)
+        df = market_service.get_historical_data(product_id, granularity, limit, require_volume=True)
         
         if df.empty:
             raise HTTPException(status_code=404, detail=f"No historical data found for {product_id}")
@@ -278,6 +274,7 @@ async def get_historical_data(
             "product_id": product_id,
             "granularity": granularity,
             "count": len(data),
+            "stale": bool(df.attrs.get('stale', False)),
             "data": data
         }
         
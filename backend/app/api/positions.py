@@ -126,15 +126,14 @@ async def update_unrealized_pnl(db: Session = Depends(get_db)):
         # Get current prices for products with open positions using cached data
         current_prices = {}
         market_data_service = MarketDataService()
-        for summary in summaries:
-            if summary.current_quantity > 0:
-                try:
-                    # Get current price from cache
-                    ticker = market_data_service.get_ticker(summary.product_id)
-                    if ticker and ticker.price:
-                        current_prices[summary.product_id] = Decimal(str(ticker.price))
-                except Exception as e:
-                    print(f"Could not get price for {summary.product_id}: {e}")
+        open_products = [summary.product_id for summary in summaries if summary.current_quantity > 0]
+        try:
+            # Get current prices from cache in one lookup
+            for product_id, ticker in market_data_service.get_tickers(open_products).items():
+                if ticker.price:
+                    current_prices[product_id] = Decimal(str(ticker.price))
+        except Exception as e:
+            print(f"Could not get prices for {open_products}: {e}")
         
         # Calculate unrealized P&L with current prices
         positions = position_service.calculate_unrealized_pnl(current_prices)
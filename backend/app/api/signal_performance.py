@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 import logging
 from ..core.database import get_db
 from ..services.signal_performance_tracker import get_signal_performance_tracker
+from ..services.prediction_write_queue import get_prediction_write_queue
 from ..api.schemas import BaseModel
 from pydantic import Field
 
@@ -302,6 +303,20 @@ def get_performance_report(
         raise HTTPException(status_code=500, detail=f"Failed to generate report: {str(e)}")
 
 
+@router.get("/performance/write-queue")
+def get_prediction_write_queue_stats():
+    """
+    Get signal prediction write-behind queue statistics.
+    
+    Reports queue depth, rows written/dropped/failed and backpressure events.
+    """
+    try:
+        return get_prediction_write_queue().get_stats()
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get write queue stats: {str(e)}")
+
+
 @router.post("/adaptive-weighting/update-bot-weights/{bot_id}")
 def trigger_bot_weight_update(bot_id: int, db: Session = Depends(get_db)):
     """
@@ -7,6 +7,7 @@ from fastapi import APIRouter, HTTPException, Query
 from typing import Dict, Any, List, Optional
 import logging
 from ..services.trend_detection_engine import get_trend_engine
+from ..services.regime_snapshot import get_latest_regime_snapshot
 from ..api.schemas import TrendAnalysisResponse
 
 logger = logging.getLogger(__name__)
@@ -69,21 +70,9 @@ def get_multiple_trend_analysis(
             )
         
         trend_engine = get_trend_engine()
-        results = {}
         
-        for pair in pair_list:
-            try:
-                result = trend_engine.analyze_trend(pair)
-                results[pair] = result
-            except Exception as e:
-                logger.error(f"Error analyzing {pair}: {e}")
-                results[pair] = {
-                    'product_id': pair,
-                    'error': str(e),
-                    'trend_strength': 0.0,
-                    'confidence': 0.0,
-                    'regime': 'NEUTRAL'
-                }
+        # Cached pairs are served as-is; the rest are analyzed in one pass
+        results = trend_engine.analyze_trends(pair_list)
         
         return {
             'pairs_analyzed': len(results),
@@ -228,4 +217,22 @@ def get_regime_summary() -> Dict[str, Any]:
         raise HTTPException(
             status_code=500,
             detail=f"Failed to generate regime summary: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.get("/regime/snapshot")
+def get_regime_snapshot() -> Dict[str, Any]:
+    """
+    Get the regimes used by the most recent bot evaluation cycle.
+    
+    Each cycle analyzes a pair's regime once and shares it across threshold
+    selection, prediction tagging and position sizing; this returns that
+    snapshot as the worker published it to Redis at the end of the cycle.
+    
+    Returns:
+        Snapshot with per-pair regimes, or available=False before the first
+        cycle (or once the last published snapshot has expired)
+    """
+    snapshot = get_latest_regime_snapshot()
+    if snapshot is None:
+        return {'available': False, 'pairs': {}}
+    return {'available': True, **snapshot}
@@ -186,8 +186,9 @@ async def start_websocket_streaming(db: Session = Depends(get_db)):
     """Start WebSocket streaming for all active bot pairs."""
     try:
         # Get active products from running bots
-        from ..services.streaming_bot_evaluator import StreamingBotEvaluator
-        streaming_evaluator = StreamingBotEvaluator(db)
+        from ..services.streaming_bot_evaluator import get_streaming_bot_evaluator
+        streaming_evaluator = get_streaming_bot_evaluator()
+        streaming_evaluator.refresh_bot_index(db)
         active_products = streaming_evaluator.get_active_products()
         
         if not active_products:
@@ -236,12 +237,14 @@ async def stop_websocket_streaming():
 @router.get("/websocket/status")
 async def get_websocket_status():
     """Get current WebSocket connection status."""
+    from ..services.streaming_bot_evaluator import get_streaming_bot_evaluator
     coinbase_ws_status = coinbase_service.get_websocket_status()
     
     return {
         "active_connections": len(manager.active_connections),
         "coinbase_websocket": coinbase_ws_status,
-        "bot_evaluator_initialized": manager.bot_evaluator is not None
+        "bot_evaluator_initialized": manager.bot_evaluator is not None,
+        "streaming_evaluator": get_streaming_bot_evaluator().get_cache_stats()
     }
 
 
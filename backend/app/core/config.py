@@ -22,6 +22,10 @@ class Settings(BaseSettings):
     # Redis for Celery
     redis_url: str = "redis://localhost:6379/0"
     
+    # Streaming bot evaluation
+    evaluation_debounce_seconds: float = 1.0  # Minimum seconds between evaluations per product
+    evaluation_workers: int = 4  # Worker threads running ticker-driven evaluations
+    
     # API settings
     api_v1_prefix: str = "/api/v1"
     
@@ -90,6 +90,15 @@ app.include_router(signal_performance.router, prefix="/api/v1/signal-performance
 app.include_router(intelligence_analytics.router, prefix="/api/v1/intelligence", tags=["intelligence-analytics"])
 
 
+@app.on_event("shutdown")
+def shutdown_background_services():
+    """Stop ticker-driven evaluations and persist queued signal predictions."""
+    from .services.evaluation_scheduler import get_evaluation_scheduler
+    from .services.prediction_write_queue import get_prediction_write_queue
+    get_evaluation_scheduler().stop()
+    get_prediction_write_queue().stop()
+
+
 @app.get("/")
 def read_root():
     """Root endpoint."""
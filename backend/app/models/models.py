@@ -139,6 +139,42 @@ class RawTrade(Base):
     synced_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
+class PositionLedger(Base):
+    """Materialized FIFO position per product, kept current as raw trades are stored."""
+    __tablename__ = "position_ledger"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    product_id = Column(String(20), unique=True, nullable=False, index=True)  # e.g. "BTC-USD"
+    
+    # Running position (sum of open lot quantities) and P&L
+    total_quantity = Column(Numeric(precision=28, scale=12), nullable=False, default=0)
+    realized_pnl = Column(Numeric(precision=28, scale=12), nullable=False, default=0)
+    total_fees = Column(Numeric(precision=28, scale=12), nullable=False, default=0)
+    
+    # Raw trade counts (size_in_quote trades are counted but not applied)
+    trade_count = Column(Integer, nullable=False, default=0)
+    buy_count = Column(Integer, nullable=False, default=0)
+    sell_count = Column(Integer, nullable=False, default=0)
+    
+    # Last applied fill in FIFO order; an older fill forces a replay of the product
+    last_fill_at = Column(String(50))  # RawTrade.created_at
+    last_trade_id = Column(Integer)  # Highest RawTrade.id applied
+    
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class PositionLedgerLot(Base):
+    """Open lot (remaining quantity of one buy) in a product's FIFO position ledger."""
+    __tablename__ = "position_ledger_lots"
+    
+    id = Column(Integer, primary_key=True, index=True)  # Ascending id = FIFO order
+    product_id = Column(String(20), nullable=False, index=True)
+    fill_id = Column(String(100), nullable=False)  # Buy fill that opened the lot
+    quantity = Column(Numeric(precision=28, scale=12), nullable=False)  # Remaining quantity
+    cost_basis = Column(Numeric(precision=28, scale=12), nullable=False)  # Price paid per unit
+    purchase_date = Column(String(50), nullable=False)  # RawTrade.created_at of the buy
+
+
 class Notification(Base):
     """System notifications for market opportunities and alerts."""
     __tablename__ = "notifications"
@@ -0,0 +1,555 @@
+"""
+Adaptive Rate Limiter - one Coinbase call budget shared by every process.
+
+The API workers, the Celery worker and the coordinator each used to guess
+at the budget on their own: a fixed 8 calls/min in the coordinator and a
+fixed 500ms sleep plus a private circuit breaker in CoinbaseService. This
+limiter learns the budget instead:
+
+- ``x-ratelimit-remaining`` / ``x-ratelimit-reset`` response headers set the
+  pace directly (remaining calls, less a reserve, spread over the time left
+  in the window)
+- a 429 halves the pace and pauses everyone until ``Retry-After`` (or the
+  window reset, or a cooldown)
+- without headers the pace creeps up additively on success (AIMD)
+
+State and call slots live in Redis, so every process spends from the same
+budget: the pace is one JSON key, and each call INCRs a per-second counter,
+succeeding while the counter is within that second's share of the pace, so
+calls are spread across processes without a lock. Without Redis the same
+logic runs on an in-process store.
+"""
+
+import json
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a call would have to wait longer than allowed for the rate limit."""
+
+
+def parse_reset(value: Any, now: float) -> Optional[float]:
+    """
+    Turn an ``x-ratelimit-reset`` value into an absolute Unix time.
+
+    Accepts epoch seconds, epoch milliseconds, seconds from now, or an
+    ISO-8601 timestamp.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        try:
+            return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+        except ValueError:
+            return None
+    if number > 1e12:
+        return number / 1000.0
+    if number > 1e9:
+        return number
+    return now + max(number, 0.0)
+
+
+def _header(headers: Any, name: str) -> Any:
+    if headers is None:
+        return None
+    getter = getattr(headers, 'get', None)
+    if getter is None:
+        return None
+    value = getter(name)
+    if value is None:
+        value = getter(name.title())
+    return value
+
+
+class _LocalStore:
+    """The few Redis commands the limiter needs, for running without Redis."""
+
+    def __init__(self, clock: Callable[[], float]):
+        self._clock = clock
+        self._data: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        for key in [k for k, at in self._expires.items() if at <= now]:
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+
+    def get(self, key):
+        with self._lock:
+            self._expire(self._clock())
+            return self._data.get(key)
+
+    def set(self, key, value, nx=False, px=None):
+        with self._lock:
+            now = self._clock()
+            self._expire(now)
+            if nx and key in self._data:
+                return None
+            self._data[key] = value
+            if px is not None:
+                self._expires[key] = now + px / 1000.0
+            return True
+
+    def setex(self, key, ttl, value):
+        return self.set(key, value, px=int(ttl * 1000))
+
+    def incr(self, key):
+        with self._lock:
+            self._expire(self._clock())
+            self._data[key] = int(self._data.get(key) or 0) + 1
+            return self._data[key]
+
+    def expire(self, key, seconds):
+        with self._lock:
+            if key in self._data:
+                self._expires[key] = self._clock() + seconds
+                return True
+            return False
+
+
+class AdaptiveRateLimiter:
+    """
+    Paces Coinbase calls at a rate learned from the exchange.
+
+    Features:
+    - Header-driven pace: the window's remaining calls, less a reserve of
+      (1 - margin) * limit, spread over the seconds to reset
+    - Multiplicative decrease and shared pause on 429; additive increase otherwise
+    - Cross-process slots and state in Redis (in-process fallback)
+    - Blocking acquire() for direct callers, non-blocking try_acquire() for the
+      coordinator's dispatcher, and prepaid() so the call it dispatched is
+      not charged twice
+    """
+
+    STATE_TTL_SECONDS = 3600
+
+    def __init__(self, redis_client=None, name: str = 'coinbase',
+                 initial_rate: float = 1.0, min_rate: float = 8 / 60, max_rate: float = 10.0,
+                 safety_margin: float = 0.8, increase_per_success: float = 0.05,
+                 decrease_factor: float = 0.5, cooldown_seconds: float = 8.0,
+                 max_wait_seconds: float = 30.0, state_sync_seconds: float = 1.0,
+                 redis_retry_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the limiter.
+
+        Args:
+            redis_client: Shared Redis client (None = in-process only)
+            name: Budget name; processes with the same name share one budget
+            initial_rate: Calls per second before anything has been learned
+            min_rate: Floor for the pace (the old fixed 8/min)
+            max_rate: Ceiling for the pace (Coinbase's public endpoint limit)
+            safety_margin: Fraction of the advertised budget actually used
+            increase_per_success: Additive increase (calls/s) per success without headers
+            decrease_factor: Multiplicative decrease on a 429
+            cooldown_seconds: Pause after a 429 that carries no Retry-After or reset
+            max_wait_seconds: acquire() raises RateLimitTimeout rather than wait longer
+            state_sync_seconds: How stale the local copy of the shared state may get
+            redis_retry_seconds: After a Redis error, run locally this long before retrying
+            clock: Wall-clock time source (shared across processes, so not monotonic)
+            sleep: Sleep function (injectable for tests)
+        """
+        self.name = name
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.safety_margin = safety_margin
+        self.increase_per_success = increase_per_success
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.state_sync_seconds = state_sync_seconds
+        self.redis_retry_seconds = redis_retry_seconds
+        self._clock = clock
+        self._sleep = sleep
+
+        self._redis = redis_client
+        self._local = _LocalStore(clock)
+        self._redis_down_until = 0.0
+        self._state_key = f"rate_limit:{name}:state"
+        self._slot_prefix = f"rate_limit:{name}:slot"
+
+        self._lock = threading.RLock()
+        self._thread_state = threading.local()
+        self._state = {
+            'rate': min(max(initial_rate, min_rate), max_rate),
+            'paused_until': 0.0,
+            'limit': None,
+            'remaining': None,
+            'reset_at': None,
+            'updated_at': 0.0
+        }
+        self._state_synced_at = float('-inf')
+
+        self.stats = {
+            'acquired': 0,
+            'prepaid_calls': 0,
+            'waits': 0,
+            'total_wait_seconds': 0.0,
+            'timeouts': 0,
+            'header_updates': 0,
+            'rate_limited': 0,
+            'slot_conflicts': 0,
+            'redis_errors': 0
+        }
+
+    # Storage
+
+    def _store(self):
+        if self._redis is not None and self._clock() >= self._redis_down_until:
+            return self._redis
+        return self._local
+
+    def _redis_failed(self, error: Exception):
+        self.stats['redis_errors'] += 1
+        self._redis_down_until = self._clock() + self.redis_retry_seconds
+        logger.warning(f"⚠️ Rate limiter Redis unavailable, pacing locally for "
+                       f"{self.redis_retry_seconds}s: {error}")
+
+    def _call_store(self, command: str, *args, **kwargs):
+        store = self._store()
+        try:
+            return getattr(store, command)(*args, **kwargs)
+        except Exception as e:
+            if store is self._local:
+                raise
+            self._redis_failed(e)
+            return getattr(self._local, command)(*args, **kwargs)
+
+    # Shared state
+
+    def _sync_state(self, force: bool = False):
+        """Refresh the local copy of the shared pace. Caller holds the lock."""
+        now = self._clock()
+        if not force and now - self._state_synced_at < self.state_sync_seconds:
+            return
+        raw = self._call_store('get', self._state_key)
+        self._state_synced_at = now
+        if not raw:
+            return
+        try:
+            shared = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if shared.get('updated_at', 0) >= self._state['updated_at']:
+            self._state.update(shared)
+
+    def _publish_state(self):
+        """Write the local pace to the shared store. Caller holds the lock."""
+        self._state['updated_at'] = self._clock()
+        self._call_store('setex', self._state_key, self.STATE_TTL_SECONDS, json.dumps(self._state))
+        self._state_synced_at = self._clock()
+
+    def _set_rate(self, rate: float):
+        self._state['rate'] = min(max(rate, self.min_rate), self.max_rate)
+
+    # Acquiring
+
+    def _allowance(self, second: int) -> int:
+        """Calls allowed in a whole second at the current pace (fractional paces spread over seconds)."""
+        rate = self._state['rate']
+        return int(math.floor((second + 1) * rate) - math.floor(second * rate))
+
+    def _claim_slot(self, now: float, lookahead: int) -> Optional[float]:
+        """
+        Claim a call in the first second at or after now with budget left.
+
+        Each second has a shared counter; INCR returns this caller's place in
+        that second, which is accepted while it is within the second's allowance.
+
+        Returns:
+            Time the claimed call may start, or None if no second within lookahead had room
+        """
+        first = int(now)
+        for offset in range(lookahead):
+            second = first + offset
+            allowance = self._allowance(second)
+            if allowance <= 0:
+                continue
+            key = f"{self._slot_prefix}:{second}"
+            place = self._call_store('incr', key)
+            if place == 1:
+                self._call_store('expire', key, lookahead + 5)
+            if place <= allowance:
+                return max(now, float(second))
+            self.stats['slot_conflicts'] += 1
+        return None
+
+    def wait_time(self) -> float:
+        """Seconds until the shared pause (if any) ends."""
+        with self._lock:
+            self._sync_state()
+            return max(0.0, self._state['paused_until'] - self._clock())
+
+    def is_paused(self) -> bool:
+        return self.wait_time() > 0
+
+    def try_acquire(self) -> float:
+        """
+        Claim the current call slot without waiting.
+
+        Returns:
+            0.0 if the caller may make one call now, else seconds to wait before retrying
+        """
+        with self._lock:
+            self._sync_state()
+            now = self._clock()
+            if now < self._state['paused_until']:
+                return self._state['paused_until'] - now
+            if self._claim_slot(now, lookahead=1) is not None:
+                self.stats['acquired'] += 1
+                return 0.0
+            return (int(now) + 1) - now
+
+    def acquire(self, max_wait: Optional[float] = None) -> float:
+        """
+        Wait for a call slot (no-op for the first call inside prepaid()).
+
+        Args:
+            max_wait: Longest acceptable wait (defaults to max_wait_seconds)
+
+        Returns:
+            Seconds waited
+
+        Raises:
+            RateLimitTimeout: If the budget can't be had within max_wait
+        """
+        if getattr(self._thread_state, 'prepaid', 0) > 0:
+            self._thread_state.prepaid -= 1
+            with self._lock:
+                self.stats['prepaid_calls'] += 1
+            return 0.0
+        max_wait = self.max_wait_seconds if max_wait is None else max_wait
+        started = self._clock()
+        while True:
+            with self._lock:
+                self._sync_state()
+                now = self._clock()
+                start_at = self._state['paused_until'] if now < self._state['paused_until'] else None
+                if start_at is None:
+                    lookahead = int(max_wait) + 2
+                    start_at = self._claim_slot(now, lookahead)
+                    claimed = start_at is not None
+                    if not claimed:
+                        start_at = now + max_wait + 1
+                else:
+                    claimed = False
+                if start_at - started > max_wait:
+                    self.stats['timeouts'] += 1
+                    raise RateLimitTimeout(
+                        f"Rate limit: no Coinbase call budget within {max_wait:.1f}s ({self.name})"
+                    )
+            delay = start_at - now
+            if delay > 0:
+                self._sleep(delay)
+            if claimed:
+                waited = self._clock() - started
+                with self._lock:
+                    self.stats['acquired'] += 1
+                    if waited > 0:
+                        self.stats['waits'] += 1
+                        self.stats['total_wait_seconds'] += waited
+                return waited
+
+    @contextmanager
+    def prepaid(self, calls: int = 1):
+        """
+        Mark the next ``calls`` calls on this thread as already paid for (the
+        coordinator claimed their slot). Any further call in the block, such as
+        a second request or another page made by the same service method,
+        acquires its own slot.
+        """
+        previous = getattr(self._thread_state, 'prepaid', 0)
+        self._thread_state.prepaid = calls
+        try:
+            yield
+        finally:
+            self._thread_state.prepaid = previous
+
+    # Learning
+
+    def observe_headers(self, headers: Any) -> bool:
+        """
+        Learn the budget from rate-limit headers (a dict, a requests
+        CaseInsensitiveDict, or a coinbase response object).
+
+        Returns:
+            True if the headers carried budget information
+        """
+        if headers is not None and not hasattr(headers, 'get'):
+            headers = {
+                'x-ratelimit-limit': getattr(headers, 'rate_limit_limit', None),
+                'x-ratelimit-remaining': getattr(headers, 'rate_limit_remaining', None),
+                'x-ratelimit-reset': getattr(headers, 'rate_limit_reset', None),
+            }
+        remaining = _header(headers, 'x-ratelimit-remaining')
+        if remaining is None:
+            return False
+        try:
+            remaining = float(remaining)
+        except (TypeError, ValueError):
+            return False
+
+        with self._lock:
+            self._sync_state()
+            now = self._clock()
+            reset_at = parse_reset(_header(headers, 'x-ratelimit-reset'), now)
+            limit = _header(headers, 'x-ratelimit-limit')
+            self._state['remaining'] = remaining
+            self._state['reset_at'] = reset_at
+            if limit is not None:
+                try:
+                    self._state['limit'] = float(limit)
+                except (TypeError, ValueError):
+                    pass
+            if reset_at is not None and reset_at > now:
+                if remaining <= 0:
+                    self._state['paused_until'] = max(self._state['paused_until'], reset_at)
+                else:
+                    # Keep (1 - margin) of the window's budget in reserve
+                    if self._state['limit']:
+                        usable = remaining - (1 - self.safety_margin) * self._state['limit']
+                    else:
+                        usable = self.safety_margin * remaining
+                    self._set_rate(max(usable, 0.0) / (reset_at - now))
+            self.stats['header_updates'] += 1
+            self._publish_state()
+        return True
+
+    def record_success(self, headers: Any = None):
+        """Record a successful call; headers (if any) set the pace, else increase it additively."""
+        if self.observe_headers(headers):
+            return
+        with self._lock:
+            self._sync_state()
+            if self._state['rate'] < self.max_rate:
+                self._set_rate(self._state['rate'] + self.increase_per_success)
+                self._publish_state()
+
+    def record_rate_limited(self, retry_after: Optional[float] = None, headers: Any = None):
+        """Record a 429: halve the pace and pause every process sharing the budget."""
+        with self._lock:
+            self._sync_state(force=True)
+            now = self._clock()
+            if retry_after is None:
+                retry_after = _header(headers, 'retry-after')
+            pause_until = None
+            if retry_after is not None:
+                try:
+                    pause_until = now + float(retry_after)
+                except (TypeError, ValueError):
+                    pause_until = None
+            if pause_until is None:
+                pause_until = parse_reset(_header(headers, 'x-ratelimit-reset'), now)
+            if pause_until is None or pause_until <= now:
+                pause_until = now + self.cooldown_seconds
+            self._set_rate(self._state['rate'] * self.decrease_factor)
+            self._state['paused_until'] = max(self._state['paused_until'], pause_until)
+            self._state['remaining'] = 0
+            self.stats['rate_limited'] += 1
+            self._publish_state()
+            rate = self._state['rate']
+        logger.warning(f"🚨 Coinbase rate limit hit: pausing {pause_until - now:.1f}s, "
+                       f"pace now {rate * 60:.1f}/min")
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """Run one API call within the budget, learning from its outcome."""
+        self.acquire()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if is_rate_limit_error(e):
+                response = getattr(e, 'response', None)
+                self.record_rate_limited(headers=getattr(response, 'headers', None))
+            raise
+        self.record_success(result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the learned budget and limiter statistics."""
+        with self._lock:
+            self._sync_state()
+            now = self._clock()
+            avg_wait = self.stats['total_wait_seconds'] / self.stats['waits'] if self.stats['waits'] else 0.0
+            return {
+                'name': self.name,
+                'calls_per_minute': round(self._state['rate'] * 60, 2),
+                'paused_for_seconds': round(max(0.0, self._state['paused_until'] - now), 2),
+                'advertised_limit': self._state['limit'],
+                'remaining': self._state['remaining'],
+                'reset_in_seconds': (
+                    round(self._state['reset_at'] - now, 2) if self._state['reset_at'] else None
+                ),
+                'shared': self._store() is self._redis and self._redis is not None,
+                'acquired': self.stats['acquired'],
+                'prepaid_calls': self.stats['prepaid_calls'],
+                'waits': self.stats['waits'],
+                'avg_wait_ms': round(avg_wait * 1000, 2),
+                'timeouts': self.stats['timeouts'],
+                'header_updates': self.stats['header_updates'],
+                'rate_limited': self.stats['rate_limited'],
+                'slot_conflicts': self.stats['slot_conflicts'],
+                'redis_errors': self.stats['redis_errors']
+            }
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """True for a 429 / rate-limit error (but not our own RateLimitTimeout)."""
+    if isinstance(error, RateLimitTimeout):
+        return False
+    response = getattr(error, 'response', None)
+    if getattr(response, 'status_code', None) == 429:
+        return True
+    message = str(error)
+    return "429" in message or "Too Many Requests" in message or "rate limit" in message.lower()
+
+
+class RateLimitedClient:
+    """Proxy for a Coinbase RESTClient that routes every method call through the limiter."""
+
+    def __init__(self, client, limiter: AdaptiveRateLimiter):
+        self._client = client
+        self._limiter = limiter
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def limited(*args, **kwargs):
+            return self._limiter.call(attr, *args, **kwargs)
+
+        limited.__name__ = name
+        return limited
+
+
+# Global limiter instance
+_rate_limiter: Optional[AdaptiveRateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> AdaptiveRateLimiter:
+    """Get the process-wide Coinbase limiter, shared with other processes via Redis."""
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            redis_client = None
+            try:
+                import redis
+                from ..core.config import settings
+                redis_client = redis.from_url(settings.redis_url, socket_timeout=2, socket_connect_timeout=2)
+            except Exception as e:
+                logger.warning(f"⚠️ Rate limiter running without Redis: {e}")
+            _rate_limiter = AdaptiveRateLimiter(redis_client=redis_client)
+            logger.info("🚦 AdaptiveRateLimiter created")
+        return _rate_limiter
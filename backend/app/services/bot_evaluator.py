@@ -2,8 +2,9 @@
 Bot signal evaluation service for aggregating multiple signals with Phase 2.3 confirmation system.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import json
+import numpy as np
 import pandas as pd
 import logging
 from datetime import datetime, timedelta
@@ -11,7 +12,9 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from ..models.models import Bot, BotSignalHistory
-from ..services.signals.base import create_signal_instance
+from ..services.evaluation_plan import get_evaluation_plan_cache
+from ..services.indicator_cache import get_indicator_cache
+from ..services.regime_snapshot import RegimeSnapshot
 from ..core.database import get_db
 from ..utils.temperature import calculate_bot_temperature, get_temperature_emoji
 from ..utils.error_reporting import report_bot_error, ErrorType
@@ -26,17 +29,30 @@ class BotSignalEvaluator:
     DEFAULT_BUY_THRESHOLD = -0.3
     DEFAULT_SELL_THRESHOLD = 0.3
     
-    def __init__(self, db: Session, enable_confirmation: bool = True):
+    # Phase 3: Signal quality filter - TEMPORARILY LOWERED: Allow trades with 20%+ confidence
+    MIN_SIGNAL_CONFIDENCE = 0.2
+    
+    def __init__(self, db: Session, enable_confirmation: bool = True, indicator_store=None,
+                 write_sink=None):
         self.db = db
         self.enable_confirmation = enable_confirmation
+        # Optional IndicatorStateStore: streaming callers pass one so signals
+        # advance O(1) incremental state instead of recomputing full series
+        self.indicator_store = indicator_store
+        # Optional EvaluationWriteSink: history, predictions and confirmation state
+        # are queued for one flush per cycle instead of committed per evaluation
+        self.write_sink = write_sink
     
-    def evaluate_bot(self, bot: Bot, market_data: pd.DataFrame) -> Dict[str, Any]:
+    def evaluate_bot(self, bot: Bot, market_data: pd.DataFrame,
+                     regime_snapshot: Optional[RegimeSnapshot] = None) -> Dict[str, Any]:
         """
         Evaluate all enabled signals for a bot and return aggregated decision with confirmation.
         
         Args:
             bot: Bot instance with signal configuration
             market_data: DataFrame with OHLCV data
+            regime_snapshot: The evaluation cycle's regime snapshot (a fresh one is
+                             used if omitted, so the regime is still looked up once)
             
         Returns:
             Dict containing:
@@ -47,49 +63,17 @@ class BotSignalEvaluator:
             - confirmation_status: Confirmation tracking info
             - metadata: Evaluation metadata
         """
-        # EARLY BLOCKING CHECKS - Prevent all signal processing if bot can't trade
-        early_block_result = self._check_early_blocking_conditions(bot)
-        if early_block_result:
-            logger.debug(f"Bot {bot.id} ({bot.pair}) blocked early: {early_block_result['reason']}")
-            return early_block_result
+        pre_check_result = self._check_pre_evaluation_blocks(bot, market_data)
+        if pre_check_result:
+            return pre_check_result
         
-        # Legacy balance check for bots with skip_signals_on_low_balance flag
-        if hasattr(bot, 'skip_signals_on_low_balance') and bot.skip_signals_on_low_balance:
-            balance_check = self._has_minimum_balance_for_any_trade(bot)
-            if not balance_check.get('can_trade', True):
-                logger.debug(f"Skipping signal processing for bot {bot.id} ({bot.pair}) due to insufficient balance: {balance_check.get('reason', 'unknown')}")
-                return {
-                    'overall_score': 0.0,
-                    'action': 'hold',
-                    'confidence': 0.0,
-                    'signal_results': {},
-                    'confirmation_status': {
-                        'confirmed': False,
-                        'consecutive_signals': 0,
-                        'required_signals': bot.confirmation_minutes,
-                        'last_signal_time': None,
-                        'message': f'Skipped: {balance_check.get("reason", "Insufficient balance for trading")}'
-                    },
-                    'metadata': {
-                        'evaluation_time': pd.Timestamp.now().isoformat(),
-                        'data_points_evaluated': len(market_data),
-                        'optimization_skipped': True,
-                        'balance_details': balance_check
-                    },
-                    'automatic_trade': False
-                }
-        
-        # Get current price from market data
-        current_price = market_data['close'].iloc[-1] if len(market_data) > 0 else 0
+        if regime_snapshot is None:
+            regime_snapshot = RegimeSnapshot()
         
-        # Parse signal configuration
-        try:
-            signal_config = json.loads(bot.signal_config) if isinstance(bot.signal_config, str) else bot.signal_config
-        except (json.JSONDecodeError, TypeError):
-            return self._error_result("Invalid signal configuration", bot)
-        
-        if not signal_config:
-            return self._error_result("No signal configuration found", bot)
+        # Compiled signal configuration (parsed once per config change)
+        plan = get_evaluation_plan_cache().get_plan(bot)
+        if plan.error:
+            return self._error_result(plan.error, bot)
         
         # Evaluate individual signals
         signal_results = {}
@@ -97,18 +81,11 @@ class BotSignalEvaluator:
         weighted_score_sum = 0
         confidence_values = []
         
-        for signal_name, config in signal_config.items():
-            if not config or not config.get('enabled', False):
-                continue
-                
+        for planned in plan.signals:
+            signal_name, config = planned.name, planned.config
             try:
-                # Create signal instance
-                signal_instance = self._create_signal_instance(signal_name, config)
-                if not signal_instance:
-                    continue
-                
                 # Calculate signal
-                signal_result = signal_instance.calculate(market_data)
+                signal_result = self._calculate_signal(planned.instance, bot, market_data)
                 
                 # Only skip signals that completely failed to calculate (missing required fields)
                 # A hold action with score=0 is still a valid signal result
@@ -120,7 +97,7 @@ class BotSignalEvaluator:
                 signal_results[signal_name] = signal_result
                 
                 # Aggregate weighted score
-                weight = config.get('weight', 0)
+                weight = planned.weight
                 total_weight += weight
                 weighted_score_sum += signal_result['score'] * weight
                 confidence_values.append(signal_result['confidence'])
@@ -149,16 +126,33 @@ class BotSignalEvaluator:
         overall_confidence = sum(confidence_values) / len(confidence_values) if confidence_values else 0
         
         # Phase 3: Signal Quality Filtering - Reject weak signals below confidence threshold
-        min_confidence = 0.2  # TEMPORARILY LOWERED: Allow trades with 20%+ confidence
-        if overall_confidence < min_confidence:
+        if overall_confidence < self.MIN_SIGNAL_CONFIDENCE:
             logger.info(f"🚫 Signal quality filter: Rejecting signal for {bot.pair} due to low confidence "
-                       f"({overall_confidence:.3f} < {min_confidence})")
+                       f"({overall_confidence:.3f} < {self.MIN_SIGNAL_CONFIDENCE})")
             action = 'hold'
         else:
             # Determine action based on overall score and bot thresholds
-            action = self._determine_action(overall_score, bot)
+            action = self._determine_action(overall_score, bot, regime_snapshot)
             logger.info(f"✅ Signal quality filter: Accepting signal for {bot.pair} "
-                       f"(confidence: {overall_confidence:.3f} >= {min_confidence})")
+                       f"(confidence: {overall_confidence:.3f} >= {self.MIN_SIGNAL_CONFIDENCE})")
+        
+        return self._complete_evaluation(
+            bot, market_data, signal_results, overall_score, overall_confidence, total_weight, action,
+            regime_snapshot
+        )
+    
+    def _complete_evaluation(self, bot: Bot, market_data: pd.DataFrame, signal_results: Dict[str, Any],
+                             overall_score: float, overall_confidence: float, total_weight: float,
+                             action: str, regime_snapshot: RegimeSnapshot) -> Dict[str, Any]:
+        """
+        Finish an evaluation once signals are aggregated and the action is decided.
+        
+        Handles confirmation, performance tracking, signal history, position sizing
+        and automatic trading. Shared by evaluate_bot and evaluate_bots_batch.
+        Regime data for tagging and sizing comes from the cycle's snapshot.
+        """
+        # Get current price from market data
+        current_price = market_data['close'].iloc[-1] if len(market_data) > 0 else 0
         
         # Prepare evaluation result
         evaluation_result = {
@@ -197,15 +191,12 @@ class BotSignalEvaluator:
         logger.info(f"📊 Starting signal performance tracking for {bot.pair}, signals: {list(signal_results.keys())}")
         try:
             from .signal_performance_tracker import get_signal_performance_tracker
-            from .trend_detection_engine import get_trend_engine
             
             # Get current market regime (if trend detection enabled)
             regime = "UNKNOWN"
             if getattr(bot, 'use_trend_detection', False):
                 try:
-                    trend_engine = get_trend_engine()
-                    regime_data = trend_engine.analyze_trend(bot.pair)
-                    regime = regime_data.get('regime', 'UNKNOWN')
+                    regime = regime_snapshot.get_regime(bot.pair)
                 except Exception as e:
                     logger.debug(f"Failed to get regime for performance tracking: {e}")
             
@@ -227,7 +218,7 @@ class BotSignalEvaluator:
                     )
                     
                     # Record the prediction for later performance evaluation
-                    performance_tracker.record_signal_prediction(prediction)
+                    performance_tracker.record_signal_prediction(prediction, write_sink=self.write_sink)
                     
                     logger.info(
                         f"📊 Recorded signal prediction: {signal_name} → {signal_result['action']} "
@@ -253,7 +244,8 @@ class BotSignalEvaluator:
                 position_sizing_analysis = sizing_engine.calculate_position_size(
                     base_position_size=bot.position_size_usd,
                     product_id=bot.pair,
-                    signal_confidence=overall_confidence
+                    signal_confidence=overall_confidence,
+                    override_regime=regime_snapshot.get(bot.pair)
                 )
                 
                 evaluation_result['position_sizing'] = position_sizing_analysis
@@ -305,42 +297,206 @@ class BotSignalEvaluator:
         
         return evaluation_result
     
-    def _create_signal_instance(self, signal_name: str, config: Dict[str, Any]):
-        """Create signal instance from configuration."""
-        # Map bot config signal names to signal factory names
-        signal_type_map = {
-            'rsi': 'RSI',
-            'moving_average': 'MA_Crossover',
-            'macd': 'MACD'
-        }
+    def evaluate_bots_batch(self, bots: List[Bot], market_data_by_pair: Dict[str, pd.DataFrame],
+                            regime_snapshot: Optional[RegimeSnapshot] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Evaluate many bots in one pass, computing each distinct indicator once.
         
-        signal_type = signal_type_map.get(signal_name.lower())
-        if not signal_type:
-            return None
+        Bots are grouped by pair and by signal parameter set, so bots sharing a
+        pair and default parameters reuse a single indicator calculation. Weighted
+        scores, confidences and actions are aggregated as NumPy arrays; confirmation,
+        tracking, sizing and automatic trading then run per bot exactly as in
+        evaluate_bot.
         
-        # Extract parameters (exclude 'enabled' and 'weight')
-        parameters = {k: v for k, v in config.items() if k not in ['enabled', 'weight']}
+        Args:
+            bots: Bots to evaluate
+            market_data_by_pair: OHLCV DataFrames keyed by trading pair
+            regime_snapshot: The evaluation cycle's regime snapshot, shared by
+                             thresholds, prediction tagging and sizing (a fresh
+                             one is used if omitted)
+            
+        Returns:
+            Dict mapping bot id to the same result dict evaluate_bot returns.
+            Bots whose pair is missing from market_data_by_pair, or whose
+            evaluation raised, are omitted.
+        """
+        if regime_snapshot is None:
+            regime_snapshot = RegimeSnapshot()
         
-        # Map bot config parameter names to signal parameter names
-        if signal_name.lower() == 'rsi':
-            parameters = {
-                'period': parameters.get('period', 14),
-                'oversold': parameters.get('buy_threshold', 30),
-                'overbought': parameters.get('sell_threshold', 70)
-            }
-        elif signal_name.lower() == 'moving_average':
-            parameters = {
-                'fast_period': parameters.get('fast_period', 10),
-                'slow_period': parameters.get('slow_period', 20)
-            }
-        elif signal_name.lower() == 'macd':
-            parameters = {
-                'fast_period': parameters.get('fast_period', 12),
-                'slow_period': parameters.get('slow_period', 26),
-                'signal_period': parameters.get('signal_period', 9)
-            }
+        results = {}
+        pending = []          # (bot, market_data, [(signal_name, config, weight, column)])
+        columns = {}          # (pair, signal name, parameters) -> column index
+        column_results = []   # one signal result (or raised exception) per column
+        
+        # Pass 1: pre-checks, config parsing and one calculation per distinct indicator
+        for bot in bots:
+            market_data = market_data_by_pair.get(bot.pair)
+            if market_data is None:
+                continue
+            
+            try:
+                pre_check_result = self._check_pre_evaluation_blocks(bot, market_data)
+                if pre_check_result:
+                    results[bot.id] = pre_check_result
+                    continue
+                
+                plan = get_evaluation_plan_cache().get_plan(bot)
+                if plan.error:
+                    results[bot.id] = self._error_result(plan.error, bot)
+                    continue
+                
+                bot_signals = []
+                for planned in plan.signals:
+                    signal_instance = planned.instance
+                    key = (bot.pair, signal_instance.name, tuple(sorted(signal_instance.parameters.items())))
+                    column = columns.get(key)
+                    if column is None:
+                        column = len(column_results)
+                        columns[key] = column
+                        try:
+                            column_results.append(self._calculate_signal(signal_instance, bot, market_data))
+                        except Exception as e:
+                            column_results.append(e)
+                    
+                    bot_signals.append((planned.name, planned.config, float(planned.weight), column))
+                
+                pending.append((bot, market_data, bot_signals))
+                
+            except Exception as e:
+                logger.error(f"Error preparing batch evaluation for bot {bot.id}: {e}")
+        
+        if not pending:
+            return results
+        
+        # Pass 2: vectorized aggregation over (bots x distinct indicators)
+        n_bots, n_columns = len(pending), len(column_results)
+        scores = np.zeros(n_columns)
+        confidences = np.zeros(n_columns)
+        valid = np.zeros(n_columns, dtype=bool)
+        for column, result in enumerate(column_results):
+            if isinstance(result, dict) and 'score' in result and 'action' in result:
+                scores[column] = result['score']
+                confidences[column] = result['confidence']
+                valid[column] = True
+        
+        weights = np.zeros((n_bots, n_columns))
+        used = np.zeros((n_bots, n_columns))
+        for row, (bot, _, bot_signals) in enumerate(pending):
+            for signal_name, config, weight, column in bot_signals:
+                if valid[column]:
+                    weights[row, column] += weight
+                    used[row, column] += 1
+                else:
+                    self._report_batch_signal_failure(bot, signal_name, config, column_results[column])
+        
+        total_weights = weights.sum(axis=1)
+        signal_counts = used.sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            overall_scores = (weights @ scores) / total_weights
+            overall_confidences = np.where(signal_counts > 0, (used @ confidences) / signal_counts, 0.0)
+        
+        # Phase 3 quality filter, then per-bot thresholds for accepted signals only
+        buy_thresholds = np.full(n_bots, -np.inf)
+        sell_thresholds = np.full(n_bots, np.inf)
+        accepted = (overall_confidences >= self.MIN_SIGNAL_CONFIDENCE) & (total_weights != 0)
+        for row in np.flatnonzero(accepted):
+            buy_thresholds[row], sell_thresholds[row] = self._resolve_thresholds(pending[row][0], regime_snapshot)
+        
+        actions = np.where(
+            overall_scores <= buy_thresholds, 'buy',
+            np.where(overall_scores >= sell_thresholds, 'sell', 'hold')
+        )
+        
+        logger.info(f"📦 Batch evaluated {n_bots} bots with {n_columns} distinct indicator calculations")
+        
+        # Pass 3: per-bot confirmation, tracking, sizing and automatic trading
+        for row, (bot, market_data, bot_signals) in enumerate(pending):
+            try:
+                if total_weights[row] == 0:
+                    results[bot.id] = self._error_result("No enabled signals with valid weights", bot)
+                    continue
+                
+                signal_results = {
+                    signal_name: column_results[column]
+                    for signal_name, _, _, column in bot_signals
+                    if valid[column]
+                }
+                results[bot.id] = self._complete_evaluation(
+                    bot, market_data, signal_results,
+                    float(overall_scores[row]), float(overall_confidences[row]),
+                    float(total_weights[row]), str(actions[row]), regime_snapshot
+                )
+            except Exception as e:
+                logger.error(f"Error completing batch evaluation for bot {bot.id}: {e}")
+        
+        return results
+    
+    def _report_batch_signal_failure(self, bot: Bot, signal_name: str, config: Dict[str, Any], failure: Any):
+        """Report a shared indicator failure against each bot that uses it, as evaluate_bot does."""
+        if isinstance(failure, Exception):
+            report_bot_error(
+                error_type=ErrorType.SIGNAL_CALCULATION,
+                message=f"Error calculating {signal_name} signal: {str(failure)}",
+                bot_id=bot.id,
+                bot_name=bot.name,
+                details={
+                    "signal_name": signal_name,
+                    "signal_config": config,
+                    "error_type": type(failure).__name__
+                }
+            )
+            logger.warning(f"Error calculating {signal_name} for bot {bot.id}: {failure}")
+        else:
+            logger.warning(f"Invalid signal result from {signal_name} for bot {bot.id}: {failure}")
+    
+    def _check_pre_evaluation_blocks(self, bot: Bot, market_data: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Return a blocking result if the bot should skip signal processing, None otherwise."""
+        # EARLY BLOCKING CHECKS - Prevent all signal processing if bot can't trade
+        early_block_result = self._check_early_blocking_conditions(bot)
+        if early_block_result:
+            logger.debug(f"Bot {bot.id} ({bot.pair}) blocked early: {early_block_result['metadata'].get('blocking_reason')}")
+            return early_block_result
         
-        return create_signal_instance(signal_type, parameters)
+        # Legacy balance check for bots with skip_signals_on_low_balance flag
+        if hasattr(bot, 'skip_signals_on_low_balance') and bot.skip_signals_on_low_balance:
+            balance_check = self._has_minimum_balance_for_any_trade(bot)
+            if not balance_check.get('can_trade', True):
+                logger.debug(f"Skipping signal processing for bot {bot.id} ({bot.pair}) due to insufficient balance: {balance_check.get('reason', 'unknown')}")
+                return {
+                    'overall_score': 0.0,
+                    'action': 'hold',
+                    'confidence': 0.0,
+                    'signal_results': {},
+                    'confirmation_status': {
+                        'confirmed': False,
+                        'consecutive_signals': 0,
+                        'required_signals': bot.confirmation_minutes,
+                        'last_signal_time': None,
+                        'message': f'Skipped: {balance_check.get("reason", "Insufficient balance for trading")}'
+                    },
+                    'metadata': {
+                        'evaluation_time': pd.Timestamp.now().isoformat(),
+                        'data_points_evaluated': len(market_data),
+                        'optimization_skipped': True,
+                        'balance_details': balance_check
+                    },
+                    'automatic_trade': False
+                }
+        
+        return None
+    
+    def _calculate_signal(self, signal_instance, bot: Bot, market_data: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Calculate a signal through the shared indicator cache.
+        
+        On a miss, uses incremental indicator state when a store is attached,
+        otherwise the signal's batch calculation.
+        """
+        if self.indicator_store is not None:
+            compute = lambda: self.indicator_store.calculate(signal_instance, market_data, bot.pair)
+        else:
+            compute = lambda: signal_instance.calculate(market_data)
+        return get_indicator_cache().get_or_compute(bot.pair, signal_instance, market_data, compute)
     
     def _check_signal_confirmation(self, bot: Bot, current_action: str, current_score: float) -> Dict[str, Any]:
         """Check and update signal confirmation status for Phase 2.3."""
@@ -351,8 +507,7 @@ class BotSignalEvaluator:
         if current_action == 'hold':
             # Reset any active confirmation
             if bot.signal_confirmation_start:
-                bot.signal_confirmation_start = None
-                self.db.commit()
+                self._update_confirmation_start(bot, None)
             
             return {
                 'is_confirmed': False,
@@ -376,8 +531,7 @@ class BotSignalEvaluator:
         # Check if we need to start or reset confirmation
         if not bot.signal_confirmation_start:
             # No active confirmation - start new one
-            bot.signal_confirmation_start = now
-            self.db.commit()
+            self._update_confirmation_start(bot, now)
             
             return {
                 'is_confirmed': False,
@@ -394,8 +548,7 @@ class BotSignalEvaluator:
             latest_action = recent_history[0].action
             if latest_action != current_action:
                 # Action changed - reset confirmation
-                bot.signal_confirmation_start = now
-                self.db.commit()
+                self._update_confirmation_start(bot, now)
                 
                 return {
                     'is_confirmed': False,
@@ -439,7 +592,16 @@ class BotSignalEvaluator:
                 'time_remaining_minutes': time_remaining
             }
     
-    def _determine_action(self, overall_score: float, bot: Bot) -> str:
+    def _update_confirmation_start(self, bot: Bot, confirmation_start: Optional[datetime]):
+        """Set the bot's confirmation start, committing now or on the write sink's flush."""
+        if self.write_sink is not None:
+            self.write_sink.update_bot(bot, signal_confirmation_start=confirmation_start)
+        else:
+            bot.signal_confirmation_start = confirmation_start
+            self.db.commit()
+    
+    def _determine_action(self, overall_score: float, bot: Bot,
+                          regime_snapshot: Optional[RegimeSnapshot] = None) -> str:
         """
         Determine trading action based on overall score and bot-specific thresholds.
         
@@ -447,13 +609,24 @@ class BotSignalEvaluator:
         Supports per-bot threshold configuration via signal_config.trading_thresholds
         Falls back to default thresholds if not configured.
         """
+        buy_threshold, sell_threshold = self._resolve_thresholds(bot, regime_snapshot)
         
+        if overall_score <= buy_threshold:
+            return 'buy'
+        elif overall_score >= sell_threshold:
+            return 'sell'
+        else:
+            return 'hold'
+    
+    def _resolve_thresholds(self, bot: Bot,
+                            regime_snapshot: Optional[RegimeSnapshot] = None) -> Tuple[float, float]:
+        """Return (buy_threshold, sell_threshold) for a bot's current regime and configuration."""
         # Phase 1D: Check if this bot uses trend-adaptive thresholds
         if getattr(bot, 'use_trend_detection', False):
             try:
-                from .trend_detection_engine import get_trend_engine
-                trend_engine = get_trend_engine()
-                regime_data = trend_engine.analyze_trend(bot.pair)
+                if regime_snapshot is None:
+                    regime_snapshot = RegimeSnapshot()
+                regime_data = regime_snapshot.get(bot.pair)
                 
                 # Dynamic thresholds based on market regime
                 if regime_data['regime'] == 'STRONG_TRENDING':
@@ -491,30 +664,13 @@ class BotSignalEvaluator:
                 sell_threshold = 0.05
         else:
             # Original static threshold logic for non-regime bots
-            # Check for bot-specific thresholds in signal_config
-            try:
-                signal_config = json.loads(bot.signal_config) if isinstance(bot.signal_config, str) else bot.signal_config
-                if signal_config and 'trading_thresholds' in signal_config:
-                    thresholds = signal_config['trading_thresholds']
-                    buy_threshold = thresholds.get('buy_threshold', -0.05)
-                    sell_threshold = thresholds.get('sell_threshold', 0.05)
-                    logger.info(f"Using custom thresholds for {bot.pair}: buy={buy_threshold}, sell={sell_threshold}")
-                else:
-                    # Default thresholds for static bots
-                    buy_threshold = -0.05  # System-wide optimized threshold
-                    sell_threshold = 0.05   # System-wide optimized threshold
-            except Exception as e:
-                # Fallback to default if any error
-                buy_threshold = -0.05
-                sell_threshold = 0.05
-                logger.warning(f"Error reading thresholds for {bot.pair}, using defaults: {e}")
+            # Bot-specific thresholds from signal_config, resolved when the plan was compiled
+            plan = get_evaluation_plan_cache().get_plan(bot)
+            buy_threshold, sell_threshold = plan.thresholds
+            if plan.custom_thresholds:
+                logger.debug(f"Using custom thresholds for {bot.pair}: buy={buy_threshold}, sell={sell_threshold}")
         
-        if overall_score <= buy_threshold:
-            return 'buy'
-        elif overall_score >= sell_threshold:
-            return 'sell'
-        else:
-            return 'hold'
+        return buy_threshold, sell_threshold
     
     def _error_result(self, error_message: str, bot: Bot = None) -> Dict[str, Any]:
         """Return standardized error result and report to error tracking."""
@@ -580,19 +736,25 @@ class BotSignalEvaluator:
         try:
             from ..core.database import SessionLocal
             
+            history_values = {
+                'bot_id': bot.id,
+                'timestamp': datetime.utcnow(),
+                'combined_score': evaluation_result['overall_score'],
+                'action': evaluation_result['action'],
+                'confidence': evaluation_result['confidence'],
+                'signal_scores': json.dumps(self._convert_to_json_serializable(evaluation_result['signal_results'])),
+                'evaluation_metadata': json.dumps(self._convert_to_json_serializable(evaluation_result['metadata'])),
+                'price': float(price)
+            }
+            
+            if self.write_sink is not None:
+                self.write_sink.add_signal_history(history_values)
+                return
+            
             # Use fresh database session to avoid conflicts
             fresh_db = SessionLocal()
             try:
-                history_entry = BotSignalHistory(
-                    bot_id=bot.id,
-                    timestamp=datetime.utcnow(),
-                    combined_score=evaluation_result['overall_score'],
-                    action=evaluation_result['action'],
-                    confidence=evaluation_result['confidence'],
-                    signal_scores=json.dumps(self._convert_to_json_serializable(evaluation_result['signal_results'])),
-                    evaluation_metadata=json.dumps(self._convert_to_json_serializable(evaluation_result['metadata'])),
-                    price=price
-                )
+                history_entry = BotSignalHistory(**history_values)
                 
                 fresh_db.add(history_entry)
                 fresh_db.commit()
@@ -696,29 +858,22 @@ class BotSignalEvaluator:
         total_score = 0.0
         total_weight = 0.0
         
-        # Parse signal configuration (handle JSON string from database)
-        if isinstance(bot.signal_config, str):
-            signal_config = json.loads(bot.signal_config)
-        else:
-            signal_config = bot.signal_config
+        plan = get_evaluation_plan_cache().get_plan(bot)
+        if plan.error:
+            raise ValueError(plan.error)
         
         # Signal calculations with consistent error handling
-        signal_types = ['rsi', 'moving_average', 'macd']
-        
-        for signal_name in signal_types:
-            config = signal_config.get(signal_name)
-            if config and config.get('enabled', False):
-                try:
-                    signal_instance = self._create_signal_instance(signal_name, config)
-                    if signal_instance:
-                        result = signal_instance.calculate(market_data)
-                        if result and 'score' in result:
-                            signal_results[signal_name] = result
-                            weight = config.get('weight', 1.0)
-                            total_score += result['score'] * weight
-                            total_weight += weight
-                except Exception as e:
-                    logger.warning(f"{signal_name.upper()} calculation failed in temperature mode: {e}")
+        for planned in plan.signals:
+            signal_name = planned.name
+            try:
+                result = self._calculate_signal(planned.instance, bot, market_data)
+                if result and 'score' in result:
+                    signal_results[signal_name] = result
+                    weight = planned.config.get('weight', 1.0)
+                    total_score += result['score'] * weight
+                    total_weight += weight
+            except Exception as e:
+                logger.warning(f"{signal_name.upper()} calculation failed in temperature mode: {e}")
         
         # Calculate final weighted score
         overall_score = total_score / max(total_weight, 1.0) if total_weight > 0 else 0.0
@@ -795,6 +950,10 @@ class BotSignalEvaluator:
         """
         # Get current evaluation
         evaluation = self.evaluate_bot(bot, market_data)
+        return self._temperature_from_evaluation(evaluation)
+    
+    def _temperature_from_evaluation(self, evaluation: Dict[str, Any]) -> Dict[str, Any]:
+        """Build temperature data from an evaluate_bot/evaluate_bots_batch result."""
         score = evaluation['overall_score']
         action = evaluation['action']
         
@@ -851,17 +1010,24 @@ class BotSignalEvaluator:
         bots = self.db.query(Bot).filter(Bot.status == 'RUNNING').all()
         temperatures = []
         
+        # Use cached market data if available, otherwise create fallback data
+        market_data_by_pair = {}
+        for pair in set(bot.pair for bot in bots):
+            if market_data_cache and pair in market_data_cache:
+                market_data_by_pair[pair] = market_data_cache[pair]
+            else:
+                # Create minimal fallback data for temperature calculation using centralized utility
+                from ..utils.market_data_helper import create_fallback_dataframe
+                market_data_by_pair[pair] = create_fallback_dataframe()
+        
+        # One batched evaluation shares indicator work across bots on the same pair
+        evaluations = self.evaluate_bots_batch(bots, market_data_by_pair)
+        
         for bot in bots:
             try:
-                # Use cached market data if available, otherwise create fallback data
-                if market_data_cache and bot.pair in market_data_cache:
-                    market_data = market_data_cache[bot.pair]
-                else:
-                    # Create minimal fallback data for temperature calculation using centralized utility
-                    from ..utils.market_data_helper import create_fallback_dataframe
-                    market_data = create_fallback_dataframe()
-                
-                temp_data = self.calculate_bot_temperature(bot, market_data)
+                if bot.id not in evaluations:
+                    raise ValueError(f"Evaluation failed for bot {bot.id}")
+                temp_data = self._temperature_from_evaluation(evaluations[bot.id])
                 
                 # Update the bot's current_combined_score in the database
                 try:
@@ -0,0 +1,109 @@
+"""
+Candle Codec - compact binary encoding of candle frames for the Redis cache.
+
+Historical candles used to be cached as JSON records: timestamps were
+stringified, the DatetimeIndex was lost, and a cache hit rebuilt the frame
+from per-row dicts, returning a differently shaped frame than a fresh fetch.
+This codec stores the frame column by column:
+
+    header   16 bytes  magic b'CNDL', version (u16), column count (u16), row count (u32), padding
+    index    n * 8     candle start times, int64 epoch nanoseconds
+    columns  5 * n * 8 float64 open, high, low, close, volume (each contiguous)
+
+Decoding wraps the payload with np.frombuffer, so the returned frame shares
+memory with the cached bytes and is read-only. It round-trips exactly the
+frame CoinbaseService produces: a 'timestamp' DatetimeIndex and float64
+OHLCV columns.
+"""
+
+import struct
+from typing import Union
+
+import numpy as np
+import pandas as pd
+
+from .candle_store import OHLCV_COLUMNS
+
+CANDLE_CODEC_MAGIC = b'CNDL'
+CANDLE_CODEC_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHI4x')   # 16 bytes keeps the int64/float64 sections 8-byte aligned
+_INDEX_NAME = 'timestamp'
+
+
+def is_encoded_candles(payload: Union[bytes, bytearray, memoryview, str, None]) -> bool:
+    """Return True if a cached value was written by encode_candles."""
+    return isinstance(payload, (bytes, bytearray, memoryview)) and bytes(payload[:4]) == CANDLE_CODEC_MAGIC
+
+
+def can_encode_candles(df: pd.DataFrame) -> bool:
+    """Return True if a frame has the candle shape the codec stores."""
+    return (
+        isinstance(df.index, pd.DatetimeIndex)
+        and df.index.tz is None
+        and df.index.name == _INDEX_NAME
+        and list(df.columns) == OHLCV_COLUMNS
+        and all(dtype == np.float64 for dtype in df.dtypes)
+    )
+
+
+def encode_candles(df: pd.DataFrame) -> bytes:
+    """
+    Encode a candle frame to the binary columnar format.
+
+    Args:
+        df: Frame indexed by naive 'timestamp' with float64 OHLCV columns
+
+    Returns:
+        Encoded payload
+
+    Raises:
+        ValueError: If the frame doesn't have the candle shape (see can_encode_candles)
+    """
+    if not can_encode_candles(df):
+        raise ValueError("Frame is not an OHLCV candle frame with a 'timestamp' DatetimeIndex")
+
+    count = len(df)
+    index = np.ascontiguousarray(df.index.as_unit('ns').asi8, dtype='<i8')
+    # Transposed so each column is contiguous in the payload
+    columns = np.ascontiguousarray(df.to_numpy(dtype=np.float64).T, dtype='<f8')
+    header = _HEADER.pack(CANDLE_CODEC_MAGIC, CANDLE_CODEC_VERSION, len(OHLCV_COLUMNS), count)
+    return header + index.tobytes() + columns.tobytes()
+
+
+def decode_candles(payload: Union[bytes, bytearray, memoryview]) -> pd.DataFrame:
+    """
+    Decode a payload written by encode_candles without copying the OHLCV data.
+
+    Args:
+        payload: Encoded bytes (e.g. a Redis value read with decode_responses=False)
+
+    Returns:
+        Read-only candle frame identical to the one that was encoded
+
+    Raises:
+        ValueError: If the payload is not a supported candle encoding
+    """
+    if len(payload) < _HEADER.size:
+        raise ValueError("Candle payload is truncated")
+    magic, version, n_columns, count = _HEADER.unpack_from(payload)
+    if magic != CANDLE_CODEC_MAGIC:
+        raise ValueError("Payload is not an encoded candle frame")
+    if version != CANDLE_CODEC_VERSION:
+        raise ValueError(f"Unsupported candle encoding version {version}")
+    if n_columns != len(OHLCV_COLUMNS):
+        raise ValueError(f"Unexpected candle column count {n_columns}")
+    expected_size = _HEADER.size + count * 8 * (1 + n_columns)
+    if len(payload) != expected_size:
+        raise ValueError(f"Candle payload size {len(payload)} != expected {expected_size}")
+
+    index = np.frombuffer(payload, dtype='<i8', count=count, offset=_HEADER.size)
+    columns = np.frombuffer(payload, dtype='<f8', count=count * n_columns,
+                            offset=_HEADER.size + count * 8).reshape(n_columns, count)
+
+    return pd.DataFrame(
+        columns.T,
+        index=pd.DatetimeIndex(index.view('M8[ns]'), name=_INDEX_NAME),
+        columns=list(OHLCV_COLUMNS),
+        copy=False
+    )
@@ -0,0 +1,344 @@
+"""
+Candle Store - rolling OHLCV windows kept current from the ticker feed.
+
+Every candle consumer used to refetch 24-100 candles over REST, even though
+the websocket ticker stream already tells us every price the open candle
+sees. The store keeps one ring buffer per (product, granularity): it is
+seeded once from REST, each tick is folded into the open candle, and a tick
+past the candle boundary rolls a new one. REST is only needed again after a
+gap (missed boundary, websocket reconnect, or an idle series).
+
+Buffers are preallocated NumPy arrays written twice (at i and i + capacity),
+so the last n candles are always one contiguous slice, copied out under the
+store lock so callers never see a row rewritten mid-computation.
+
+The ticker feed carries no trade size, so candles touched by size-less ticks
+have incomplete volume. They are tracked per row, and callers that read
+volume ask for volume-exact windows only.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+_OPEN, _HIGH, _LOW, _CLOSE, _VOLUME = range(5)
+_NS_PER_SECOND = 1_000_000_000
+
+
+class CandleRingBuffer:
+    """
+    Fixed-capacity OHLCV window for one (product, granularity).
+
+    Rows are stored twice so that any window of up to ``capacity`` candles
+    is a contiguous, zero-copy slice of the backing arrays.
+    """
+
+    def __init__(self, granularity: int, capacity: int = 512):
+        """
+        Initialize the buffer.
+
+        Args:
+            granularity: Candle length in seconds
+            capacity: Maximum number of candles kept
+        """
+        self.granularity = granularity
+        self.capacity = capacity
+        self._starts = np.zeros(2 * capacity, dtype=np.int64)          # candle start, epoch ns
+        self._ohlcv = np.zeros((2 * capacity, len(OHLCV_COLUMNS)), dtype=np.float64)
+        self._volume_exact = np.zeros(2 * capacity, dtype=bool)         # volume covers every trade
+        self._written = 0   # Total candles ever written; the open candle is row _written - 1
+        self.needs_reseed = True
+        self.last_update = 0.0
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    @property
+    def open_start(self) -> Optional[int]:
+        """Start (epoch seconds) of the open candle, or None if empty."""
+        if self._written == 0:
+            return None
+        return int(self._starts[(self._written - 1) % self.capacity] // _NS_PER_SECOND)
+
+    def _write_row(self, start_seconds: int, row, volume_exact: bool):
+        position = self._written % self.capacity
+        start_ns = start_seconds * _NS_PER_SECOND
+        self._starts[position] = start_ns
+        self._starts[position + self.capacity] = start_ns
+        self._ohlcv[position] = row
+        self._ohlcv[position + self.capacity] = row
+        self._volume_exact[position] = volume_exact
+        self._volume_exact[position + self.capacity] = volume_exact
+        self._written += 1
+
+    def seed(self, starts: np.ndarray, ohlcv: np.ndarray):
+        """
+        Replace the buffer contents with REST candles.
+
+        Args:
+            starts: Candle start times in epoch seconds, ascending
+            ohlcv: Array of shape (n, 5) in OHLCV_COLUMNS order
+        """
+        self._written = 0
+        for start, row in zip(starts[-self.capacity:], ohlcv[-self.capacity:]):
+            self._write_row(int(start), row, True)
+        self.needs_reseed = False
+        self.last_update = time.time()
+
+    def apply_tick(self, timestamp: float, price: float, size: Optional[float] = None) -> str:
+        """
+        Fold one trade price into the window.
+
+        A tick without a size leaves its candle's volume incomplete.
+
+        Returns:
+            'updated' (open candle changed), 'rolled' (a new candle opened),
+            'stale' (tick older than the open candle), 'gap' (a boundary was
+            missed; the buffer is now flagged for reseeding) or 'ignored'
+            (the buffer is already waiting for a reseed)
+        """
+        if self._written == 0 or self.needs_reseed:
+            return 'ignored'
+
+        bucket = int(timestamp // self.granularity) * self.granularity
+        open_start = self.open_start
+
+        if bucket == open_start:
+            position = (self._written - 1) % self.capacity
+            for row in (self._ohlcv[position], self._ohlcv[position + self.capacity]):
+                if price > row[_HIGH]:
+                    row[_HIGH] = price
+                if price < row[_LOW]:
+                    row[_LOW] = price
+                row[_CLOSE] = price
+                row[_VOLUME] += size or 0.0
+            if size is None:
+                self._volume_exact[position] = False
+                self._volume_exact[position + self.capacity] = False
+            self.last_update = time.time()
+            return 'updated'
+
+        if bucket < open_start:
+            return 'stale'
+
+        if bucket == open_start + self.granularity:
+            self._write_row(bucket, (price, price, price, price, size or 0.0), size is not None)
+            self.last_update = time.time()
+            return 'rolled'
+
+        # We can't tell an untraded interval from ticks we never received
+        self.needs_reseed = True
+        return 'gap'
+
+    def view(self, limit: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Zero-copy views of the last ``limit`` candles.
+
+        The views alias the live arrays; copy them before releasing whatever
+        lock serializes writes to this buffer.
+
+        Returns:
+            (starts in epoch ns, OHLCV rows) read-only views, or None if the
+            buffer holds fewer than ``limit`` candles
+        """
+        if limit <= 0 or limit > len(self):
+            return None
+        start = (self._written - limit) % self.capacity
+        starts = self._starts[start:start + limit]
+        ohlcv = self._ohlcv[start:start + limit]
+        starts.flags.writeable = False
+        ohlcv.flags.writeable = False
+        return starts, ohlcv
+
+    def volume_exact(self, limit: int) -> bool:
+        """Whether every one of the last ``limit`` candles has complete volume."""
+        if limit <= 0 or limit > len(self):
+            return False
+        start = (self._written - limit) % self.capacity
+        return bool(self._volume_exact[start:start + limit].all())
+
+
+class CandleStore:
+    """
+    Process-wide registry of candle ring buffers fed by the ticker stream.
+
+    Features:
+    - One preallocated ring buffer per (product, granularity)
+    - Ticks update every granularity of a product in O(1)
+    - Contiguous windows copied out under the lock for the signal classes
+    - Per-candle volume completeness for callers that read volume
+    - Gap detection: missed boundaries and idle series are reseeded from REST
+    """
+
+    def __init__(self, capacity: int = 512, max_idle_seconds: float = 300.0):
+        """
+        Initialize the store.
+
+        Args:
+            capacity: Candles kept per (product, granularity)
+            max_idle_seconds: A series with no tick or seed for this long is not
+                              served (its open candle may have missed trades)
+        """
+        self._capacity = capacity
+        self._max_idle_seconds = max_idle_seconds
+        self._buffers: Dict[Tuple[str, int], CandleRingBuffer] = {}
+        self._lock = threading.RLock()
+        self._stats = {
+            'seeds': 0,
+            'ticks': 0,
+            'rolls': 0,
+            'gaps': 0,
+            'hits': 0,
+            'misses': 0
+        }
+        logger.info(f"CandleStore initialized (capacity={capacity}, max_idle={max_idle_seconds}s)")
+
+    def seed(self, product_id: str, granularity: int, candles: pd.DataFrame) -> bool:
+        """
+        Seed (or reseed) a series from REST candles.
+
+        Args:
+            product_id: Trading pair
+            granularity: Candle length in seconds
+            candles: DataFrame indexed by candle start with OHLCV columns
+
+        Returns:
+            True if the series was seeded
+        """
+        if candles is None or candles.empty or not isinstance(candles.index, pd.DatetimeIndex):
+            return False
+        if any(column not in candles.columns for column in OHLCV_COLUMNS):
+            return False
+
+        candles = candles.sort_index()
+        index = candles.index.tz_localize(None) if candles.index.tz is not None else candles.index
+        starts = index.as_unit('ns').asi8 // _NS_PER_SECOND
+        ohlcv = candles[OHLCV_COLUMNS].to_numpy(dtype=np.float64)
+
+        with self._lock:
+            buffer = self._buffers.get((product_id, granularity))
+            if buffer is None or buffer.capacity < len(candles):
+                buffer = CandleRingBuffer(granularity, max(self._capacity, len(candles)))
+                self._buffers[(product_id, granularity)] = buffer
+            buffer.seed(starts, ohlcv)
+            self._stats['seeds'] += 1
+        return True
+
+    def on_tick(self, product_id: str, price: float, timestamp: Optional[float] = None,
+                size: Optional[float] = None):
+        """
+        Fold a ticker update into every series of the product.
+
+        Args:
+            product_id: Trading pair
+            price: Last trade price
+            timestamp: Tick time in epoch seconds (defaults to now)
+            size: Trade size, when the feed provides it (None marks the
+                  candle's volume as incomplete)
+        """
+        if not price or price <= 0:
+            return
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            self._stats['ticks'] += 1
+            for (pair, granularity), buffer in self._buffers.items():
+                if pair != product_id:
+                    continue
+                outcome = buffer.apply_tick(timestamp, price, size)
+                if outcome == 'rolled':
+                    self._stats['rolls'] += 1
+                elif outcome == 'gap':
+                    self._stats['gaps'] += 1
+                    logger.info(f"Candle gap detected for {pair} ({granularity}s); awaiting reseed")
+
+    def get_candles(self, product_id: str, granularity: int, limit: int,
+                    require_volume: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Get a snapshot of the last ``limit`` candles.
+
+        The rows are copied while the store lock is held, so later ticks and
+        reseeds never change a frame a caller is computing on.
+
+        Args:
+            product_id: Trading pair
+            granularity: Candle length in seconds
+            limit: Number of candles
+            require_volume: Only serve the window if every candle's volume is
+                            complete (no size-less ticks folded in)
+
+        Returns:
+            DataFrame indexed by candle start, or None if the series is missing,
+            too short, flagged for reseeding, idle or (with require_volume)
+            missing volume (callers fetch and seed)
+        """
+        with self._lock:
+            buffer = self._buffers.get((product_id, granularity))
+            if buffer is None or buffer.needs_reseed or \
+                    time.time() - buffer.last_update > self._max_idle_seconds:
+                self._stats['misses'] += 1
+                return None
+            views = buffer.view(limit)
+            if views is None or (require_volume and not buffer.volume_exact(limit)):
+                self._stats['misses'] += 1
+                return None
+            self._stats['hits'] += 1
+            starts, ohlcv = views[0].copy(), views[1].copy()
+
+        index = pd.DatetimeIndex(starts.view('M8[ns]'), name='timestamp')
+        return pd.DataFrame(ohlcv, index=index, columns=OHLCV_COLUMNS, copy=False)
+
+    def mark_gap(self, product_ids: Optional[Iterable[str]] = None) -> int:
+        """
+        Flag series for reseeding (e.g. after a websocket reconnect).
+
+        Args:
+            product_ids: Products to flag. If None, flag every series.
+
+        Returns:
+            Number of series flagged
+        """
+        products = None if product_ids is None else set(product_ids)
+        with self._lock:
+            flagged = 0
+            for (pair, _), buffer in self._buffers.items():
+                if products is None or pair in products:
+                    buffer.needs_reseed = True
+                    flagged += 1
+            return flagged
+
+    def clear(self):
+        """Drop every series."""
+        with self._lock:
+            self._buffers.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            hit_rate = (self._stats['hits'] / lookups * 100) if lookups > 0 else 0
+            return {
+                'series': len(self._buffers),
+                'products': len({pair for pair, _ in self._buffers}),
+                'awaiting_reseed': sum(1 for buffer in self._buffers.values() if buffer.needs_reseed),
+                'capacity': self._capacity,
+                'hit_rate_percent': round(hit_rate, 2),
+                **self._stats
+            }
+
+
+# Global candle store instance
+_global_candle_store = CandleStore()
+
+
+def get_candle_store() -> CandleStore:
+    """Get the global candle store instance."""
+    return _global_candle_store
@@ -11,6 +11,8 @@ import logging
 import signal
 from contextlib import contextmanager
 from .market_data_cache import get_market_data_cache
+from .candle_store import get_candle_store
+from .adaptive_rate_limiter import RateLimitedClient, get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -50,25 +52,30 @@ class CoinbaseService:
         # Initialize market data cache (centralized caching)
         self.market_data_cache = get_market_data_cache()
         
-        # Rate limiting circuit breaker
-        self.rate_limit_circuit_breaker = {
-            'failure_count': 0,
-            'last_failure_time': 0,
-            'circuit_open': False,
-            'circuit_open_until': 0,
-            'backoff_seconds': 1  # Start with 1 second backoff
-        }
+        # One adaptive call budget shared with every other process (see AdaptiveRateLimiter)
+        self.rate_limiter = get_rate_limiter()
         
         self._initialize_client()
     
+    @property
+    def rate_limit_circuit_breaker(self) -> Dict[str, Any]:
+        """Circuit-breaker view of the shared limiter: open while a 429 pause is in force."""
+        wait = self.rate_limiter.wait_time()
+        return {
+            'circuit_open': wait > 0,
+            'circuit_open_until': time.time() + wait if wait > 0 else 0
+        }
+    
     def _initialize_client(self):
         """Initialize Coinbase REST client."""
         try:
             if settings.coinbase_api_key and settings.coinbase_api_secret:
-                self.client = RESTClient(
+                # Every call goes through the limiter, which learns from the rate-limit headers
+                self.client = RateLimitedClient(RESTClient(
                     api_key=settings.coinbase_api_key,
-                    api_secret=settings.coinbase_api_secret
-                )
+                    api_secret=settings.coinbase_api_secret,
+                    rate_limit_headers=True
+                ), self.rate_limiter)
                 logger.info("Coinbase client initialized successfully")
             else:
                 logger.warning("Coinbase API credentials not provided")
@@ -94,24 +101,14 @@ class CoinbaseService:
             return False
     
     def _handle_ws_message(self, message):
-        """Handle incoming WebSocket messages and trigger bot evaluations."""
+        """Handle incoming WebSocket messages and schedule bot evaluations."""
         try:
-            logger.info(f"📥 Received WebSocket message: {type(message)}")
+            logger.debug(f"📥 Received WebSocket message: {type(message)}")
             
-            # Log the raw message for debugging (safely)
             if isinstance(message, str):
-                try:
-                    msg_preview = message[:200] if len(message) > 200 else message
-                    logger.info(f"📨 Raw message preview: {msg_preview}")
-                except Exception as e:
-                    logger.info(f"📨 Raw message length: {len(message)} chars")
                 message = json.loads(message)
             
-            if isinstance(message, dict):
-                logger.info(f"📋 Message keys: {list(message.keys())}")
-            
             channel = message.get('channel', '') if isinstance(message, dict) else ''
-            logger.info(f"📡 Message channel: '{channel}'")
             
             # Route message to appropriate handlers
             if channel in self.message_handlers:
@@ -123,7 +120,6 @@ class CoinbaseService:
             
             # Handle ticker updates for bot evaluation
             if channel == 'ticker':
-                logger.info(f"📊 Processing ticker message")
                 events = message.get('events', [])
                 for event in events:
                     tickers = event.get('tickers', [])
@@ -131,33 +127,26 @@ class CoinbaseService:
                         product_id = ticker.get('product_id')
                         price = ticker.get('price')
                         if product_id and price:
-                            logger.info(f"📈 Ticker update: {product_id} @ ${price}")
-                            # Trigger bot evaluation for this product
+                            logger.debug(f"📈 Ticker update: {product_id} @ ${price}")
+                            get_candle_store().on_tick(product_id, float(price))
+                            # Schedule bot evaluation for this product
                             self._trigger_bot_evaluations(product_id, ticker)
                 
         except Exception as e:
             logger.error(f"Error handling WebSocket message: {e}")
     
     def _trigger_bot_evaluations(self, product_id: str, ticker_data: dict):
-        """Trigger bot evaluations for a specific product on ticker updates."""
+        """
+        Schedule bot evaluations for a product on a ticker update.
+        
+        Only enqueues: the evaluation scheduler coalesces updates per product and
+        runs evaluations on its worker pool, keeping the websocket thread free.
+        """
         try:
-            logger.info(f"🤖 Triggering bot evaluations for {product_id}")
-            
-            # Import here to avoid circular imports
-            from ..services.streaming_bot_evaluator import StreamingBotEvaluator
-            from ..core.database import SessionLocal
-            
-            # Create database session
-            db = SessionLocal()
-            try:
-                evaluator = StreamingBotEvaluator(db)
-                evaluator.evaluate_bots_on_ticker_update(product_id, ticker_data)
-                logger.info(f"✅ Bot evaluations completed for {product_id}")
-            finally:
-                db.close()
-                
+            from .evaluation_scheduler import get_evaluation_scheduler
+            get_evaluation_scheduler().submit(product_id, ticker_data)
         except Exception as e:
-            logger.error(f"❌ Error triggering bot evaluations for {product_id}: {e}")
+            logger.error(f"❌ Error scheduling bot evaluations for {product_id}: {e}")
     
     def add_message_handler(self, channel: str, handler: Callable):
         """Add a handler function for WebSocket messages from a specific channel."""
@@ -255,9 +244,17 @@ class CoinbaseService:
             "is_running": self.is_ws_running,
             "thread_alive": self.ws_thread.is_alive() if self.ws_thread else False,
             "client_initialized": self.ws_client is not None,
-            "handler_count": {channel: len(handlers) for channel, handlers in self.message_handlers.items()}
+            "handler_count": {channel: len(handlers) for channel, handlers in self.message_handlers.items()},
+            "evaluation_scheduler": self._get_evaluation_scheduler_stats()
         }
     
+    def _get_evaluation_scheduler_stats(self) -> Dict[str, Any]:
+        try:
+            from .evaluation_scheduler import get_evaluation_scheduler
+            return get_evaluation_scheduler().get_stats()
+        except Exception as e:
+            return {"error": str(e)}
+    
     def get_products(self) -> List[dict]:
         """Get available trading products."""
         if not self.client:
@@ -300,8 +297,66 @@ class CoinbaseService:
         except Exception as e:
             logger.error(f"Error fetching ticker for {product_id}: {e}")
             return None
-    
-    def get_historical_data(self, product_id: str, granularity: int = 3600, limit: int = 100) -> pd.DataFrame:
+
+    def get_product_tickers(self, product_ids: List[str], batch_size: int = 250) -> Dict[str, dict]:
+        """
+        Get tickers for many products with two REST calls per batch.
+
+        One list-products call (price and 24h volume) and one best bid/ask call
+        cover up to batch_size products, instead of one get_product call each.
+
+        Args:
+            product_ids: Trading pairs to fetch
+            batch_size: Products per request (keeps the query string bounded)
+
+        Returns:
+            Dict of product_id -> ticker dict (products the API didn't return are omitted)
+        """
+        if not self.client or not product_ids:
+            return {}
+
+        tickers: Dict[str, dict] = {}
+        for i in range(0, len(product_ids), batch_size):
+            batch = list(product_ids[i:i + batch_size])
+            try:
+                products_response = self.client.get_products(product_ids=batch)
+                for product in getattr(products_response, 'products', None) or []:
+                    price = getattr(product, 'price', None)
+                    if not price:
+                        continue
+                    volume_24h = getattr(product, 'volume_24h', None)
+                    tickers[product.product_id] = {
+                        "product_id": product.product_id,
+                        "price": float(price),
+                        "volume_24h": float(volume_24h) if volume_24h else 0,
+                        "best_bid": 0.0,
+                        "best_ask": 0.0,
+                        "data_source": "rest_api_batch"
+                    }
+            except Exception as e:
+                logger.error(f"Error fetching batch tickers for {len(batch)} products: {e}")
+                continue
+
+            try:
+                book_response = self.client.get_best_bid_ask(product_ids=batch)
+                for book in getattr(book_response, 'pricebooks', None) or []:
+                    ticker = tickers.get(getattr(book, 'product_id', None))
+                    if ticker is None:
+                        continue
+                    bids = getattr(book, 'bids', None) or []
+                    asks = getattr(book, 'asks', None) or []
+                    if bids:
+                        ticker["best_bid"] = float(bids[0].price)
+                    if asks:
+                        ticker["best_ask"] = float(asks[0].price)
+            except Exception as e:
+                # Prices are still usable without the book
+                logger.warning(f"Error fetching best bid/ask for {len(batch)} products: {e}")
+
+        return tickers
+
+    def get_historical_data(self, product_id: str, granularity: int = 3600, limit: int = 100,
+                            start: Optional[int] = None) -> pd.DataFrame:
         """
         Get historical candlestick data directly from API.
         
@@ -312,41 +367,40 @@ class CoinbaseService:
             product_id: Trading pair (e.g., "BTC-USD")
             granularity: Candlestick granularity in seconds (3600 = 1 hour)
             limit: Number of candles to fetch
+            start: If given, fetch only candles starting at or after this Unix time
+                   (a delta update of a series already held); limit then caps the count
         """
         if not self.client:
             return pd.DataFrame()
         
         # Direct API call without legacy cache
-        return self._fetch_historical_data_from_api(product_id, granularity, limit)
+        return self._fetch_historical_data_from_api(product_id, granularity, limit, start)
     
-    def _fetch_historical_data_from_api(self, product_id: str, granularity: int, limit: int) -> pd.DataFrame:
+    def _fetch_historical_data_from_api(self, product_id: str, granularity: int, limit: int,
+                                        start: Optional[int] = None) -> pd.DataFrame:
         """
-        Internal method to fetch data directly from Coinbase API with circuit breaker and backoff.
+        Internal method to fetch data directly from Coinbase API.
         This method should only be called by the cache system.
-        """
-        # Check circuit breaker
-        current_time = time.time()
-        cb = self.rate_limit_circuit_breaker
         
-        if cb['circuit_open'] and current_time < cb['circuit_open_until']:
-            logger.warning(f"🔐 Circuit breaker open for {product_id}, skipping API call until {cb['circuit_open_until'] - current_time:.1f}s")
+        Pacing and 429 backoff are handled by the shared rate limiter the
+        client goes through; while it is paused after a 429 the call is
+        skipped so callers can serve what they have cached.
+        """
+        pause = self.rate_limiter.wait_time()
+        if pause > 0:
+            logger.warning(f"🔐 Rate limit pause in force, skipping API call for {product_id} for {pause:.1f}s")
             return pd.DataFrame()
         
-        # Reset circuit breaker if enough time has passed
-        if cb['circuit_open'] and current_time >= cb['circuit_open_until']:
-            logger.info(f"🔓 Circuit breaker reset for {product_id}")
-            cb['circuit_open'] = False
-            cb['failure_count'] = max(0, cb['failure_count'] - 2)  # Reduce failure count on recovery
-        
         logger.info(f"🌐 Making API call for {product_id} (granularity={granularity}, limit={limit})")
         
-        # Add small delay to respect rate limits
-        time.sleep(0.5)  # 500ms delay between API calls
-        
         try:
             # Calculate start and end times as Unix timestamps
             end_timestamp = int(time.time())
             start_timestamp = end_timestamp - (granularity * limit)
+            if start is not None and start > start_timestamp:
+                # Delta fetch: only the candles from `start` onwards
+                start_timestamp = int(start)
+                limit = min(limit, (end_timestamp - start_timestamp) // granularity + 1)
             
             # Convert granularity to string format expected by API
             granularity_map = {
@@ -385,12 +439,6 @@ class CoinbaseService:
                 df.set_index('timestamp', inplace=True)
                 df.sort_index(inplace=True)
                 
-                # Reset circuit breaker on success
-                if cb['failure_count'] > 0:
-                    logger.info(f"✅ API success for {product_id}, reducing failure count")
-                    cb['failure_count'] = max(0, cb['failure_count'] - 1)
-                    cb['backoff_seconds'] = max(1, cb['backoff_seconds'] // 2)  # Reduce backoff on success
-                
                 logger.info(f"✅ Successfully fetched {len(df)} candles for {product_id}")
                 return df
             
@@ -398,23 +446,14 @@ class CoinbaseService:
             error_msg = str(e)
             logger.error(f"Error fetching historical data for {product_id}: {e}")
             
-            # Check for rate limiting errors and update circuit breaker
+            # The limiter has already slowed down and paused on a 429; just report it
             is_rate_limit = "429" in error_msg or "Too Many Requests" in error_msg or "rate limit" in error_msg.lower()
             
             if is_rate_limit:
-                cb['failure_count'] += 1
-                cb['last_failure_time'] = current_time
-                
-                # Exponential backoff: 1s, 2s, 4s, 8s, 16s, max 60s
-                cb['backoff_seconds'] = min(60, cb['backoff_seconds'] * 2)
-                
-                # Open circuit breaker after 3 failures
-                if cb['failure_count'] >= 3:
-                    cb['circuit_open'] = True
-                    cb['circuit_open_until'] = current_time + cb['backoff_seconds']
-                    logger.error(f"🚨 Circuit breaker opened for {cb['backoff_seconds']}s after {cb['failure_count']} failures")
-                
-                logger.error(f"🚨 Rate limiting detected for {product_id} (failure #{cb['failure_count']}, next backoff: {cb['backoff_seconds']}s)")
+                limiter_stats = self.rate_limiter.get_stats()
+                logger.error(f"🚨 Rate limiting detected for {product_id} "
+                             f"(pace {limiter_stats['calls_per_minute']}/min, "
+                             f"paused {limiter_stats['paused_for_seconds']}s)")
                 
                 # Report to system health monitor
                 try:
@@ -425,8 +464,8 @@ class CoinbaseService:
                         details={
                             "product_id": product_id, 
                             "error_type": "rate_limit_429",
-                            "failure_count": cb['failure_count'],
-                            "backoff_seconds": cb['backoff_seconds']
+                            "calls_per_minute": limiter_stats['calls_per_minute'],
+                            "backoff_seconds": limiter_stats['paused_for_seconds']
                         }
                     )
                 except Exception as report_error:
@@ -0,0 +1,241 @@
+"""
+Compiled Evaluation Plans - per-bot signal configuration resolved once.
+
+Every evaluation used to json.loads() the bot's signal_config (twice, once
+for signals and once for thresholds), rebuild parameter dicts and go through
+the signal factory. An EvaluationPlan holds the result of all that work: the
+parsed configuration, ready signal instances with their weights and the
+static trading thresholds. Plans are cached by bot id and updated_at, and
+invalidated explicitly when a bot's configuration is changed through the API.
+"""
+
+import copy
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..models.models import Bot
+from .signals.base import create_signal_instance
+from ..utils.error_reporting import report_bot_error, ErrorType
+
+logger = logging.getLogger(__name__)
+
+# Bot config signal names -> signal factory names
+SIGNAL_TYPE_MAP = {
+    'rsi': 'RSI',
+    'moving_average': 'MA_Crossover',
+    'macd': 'MACD'
+}
+
+DEFAULT_BUY_THRESHOLD = -0.05   # System-wide optimized threshold
+DEFAULT_SELL_THRESHOLD = 0.05   # System-wide optimized threshold
+
+
+def build_signal_parameters(signal_name: str, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Map bot config parameter names to signal constructor parameters."""
+    # Extract parameters (exclude 'enabled' and 'weight')
+    parameters = {k: v for k, v in config.items() if k not in ['enabled', 'weight']}
+
+    if signal_name.lower() == 'rsi':
+        parameters = {
+            'period': parameters.get('period', 14),
+            'oversold': parameters.get('buy_threshold', 30),
+            'overbought': parameters.get('sell_threshold', 70)
+        }
+    elif signal_name.lower() == 'moving_average':
+        parameters = {
+            'fast_period': parameters.get('fast_period', 10),
+            'slow_period': parameters.get('slow_period', 20)
+        }
+    elif signal_name.lower() == 'macd':
+        parameters = {
+            'fast_period': parameters.get('fast_period', 12),
+            'slow_period': parameters.get('slow_period', 26),
+            'signal_period': parameters.get('signal_period', 9)
+        }
+
+    return parameters
+
+
+class PlannedSignal:
+    """One enabled signal of a plan: its config entry, weight and ready instance."""
+
+    __slots__ = ('name', 'config', 'weight', 'normalized_weight', 'instance')
+
+    def __init__(self, name: str, config: Dict[str, Any], instance):
+        self.name = name
+        self.config = config
+        self.weight = config.get('weight', 0)
+        self.normalized_weight = 0.0
+        self.instance = instance
+
+
+class EvaluationPlan:
+    """
+    Everything evaluate_bot needs from a bot's signal_config, resolved once.
+
+    ``error`` is set (and ``signals`` empty) when the configuration can't be
+    used; evaluators turn it into their standard error result.
+    """
+
+    def __init__(self, signal_config: Optional[Dict[str, Any]], signals: List[PlannedSignal],
+                 buy_threshold: float, sell_threshold: float,
+                 custom_thresholds: bool = False, error: Optional[str] = None):
+        self.signal_config = signal_config
+        self.signals = signals
+        self.buy_threshold = buy_threshold
+        self.sell_threshold = sell_threshold
+        self.custom_thresholds = custom_thresholds
+        self.error = error
+        self.total_weight = sum(signal.weight for signal in signals)
+        if self.total_weight:
+            for signal in signals:
+                signal.normalized_weight = signal.weight / self.total_weight
+
+    @property
+    def thresholds(self) -> Tuple[float, float]:
+        return self.buy_threshold, self.sell_threshold
+
+    @classmethod
+    def compile(cls, raw_config: Any, bot: Optional[Bot] = None) -> 'EvaluationPlan':
+        """
+        Compile a plan from a bot's signal_config (JSON string or dict).
+
+        Args:
+            raw_config: The bot's signal_config column value
+            bot: The bot the plan is for, named in reported signal errors
+
+        Returns:
+            EvaluationPlan (with ``error`` set for unusable configurations)
+        """
+        try:
+            signal_config = json.loads(raw_config) if isinstance(raw_config, str) else raw_config
+        except (json.JSONDecodeError, TypeError):
+            return cls(None, [], DEFAULT_BUY_THRESHOLD, DEFAULT_SELL_THRESHOLD,
+                       error="Invalid signal configuration")
+
+        if not signal_config:
+            return cls(signal_config, [], DEFAULT_BUY_THRESHOLD, DEFAULT_SELL_THRESHOLD,
+                       error="No signal configuration found")
+
+        signals = []
+        for signal_name, config in signal_config.items():
+            if not config or not isinstance(config, dict) or not config.get('enabled', False):
+                continue
+
+            signal_type = SIGNAL_TYPE_MAP.get(signal_name.lower())
+            if not signal_type:
+                continue
+
+            try:
+                instance = create_signal_instance(signal_type, build_signal_parameters(signal_name, config))
+            except Exception as e:
+                # Report signal calculation error
+                report_bot_error(
+                    error_type=ErrorType.SIGNAL_CALCULATION,
+                    message=f"Error calculating {signal_name} signal: {str(e)}",
+                    bot_id=getattr(bot, 'id', None),
+                    bot_name=getattr(bot, 'name', None),
+                    details={
+                        "signal_name": signal_name,
+                        "signal_config": config,
+                        "error_type": type(e).__name__
+                    }
+                )
+                logger.warning(f"Invalid {signal_name} signal configuration: {e}")
+                continue
+            if instance:
+                signals.append(PlannedSignal(signal_name, config, instance))
+
+        buy_threshold, sell_threshold = DEFAULT_BUY_THRESHOLD, DEFAULT_SELL_THRESHOLD
+        custom_thresholds = False
+        try:
+            if 'trading_thresholds' in signal_config:
+                thresholds = signal_config['trading_thresholds']
+                buy_threshold = thresholds.get('buy_threshold', DEFAULT_BUY_THRESHOLD)
+                sell_threshold = thresholds.get('sell_threshold', DEFAULT_SELL_THRESHOLD)
+                custom_thresholds = True
+        except Exception as e:
+            buy_threshold, sell_threshold = DEFAULT_BUY_THRESHOLD, DEFAULT_SELL_THRESHOLD
+            logger.warning(f"Error reading trading thresholds, using defaults: {e}")
+
+        return cls(signal_config, signals, buy_threshold, sell_threshold, custom_thresholds)
+
+
+class EvaluationPlanCache:
+    """
+    Thread-safe cache of compiled evaluation plans.
+
+    Entries are keyed by bot id and validated against the bot's updated_at
+    and signal_config, so a bot modified by another process (or an unsaved
+    in-memory edit) never reuses a stale plan.
+    """
+
+    def __init__(self):
+        self._plans: Dict[int, Tuple[Any, Any, EvaluationPlan]] = {}
+        self._lock = threading.RLock()
+        self._stats = {
+            'hits': 0,
+            'compilations': 0,
+            'invalidations': 0
+        }
+
+    def get_plan(self, bot: Bot) -> EvaluationPlan:
+        """Return the compiled plan for a bot, compiling it if missing or stale."""
+        bot_id = getattr(bot, 'id', None)
+        raw_config = bot.signal_config
+        updated_at = getattr(bot, 'updated_at', None)
+
+        if bot_id is not None:
+            with self._lock:
+                entry = self._plans.get(bot_id)
+                if entry is not None and entry[0] == updated_at and entry[1] == raw_config:
+                    self._stats['hits'] += 1
+                    return entry[2]
+
+        plan = EvaluationPlan.compile(raw_config, bot)
+
+        with self._lock:
+            self._stats['compilations'] += 1
+            if bot_id is not None:
+                # Keep our own copy of dict configs so in-place edits are detected
+                source = copy.deepcopy(raw_config) if isinstance(raw_config, dict) else raw_config
+                self._plans[bot_id] = (updated_at, source, plan)
+        return plan
+
+    def invalidate(self, bot_id: Optional[int] = None) -> int:
+        """
+        Drop compiled plans.
+
+        Args:
+            bot_id: If provided, only drop this bot's plan. If None, drop all.
+
+        Returns:
+            Number of plans dropped
+        """
+        with self._lock:
+            if bot_id is None:
+                count = len(self._plans)
+                self._plans.clear()
+            else:
+                count = 1 if self._plans.pop(bot_id, None) is not None else 0
+            self._stats['invalidations'] += count
+            return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get plan cache statistics."""
+        with self._lock:
+            return {
+                'cached_plans': len(self._plans),
+                **self._stats
+            }
+
+
+# Global plan cache instance
+_global_plan_cache = EvaluationPlanCache()
+
+
+def get_evaluation_plan_cache() -> EvaluationPlanCache:
+    """Get the global evaluation plan cache instance."""
+    return _global_plan_cache
@@ -0,0 +1,232 @@
+"""
+Evaluation Scheduler - event-driven bot evaluation off the websocket thread.
+
+Every ticker message used to run a full round of bot evaluations inline on
+the websocket receive thread, so a busy feed backed up the socket. The
+scheduler decouples the two: the receive loop only records the latest
+ticker per product (coalescing anything not yet evaluated, latest wins),
+and a dispatcher hands each product to a worker pool at most once per
+debounce interval. A product is never evaluated by two workers at once.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate_product_ticker(product_id: str, ticker_data: dict):
+    """Default worker: evaluate every running bot of a product for one ticker update."""
+    # Import here to avoid circular imports
+    from .streaming_bot_evaluator import get_streaming_bot_evaluator
+    get_streaming_bot_evaluator().evaluate_bots_on_ticker_update(product_id, ticker_data)
+
+
+class EvaluationScheduler:
+    """
+    Coalescing, debounced scheduler for ticker-driven bot evaluations.
+
+    Features:
+    - Non-blocking submit (safe to call from the websocket thread)
+    - Latest-wins coalescing of pending ticker updates per product
+    - Per-product debounce: at most one evaluation start per interval
+    - Worker pool with one in-flight evaluation per product
+    - Queue depth, coalescing and lag metrics
+    """
+
+    def __init__(self, evaluate: Callable[[str, dict], Any] = evaluate_product_ticker,
+                 debounce_seconds: float = 1.0, max_workers: int = 4):
+        """
+        Initialize the scheduler.
+
+        Args:
+            evaluate: Function called on a worker with (product_id, latest ticker)
+            debounce_seconds: Minimum seconds between evaluation starts per product
+            max_workers: Size of the evaluation worker pool
+        """
+        self._evaluate = evaluate
+        self._debounce_seconds = debounce_seconds
+        self._max_workers = max_workers
+        self._pending: Dict[str, Tuple[dict, float]] = {}   # product -> (latest ticker, first enqueue time)
+        self._in_flight: set = set()
+        self._last_started: Dict[str, float] = {}
+        self._condition = threading.Condition()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._running = False
+        self._stopped = False
+        self._stats = {
+            'submitted': 0,
+            'coalesced': 0,
+            'evaluations': 0,
+            'failures': 0,
+            'total_lag_seconds': 0.0,
+            'max_lag_seconds': 0.0,
+            'last_lag_seconds': 0.0
+        }
+
+    def start(self):
+        """Start the dispatcher thread and worker pool (idempotent)."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._stopped = False
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="bot-evaluation"
+            )
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="evaluation-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+        logger.info(
+            f"EvaluationScheduler started (debounce={self._debounce_seconds}s, workers={self._max_workers})"
+        )
+
+    def submit(self, product_id: str, ticker_data: dict):
+        """
+        Record a ticker update for evaluation. Never blocks on evaluation work.
+
+        If an update for the product is already pending, it is replaced by this
+        one (latest wins) and counted as coalesced; lag is still measured from
+        the first pending update. The first submit starts the scheduler; once
+        stop() has been called, updates are dropped until start() is called
+        again.
+        """
+        if self._stopped:
+            return
+        if not self._running:
+            self.start()
+
+        with self._condition:
+            if not self._running:
+                return  # Stopped meanwhile
+            self._stats['submitted'] += 1
+            pending = self._pending.get(product_id)
+            if pending is not None:
+                self._stats['coalesced'] += 1
+                self._pending[product_id] = (ticker_data, pending[1])
+            else:
+                self._pending[product_id] = (ticker_data, time.monotonic())
+            self._condition.notify()
+
+    def _due_at(self, product_id: str, enqueued_at: float) -> float:
+        last_started = self._last_started.get(product_id)
+        if last_started is None:
+            return enqueued_at
+        return max(enqueued_at, last_started + self._debounce_seconds)
+
+    def _dispatch_loop(self):
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                ready, wait_seconds = self._collect_ready()
+                if not ready:
+                    self._condition.wait(wait_seconds)
+                    continue
+
+            for product_id, ticker_data, enqueued_at in ready:
+                try:
+                    self._executor.submit(self._run_evaluation, product_id, ticker_data, enqueued_at)
+                except Exception as e:
+                    logger.error(f"❌ Could not schedule evaluation for {product_id}: {e}")
+                    with self._condition:
+                        self._in_flight.discard(product_id)
+                        self._stats['failures'] += 1
+
+    def _collect_ready(self):
+        """Pop every pending product that is due and not in flight. Caller holds the lock."""
+        now = time.monotonic()
+        ready = []
+        next_due = None
+        for product_id, (ticker_data, enqueued_at) in list(self._pending.items()):
+            if product_id in self._in_flight:
+                continue    # Re-examined when the running evaluation finishes
+            due_at = self._due_at(product_id, enqueued_at)
+            if due_at <= now:
+                del self._pending[product_id]
+                self._in_flight.add(product_id)
+                self._last_started[product_id] = now
+                ready.append((product_id, ticker_data, enqueued_at))
+            elif next_due is None or due_at < next_due:
+                next_due = due_at
+        wait_seconds = None if next_due is None else max(next_due - now, 0.001)
+        return ready, wait_seconds
+
+    def _run_evaluation(self, product_id: str, ticker_data: dict, enqueued_at: float):
+        lag = time.monotonic() - enqueued_at
+        failed = False
+        try:
+            self._evaluate(product_id, ticker_data)
+        except Exception as e:
+            failed = True
+            logger.error(f"❌ Error evaluating bots for {product_id}: {e}")
+        finally:
+            with self._condition:
+                self._in_flight.discard(product_id)
+                self._stats['evaluations'] += 1
+                if failed:
+                    self._stats['failures'] += 1
+                self._stats['total_lag_seconds'] += lag
+                self._stats['last_lag_seconds'] = lag
+                if lag > self._stats['max_lag_seconds']:
+                    self._stats['max_lag_seconds'] = lag
+                self._condition.notify()
+
+    def stop(self, wait: bool = True):
+        """Stop dispatching; pending updates are discarded, running evaluations finish if wait."""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._stopped = True
+            self._pending.clear()
+            self._condition.notify_all()
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+        logger.info("EvaluationScheduler stopped")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics."""
+        with self._condition:
+            evaluations = self._stats['evaluations']
+            avg_lag = self._stats['total_lag_seconds'] / evaluations if evaluations else 0.0
+            return {
+                'running': self._running,
+                'queue_depth': len(self._pending),
+                'in_flight': len(self._in_flight),
+                'debounce_seconds': self._debounce_seconds,
+                'max_workers': self._max_workers,
+                'submitted': self._stats['submitted'],
+                'coalesced': self._stats['coalesced'],
+                'evaluations': evaluations,
+                'failures': self._stats['failures'],
+                'avg_lag_ms': round(avg_lag * 1000, 2),
+                'max_lag_ms': round(self._stats['max_lag_seconds'] * 1000, 2),
+                'last_lag_ms': round(self._stats['last_lag_seconds'] * 1000, 2)
+            }
+
+
+# Global scheduler instance
+_global_evaluation_scheduler: Optional[EvaluationScheduler] = None
+_global_scheduler_lock = threading.Lock()
+
+
+def get_evaluation_scheduler() -> EvaluationScheduler:
+    """Get the global evaluation scheduler instance."""
+    global _global_evaluation_scheduler
+    if _global_evaluation_scheduler is None:
+        with _global_scheduler_lock:
+            if _global_evaluation_scheduler is None:
+                from ..core.config import settings
+                _global_evaluation_scheduler = EvaluationScheduler(
+                    debounce_seconds=settings.evaluation_debounce_seconds,
+                    max_workers=settings.evaluation_workers
+                )
+    return _global_evaluation_scheduler
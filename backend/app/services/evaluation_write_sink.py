@@ -0,0 +1,130 @@
+"""
+Evaluation Write Sink - unit of work for the side effects of an evaluation cycle.
+
+A single evaluate_bot call used to commit several times (signal history,
+confirmation state, one fresh session per recorded signal prediction) and
+the trading tasks added two more commits per bot for the UI score fields.
+On SQLite every commit is an fsync. Evaluators given a sink collect these
+writes instead, and the cycle owner flushes them once: bulk inserts for
+history and predictions plus the pending bot updates, in one transaction.
+"""
+
+import logging
+import threading
+from typing import Any, Dict, List
+
+from sqlalchemy.orm import Session
+
+from ..models.models import Bot, BotSignalHistory, SignalPredictionRecord
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationWriteSink:
+    """
+    Collects evaluation writes and persists them in one transaction per flush.
+
+    Bot column changes are made on the ORM objects as before (so reads within
+    the cycle see them) and only the commit is deferred; inserts are buffered
+    as plain mappings and written with bulk inserts.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Initialize the sink.
+
+        Args:
+            db: Session the cycle's bots are loaded in; used for the flush
+        """
+        self.db = db
+        self._signal_history: List[Dict[str, Any]] = []
+        self._signal_predictions: List[Dict[str, Any]] = []
+        self._dirty_bots: Dict[Any, Bot] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            'flushes': 0,
+            'failed_flushes': 0,
+            'signal_history_written': 0,
+            'signal_predictions_written': 0,
+            'bot_updates_written': 0
+        }
+
+    def add_signal_history(self, values: Dict[str, Any]):
+        """Queue a BotSignalHistory row (column -> value mapping)."""
+        with self._lock:
+            self._signal_history.append(values)
+
+    def add_signal_prediction(self, values: Dict[str, Any]):
+        """Queue a SignalPredictionRecord row (column -> value mapping)."""
+        with self._lock:
+            self._signal_predictions.append(values)
+
+    def update_bot(self, bot: Bot, **fields):
+        """Apply column changes to a bot and defer their commit to the next flush."""
+        for field, value in fields.items():
+            setattr(bot, field, value)
+        with self._lock:
+            self._dirty_bots[bot.id] = bot
+
+    @property
+    def pending(self) -> int:
+        """Number of writes waiting for the next flush."""
+        with self._lock:
+            return len(self._signal_history) + len(self._signal_predictions) + len(self._dirty_bots)
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Persist every queued write in one transaction.
+
+        Returns:
+            Dict with the number of history rows, prediction rows and bots written
+            (all zero if the transaction failed and was rolled back)
+        """
+        with self._lock:
+            history, self._signal_history = self._signal_history, []
+            predictions, self._signal_predictions = self._signal_predictions, []
+            dirty_bots, self._dirty_bots = self._dirty_bots, {}
+
+        written = {'signal_history': 0, 'signal_predictions': 0, 'bot_updates': 0}
+        if not (history or predictions or dirty_bots):
+            return written
+
+        try:
+            if history:
+                self.db.bulk_insert_mappings(BotSignalHistory, history)
+            if predictions:
+                self.db.bulk_insert_mappings(SignalPredictionRecord, predictions)
+            # Bot changes are already tracked by the session - commit writes them with the inserts
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            with self._lock:
+                self._stats['failed_flushes'] += 1
+            logger.error(
+                f"Failed to flush evaluation writes ({len(history)} history, "
+                f"{len(predictions)} predictions, {len(dirty_bots)} bots): {e}"
+            )
+            return written
+
+        written = {
+            'signal_history': len(history),
+            'signal_predictions': len(predictions),
+            'bot_updates': len(dirty_bots)
+        }
+        with self._lock:
+            self._stats['flushes'] += 1
+            self._stats['signal_history_written'] += written['signal_history']
+            self._stats['signal_predictions_written'] += written['signal_predictions']
+            self._stats['bot_updates_written'] += written['bot_updates']
+        logger.debug(f"💾 Flushed evaluation writes in one transaction: {written}")
+        return written
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get sink statistics."""
+        with self._lock:
+            return {
+                'pending_signal_history': len(self._signal_history),
+                'pending_signal_predictions': len(self._signal_predictions),
+                'pending_bot_updates': len(self._dirty_bots),
+                **self._stats
+            }
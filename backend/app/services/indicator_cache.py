@@ -0,0 +1,188 @@
+"""
+Indicator Result Cache - shares signal calculations across consumers.
+
+The trading evaluator, the temperature endpoints and the dashboard websocket
+all compute the same (pair, indicator, parameters) over the same candles
+within seconds of each other. This cache is content-addressed: the key is
+the last candle timestamp, the row count and a digest of the closes, plus
+the indicator parameters, so a hit is by construction the value the caller
+would have computed. When a newer candle arrives for a pair, every
+entry built on the older candle is dropped.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .signals.incremental import candle_index, infer_granularity
+
+logger = logging.getLogger(__name__)
+
+
+class IndicatorCache:
+    """
+    LRU cache of signal results keyed by candle window and parameters.
+
+    Features:
+    - Content-addressed keys (no TTL needed - a changed candle is a new key)
+    - Automatic invalidation when a new candle closes for a pair
+    - LRU eviction for memory management
+    - Thread-safe operations with hit/miss statistics
+    """
+
+    def __init__(self, max_entries: int = 2000):
+        """
+        Initialize the indicator cache.
+
+        Args:
+            max_entries: Maximum number of cached signal results (LRU eviction)
+        """
+        self._cache: OrderedDict[Tuple, Dict[str, Any]] = OrderedDict()
+        self._latest_candle: Dict[Tuple[str, int], Any] = {}
+        self._max_entries = max_entries
+        self._lock = threading.RLock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'bypassed': 0
+        }
+        logger.info(f"IndicatorCache initialized with max_entries={max_entries}")
+
+    def get_or_compute(self, pair: str, signal, data: pd.DataFrame,
+                       compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Return a cached signal result for this candle window, computing it on a miss.
+
+        Args:
+            pair: Trading pair the candles belong to
+            signal: Signal instance (its name and parameters form part of the key)
+            data: DataFrame with OHLCV data the result is computed from
+            compute: Function returning the signal result on a miss
+
+        Returns:
+            Signal result dict (a copy, safe for the caller to modify)
+        """
+        keys = candle_index(data)
+        if keys is None or len(data) == 0:
+            # Without candle timestamps there is nothing to address the entry by
+            with self._lock:
+                self._stats['bypassed'] += 1
+            return compute()
+
+        last_candle = keys[-1]
+        series_key = (pair, infer_granularity(keys))
+        cache_key = series_key + (
+            signal.name,
+            tuple(sorted(signal.parameters.items())),
+            last_candle,
+            len(data),
+            # Digest of every close, so a hit always means identical input candles
+            hash(data['close'].to_numpy(dtype='float64').tobytes())
+        )
+
+        with self._lock:
+            latest = self._latest_candle.get(series_key)
+            if latest is not None and last_candle < latest:
+                # Caller holds an older window than we've already seen - don't cache it
+                self._stats['bypassed'] += 1
+                cacheable = False
+            else:
+                cacheable = True
+                if latest is None or last_candle > latest:
+                    self._invalidate_series(series_key, last_candle)
+
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    self._cache.move_to_end(cache_key)
+                    self._stats['hits'] += 1
+                    return self._copy_result(cached)
+                self._stats['misses'] += 1
+
+        result = compute()
+
+        if cacheable and isinstance(result, dict):
+            with self._lock:
+                self._cache[cache_key] = self._copy_result(result)
+                while len(self._cache) > self._max_entries:
+                    self._cache.popitem(last=False)
+                    self._stats['evictions'] += 1
+
+        return result
+
+    def _invalidate_series(self, series_key: Tuple[str, int], new_candle: Any):
+        """Record a new latest candle for a series and drop every entry built on older candles."""
+        self._latest_candle[series_key] = new_candle
+        pair = series_key[0]
+        # Entries never outlive their series' latest candle, so all existing ones are stale
+        stale = [key for key in self._cache if key[:2] == series_key]
+        for key in stale:
+            del self._cache[key]
+        if stale:
+            self._stats['invalidations'] += len(stale)
+            logger.debug(f"New candle for {pair}: invalidated {len(stale)} indicator results")
+
+    @staticmethod
+    def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        copied = dict(result)
+        if isinstance(copied.get('metadata'), dict):
+            copied['metadata'] = dict(copied['metadata'])
+        return copied
+
+    def invalidate(self, pair: Optional[str] = None) -> int:
+        """
+        Invalidate cache entries.
+
+        Args:
+            pair: If provided, only invalidate entries for this pair.
+                  If None, invalidate all entries.
+
+        Returns:
+            Number of entries invalidated
+        """
+        with self._lock:
+            if pair is None:
+                count = len(self._cache)
+                self._cache.clear()
+                self._latest_candle.clear()
+            else:
+                keys = [key for key in self._cache if key[0] == pair]
+                for key in keys:
+                    del self._cache[key]
+                for series_key in [k for k in self._latest_candle if k[0] == pair]:
+                    del self._latest_candle[series_key]
+                count = len(keys)
+            logger.info(f"Invalidated {count} indicator cache entries")
+            return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache performance statistics."""
+        with self._lock:
+            total_requests = self._stats['hits'] + self._stats['misses']
+            hit_rate = (self._stats['hits'] / total_requests * 100) if total_requests > 0 else 0
+
+            return {
+                'cache_size': len(self._cache),
+                'max_entries': self._max_entries,
+                'tracked_series': len(self._latest_candle),
+                'total_requests': total_requests,
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+                'hit_rate_percent': round(hit_rate, 2),
+                'evictions': self._stats['evictions'],
+                'invalidations': self._stats['invalidations'],
+                'bypassed': self._stats['bypassed']
+            }
+
+
+# Global cache instance
+_global_indicator_cache = IndicatorCache(max_entries=2000)
+
+
+def get_indicator_cache() -> IndicatorCache:
+    """Get the global indicator result cache instance."""
+    return _global_indicator_cache
@@ -6,15 +6,31 @@ Eliminates rate limiting by reducing API calls from 25+ per minute to 1-2 per mi
 
 import json
 import logging
+import math
+import random
+import threading
 import time
+import uuid
 import redis
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass
 import pandas as pd
 
+from .candle_codec import can_encode_candles, decode_candles, encode_candles, is_encoded_candles
+from .candle_store import get_candle_store
+
 logger = logging.getLogger(__name__)
 
+# Delete a lock only while it still holds our token, in one atomic step
+RELEASE_LOCK_SCRIPT = (
+    "if redis.call('get', KEYS[1]) == ARGV[1] then "
+    "return redis.call('del', KEYS[1]) "
+    "end "
+    "return 0"
+)
+
 
 @dataclass
 class TickerData:
@@ -75,8 +91,17 @@ class MarketDataService:
     - Industry-proven pattern used by major trading platforms
     """
     
-    def __init__(self, coinbase_service=None, redis_client=None):
-        """Initialize market data service with caching."""
+    def __init__(self, coinbase_service=None, redis_client=None, candle_redis_client=None):
+        """
+        Initialize market data service with caching.
+        
+        Args:
+            coinbase_service: Service used for API fetches (defaults to the global one)
+            redis_client: Redis client for ticker/product caches
+            candle_redis_client: Redis client for encoded candles; must not decode
+                                 responses (defaults to a binary twin of the default
+                                 client, or to redis_client when one is injected)
+        """
         if coinbase_service is None:
             from .coinbase_service import coinbase_service as default_service
             coinbase_service = default_service
@@ -103,9 +128,41 @@ class MarketDataService:
         else:
             self.redis_client = redis_client
         
+        # Encoded candles are binary, so they need a client that doesn't decode responses
+        if candle_redis_client is not None:
+            self.candle_redis_client = candle_redis_client
+        elif redis_client is None and self.redis_client is not None:
+            self.candle_redis_client = redis.Redis(
+                host='localhost',
+                port=6379,
+                db=0,
+                decode_responses=False,
+                socket_timeout=5,
+                socket_connect_timeout=5
+            )
+        else:
+            self.candle_redis_client = self.redis_client
+        
+        # In-process candle windows kept current by the websocket ticker feed
+        self.candle_store = get_candle_store()
+        
         # Cache configuration
         self.cache_ttl = 3600  # 1 hour cache TTL - INCREASED to minimize API calls during rate limiting
         self.products_cache_ttl = 300  # 5 minutes for products (changes rarely)
+        self.historical_refresh_seconds = 300  # Soft TTL: candle series older than this get a delta fetch
+        self.historical_hard_ttl_seconds = 3600  # Hard TTL: older series are only served flagged stale
+        self.stale_while_revalidate = True  # Serve soft-expired series and refresh in the background
+        self.candle_series_ttl = 86400  # Canonical series are kept a day; refreshes are deltas
+        self.max_series_candles = 350  # Coinbase's per-request candle cap
+        self.xfetch_beta = 1.0  # XFetch early-refresh aggressiveness (0 disables early refresh)
+        self.fetch_lock_ttl_ms = 10000  # Single-flight lock; outlives a fetch with backoff
+        self.single_flight_wait_seconds = 2.0  # How long a caller with nothing cached waits for the lock holder
+        self.single_flight_poll_seconds = 0.05
+        
+        # Background (stale-while-revalidate) refreshes
+        self._refresh_executor: Optional[ThreadPoolExecutor] = None
+        self._refreshing = set()
+        self._refresh_lock = threading.Lock()
         
         # Statistics tracking
         self.stats = {
@@ -113,6 +170,15 @@ class MarketDataService:
             'cache_misses': 0,
             'api_calls': 0,
             'errors': 0,
+            'candle_store_hits': 0,
+            'full_fetches': 0,
+            'delta_fetches': 0,
+            'candles_fetched': 0,
+            'coalesced_requests': 0,
+            'early_refreshes': 0,
+            'lock_wait_timeouts': 0,
+            'background_refreshes': 0,
+            'stale_served': 0,
             'last_refresh': None,
             'last_batch_size': 0
         }
@@ -180,6 +246,91 @@ class MarketDataService:
         
         return None
     
+    def get_tickers(self, product_ids: List[str]) -> Dict[str, TickerData]:
+        """
+        Get ticker data for many products with a constant number of round trips.
+        
+        Cached tickers are read with one MGET; all misses are fetched with one
+        batched API call (CoinbaseService.get_product_tickers) and written back
+        in one pipeline.
+        
+        Args:
+            product_ids: Trading pairs to look up
+            
+        Returns:
+            Dict of product_id -> TickerData in request order (products with no
+            cached or fetched ticker are omitted)
+        """
+        product_ids = list(dict.fromkeys(p for p in product_ids if p))
+        if not product_ids:
+            return {}
+        
+        tickers: Dict[str, TickerData] = {}
+        
+        # Try cache first - one round trip for every product
+        if self.redis_client:
+            try:
+                cached_values = self.redis_client.mget(
+                    [self.get_cache_key("ticker", product_id) for product_id in product_ids]
+                )
+                for product_id, cached_data in zip(product_ids, cached_values):
+                    if cached_data:
+                        tickers[product_id] = TickerData(**json.loads(cached_data))
+            except Exception as e:
+                logger.warning(f"Cache read error for {len(product_ids)} tickers: {e}")
+        
+        self.stats['cache_hits'] += len(tickers)
+        misses = [product_id for product_id in product_ids if product_id not in tickers]
+        if misses:
+            self.stats['cache_misses'] += len(misses)
+            logger.warning(f"📦 Cache MISS for {len(misses)} tickers, falling back to batched API")
+            
+            try:
+                ticker_data = self.coinbase_service.get_product_tickers(misses)
+                self.stats['api_calls'] += 1
+            except Exception as e:
+                logger.error(f"❌ Failed to get tickers for {len(misses)} products: {e}")
+                self.stats['errors'] += 1
+                ticker_data = {}
+            
+            timestamp = datetime.now(timezone.utc).isoformat()
+            fetched = [
+                self._ticker_from_api(product_id, ticker_data[product_id], timestamp, "api_fallback")
+                for product_id in misses if ticker_data.get(product_id)
+            ]
+            
+            # Cache the results - one round trip for every fetched ticker
+            if self.redis_client and fetched:
+                try:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for ticker in fetched:
+                        pipe.setex(
+                            self.get_cache_key("ticker", ticker.product_id),
+                            self.cache_ttl,
+                            json.dumps(ticker.to_dict())
+                        )
+                    pipe.execute()
+                except Exception as e:
+                    logger.warning(f"Cache write error for {len(fetched)} tickers: {e}")
+            
+            for ticker in fetched:
+                tickers[ticker.product_id] = ticker
+        
+        return {product_id: tickers[product_id] for product_id in product_ids if product_id in tickers}
+    
+    def _ticker_from_api(self, product_id: str, data: Dict[str, Any], timestamp: str,
+                         data_source: str) -> TickerData:
+        """Convert a CoinbaseService ticker dict to TickerData."""
+        return TickerData(
+            product_id=product_id,
+            price=float(data.get('price', 0)),
+            volume_24h=float(data.get('volume_24h', 0)),
+            best_bid=float(data.get('best_bid', 0)),
+            best_ask=float(data.get('best_ask', 0)),
+            timestamp=timestamp,
+            data_source=data_source
+        )
+    
     def get_all_products(self) -> List[ProductInfo]:
         """
         Get all available trading products from cache or API.
@@ -261,7 +412,9 @@ class MarketDataService:
         Refresh market data for all trading pairs in a single batch operation.
         This is the KEY method that eliminates rate limiting.
         
-        Instead of 25+ individual API calls, this makes 1-2 API calls total.
+        Instead of 25+ individual API calls, this makes 1-2 API calls total
+        (CoinbaseService.get_product_tickers) and writes every ticker in a
+        single Redis pipeline.
         """
         start_time = time.time()
         
@@ -272,73 +425,42 @@ class MarketDataService:
         
         logger.info(f"🔄 Starting batch market data refresh for {len(product_ids)} products")
         
-        success_count = 0
-        error_count = 0
+        # One batched REST round trip (price/volume + best bid/ask) for every product
+        try:
+            ticker_data = self.coinbase_service.get_product_tickers(product_ids)
+        except Exception as e:
+            logger.error(f"❌ Batch ticker fetch failed: {e}")
+            self.stats['errors'] += 1
+            ticker_data = {}
+        
+        timestamp = datetime.now(timezone.utc).isoformat()
+        tickers = []
+        for product_id in product_ids:
+            data = ticker_data.get(product_id)
+            if not data:
+                continue
+            tickers.append(self._ticker_from_api(product_id, data, timestamp, "batch_refresh"))
+        
+        success_count = len(tickers)
+        error_count = len(product_ids) - success_count
         cached_tickers = []
         
-        # INDUSTRY PATTERN: Batch processing with chunking
-        # Process in chunks to avoid overwhelming the API
-        chunk_size = 50  # Coinbase can handle multiple products per request
-        
-        for i in range(0, len(product_ids), chunk_size):
-            chunk = product_ids[i:i + chunk_size]
-            
-            try:
-                # For now, we'll fetch individual tickers
-                # TODO: Implement true batch ticker API when available
-                for product_id in chunk:
-                    try:
-                        ticker_data = self.coinbase_service.get_product_ticker(product_id)
-                        if ticker_data:
-                            ticker = TickerData(
-                                product_id=product_id,
-                                price=float(ticker_data.get('price', 0)),
-                                volume_24h=float(ticker_data.get('volume_24h', 0)),
-                                best_bid=float(ticker_data.get('best_bid', 0)),
-                                best_ask=float(ticker_data.get('best_ask', 0)),
-                                timestamp=datetime.now(timezone.utc).isoformat(),
-                                data_source="batch_refresh"
-                            )
-                            
-                            # Cache the ticker
-                            if self.redis_client:
-                                cache_key = self.get_cache_key("ticker", product_id)
-                                try:
-                                    self.redis_client.setex(
-                                        cache_key,
-                                        self.cache_ttl,
-                                        json.dumps(ticker.to_dict())
-                                    )
-                                    cached_tickers.append(product_id)
-                                    success_count += 1
-                                except Exception as e:
-                                    logger.warning(f"Cache write error for {product_id}: {e}")
-                                    error_count += 1
-                            else:
-                                success_count += 1
-                        else:
-                            error_count += 1
-                            
-                    except Exception as e:
-                        logger.warning(f"Failed to refresh {product_id}: {e}")
-                        error_count += 1
-                
-                # Add delay between chunks to respect rate limits
-                time.sleep(0.1)
-                
-            except Exception as e:
-                logger.error(f"Batch processing error for chunk {i//chunk_size}: {e}")
-                error_count += len(chunk)
-        
         # Update statistics
         elapsed_time = time.time() - start_time
-        self.stats['last_refresh'] = datetime.now(timezone.utc).isoformat()
+        self.stats['last_refresh'] = timestamp
         self.stats['last_batch_size'] = len(product_ids)
         self.stats['api_calls'] += 1  # This entire operation counts as 1 logical API operation
         
-        # Set batch refresh metadata
+        # Write every ticker plus the batch metadata in one Redis round trip
         if self.redis_client:
             try:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for ticker in tickers:
+                    pipe.setex(
+                        self.get_cache_key("ticker", ticker.product_id),
+                        self.cache_ttl,
+                        json.dumps(ticker.to_dict())
+                    )
                 batch_info = {
                     'timestamp': self.stats['last_refresh'],
                     'product_count': len(product_ids),
@@ -346,13 +468,17 @@ class MarketDataService:
                     'error_count': error_count,
                     'elapsed_seconds': elapsed_time
                 }
-                self.redis_client.setex(
+                pipe.setex(
                     self.get_cache_key("batch_info"),
                     self.cache_ttl,
                     json.dumps(batch_info)
                 )
+                pipe.execute()
+                cached_tickers = [ticker.product_id for ticker in tickers]
             except Exception as e:
-                logger.warning(f"Failed to cache batch info: {e}")
+                logger.warning(f"Cache write error for batch refresh: {e}")
+                error_count += success_count
+                success_count = 0
         
         result = {
             'success': True,
@@ -368,69 +494,311 @@ class MarketDataService:
         
         return result
     
-    def get_historical_data(self, product_id: str, granularity: int = 3600, limit: int = 100) -> pd.DataFrame:
+    def get_historical_data(self, product_id: str, granularity: int = 3600, limit: int = 100,
+                            require_volume: bool = False) -> pd.DataFrame:
         """
         Get historical candlestick data with Redis caching.
         
+        Series kept current by the ticker-fed candle store are served from it.
+        The ticker feed carries no trade size, so callers that read volume pass
+        require_volume=True and are only served windows whose candles all still
+        have complete volume. Otherwise one canonical series per
+        (product, granularity) is kept in Redis: any limit it covers is served
+        as a slice, and once it is older than historical_refresh_seconds it is
+        extended with only the candles since its last one.
+        
+        Refreshes are single-flight across processes: a short Redis lock per
+        series lets one caller fetch while the others serve the series they
+        already have or wait briefly for the lock holder's result. Hot series
+        are refreshed a little early with XFetch-style probability, so they
+        rarely expire under load.
+        
+        With stale_while_revalidate, each series has a soft TTL
+        (historical_refresh_seconds) and a hard TTL
+        (historical_hard_ttl_seconds). Past the soft TTL the cached series is
+        returned immediately and refreshed in the background; past the hard
+        TTL it is still returned while the Coinbase circuit breaker is open
+        (or a refresh fails), flagged with ``df.attrs['stale'] = True``.
+        
         Args:
             product_id: Trading pair (e.g., "BTC-USD")
             granularity: Candlestick granularity in seconds (3600 = 1 hour)
             limit: Number of candles to fetch
+            require_volume: Skip candle store windows with tick-built volume
             
         Returns:
             DataFrame with OHLCV data
         """
-        cache_key = self.get_cache_key("historical", f"{product_id}:{granularity}:{limit}")
-        
-        # Try cache first
-        if self.redis_client:
-            try:
-                cached_data = self.redis_client.get(cache_key)
-                if cached_data:
-                    data_dict = json.loads(cached_data)
+        candles = self.candle_store.get_candles(product_id, granularity, limit, require_volume=require_volume)
+        if candles is not None:
+            self.stats['candle_store_hits'] += 1
+            return candles
+        
+        series, meta = self._load_candle_series(product_id, granularity)
+        covered = series is not None and limit <= meta.get('requested_limit', 0)
+        
+        if covered:
+            now = time.time()
+            if not self._should_refresh(meta, now):
+                self.stats['cache_hits'] += 1
+                logger.debug(f"📦 Cache HIT for historical {product_id}:{granularity}:{limit}")
+                return series.tail(limit)
+            
+            if self.stale_while_revalidate:
+                if now < meta.get('fetched_at', 0) + meta.get('hard_ttl', self.historical_hard_ttl_seconds):
+                    # Past the soft TTL: serve now, refresh off the caller's thread
                     self.stats['cache_hits'] += 1
-                    logger.debug(f"📦 Cache HIT for historical {product_id}:{granularity}:{limit}")
-                    # Convert back to DataFrame
-                    return pd.DataFrame(data_dict['data'])
-            except Exception as e:
-                logger.warning(f"Cache read error for historical {product_id}: {e}")
+                    self._schedule_background_refresh(product_id, granularity, limit,
+                                                      meta.get('fetched_at', 0))
+                    return series.tail(limit)
+                if self._upstream_unavailable():
+                    # Past the hard TTL with the circuit breaker open: stale beats empty
+                    return self._stale_candles(series, limit)
+        
+        acquired, lock_token = self._acquire_fetch_lock(product_id, granularity)
+        if not acquired:
+            # Another caller is already fetching this series
+            if covered:
+                self.stats['coalesced_requests'] += 1
+                logger.debug(f"📦 Serving stale historical {product_id}:{granularity}:{limit} during refresh")
+                return self._fallback_candles(series, limit, meta, time.time())
+            waited = self._wait_for_candle_series(product_id, granularity, limit, meta.get('fetched_at', 0))
+            if waited is not None:
+                self.stats['coalesced_requests'] += 1
+                return waited.tail(limit)
+            # The lock holder is too slow (or failed); fetch ourselves
+            self.stats['lock_wait_timeouts'] += 1
         
-        # Cache miss - fetch from API
+        try:
+            return self._refresh_candle_series(product_id, granularity, limit, series, meta)
+        finally:
+            if lock_token is not None:
+                self._release_fetch_lock(product_id, granularity, lock_token)
+    
+    def _should_refresh(self, meta: Dict[str, Any], now: float) -> bool:
+        """
+        Decide whether a cached series needs refreshing (XFetch early expiry).
+        
+        A series is refreshed once it is past its soft TTL, and
+        before that with a probability that grows as expiry approaches and
+        scales with how long the last fetch took (fetch_seconds * xfetch_beta).
+        """
+        expires_at = meta.get('fetched_at', 0) + meta.get('soft_ttl', self.historical_refresh_seconds)
+        if now >= expires_at:
+            return True
+        early_seconds = -meta.get('fetch_seconds', 0.0) * self.xfetch_beta * math.log(1.0 - random.random())
+        if now + early_seconds >= expires_at:
+            self.stats['early_refreshes'] += 1
+            return True
+        return False
+    
+    def _refresh_candle_series(self, product_id: str, granularity: int, limit: int,
+                               series: Optional[pd.DataFrame], meta: Dict[str, Any]) -> pd.DataFrame:
+        """Delta-extend or fully refetch a series; the caller holds the fetch lock."""
+        now = time.time()
+        
+        if series is not None and limit <= meta.get('requested_limit', 0):
+            last_start = int(series.index[-1].timestamp())
+            missing = int((now - last_start) // granularity) + 1
+            if missing < meta['requested_limit']:
+                # Delta: re-read the last (possibly still open) candle plus anything newer
+                self.stats['cache_misses'] += 1
+                delta = self._fetch_candles(product_id, granularity, missing, start=last_start)
+                if delta.empty:
+                    # Serve what we have rather than nothing while the API is unavailable
+                    return self._fallback_candles(series, limit, meta, now)
+                self.stats['delta_fetches'] += 1
+                series = self._merge_candles(series, delta)
+                self._save_candle_series(product_id, granularity, series, meta['requested_limit'],
+                                         now, time.time() - now)
+                return series.tail(limit)
+        
+        # Cache miss, a longer window than we hold, or too far behind for a delta:
+        # fetch the widest window requested so far and replace the series
         self.stats['cache_misses'] += 1
         logger.debug(f"📦 Cache MISS for historical {product_id}:{granularity}:{limit}")
         
+        requested_limit = min(max(limit, meta.get('requested_limit', 0)), self.max_series_candles)
+        df = self._fetch_candles(product_id, granularity, max(requested_limit, limit))
+        if df.empty and series is not None:
+            return self._fallback_candles(series, limit, meta, now)
+        if df.empty or not can_encode_candles(df):
+            self.candle_store.seed(product_id, granularity, df)
+            return df.tail(limit)
+        self.stats['full_fetches'] += 1
+        
+        self._save_candle_series(product_id, granularity, df, requested_limit, now, time.time() - now)
+        return df.tail(limit)
+    
+    def _stale_candles(self, series: pd.DataFrame, limit: int) -> pd.DataFrame:
+        """Return the tail of a series past its hard TTL, flagged stale."""
+        self.stats['stale_served'] += 1
+        candles = series.tail(limit)
+        candles.attrs['stale'] = True
+        return candles
+    
+    def _fallback_candles(self, series: pd.DataFrame, limit: int, meta: Dict[str, Any],
+                          now: float) -> pd.DataFrame:
+        """Serve a cached series after a failed refresh, flagged stale once past its hard TTL."""
+        if now >= meta.get('fetched_at', 0) + meta.get('hard_ttl', self.historical_hard_ttl_seconds):
+            return self._stale_candles(series, limit)
+        return series.tail(limit)
+    
+    def _upstream_unavailable(self) -> bool:
+        """True while the Coinbase service's rate-limit circuit breaker is open."""
+        breaker = getattr(self.coinbase_service, 'rate_limit_circuit_breaker', None)
+        if not isinstance(breaker, dict):
+            return False
+        return bool(breaker.get('circuit_open')) and time.time() < breaker.get('circuit_open_until', 0)
+    
+    def _schedule_background_refresh(self, product_id: str, granularity: int, limit: int,
+                                     seen_fetched_at: float):
+        """
+        Queue a refresh of the series unless one is already queued in this process.
+        
+        Args:
+            seen_fetched_at: fetched_at of the series the caller decided to
+                             refresh (an XFetch refresh may be before its soft TTL)
+        """
+        key = (product_id, granularity)
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresh_executor is None:
+                self._refresh_executor = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="market-data-refresh"
+                )
+        self.stats['background_refreshes'] += 1
+        self._refresh_executor.submit(self._background_refresh, product_id, granularity, limit,
+                                      seen_fetched_at)
+    
+    def _background_refresh(self, product_id: str, granularity: int, limit: int,
+                            seen_fetched_at: float):
         try:
-            # Get data directly from coinbase_service (no cache)
-            df = self.coinbase_service.get_historical_data(product_id, granularity, limit)
-            
-            if not df.empty and self.redis_client:
-                # Cache the DataFrame as JSON
-                try:
-                    cache_data = {
-                        'data': df.to_dict('records'),
-                        'cached_at': time.time(),
-                        'product_id': product_id,
-                        'granularity': granularity,
-                        'limit': limit
-                    }
-                    # Cache for 5 minutes (historical data changes less frequently)
-                    self.redis_client.setex(
-                        cache_key,
-                        300,  # 5 minutes for historical data
-                        json.dumps(cache_data, default=str)
-                    )
-                    logger.debug(f"📦 Cached historical data for {product_id}:{granularity}:{limit}")
-                except Exception as e:
-                    logger.warning(f"Cache write error for historical {product_id}: {e}")
-            
+            acquired, lock_token = self._acquire_fetch_lock(product_id, granularity)
+            if not acquired:
+                return   # Another process is already refreshing this series
+            try:
+                series, meta = self._load_candle_series(product_id, granularity)
+                if series is not None and meta.get('fetched_at', 0) > seen_fetched_at:
+                    return   # Refreshed while we were queued
+                self._refresh_candle_series(product_id, granularity, limit, series, meta)
+            finally:
+                if lock_token is not None:
+                    self._release_fetch_lock(product_id, granularity, lock_token)
+        except Exception as e:
+            logger.error(f"❌ Background refresh failed for historical {product_id}: {e}")
+            self.stats['errors'] += 1
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard((product_id, granularity))
+    
+    def _acquire_fetch_lock(self, product_id: str, granularity: int):
+        """
+        Try to take the series' fetch lock.
+        
+        Returns:
+            (acquired, token): acquired is False if another caller holds the
+            lock; token is None when no lock was taken (nothing to release)
+        """
+        if not self.candle_redis_client:
+            return True, None
+        token = uuid.uuid4().hex
+        try:
+            acquired = self.candle_redis_client.set(
+                self.get_cache_key("lock:candles", f"{product_id}:{granularity}"),
+                token,
+                nx=True,
+                px=self.fetch_lock_ttl_ms
+            )
+        except Exception as e:
+            logger.warning(f"Fetch lock error for historical {product_id}: {e}")
+            return True, None
+        return (True, token) if acquired else (False, None)
+    
+    def _release_fetch_lock(self, product_id: str, granularity: int, token: str):
+        """Release the fetch lock if we still own it (it may have expired and been retaken)."""
+        lock_key = self.get_cache_key("lock:candles", f"{product_id}:{granularity}")
+        try:
+            self.candle_redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            logger.warning(f"Fetch lock release error for historical {product_id}: {e}")
+    
+    def _wait_for_candle_series(self, product_id: str, granularity: int, limit: int,
+                                fetched_after: float) -> Optional[pd.DataFrame]:
+        """Poll for a series the lock holder writes, up to single_flight_wait_seconds."""
+        deadline = time.monotonic() + self.single_flight_wait_seconds
+        while time.monotonic() < deadline:
+            time.sleep(self.single_flight_poll_seconds)
+            series, meta = self._load_candle_series(product_id, granularity)
+            if series is not None and limit <= meta.get('requested_limit', 0) \
+                    and meta.get('fetched_at', 0) > fetched_after:
+                return series
+        return None
+    
+    def _fetch_candles(self, product_id: str, granularity: int, limit: int,
+                       start: Optional[int] = None) -> pd.DataFrame:
+        """Fetch candles from the API (a delta from ``start`` if given) and seed the candle store."""
+        try:
+            if start is not None:
+                df = self.coinbase_service.get_historical_data(product_id, granularity, limit, start=start)
+            else:
+                df = self.coinbase_service.get_historical_data(product_id, granularity, limit)
             self.stats['api_calls'] += 1
+            self.stats['candles_fetched'] += len(df)
             return df
-            
         except Exception as e:
             logger.error(f"❌ Failed to get historical data for {product_id}: {e}")
             self.stats['errors'] += 1
             return pd.DataFrame()
     
+    def _merge_candles(self, series: pd.DataFrame, newer: pd.DataFrame) -> pd.DataFrame:
+        """Extend a series with newer candles; refetched candles replace stored ones."""
+        merged = pd.concat([series[series.index < newer.index[0]], newer])
+        return merged.tail(self.max_series_candles)
+    
+    def _load_candle_series(self, product_id: str, granularity: int):
+        """Return (series, meta) from Redis, or (None, {}) if missing or unreadable."""
+        if not self.candle_redis_client:
+            return None, {}
+        try:
+            payload = self.candle_redis_client.get(self.get_cache_key("candles", f"{product_id}:{granularity}"))
+            meta = self.candle_redis_client.get(self.get_cache_key("candles_meta", f"{product_id}:{granularity}"))
+            if not payload or not meta or not is_encoded_candles(payload):
+                return None, {}
+            series = decode_candles(payload)
+            if series.empty:
+                return None, {}
+            return series, json.loads(meta)
+        except Exception as e:
+            logger.warning(f"Cache read error for historical {product_id}: {e}")
+            return None, {}
+    
+    def _save_candle_series(self, product_id: str, granularity: int, series: pd.DataFrame,
+                            requested_limit: int, fetched_at: float, fetch_seconds: float = 0.0):
+        """Store the canonical series and its metadata, and seed the candle store with it."""
+        self.candle_store.seed(product_id, granularity, series)
+        if not self.candle_redis_client:
+            return
+        try:
+            meta = {'fetched_at': fetched_at, 'requested_limit': requested_limit,
+                    'fetch_seconds': fetch_seconds, 'soft_ttl': self.historical_refresh_seconds,
+                    'hard_ttl': self.historical_hard_ttl_seconds}
+            self.candle_redis_client.setex(
+                self.get_cache_key("candles", f"{product_id}:{granularity}"),
+                self.candle_series_ttl,
+                encode_candles(series)
+            )
+            self.candle_redis_client.setex(
+                self.get_cache_key("candles_meta", f"{product_id}:{granularity}"),
+                self.candle_series_ttl,
+                json.dumps(meta)
+            )
+            logger.debug(f"📦 Cached {len(series)} candles for {product_id}:{granularity}")
+        except Exception as e:
+            logger.warning(f"Cache write error for historical {product_id}: {e}")
+    
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
         total_requests = self.stats['cache_hits'] + self.stats['cache_misses']
@@ -454,6 +822,16 @@ class MarketDataService:
             'hit_rate_percent': round(hit_rate, 2),
             'api_calls': self.stats['api_calls'],
             'errors': self.stats['errors'],
+            'candle_store_hits': self.stats['candle_store_hits'],
+            'full_fetches': self.stats['full_fetches'],
+            'delta_fetches': self.stats['delta_fetches'],
+            'candles_fetched': self.stats['candles_fetched'],
+            'coalesced_requests': self.stats['coalesced_requests'],
+            'early_refreshes': self.stats['early_refreshes'],
+            'lock_wait_timeouts': self.stats['lock_wait_timeouts'],
+            'background_refreshes': self.stats['background_refreshes'],
+            'stale_served': self.stats['stale_served'],
+            'candle_store': self.candle_store.get_stats(),
             'last_refresh': self.stats['last_refresh'],
             'last_batch_size': self.stats['last_batch_size'],
             'cache_ttl_seconds': self.cache_ttl,
@@ -0,0 +1,199 @@
+"""
+P&L Engine - per-product P&L from one streaming scan of the raw trades.
+
+RawTradeService computed P&L from the newest 1000 trades, then re-queried
+each product's trades (again capped at 1000) for its net position, average
+buy price and average short price: about 3N+1 queries, silently truncated.
+The engine streams every fill once, ordered by product and time, and
+accumulates holdings, cost basis, realized P&L and fees for every product
+in that single pass. Unrealized P&L is then priced from one prefetched
+ticker lookup for the products with open positions.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from ..models.models import RawTrade
+
+logger = logging.getLogger(__name__)
+
+
+class ProductPnL:
+    """Running P&L accumulators for one product."""
+
+    __slots__ = ('total_trades', 'buy_trades', 'sell_trades', 'total_spent', 'total_received',
+                 'total_fees', 'realized_pnl', 'net_position', 'buy_cost', 'buy_size',
+                 'sell_proceeds', 'sell_size')
+
+    def __init__(self):
+        self.total_trades = 0
+        self.buy_trades = 0
+        self.sell_trades = 0
+        self.total_spent = 0.0
+        self.total_received = 0.0
+        self.total_fees = 0.0
+        self.realized_pnl = 0.0
+        self.net_position = 0.0
+        self.buy_cost = 0.0
+        self.buy_size = 0.0
+        self.sell_proceeds = 0.0
+        self.sell_size = 0.0
+
+    def add_fill(self, side: str, size: float, price: float, commission: Optional[float],
+                 size_in_quote: bool = False):
+        """Apply one fill; fills must arrive oldest first."""
+        self.total_trades += 1
+        if size_in_quote:
+            # Skip size_in_quote trades due to data corruption issues
+            return
+
+        commission = float(commission) if commission else 0.0
+        usd_value = size * price
+        side = side.lower() if side else ''
+
+        if side == 'buy':
+            self.buy_trades += 1
+            self.total_spent += usd_value + commission
+            self.buy_cost += usd_value
+            self.buy_size += size
+            self.net_position += size
+        elif side == 'sell':
+            self.sell_trades += 1
+            self.total_received += usd_value - commission
+            self.sell_proceeds += usd_value
+            self.sell_size += size
+            self.net_position -= size
+
+            # Realized P&L for this sell at the average cost of the buys before it
+            if self.buy_size > 0:
+                cost_basis = size * (self.buy_cost / self.buy_size)
+                self.realized_pnl += (usd_value - commission) - cost_basis
+
+        self.total_fees += commission
+
+    @property
+    def average_buy_price(self) -> float:
+        return self.buy_cost / self.buy_size if self.buy_size > 0 else 0.0
+
+    @property
+    def average_short_price(self) -> float:
+        return self.sell_proceeds / self.sell_size if self.sell_size > 0 else 0.0
+
+    def to_dict(self, include_holdings: bool = False, current_price: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Summarize in RawTradeService's P&L format.
+
+        Args:
+            include_holdings: Report current holdings (and value them if priced)
+            current_price: Market price for unrealized P&L of an open position
+        """
+        data = {
+            'total_trades': self.total_trades,
+            'buy_trades': self.buy_trades,
+            'sell_trades': self.sell_trades,
+            'total_spent': self.total_spent,
+            'total_received': self.total_received,
+            'total_fees': self.total_fees,
+            'realized_pnl': self.realized_pnl,
+            'unrealized_pnl': 0.0,
+            'current_holdings': 0.0,
+            'current_value': 0.0,
+            'net_pnl': self.realized_pnl  # Default to realized only
+        }
+        if not include_holdings:
+            return data
+
+        holdings = self.net_position
+        data['current_holdings'] = holdings
+        if holdings == 0 or not current_price:
+            return data
+
+        current_value = abs(holdings) * current_price
+        data['current_value'] = current_value
+        data['current_price'] = current_price
+        if holdings > 0:  # Long position
+            data['average_buy_price'] = self.average_buy_price
+            data['unrealized_pnl'] = current_value - holdings * self.average_buy_price
+        else:  # Short position (negative holdings)
+            data['average_short_price'] = self.average_short_price
+            data['unrealized_pnl'] = abs(holdings) * self.average_short_price - current_value
+        data['net_pnl'] = data['realized_pnl'] + data['unrealized_pnl']
+        return data
+
+
+class PnLEngine:
+    """Computes every product's P&L from a single streaming scan of raw trades."""
+
+    def __init__(self, db: Session, batch_size: int = 5000):
+        """
+        Args:
+            db: Database session
+            batch_size: Rows fetched per round trip while streaming
+        """
+        self.db = db
+        self.batch_size = batch_size
+
+    def scan(self) -> Dict[str, ProductPnL]:
+        """Stream every fill once (by product, then time) into per-product accumulators."""
+        rows = self.db.query(
+            RawTrade.product_id,
+            RawTrade.side,
+            RawTrade.size,
+            RawTrade.price,
+            RawTrade.commission,
+            RawTrade.size_in_quote
+        ).order_by(RawTrade.product_id, RawTrade.created_at, RawTrade.id).yield_per(self.batch_size)
+        return self.accumulate(rows)
+
+    @staticmethod
+    def accumulate(rows: Iterable) -> Dict[str, ProductPnL]:
+        """Fold (product_id, side, size, price, commission, size_in_quote) rows, oldest first per product."""
+        products: Dict[str, ProductPnL] = {}
+        current_id, current = None, None
+        for product_id, side, size, price, commission, size_in_quote in rows:
+            if product_id != current_id:
+                current_id = product_id
+                current = products.get(product_id)
+                if current is None:
+                    current = products[product_id] = ProductPnL()
+            current.add_fill(side, float(size), float(price), commission, bool(size_in_quote))
+        return products
+
+    def calculate(self, include_unrealized: bool = False,
+                  get_tickers: Optional[Callable[[List[str]], Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        P&L by product.
+
+        Args:
+            include_unrealized: Value open positions at current market prices
+            get_tickers: Batch ticker lookup (defaults to the cached MarketDataService)
+
+        Returns:
+            Dict of product_id -> P&L summary
+        """
+        products = self.scan()
+        if not include_unrealized:
+            return {product_id: pnl.to_dict() for product_id, pnl in products.items()}
+
+        # One cached lookup prices every open position
+        tickers = {}
+        open_products = [product_id for product_id, pnl in products.items() if pnl.net_position != 0]
+        if open_products:
+            try:
+                if get_tickers is None:
+                    from ..utils.service_registry import get_market_service
+                    get_tickers = get_market_service().get_tickers
+                tickers = get_tickers(open_products)
+            except Exception as e:
+                logger.error(f"Error getting current prices for {len(open_products)} products: {e}")
+
+        results = {}
+        for product_id, pnl in products.items():
+            ticker = tickers.get(product_id)
+            current_price = float(ticker.price) if ticker is not None and ticker.price else None
+            if pnl.net_position != 0 and current_price is None:
+                logger.warning(f"Could not get current price for {product_id}")
+            results[product_id] = pnl.to_dict(include_holdings=True, current_price=current_price)
+        return results
@@ -1,6 +1,11 @@
 """
 Position Tracking Service - Proper position and P&L calculation
 Tracks actual positions and calculates realistic P&L using FIFO method.
+
+Positions are read from the persisted position ledger (one row per product
+plus its open lots), which RawTradeService keeps current as fills are
+stored. replay_positions() is the from-scratch FIFO replay the ledger is
+checked against.
 """
 
 import logging
@@ -12,7 +17,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import desc
 
 from app.core.database import SessionLocal
-from app.models.models import RawTrade
+from app.models.models import RawTrade, PositionLedger, PositionLedgerLot
+from app.services.position_ledger_service import PositionLedgerService
 
 logger = logging.getLogger(__name__)
 
@@ -60,12 +66,51 @@ class PositionTrackingService:
     
     def __init__(self, db: Session = None):
         self.db = db or SessionLocal()
+        self.ledger = PositionLedgerService(self.db)
     
     def calculate_positions(self) -> Dict[str, Position]:
-        """Calculate current positions for all trading pairs"""
+        """Current positions for all trading pairs, read from the position ledger"""
+        try:
+            lots_by_product = self.ledger.get_lots()
+            return {
+                entry.product_id: self._position_from_ledger(entry, lots_by_product.get(entry.product_id, []))
+                for entry in self.ledger.get_entries()
+            }
+        except Exception as e:
+            logger.error(f"Error reading positions from ledger: {e}")
+            return {}
+    
+    def _position_from_ledger(self, entry: PositionLedger, lots: List[PositionLedgerLot]) -> Position:
+        return Position(
+            product_id=entry.product_id,
+            total_quantity=Decimal(entry.total_quantity),
+            lots=[
+                PositionLot(
+                    quantity=Decimal(lot.quantity),
+                    cost_basis=Decimal(lot.cost_basis),
+                    purchase_date=self._parse_trade_time(lot.purchase_date),
+                    fill_id=lot.fill_id
+                )
+                for lot in lots
+            ],
+            realized_pnl=Decimal(entry.realized_pnl),
+            unrealized_pnl=Decimal('0'),
+            total_fees=Decimal(entry.total_fees)
+        )
+    
+    @staticmethod
+    def _parse_trade_time(value: str) -> datetime:
+        """RawTrade.created_at is Coinbase's ISO timestamp string."""
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except (AttributeError, ValueError):
+            return datetime.min
+    
+    def replay_positions(self) -> Dict[str, Position]:
+        """Calculate positions by replaying every trade with FIFO (the ledger's reference)"""
         try:
             # Get all trades ordered by time (oldest first for FIFO)
-            trades = self.db.query(RawTrade).order_by(RawTrade.created_at).all()
+            trades = self.db.query(RawTrade).order_by(RawTrade.created_at, RawTrade.id).all()
             
             positions = {}
             
@@ -153,16 +198,12 @@ class PositionTrackingService:
     def get_position_summaries(self) -> List[PositionSummary]:
         """Get position summaries for UI display"""
         positions = self.calculate_positions()
+        entries = {entry.product_id: entry for entry in self.ledger.get_entries()}
         summaries = []
         
         for product_id, position in positions.items():
-            # Get trade counts
-            trades = self.db.query(RawTrade).filter(
-                RawTrade.product_id == product_id
-            ).all()
-            
-            buy_count = sum(1 for t in trades if t.side.upper() == 'BUY')
-            sell_count = sum(1 for t in trades if t.side.upper() == 'SELL')
+            # Trade counts are kept by the ledger
+            entry = entries[product_id]
             
             summary = PositionSummary(
                 product_id=product_id,
@@ -172,9 +213,9 @@ class PositionTrackingService:
                 unrealized_pnl=position.unrealized_pnl,
                 total_pnl=position.realized_pnl + position.unrealized_pnl,
                 total_fees=position.total_fees,
-                trade_count=len(trades),
-                buy_count=buy_count,
-                sell_count=sell_count
+                trade_count=entry.trade_count,
+                buy_count=entry.buy_count,
+                sell_count=entry.sell_count
             )
             summaries.append(summary)
         
@@ -182,8 +223,14 @@ class PositionTrackingService:
     
     def get_position_by_product(self, product_id: str) -> Optional[Position]:
         """Get position for a specific trading pair"""
-        positions = self.calculate_positions()
-        return positions.get(product_id)
+        try:
+            entry = self.ledger.get_entry(product_id)
+            if entry is None:
+                return None
+            return self._position_from_ledger(entry, self.ledger.get_lots(product_id).get(product_id, []))
+        except Exception as e:
+            logger.error(f"Error reading position for {product_id} from ledger: {e}")
+            return None
     
     def calculate_unrealized_pnl(self, current_prices: Dict[str, Decimal]) -> Dict[str, Position]:
         """Calculate unrealized P&L using current market prices"""
@@ -0,0 +1,218 @@
+"""
+Prediction Write Queue - write-behind persistence for SignalPredictionRecord rows.
+
+Recording a signal prediction used to open a session and commit (with up
+to three retries) for every signal of every bot, inline in the trading
+decision path. Predictions are analytics: the decision must never wait on
+them. Callers now enqueue the row without blocking; a background thread
+drains the bounded queue and bulk-inserts rows with a single executemany
+per batch. When the queue is full new rows are dropped and counted rather
+than slowing evaluation down.
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import insert
+
+from ..models.models import SignalPredictionRecord
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionWriteQueue:
+    """
+    Bounded in-process write-behind queue with a background flusher.
+
+    Features:
+    - Non-blocking enqueue (drops with a counter when full)
+    - Batched executemany inserts (size- or interval-triggered)
+    - Backpressure statistics (depth, high-water mark, near-full enqueues)
+    - Clean shutdown that flushes everything still queued
+    """
+
+    def __init__(self, max_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0,
+                 session_factory: Optional[Callable] = None, backpressure_ratio: float = 0.8):
+        """
+        Initialize the write queue.
+
+        Args:
+            max_size: Maximum queued rows before new rows are dropped
+            batch_size: Maximum rows per executemany insert
+            flush_interval: Seconds to wait for a batch to fill before writing it
+            session_factory: Callable returning a new DB session (defaults to SessionLocal)
+            backpressure_ratio: Queue fill ratio above which enqueues count as backpressure
+        """
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._max_size = max_size
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._session_factory = session_factory
+        self._backpressure_threshold = int(max_size * backpressure_ratio)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0,
+            'backpressure_events': 0,
+            'max_queue_depth': 0
+        }
+
+    def start(self):
+        """Start the background flusher thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="prediction-write-queue", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            f"PredictionWriteQueue started (max_size={self._max_size}, "
+            f"batch_size={self._batch_size}, flush_interval={self._flush_interval}s)"
+        )
+
+    def enqueue(self, values: Dict[str, Any]) -> bool:
+        """
+        Queue a SignalPredictionRecord row without blocking.
+
+        Args:
+            values: Column -> value mapping for the row
+
+        Returns:
+            True if queued, False if dropped because the queue is full or stopped
+        """
+        if self._stop_event.is_set():
+            with self._lock:
+                self._stats['dropped'] += 1
+            return False
+
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            # Not started yet, or the flusher died (unhandled error, forked worker)
+            self.start()
+
+        try:
+            self._queue.put_nowait(values)
+        except queue.Full:
+            with self._lock:
+                self._stats['dropped'] += 1
+                dropped = self._stats['dropped']
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Prediction write queue full ({self._max_size}); {dropped} rows dropped so far")
+            return False
+
+        depth = self._queue.qsize()
+        with self._lock:
+            self._stats['enqueued'] += 1
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+            if depth >= self._backpressure_threshold:
+                self._stats['backpressure_events'] += 1
+        return True
+
+    def _run(self):
+        """Flusher loop: collect a batch, write it, repeat until stopped and drained."""
+        while not (self._stop_event.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def _collect_batch(self) -> List[Dict[str, Any]]:
+        batch = []
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self._stop_event.is_set() and self._queue.empty()):
+                break
+            try:
+                batch.append(self._queue.get(timeout=min(remaining, 0.1)))
+            except queue.Empty:
+                continue
+        return batch
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        """Insert one batch with a single executemany; failures are counted, not retried."""
+        session_factory = self._session_factory
+        if session_factory is None:
+            from ..core.database import SessionLocal
+            session_factory = SessionLocal
+
+        try:
+            session = session_factory()
+            try:
+                session.execute(insert(SignalPredictionRecord), batch)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+            finally:
+                session.close()
+        except Exception as e:
+            with self._lock:
+                self._stats['failed'] += len(batch)
+            logger.warning(f"Failed to persist {len(batch)} signal predictions: {e}")
+            return
+
+        with self._lock:
+            self._stats['written'] += len(batch)
+            self._stats['batches'] += 1
+        logger.debug(f"💾 Persisted {len(batch)} signal predictions in one batch")
+
+    def stop(self, timeout: float = 10.0) -> bool:
+        """
+        Stop accepting rows and flush everything still queued.
+
+        Args:
+            timeout: Maximum seconds to wait for the final flush
+
+        Returns:
+            True if the queue was fully drained
+        """
+        self._stop_event.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning(f"PredictionWriteQueue stop timed out with {self._queue.qsize()} rows queued")
+                return False
+        elif not self._queue.empty():
+            # Never started a thread (e.g. rows queued before start) - drain inline
+            self._run()
+        logger.info(f"PredictionWriteQueue stopped: {self.get_stats()}")
+        return self._queue.empty()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue statistics."""
+        with self._lock:
+            return {
+                'queue_depth': self._queue.qsize(),
+                'max_size': self._max_size,
+                'running': self._thread is not None and self._thread.is_alive(),
+                **self._stats
+            }
+
+
+# Global queue instance
+_global_prediction_write_queue: Optional[PredictionWriteQueue] = None
+_global_queue_lock = threading.Lock()
+
+
+def get_prediction_write_queue() -> PredictionWriteQueue:
+    """Get the global prediction write queue, flushed automatically at interpreter exit."""
+    global _global_prediction_write_queue
+    if _global_prediction_write_queue is None:
+        with _global_queue_lock:
+            if _global_prediction_write_queue is None:
+                _global_prediction_write_queue = PredictionWriteQueue()
+                atexit.register(_global_prediction_write_queue.stop)
+    return _global_prediction_write_queue
@@ -0,0 +1,154 @@
+"""
+Regime Snapshot - market regime resolved once per pair per evaluation cycle.
+
+Threshold selection, signal prediction tagging and position sizing each
+asked the trend engine for the same pair's regime, so a trend-detection bot
+cost three analyze_trend calls (and three trips through the engine's lock)
+per evaluation. A RegimeSnapshot is created for one evaluation cycle and
+memoizes the regime per pair; every consumer in the cycle reads from it.
+Cycle owners (Celery workers) publish the finished snapshot to Redis with a
+TTL, where the API process reads it for the regime snapshot endpoint.
+"""
+
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RegimeSnapshot:
+    """
+    Per-cycle memo of trend engine results keyed by pair.
+
+    Create one per evaluation cycle; it is never refreshed, so a long-lived
+    snapshot would serve stale regimes.
+    """
+
+    def __init__(self, trend_engine=None):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            trend_engine: TrendDetectionEngine to query (defaults to the global engine)
+        """
+        self._trend_engine = trend_engine
+        self._regimes: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.created_at = datetime.utcnow()
+        self.published_at: Optional[datetime] = None
+        self._stats = {
+            'lookups': 0,
+            'computations': 0
+        }
+
+    def get(self, pair: str) -> Dict[str, Any]:
+        """
+        Return the pair's regime data, analyzing the trend on first use in this cycle.
+
+        Args:
+            pair: Trading pair (e.g., "BTC-USD")
+
+        Returns:
+            Trend engine result dict (regime, trend_strength, confidence, ...)
+        """
+        with self._lock:
+            self._stats['lookups'] += 1
+            regime_data = self._regimes.get(pair)
+            if regime_data is not None:
+                return regime_data
+
+            trend_engine = self._trend_engine
+            if trend_engine is None:
+                from .trend_detection_engine import get_trend_engine
+                trend_engine = get_trend_engine()
+
+            regime_data = trend_engine.analyze_trend(pair)
+            self._regimes[pair] = regime_data
+            self._stats['computations'] += 1
+            return regime_data
+
+    def get_regime(self, pair: str) -> str:
+        """Return only the regime label for a pair."""
+        return self.get(pair).get('regime', 'UNKNOWN')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the snapshot for the API."""
+        with self._lock:
+            return {
+                'created_at': self.created_at.isoformat(),
+                'published_at': self.published_at.isoformat() if self.published_at else None,
+                'pairs': {
+                    pair: {
+                        'regime': data.get('regime', 'UNKNOWN'),
+                        'trend_strength': data.get('trend_strength', 0.0),
+                        'confidence': data.get('confidence', 0.0),
+                        'analysis_timestamp': data.get('analysis_timestamp'),
+                        'error': data.get('error')
+                    }
+                    for pair, data in self._regimes.items()
+                },
+                **self._stats
+            }
+
+
+REGIME_SNAPSHOT_KEY = "regime_snapshot:latest"
+REGIME_SNAPSHOT_TTL_SECONDS = 900  # Several evaluation cycles; older snapshots are not served
+
+# Most recently published cycle snapshot in this process (fallback without Redis)
+_latest_regime_snapshot: Optional[RegimeSnapshot] = None
+_latest_snapshot_lock = threading.Lock()
+
+
+def _get_redis_client():
+    from .market_data_service import get_market_data_service
+    return getattr(get_market_data_service(), 'redis_client', None)
+
+
+def publish_regime_snapshot(snapshot: RegimeSnapshot, redis_client=None):
+    """
+    Record a finished cycle's snapshot as the latest one.
+
+    Args:
+        snapshot: The cycle's snapshot
+        redis_client: Redis client shared with the API process (defaults to
+                      the market data service's client)
+    """
+    global _latest_regime_snapshot
+    snapshot.published_at = datetime.utcnow()
+    with _latest_snapshot_lock:
+        _latest_regime_snapshot = snapshot
+
+    try:
+        redis_client = redis_client or _get_redis_client()
+        if redis_client is not None:
+            redis_client.setex(REGIME_SNAPSHOT_KEY, REGIME_SNAPSHOT_TTL_SECONDS,
+                               json.dumps(snapshot.to_dict(), default=str))
+    except Exception as e:
+        logger.warning(f"Failed to publish regime snapshot to Redis: {e}")
+
+
+def get_latest_regime_snapshot(redis_client=None) -> Optional[Dict[str, Any]]:
+    """
+    Get the most recently published cycle snapshot, if any.
+
+    Snapshots published by any process are read from Redis; without Redis,
+    only a snapshot published in this process is available.
+
+    Returns:
+        The snapshot's to_dict() summary, or None
+    """
+    try:
+        redis_client = redis_client or _get_redis_client()
+        if redis_client is not None:
+            payload = redis_client.get(REGIME_SNAPSHOT_KEY)
+            if payload is not None:
+                return json.loads(payload)
+    except Exception as e:
+        logger.warning(f"Failed to read regime snapshot from Redis: {e}")
+
+    with _latest_snapshot_lock:
+        snapshot = _latest_regime_snapshot
+    return snapshot.to_dict() if snapshot is not None else None
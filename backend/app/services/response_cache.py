@@ -0,0 +1,266 @@
+"""
+API Response Cache - bounded, expiring cache for coordinated Coinbase calls.
+
+SyncAPICoordinator used to keep every response it had ever seen in a plain
+dict, keyed by the str() of the call arguments, and only skipped expired
+entries on read. This cache bounds both the number of entries and their
+approximate memory, expires entries with a per-method TTL (order status
+goes stale in seconds, the product list in minutes) and removes expired
+entries as it goes instead of leaving them behind.
+"""
+
+import heapq
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds a response stays fresh, per coinbase_service method. Zero disables
+# caching: orders must always reach the exchange.
+DEFAULT_METHOD_TTLS: Dict[str, float] = {
+    'place_market_order': 0,
+    'get_order_status': 2,
+    'validate_trade_balance': 5,
+    'get_available_balance': 10,
+    'get_product_ticker': 10,
+    'get_accounts': 30,
+    'get_fills': 30,
+    'get_historical_data': 60,
+    'get_products': 300,
+}
+
+
+def _freeze(value: Any) -> Hashable:
+    """Turn call arguments into a hashable, order-independent key component."""
+    if isinstance(value, dict):
+        return ('__dict__',) + tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return ('__set__',) + tuple(sorted(repr(item) for item in value))
+    try:
+        hash(value)
+    except TypeError:
+        return ('__repr__', repr(value))
+    return value
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Approximate the memory held by a cached response, in bytes."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        size += estimate_size(vars(value), _depth + 1)
+    return size
+
+
+class ResponseCache:
+    """
+    LRU cache of API responses with per-method TTLs and a memory bound.
+
+    Features:
+    - Structured keys (method, args, kwargs) instead of str()'d arguments
+    - Per-method TTLs; a TTL of 0 means the method is never cached
+    - LRU eviction when either max_entries or max_bytes is exceeded
+    - Expired entries removed on read and swept on every write
+    - Thread-safe operations with hit/miss/eviction statistics
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 32 * 1024 * 1024,
+                 default_ttl: float = 90, method_ttls: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the response cache.
+
+        Args:
+            max_entries: Maximum number of cached responses (LRU eviction)
+            max_bytes: Approximate memory budget for cached responses
+            default_ttl: TTL in seconds for methods not in method_ttls
+            method_ttls: Per-method TTL overrides (merged over DEFAULT_METHOD_TTLS)
+            clock: Monotonic time source (injectable for tests)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.method_ttls = dict(DEFAULT_METHOD_TTLS)
+        self.method_ttls.update(method_ttls or {})
+        self._clock = clock
+
+        # key -> (result, expires_at, size_bytes, method)
+        self._entries: OrderedDict[Tuple, Tuple[Any, float, int, str]] = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, Tuple]] = []
+        self._sequence = 0
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'uncacheable': 0
+        }
+
+    @staticmethod
+    def make_key(method: str, args: tuple, kwargs: dict) -> Tuple:
+        """Build the cache key for a call."""
+        return (method, _freeze(tuple(args)), _freeze(dict(kwargs)))
+
+    def ttl_for(self, method: str) -> float:
+        """TTL in seconds for a method (0 = not cached)."""
+        return self.method_ttls.get(method, self.default_ttl)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """
+        Look up a response.
+
+        Returns:
+            (hit, result) - result is None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            if entry[1] <= self._clock():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, entry[0]
+
+    def set(self, key: Tuple, result: Any) -> bool:
+        """
+        Store a response under the TTL of its method (key[0]).
+
+        Returns:
+            True if the response was cached
+        """
+        method = key[0]
+        ttl = self.ttl_for(method)
+        if ttl <= 0:
+            with self._lock:
+                self._stats['uncacheable'] += 1
+            return False
+
+        size = estimate_size(result)
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats['uncacheable'] += 1
+                return False
+            now = self._clock()
+            self._purge_expired(now)
+            if key in self._entries:
+                self._remove(key)
+            expires_at = now + ttl
+            self._entries[key] = (result, expires_at, size, method)
+            self._bytes += size
+            self._sequence += 1
+            heapq.heappush(self._expiry_heap, (expires_at, self._sequence, key))
+            self._stats['stores'] += 1
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._stats['evictions'] += 1
+            return True
+
+    def _remove(self, key: Tuple):
+        """Caller holds the lock. The expiry heap entry is dropped lazily."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _purge_expired(self, now: float) -> int:
+        """Remove every entry past its TTL. Caller holds the lock."""
+        purged = 0
+        while self._expiry_heap and self._expiry_heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(self._expiry_heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                self._remove(key)
+                purged += 1
+        self._stats['expirations'] += purged
+        # Heap entries for overwritten/evicted keys pile up otherwise
+        if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [(entry[1], i, key) for i, (key, entry) in enumerate(self._entries.items())]
+            heapq.heapify(self._expiry_heap)
+            self._sequence = len(self._expiry_heap)
+        return purged
+
+    def purge_expired(self) -> int:
+        """Remove expired entries now. Returns the number removed."""
+        with self._lock:
+            return self._purge_expired(self._clock())
+
+    def invalidate(self, method: Optional[str] = None) -> int:
+        """
+        Drop cached responses.
+
+        Args:
+            method: Only drop responses of this method (None = everything)
+
+        Returns:
+            Number of entries removed
+        """
+        with self._lock:
+            if method is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._expiry_heap.clear()
+                self._bytes = 0
+                return removed
+            keys = [key for key, entry in self._entries.items() if entry[3] == method]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self):
+        """Clear all cached responses."""
+        self.invalidate()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache performance statistics."""
+        with self._lock:
+            lookups = self._stats['hits'] + self._stats['misses']
+            hit_rate = (self._stats['hits'] / lookups * 100) if lookups > 0 else 0
+            entries_by_method: Dict[str, int] = {}
+            for entry in self._entries.values():
+                entries_by_method[entry[3]] = entries_by_method.get(entry[3], 0) + 1
+
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'memory_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._stats['hits'],
+                'misses': self._stats['misses'],
+                'hit_rate_percent': round(hit_rate, 2),
+                'stores': self._stats['stores'],
+                'evictions': self._stats['evictions'],
+                'expirations': self._stats['expirations'],
+                'uncacheable': self._stats['uncacheable'],
+                'entries_by_method': entries_by_method
+            }
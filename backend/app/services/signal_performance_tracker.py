@@ -18,6 +18,8 @@ import numpy as np
 from collections import defaultdict, deque
 from sqlalchemy import and_
 
+from .prediction_write_queue import get_prediction_write_queue
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,73 +77,52 @@ class SignalPerformanceTracker:
         self.performance_cache: Dict[str, SignalPerformanceMetrics] = {}
         self.regime_signal_rankings: Dict[str, List[Tuple[str, float]]] = {}
         
-    def record_signal_prediction(self, prediction: SignalPrediction) -> None:
+    def record_signal_prediction(self, prediction: SignalPrediction, write_sink=None) -> None:
         """
         Record a signal prediction for later performance evaluation.
         
         Args:
             prediction: SignalPrediction with signal details and prediction
+            write_sink: Optional EvaluationWriteSink; if given, the database row is
+                        written with the sink's flush, otherwise by the write-behind queue
         """
         # Store in memory for immediate access
         key = f"{prediction.pair}_{prediction.regime}_{prediction.signal_type}"
         self.predictions[key].append(prediction)
         
-        # Persist to database for permanent storage
-        if self.db:
-            max_retries = 3
-            retry_count = 0
-            
-            while retry_count < max_retries:
-                try:
-                    from ..models.models import SignalPredictionRecord
-                    from ..core.database import SessionLocal
-                    
-                    # Use a fresh database session to avoid conflicts
-                    fresh_db = SessionLocal()
-                    try:
-                        db_record = SignalPredictionRecord(
-                            timestamp=prediction.timestamp,
-                            pair=prediction.pair,
-                            regime=prediction.regime,
-                            signal_type=prediction.signal_type,
-                            signal_score=prediction.signal_score,
-                            prediction=prediction.prediction,
-                            confidence=prediction.confidence,
-                            actual_price_change_pct=prediction.actual_price_change,
-                            outcome=prediction.outcome.value if prediction.outcome else None,
-                            evaluation_timestamp=None,  # To be filled when evaluated
-                            trade_executed=prediction.trade_executed,
-                            trade_pnl_usd=prediction.trade_pnl,
-                            evaluation_period_minutes=60
-                        )
-                        
-                        fresh_db.add(db_record)
-                        fresh_db.commit()
-                    finally:
-                        fresh_db.close()
-                    
-                    logger.info(
-                        f"✅ COMMITTED signal prediction to database: {prediction.signal_type} for {prediction.pair} "
-                        f"in {prediction.regime} regime → {prediction.prediction} (confidence: {prediction.confidence:.3f})"
-                    )
-                    break  # Success - exit retry loop
-                    
-                except Exception as db_error:
-                    # Fresh session auto-rollback on exception
-                    retry_count += 1
-                    
-                    if retry_count >= max_retries:
-                        logger.warning(f"Failed to persist signal prediction after {max_retries} retries: {db_error}")
-                        break
-                    else:
-                        logger.debug(f"Database retry {retry_count}/{max_retries} for signal prediction: {db_error}")
-                # Continue with in-memory storage even if DB fails
+        # Defer persistence to the evaluation cycle's single transaction
+        if self.db and write_sink is not None:
+            write_sink.add_signal_prediction(self._prediction_record_values(prediction))
+        
+        # Persist to database for permanent storage without blocking the caller
+        elif self.db:
+            if not get_prediction_write_queue().enqueue(self._prediction_record_values(prediction)):
+                logger.debug(f"Signal prediction for {prediction.pair} not persisted: write queue full")
         
         logger.debug(
             f"📊 Recorded signal prediction: {prediction.signal_type} for {prediction.pair} "
             f"in {prediction.regime} regime → {prediction.prediction} (confidence: {prediction.confidence:.3f})"
         )
     
+    @staticmethod
+    def _prediction_record_values(prediction: SignalPrediction) -> Dict[str, Any]:
+        """Column values of the SignalPredictionRecord row for a prediction."""
+        return {
+            'timestamp': prediction.timestamp,
+            'pair': prediction.pair,
+            'regime': prediction.regime,
+            'signal_type': prediction.signal_type,
+            'signal_score': prediction.signal_score,
+            'prediction': prediction.prediction,
+            'confidence': prediction.confidence,
+            'actual_price_change_pct': prediction.actual_price_change,
+            'outcome': prediction.outcome.value if prediction.outcome else None,
+            'evaluation_timestamp': None,  # To be filled when evaluated
+            'trade_executed': prediction.trade_executed,
+            'trade_pnl_usd': prediction.trade_pnl,
+            'evaluation_period_minutes': 60
+        }
+    
     def evaluate_prediction_outcome(self, 
                                    prediction: SignalPrediction,
                                    actual_price_change_pct: float,
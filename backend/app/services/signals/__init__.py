@@ -1,4 +1,5 @@
 from .base import BaseSignal
 from .technical import RSISignal, MovingAverageSignal
+from .incremental import IndicatorStateStore, get_indicator_state_store
 
-__all__ = ["BaseSignal", "RSISignal", "MovingAverageSignal"]
+__all__ = ["BaseSignal", "RSISignal", "MovingAverageSignal", "IndicatorStateStore", "get_indicator_state_store"]
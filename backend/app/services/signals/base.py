@@ -4,6 +4,9 @@ import pandas as pd
 from datetime import datetime
 
 
+_signal_map: Optional[Dict[str, type]] = None
+
+
 def create_signal_instance(signal_type: str, parameters: Dict[str, Any]) -> Optional['BaseSignal']:
     """
     Factory function to create signal instances.
@@ -15,15 +18,18 @@ def create_signal_instance(signal_type: str, parameters: Dict[str, Any]) -> Opti
     Returns:
         Signal instance or None if type not found
     """
-    from .technical import RSISignal, MovingAverageSignal, MACDSignal
-    
-    signal_map = {
-        'RSI': RSISignal,
-        'MA_Crossover': MovingAverageSignal,
-        'MACD': MACDSignal,
-    }
+    global _signal_map
+    if _signal_map is None:
+        # Imported lazily (technical imports this module) and resolved only once
+        from .technical import RSISignal, MovingAverageSignal, MACDSignal
+        
+        _signal_map = {
+            'RSI': RSISignal,
+            'MA_Crossover': MovingAverageSignal,
+            'MACD': MACDSignal,
+        }
     
-    signal_class = signal_map.get(signal_type)
+    signal_class = _signal_map.get(signal_type)
     if signal_class:
         return signal_class(**parameters)
     return None
@@ -61,6 +67,26 @@ class BaseSignal(ABC):
         """Return minimum number of data periods required for calculation."""
         pass
     
+    def create_state(self) -> Optional[Any]:
+        """
+        Create O(1) incremental indicator state for streaming evaluation.
+        
+        Returns None for signals without an incremental implementation.
+        """
+        return None
+    
+    def calculate_from_state(self, state: Any, close: float) -> Dict[str, Any]:
+        """
+        Calculate signal from incremental state plus the live candle's close.
+        
+        The state holds every closed candle; ``close`` is the latest (still
+        forming) candle, which is peeked rather than committed. Produces the
+        same result as ``calculate()`` over the same candle sequence.
+        """
+        if state.count + 1 < self.get_required_periods():
+            return {"score": 0, "action": "hold", "confidence": 0, "metadata": {}}
+        return self._score(*state.peek(close).values())
+    
     def is_valid_data(self, data: pd.DataFrame) -> bool:
         """Check if data is sufficient for signal calculation."""
         return len(data) >= self.get_required_periods()
@@ -0,0 +1,398 @@
+"""
+Incremental (streaming) indicator state for the technical signals.
+
+The batch signals in ``technical.py`` rebuild full ``rolling()``/``ewm()``
+series over the whole candle DataFrame just to read the last value. The
+classes here keep O(1) running state instead and advance one candle at a
+time. The running means mirror pandas' own window kernels (Kahan-compensated
+rolling mean, adjusted EWM) step for step, so a state that has seen exactly
+the candle sequence of a frame produces bit-identical indicator values to a
+batch calculation over that frame - and therefore identical scores.
+
+Closed candles are committed with ``update()``; the live (still-forming)
+candle is evaluated with ``peek()`` which never mutates state, so per-tick
+evaluation costs a handful of float operations. Both the adjusted EWM and
+the compensated sums depend on where the sequence starts, so a state is
+only reused while the frame's first candle is unchanged: a sliding window
+rebuilds once per new candle, the same work the batch path does per call.
+"""
+
+import logging
+import math
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class RollingMean:
+    """
+    Fixed-window simple moving average with pandas-compatible numerics.
+
+    Mirrors ``pandas._libs.window.aggregations.roll_mean``: separate Kahan
+    compensation for adds and removes, sign tracking to clamp round-off
+    around zero, and exact results for runs of identical values.
+    """
+
+    def __init__(self, window: int):
+        self.window = window
+        self._values = deque()
+        self._nobs = 0
+        self._sum = 0.0
+        self._neg_ct = 0
+        self._comp_add = 0.0
+        self._comp_remove = 0.0
+        self._same_ct = 0
+        self._prev = math.nan
+        self.value = math.nan
+
+    def _step(self, val: float) -> Tuple:
+        nobs, sum_x, neg_ct = self._nobs, self._sum, self._neg_ct
+        comp_add, comp_remove = self._comp_add, self._comp_remove
+        same_ct, prev = self._same_ct, self._prev
+
+        # Remove the value leaving the window (pandas removes before adding)
+        if len(self._values) == self.window:
+            old = self._values[0]
+            nobs -= 1
+            y = -old - comp_remove
+            t = sum_x + y
+            comp_remove = t - sum_x - y
+            sum_x = t
+            if math.copysign(1.0, old) < 0:
+                neg_ct -= 1
+
+        nobs += 1
+        y = val - comp_add
+        t = sum_x + y
+        comp_add = t - sum_x - y
+        sum_x = t
+        if math.copysign(1.0, val) < 0:
+            neg_ct += 1
+        same_ct = same_ct + 1 if val == prev else 1
+        prev = val
+
+        if nobs >= self.window:
+            result = sum_x / nobs
+            if same_ct >= nobs:
+                result = prev
+            elif neg_ct == 0 and result < 0:
+                result = 0.0
+            elif neg_ct == nobs and result > 0:
+                result = 0.0
+        else:
+            result = math.nan
+
+        return nobs, sum_x, neg_ct, comp_add, comp_remove, same_ct, prev, result
+
+    def push(self, val: float) -> float:
+        """Commit a value and return the new mean."""
+        (self._nobs, self._sum, self._neg_ct, self._comp_add, self._comp_remove,
+         self._same_ct, self._prev, self.value) = self._step(val)
+        self._values.append(val)
+        if len(self._values) > self.window:
+            self._values.popleft()
+        return self.value
+
+    def peek(self, val: float) -> float:
+        """Return the mean the window would have after ``val``, without committing it."""
+        return self._step(val)[-1]
+
+
+class ExponentialMean:
+    """
+    Adjusted exponential moving average matching ``Series.ewm(span=...).mean()``.
+
+    Mirrors ``pandas._libs.window.aggregations.ewm`` with ``adjust=True``:
+    the running weight decays by ``1 - alpha`` and grows by one per
+    observation, and the weighted value is left untouched when the new
+    observation equals it.
+    """
+
+    def __init__(self, span: int):
+        com = (span - 1) / 2.0
+        alpha = 1. / (1. + com)
+        self._old_wt_factor = 1. - alpha
+        self._old_wt = 1.
+        self.value = math.nan
+        self._started = False
+
+    def _step(self, cur: float) -> Tuple[float, float]:
+        if not self._started:
+            return cur, 1.
+        weighted = self.value
+        old_wt = self._old_wt * self._old_wt_factor
+        # pandas skips the update on a constant run to avoid round-off
+        if weighted != cur:
+            weighted = old_wt * weighted + 1. * cur
+            weighted /= (old_wt + 1.)
+        old_wt += 1.
+        return weighted, old_wt
+
+    def push(self, cur: float) -> float:
+        """Commit an observation and return the new average."""
+        self.value, self._old_wt = self._step(cur)
+        self._started = True
+        return self.value
+
+    def peek(self, cur: float) -> float:
+        """Return the average after ``cur``, without committing it."""
+        return self._step(cur)[0]
+
+
+class RSIState:
+    """Running gain/loss averages for ``RSISignal``."""
+
+    def __init__(self, period: int):
+        self.count = 0
+        self._last_close: Optional[float] = None
+        self._gains = RollingMean(period)
+        self._losses = RollingMean(period)
+
+    def _gain_loss(self, close: float) -> Tuple[float, float]:
+        # Same conventions as delta.where(delta > 0, 0) / -delta.where(delta < 0, 0):
+        # the first candle has no delta and counts as (0.0, -0.0)
+        if self._last_close is None:
+            return 0.0, -0.0
+        delta = close - self._last_close
+        gain = delta if delta > 0 else 0.0
+        loss = -delta if delta < 0 else -0.0
+        return gain, loss
+
+    @staticmethod
+    def _rsi(gain: float, loss: float) -> float:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(gain) / np.float64(loss)
+            return 100 - (100 / (1 + rs))
+
+    def update(self, close: float):
+        gain, loss = self._gain_loss(close)
+        self._gains.push(gain)
+        self._losses.push(loss)
+        self._last_close = close
+        self.count += 1
+
+    def peek(self, close: float) -> Dict[str, float]:
+        gain, loss = self._gain_loss(close)
+        return {"rsi": self._rsi(self._gains.peek(gain), self._losses.peek(loss))}
+
+
+class MovingAverageState:
+    """Running fast/slow simple moving averages for ``MovingAverageSignal``."""
+
+    def __init__(self, fast_period: int, slow_period: int):
+        self.count = 0
+        self._fast = RollingMean(fast_period)
+        self._slow = RollingMean(slow_period)
+
+    def update(self, close: float):
+        self._fast.push(close)
+        self._slow.push(close)
+        self.count += 1
+
+    def peek(self, close: float) -> Dict[str, float]:
+        return {
+            "fast_ma": np.float64(self._fast.peek(close)),
+            "slow_ma": np.float64(self._slow.peek(close)),
+            "prev_fast_ma": np.float64(self._fast.value),
+            "prev_slow_ma": np.float64(self._slow.value),
+        }
+
+
+class MACDState:
+    """Running fast/slow EMAs and signal-line EMA for ``MACDSignal``."""
+
+    def __init__(self, fast_period: int, slow_period: int, signal_period: int):
+        self.count = 0
+        self._ema_fast = ExponentialMean(fast_period)
+        self._ema_slow = ExponentialMean(slow_period)
+        self._signal = ExponentialMean(signal_period)
+        self._histogram = 0.0
+
+    def update(self, close: float):
+        macd_line = self._ema_fast.push(close) - self._ema_slow.push(close)
+        self._histogram = macd_line - self._signal.push(macd_line)
+        self.count += 1
+
+    def peek(self, close: float) -> Dict[str, float]:
+        macd_line = self._ema_fast.peek(close) - self._ema_slow.peek(close)
+        signal_line = self._signal.peek(macd_line)
+        return {
+            "macd_line": np.float64(macd_line),
+            "signal_line": np.float64(signal_line),
+            "histogram": np.float64(macd_line - signal_line),
+            "prev_histogram": np.float64(self._histogram),
+        }
+
+
+def candle_index(data: pd.DataFrame) -> Optional[pd.Index]:
+    """Return per-candle identities (timestamps), or None if the frame has none."""
+    if isinstance(data.index, pd.DatetimeIndex):
+        return data.index
+    if 'timestamp' in data.columns:
+        return pd.Index(data['timestamp'])
+    return None
+
+
+def infer_granularity(keys: pd.Index) -> int:
+    """Infer candle granularity in seconds from the last two timestamps."""
+    if len(keys) < 2:
+        return 0
+    try:
+        return int((keys[-1] - keys[-2]).total_seconds())
+    except (AttributeError, TypeError):
+        return 0
+
+
+class _StateEntry:
+    """Indicator state plus the keys of the first and last committed candles."""
+
+    __slots__ = ("state", "first_key", "last_key")
+
+    def __init__(self, state, first_key: Hashable):
+        self.state = state
+        self.first_key = first_key
+        self.last_key: Optional[Hashable] = None
+
+
+class IndicatorStateStore:
+    """
+    Process-wide registry of incremental indicator states.
+
+    States are keyed by (pair, granularity, signal name, parameters). Each
+    call syncs the state to the supplied candles: every candle except the
+    last is treated as closed and committed once, the last (live) candle is
+    only peeked. In steady state a tick therefore advances nothing and a new
+    candle in a growing frame advances exactly one step. If the frame starts
+    at a different candle (sliding window) or the stored history no longer
+    lines up with it (gap, reseed, restart), the state is rebuilt from the
+    DataFrame, which is the same work the batch path does on every call.
+    At most ``max_states`` states are kept, least recently used evicted first.
+    """
+
+    def __init__(self, max_states: int = 1000):
+        """
+        Initialize the store.
+
+        Args:
+            max_states: Maximum number of (pair, granularity, signal, params) states kept
+        """
+        self._max_states = max_states
+        self._states: "OrderedDict[Tuple, _StateEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._stats = {
+            'evaluations': 0,
+            'candles_advanced': 0,
+            'rebuilds': 0,
+            'evictions': 0,
+            'batch_fallbacks': 0
+        }
+
+    def calculate(self, signal, data: pd.DataFrame, pair: str,
+                  granularity: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Calculate a signal from incremental state, advancing it to ``data``.
+
+        Args:
+            signal: Signal instance (RSISignal, MovingAverageSignal, MACDSignal)
+            data: DataFrame with OHLCV data, oldest candle first
+            pair: Trading pair the candles belong to
+            granularity: Candle granularity in seconds (inferred if omitted)
+
+        Returns:
+            Same result dict as ``signal.calculate(data)``
+        """
+        keys = candle_index(data)
+        if keys is None or len(data) == 0:
+            # No stable candle identity - incremental state can't be synced
+            return self._batch_fallback(signal, data)
+
+        if granularity is None:
+            granularity = infer_granularity(keys)
+
+        params = tuple(sorted(signal.parameters.items()))
+        state_key = (pair, granularity, signal.name, params)
+        closes = data['close'].to_numpy(dtype=np.float64)
+        last_committed = len(closes) - 2
+
+        with self._lock:
+            self._stats['evaluations'] += 1
+            entry = self._states.get(state_key)
+            if entry is not None:
+                self._states.move_to_end(state_key)
+
+            # The state only matches a batch over this frame if it starts at the same candle
+            same_origin = entry is not None and entry.first_key == keys[0]
+
+            # Locate the last committed candle, scanning back from the newest
+            position = None
+            if same_origin and entry.last_key is not None:
+                for i in range(last_committed, -1, -1):
+                    if keys[i] == entry.last_key:
+                        position = i
+                        break
+
+            if not same_origin or (position is None and entry.last_key is not None):
+                state = signal.create_state()
+                if state is None:
+                    return self._batch_fallback(signal, data)
+                if entry is not None:
+                    self._stats['rebuilds'] += 1
+                entry = _StateEntry(state, keys[0])
+                self._states[state_key] = entry
+                self._states.move_to_end(state_key)
+                while len(self._states) > self._max_states:
+                    self._states.popitem(last=False)
+                    self._stats['evictions'] += 1
+                position = -1
+            elif position is None:
+                position = -1
+
+            for i in range(position + 1, last_committed + 1):
+                entry.state.update(float(closes[i]))
+                self._stats['candles_advanced'] += 1
+            if last_committed >= 0:
+                entry.last_key = keys[last_committed]
+
+            return signal.calculate_from_state(entry.state, float(closes[-1]))
+
+    def _batch_fallback(self, signal, data: pd.DataFrame) -> Dict[str, Any]:
+        with self._lock:
+            self._stats['batch_fallbacks'] += 1
+        return signal.calculate(data)
+
+    def reset(self, pair: Optional[str] = None) -> int:
+        """Drop stored states (all, or for one pair). Returns number removed."""
+        with self._lock:
+            if pair is None:
+                count = len(self._states)
+                self._states.clear()
+            else:
+                keys = [key for key in self._states if key[0] == pair]
+                for key in keys:
+                    del self._states[key]
+                count = len(keys)
+            logger.info(f"Reset {count} incremental indicator states")
+            return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get incremental indicator statistics."""
+        with self._lock:
+            return {
+                'tracked_states': len(self._states),
+                'max_states': self._max_states,
+                **self._stats
+            }
+
+
+# Global store instance
+_global_indicator_state_store = IndicatorStateStore()
+
+
+def get_indicator_state_store() -> IndicatorStateStore:
+    """Get the global incremental indicator state store."""
+    return _global_indicator_state_store
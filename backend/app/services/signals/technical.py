@@ -2,6 +2,7 @@ from typing import Dict, Any
 import pandas as pd
 import numpy as np
 from .base import BaseSignal
+from .incremental import RSIState, MovingAverageState, MACDState
 
 
 class RSISignal(BaseSignal):
@@ -24,8 +25,6 @@ class RSISignal(BaseSignal):
         
         # Calculate RSI using pandas
         period = self.parameters["period"]
-        oversold = self.parameters["oversold"]
-        overbought = self.parameters["overbought"]
         
         # Calculate price changes
         delta = data['close'].diff()
@@ -38,7 +37,13 @@ class RSISignal(BaseSignal):
         rs = gain / loss
         rsi = 100 - (100 / (1 + rs))
         
-        current_rsi = rsi.iloc[-1]
+        return self._score(rsi.iloc[-1])
+    
+    def _score(self, current_rsi: float) -> Dict[str, Any]:
+        """Turn the latest RSI value into a signal result (shared by batch and incremental paths)."""
+        period = self.parameters["period"]
+        oversold = self.parameters["oversold"]
+        overbought = self.parameters["overbought"]
         
         # Handle NaN values
         if pd.isna(current_rsi):
@@ -88,6 +93,9 @@ class RSISignal(BaseSignal):
     
     def get_required_periods(self) -> int:
         return self.parameters["period"] + 1
+    
+    def create_state(self) -> RSIState:
+        return RSIState(self.parameters["period"])
 
 
 class MovingAverageSignal(BaseSignal):
@@ -113,10 +121,13 @@ class MovingAverageSignal(BaseSignal):
         fast_ma = data['close'].rolling(window=fast_period).mean()
         slow_ma = data['close'].rolling(window=slow_period).mean()
         
-        current_fast = fast_ma.iloc[-1]
-        current_slow = slow_ma.iloc[-1]
-        prev_fast = fast_ma.iloc[-2]
-        prev_slow = slow_ma.iloc[-2]
+        return self._score(fast_ma.iloc[-1], slow_ma.iloc[-1], fast_ma.iloc[-2], slow_ma.iloc[-2])
+    
+    def _score(self, current_fast: float, current_slow: float,
+               prev_fast: float, prev_slow: float) -> Dict[str, Any]:
+        """Turn current and previous MA values into a signal result (shared by batch and incremental paths)."""
+        fast_period = self.parameters["fast_period"]
+        slow_period = self.parameters["slow_period"]
         
         # Handle NaN values
         if pd.isna(current_fast) or pd.isna(current_slow) or pd.isna(prev_fast) or pd.isna(prev_slow):
@@ -177,6 +188,9 @@ class MovingAverageSignal(BaseSignal):
     
     def get_required_periods(self) -> int:
         return max(self.parameters["fast_period"], self.parameters["slow_period"]) + 1
+    
+    def create_state(self) -> MovingAverageState:
+        return MovingAverageState(self.parameters["fast_period"], self.parameters["slow_period"])
 
 
 class MACDSignal(BaseSignal):
@@ -214,10 +228,15 @@ class MACDSignal(BaseSignal):
         # Calculate histogram
         histogram = macd_line - signal_line
         
-        current_macd = macd_line.iloc[-1]
-        current_signal = signal_line.iloc[-1]
-        current_histogram = histogram.iloc[-1]
         prev_histogram = histogram.iloc[-2] if len(histogram) > 1 else 0
+        return self._score(macd_line.iloc[-1], signal_line.iloc[-1], histogram.iloc[-1], prev_histogram)
+    
+    def _score(self, current_macd: float, current_signal: float,
+               current_histogram: float, prev_histogram: float) -> Dict[str, Any]:
+        """Turn the latest MACD values into a signal result (shared by batch and incremental paths)."""
+        fast_period = self.parameters["fast_period"]
+        slow_period = self.parameters["slow_period"]
+        signal_period = self.parameters["signal_period"]
         
         # Handle NaN values
         if pd.isna(current_macd) or pd.isna(current_signal) or pd.isna(current_histogram):
@@ -283,3 +302,10 @@ class MACDSignal(BaseSignal):
     
     def get_required_periods(self) -> int:
         return self.parameters["slow_period"] + self.parameters["signal_period"] + 5  # Buffer for EMA calculations
+    
+    def create_state(self) -> MACDState:
+        return MACDState(
+            self.parameters["fast_period"],
+            self.parameters["slow_period"],
+            self.parameters["signal_period"]
+        )
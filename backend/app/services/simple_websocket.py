@@ -11,6 +11,8 @@ import threading
 from datetime import datetime, timezone
 from typing import Dict, Optional, List
 
+from .candle_store import get_candle_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,11 +86,14 @@ class SimpleCoinbaseWebSocket:
             except websockets.exceptions.ConnectionClosed:
                 logger.warning("WebSocket disconnected, reconnecting in 5 seconds...")
                 self.is_connected = False
+                # Ticks missed while disconnected would leave holes in the live candles
+                get_candle_store().mark_gap(self.subscription_products)
                 await asyncio.sleep(5)
                 
             except Exception as e:
                 logger.error(f"WebSocket error: {e}, reconnecting in 10 seconds...")
                 self.is_connected = False
+                get_candle_store().mark_gap(self.subscription_products)
                 await asyncio.sleep(10)
     
     def _process_message(self, data: dict):
@@ -112,6 +117,7 @@ class SimpleCoinbaseWebSocket:
                                 }
                                 
                                 self.price_cache[product_id] = price_data
+                                get_candle_store().on_tick(product_id, price_data["price"])
                                 logger.info(f"💰 {product_id}: ${price_data['price']}")
                                 
         except Exception as e:
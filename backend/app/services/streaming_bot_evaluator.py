@@ -1,32 +1,82 @@
 """
 Streaming bot evaluator for real-time WebSocket-driven bot evaluation.
+
+A single long-lived instance serves every ticker update in the process. It
+reads candles from the ticker-fed candle store (seeding it through the API
+coordinator only when a series is missing or has a gap) and looks up running
+bots through an index that is refreshed when bots start or stop. In steady
+state a tick costs no REST calls.
 """
 
 import logging
+import threading
+import time
 import pandas as pd
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Any, Optional
+from datetime import datetime
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
 
 from ..models.models import Bot
 from ..services.bot_evaluator import BotSignalEvaluator
-from ..services.coinbase_service import coinbase_service
+from ..services.candle_store import CandleStore, get_candle_store
+from ..services.signals.incremental import get_indicator_state_store
 
 logger = logging.getLogger(__name__)
 
 
+def fetch_candles_coordinated(product_id: str, granularity: int, limit: int) -> pd.DataFrame:
+    """Fetch candles through the rate-limit coordinator."""
+    from .sync_coordinated_coinbase_service import get_coordinated_coinbase_service
+    from .sync_api_coordinator import RequestPriority
+    return get_coordinated_coinbase_service().get_historical_data(
+        product_id, granularity, limit, priority=RequestPriority.HIGH
+    )
+
+
 class StreamingBotEvaluator:
     """
     Handles real-time bot evaluation triggered by WebSocket ticker updates.
     Extends the existing BotSignalEvaluator for streaming capabilities.
+    
+    Use the process-wide instance from get_streaming_bot_evaluator(); its
+    candle store and running-bot index are what make ticks cheap.
     """
     
-    def __init__(self, db: Session):
-        self.db = db
-        self.bot_evaluator = BotSignalEvaluator(db)
+    CANDLE_GRANULARITY = 3600       # 1-hour candles
+    CANDLE_LIMIT = 100
+    BOT_INDEX_MAX_AGE_SECONDS = 60  # Safety refresh for changes made outside the bots API
+    
+    def __init__(self, session_factory: Optional[Callable[[], Session]] = None,
+                 candle_fetcher: Optional[Callable[[str, int, int], pd.DataFrame]] = None,
+                 candle_store: Optional[CandleStore] = None):
+        """
+        Initialize the streaming evaluator.
+        
+        Args:
+            session_factory: Callable returning a new DB session (defaults to SessionLocal)
+            candle_fetcher: Callable (product_id, granularity, limit) -> candle DataFrame
+                            (defaults to the coordinated Coinbase service)
+            candle_store: Ticker-fed candle store (defaults to the global store)
+        """
+        if session_factory is None:
+            from ..core.database import SessionLocal
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+        self._candle_fetcher = candle_fetcher or fetch_candles_coordinated
+        self._candle_store = candle_store or get_candle_store()
+        self._lock = threading.RLock()
         self._ticker_cache = {}  # Cache recent ticker data
-        self._market_data_cache = {}  # Cache market data to avoid repeated API calls
+        self._bots_by_pair: Dict[str, List[int]] = {}
+        self._bot_index_loaded_at: Optional[float] = None
+        self._stats = {
+            'ticks': 0,
+            'skipped_no_bots': 0,
+            'evaluations': 0,
+            'candle_cache_hits': 0,
+            'candle_fetches': 0,
+            'candle_fetch_failures': 0,
+            'bot_index_refreshes': 0
+        }
         
     def evaluate_bots_on_ticker_update(self, product_id: str, ticker_data: dict):
         """
@@ -37,41 +87,54 @@ class StreamingBotEvaluator:
             ticker_data: Real-time ticker data from WebSocket
         """
         try:
-            # Update ticker cache
-            self._ticker_cache[product_id] = {
-                'price': float(ticker_data.get('price', 0)),
-                'timestamp': datetime.utcnow(),
-                'volume_24h': float(ticker_data.get('volume_24h', 0)),
-                'best_bid': float(ticker_data.get('best_bid', 0)),
-                'best_ask': float(ticker_data.get('best_ask', 0))
-            }
+            price = float(ticker_data.get('price', 0) or 0)
+            with self._lock:
+                self._stats['ticks'] += 1
+                # Update ticker cache
+                self._ticker_cache[product_id] = {
+                    'price': price,
+                    'timestamp': datetime.utcnow(),
+                    'volume_24h': float(ticker_data.get('volume_24h', 0) or 0),
+                    'best_bid': float(ticker_data.get('best_bid', 0) or 0),
+                    'best_ask': float(ticker_data.get('best_ask', 0) or 0)
+                }
             
             # Find all running bots for this product
-            running_bots = self.db.query(Bot).filter(
-                and_(
-                    Bot.pair == product_id,
-                    Bot.status == "RUNNING"
-                )
-            ).all()
-            
-            if not running_bots:
+            bot_ids = self.get_running_bot_ids(product_id)
+            if not bot_ids:
+                with self._lock:
+                    self._stats['skipped_no_bots'] += 1
                 logger.debug(f"No running bots found for {product_id}")
                 return
-                
-            logger.info(f"Evaluating {len(running_bots)} running bots for {product_id} ticker update")
             
-            # Get or refresh market data for signal calculations
+            # Candles from the store; the websocket feed has already applied this tick
             market_data = self._get_market_data_for_evaluation(product_id)
             
             if market_data.empty:
                 logger.warning(f"No market data available for {product_id} bot evaluation")
                 return
             
-            # Evaluate each running bot
-            evaluation_results = []
-            for bot in running_bots:
-                try:
-                    result = self.bot_evaluator.evaluate_bot(bot, market_data)
+            db = self._session_factory()
+            try:
+                running_bots = db.query(Bot).filter(
+                    Bot.id.in_(bot_ids),
+                    Bot.status == "RUNNING"
+                ).all()
+                if not running_bots:
+                    return
+                
+                logger.info(f"Evaluating {len(running_bots)} running bots for {product_id} ticker update")
+                
+                # Incremental indicator state persists across ticks in the global store
+                bot_evaluator = BotSignalEvaluator(db, indicator_store=get_indicator_state_store())
+                batch_results = bot_evaluator.evaluate_bots_batch(running_bots, {product_id: market_data})
+                
+                evaluation_results = []
+                for bot in running_bots:
+                    result = batch_results.get(bot.id)
+                    if result is None:
+                        logger.error(f"Error evaluating bot {bot.name}")
+                        continue
                     evaluation_results.append({
                         'bot_id': bot.id,
                         'bot_name': bot.name,
@@ -80,9 +143,11 @@ class StreamingBotEvaluator:
                     
                     logger.debug(f"Bot {bot.name}: {result.get('action', 'unknown')} "
                               f"(score: {result.get('overall_score', 0):.3f})")
-                    
-                except Exception as e:
-                    logger.error(f"Error evaluating bot {bot.name}: {e}")
+            finally:
+                db.close()
+            
+            with self._lock:
+                self._stats['evaluations'] += len(evaluation_results)
                     
             # Broadcast results to WebSocket clients if needed
             self._broadcast_evaluation_results(product_id, evaluation_results)
@@ -92,38 +157,78 @@ class StreamingBotEvaluator:
     
     def _get_market_data_for_evaluation(self, product_id: str) -> pd.DataFrame:
         """
-        Get market data for bot evaluation, using cache to avoid repeated API calls.
+        Get market data for bot evaluation from the candle store.
+        
+        The store's open candle already carries every tick from the websocket
+        feed; candles are only fetched (and the store reseeded) when the
+        series is missing or has a gap.
         """
+        candles = self._candle_store.get_candles(product_id, self.CANDLE_GRANULARITY, self.CANDLE_LIMIT)
+        if candles is not None:
+            with self._lock:
+                self._stats['candle_cache_hits'] += 1
+            return candles
+        return self._refresh_candles(product_id)
+    
+    def _refresh_candles(self, product_id: str) -> pd.DataFrame:
         try:
-            # Check if we have recent market data (within last 30 seconds)
-            now = datetime.utcnow()
-            cache_key = product_id
-            
-            if (cache_key in self._market_data_cache and 
-                (now - self._market_data_cache[cache_key]['timestamp']).total_seconds() < 30):
-                
-                logger.debug(f"Using cached market data for {product_id}")
-                return self._market_data_cache[cache_key]['data']
-            
-            # Fetch fresh market data
             logger.debug(f"Fetching fresh market data for {product_id}")
-            market_data = coinbase_service.get_historical_data(
-                product_id=product_id,
-                granularity=3600,  # 1-hour candles
-                limit=100
-            )
-            
-            # Cache the data
-            self._market_data_cache[cache_key] = {
-                'data': market_data,
-                'timestamp': now
-            }
-            
-            return market_data
-            
+            market_data = self._candle_fetcher(product_id, self.CANDLE_GRANULARITY, self.CANDLE_LIMIT)
         except Exception as e:
             logger.error(f"Error fetching market data for {product_id}: {e}")
-            return pd.DataFrame()
+            market_data = pd.DataFrame()
+        
+        with self._lock:
+            self._stats['candle_fetches'] += 1
+            if market_data is None or market_data.empty:
+                self._stats['candle_fetch_failures'] += 1
+                return pd.DataFrame()
+        
+        if self._candle_store.seed(product_id, self.CANDLE_GRANULARITY, market_data):
+            seeded = self._candle_store.get_candles(product_id, self.CANDLE_GRANULARITY, len(market_data))
+            if seeded is not None:
+                return seeded
+        return market_data
+    
+    def refresh_bot_index(self, db: Optional[Session] = None):
+        """
+        Rebuild the running-bots-by-pair index.
+        
+        Called when bots are started, stopped, created, updated or deleted.
+        
+        Args:
+            db: Session to query with (a new session is used if omitted)
+        """
+        owns_session = db is None
+        if owns_session:
+            db = self._session_factory()
+        try:
+            rows = db.query(Bot.id, Bot.pair).filter(Bot.status == "RUNNING").all()
+        finally:
+            if owns_session:
+                db.close()
+        
+        bots_by_pair: Dict[str, List[int]] = {}
+        for bot_id, pair in rows:
+            bots_by_pair.setdefault(pair, []).append(bot_id)
+        
+        with self._lock:
+            self._bots_by_pair = bots_by_pair
+            self._bot_index_loaded_at = time.monotonic()
+            self._stats['bot_index_refreshes'] += 1
+        logger.debug(f"Running bot index refreshed: {len(rows)} bots across {len(bots_by_pair)} pairs")
+    
+    def _ensure_bot_index(self):
+        with self._lock:
+            loaded_at = self._bot_index_loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > self.BOT_INDEX_MAX_AGE_SECONDS:
+            self.refresh_bot_index()
+    
+    def get_running_bot_ids(self, product_id: str) -> List[int]:
+        """Get ids of running bots trading a product, from the index."""
+        self._ensure_bot_index()
+        with self._lock:
+            return list(self._bots_by_pair.get(product_id, []))
     
     def _broadcast_evaluation_results(self, product_id: str, results: List[Dict]):
         """
@@ -173,18 +278,46 @@ class StreamingBotEvaluator:
         Used to determine which WebSocket subscriptions are needed.
         """
         try:
-            active_products = self.db.query(Bot.pair).filter(
-                Bot.status == "RUNNING"
-            ).distinct().all()
-            
-            return [product[0] for product in active_products]
+            self._ensure_bot_index()
+            with self._lock:
+                return list(self._bots_by_pair.keys())
             
         except Exception as e:
             logger.error(f"Error getting active products: {e}")
             return []
     
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get candle store, bot index and evaluation statistics."""
+        with self._lock:
+            lookups = self._stats['candle_cache_hits'] + self._stats['candle_fetches']
+            hit_rate = (self._stats['candle_cache_hits'] / lookups * 100) if lookups > 0 else 0
+            return {
+                'tracked_tickers': len(self._ticker_cache),
+                'indexed_pairs': len(self._bots_by_pair),
+                'running_bots': sum(len(ids) for ids in self._bots_by_pair.values()),
+                'candle_hit_rate_percent': round(hit_rate, 2),
+                'candle_store': self._candle_store.get_stats(),
+                **self._stats
+            }
+    
     def clear_caches(self):
         """Clear internal caches - useful for testing or manual refresh."""
-        self._ticker_cache.clear()
-        self._market_data_cache.clear()
+        with self._lock:
+            self._ticker_cache.clear()
+            self._bot_index_loaded_at = None
         logger.info("Streaming bot evaluator caches cleared")
+
+
+# Global streaming evaluator instance
+_global_streaming_evaluator: Optional[StreamingBotEvaluator] = None
+_global_streaming_lock = threading.Lock()
+
+
+def get_streaming_bot_evaluator() -> StreamingBotEvaluator:
+    """Get the process-wide streaming bot evaluator."""
+    global _global_streaming_evaluator
+    if _global_streaming_evaluator is None:
+        with _global_streaming_lock:
+            if _global_streaming_evaluator is None:
+                _global_streaming_evaluator = StreamingBotEvaluator()
+    return _global_streaming_evaluator
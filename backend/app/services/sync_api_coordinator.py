@@ -1,25 +1,47 @@
 """
 Synchronous API Coordinator - Phase 6.4 Implementation
 Rate-limited request coordination without async/sync deadlock issues.
+
+Requests wait in a heap ordered by (priority, enqueue time) and are started
+by a dispatcher thread whenever the rate limiter allows; callers block on a
+future instead of polling. The limiter is the coinbase service's shared
+AdaptiveRateLimiter when it has one (a local token bucket otherwise). Rate-limited calls are rescheduled with jittered
+exponential backoff rather than sleeping on a worker, and a request that
+has waited longer than the starvation limit is started ahead of the heap.
+Identical concurrent requests are collapsed onto the one already queued or
+running, so a burst of evaluations asking for the same candles costs one
+upstream call.
 """
 
+import heapq
+import random
 import time
 import threading
 import logging
-from typing import Dict, List, Optional, Any, Callable
-from datetime import datetime, timedelta
-from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Any, Callable, Tuple
+from datetime import datetime
+from dataclasses import dataclass, field
 from enum import Enum
 from collections import deque
-import json
+import itertools
+from contextlib import nullcontext
+
+from .adaptive_rate_limiter import AdaptiveRateLimiter
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
 
+# Calls that must reach the exchange once per caller, never shared
+UNSHARED_METHODS = frozenset({'place_market_order'})
+
+
 class RequestPriority(Enum):
     """Request priority levels for API call coordination."""
     CRITICAL = 1     # Trading operations
-    HIGH = 2         # Bot evaluations  
+    HIGH = 2         # Bot evaluations
     MEDIUM = 3       # Market data
     LOW = 4          # Background analytics
 
@@ -35,147 +57,455 @@ class APIRequest:
     timestamp: datetime
     retries: int = 0
     max_retries: int = 3
+    enqueued_at: float = 0.0      # Coordinator clock; retries keep their original place
+    not_before: float = 0.0       # Earliest start (retry backoff)
+    state: str = 'queued'         # queued, running, done, cancelled
+    future: Future = field(default_factory=Future, repr=False)
+    key: Optional[Tuple] = None   # Dedup key; None for unshared methods
+    waiters: int = 1              # Callers sharing this request's future
 
 
 @dataclass
 class RateLimitConfig:
-    """Rate limiting configuration."""
+    """
+    Rate limiting configuration.
+    
+    calls_per_minute, burst_allowance and cooldown_seconds only drive the local
+    token bucket used when the coinbase service has no shared adaptive limiter.
+    """
     calls_per_minute: int = 8  # Conservative limit under Coinbase's 10/min
     burst_allowance: int = 3   # Allow small bursts
     cooldown_seconds: int = 8  # Wait time after rate limit hit
+    max_concurrent_calls: int = 4       # Worker threads running API calls
+    queue_timeout_seconds: float = 60.0  # How long coordinated_call waits for its result
+    starvation_seconds: float = 30.0     # Requests waiting this long jump the priority order
+    retry_base_seconds: float = 2.0      # Backoff before the first retry (doubles, with jitter)
+    retry_max_seconds: float = 30.0
+
+
+class TokenBucket:
+    """
+    Token-bucket limiter: refills at ``rate`` tokens per second up to ``capacity``.
+    
+    Not thread-safe; the coordinator calls it under its own lock.
+    """
+    
+    def __init__(self, rate: float, capacity: int, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._paused_until = 0.0
+    
+    def _refill(self, now: float):
+        if now < self._paused_until:
+            self._updated = now
+            return
+        start = max(self._updated, self._paused_until)
+        self._tokens = min(self.capacity, self._tokens + (now - start) * self.rate)
+        self._updated = now
+    
+    def try_acquire(self) -> float:
+        """Take a token. Returns 0.0 on success, else seconds until one is available."""
+        now = self._clock()
+        self._refill(now)
+        if now < self._paused_until:
+            return self._paused_until - now + (1.0 - self._tokens) / self.rate
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+    
+    def pause(self, seconds: float):
+        """Drain the bucket and stop refilling for ``seconds`` (e.g. after a 429)."""
+        now = self._clock()
+        self._refill(now)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + seconds)
+    
+    @property
+    def tokens(self) -> float:
+        self._refill(self._clock())
+        return self._tokens
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    return "429" in str(error) or "rate limit" in str(error).lower()
 
 
 class SyncAPICoordinator:
     """
     Synchronous API coordinator that prevents rate limiting through
     request queuing and intelligent batching.
+    
+    Features:
+    - Heap ordered by (priority, enqueue time); starvation guard for old requests
+    - Shared AdaptiveRateLimiter (learned from Coinbase headers and 429s), or a
+      local token bucket with burst (calls_per_minute, burst_allowance)
+    - Dispatcher thread plus worker pool; callers wait on futures
+    - Rate-limited calls retried later with jittered exponential backoff
+    - Bounded response cache with per-method TTLs (see ResponseCache)
+    - In-flight dedup: identical concurrent calls share one request's result
+      or exception (orders excepted)
+    - Injectable clock: with autostart=False, dispatch_pending() drives the
+      coordinator deterministically (calls run inline)
     """
     
-    def __init__(self, coinbase_service, rate_config: RateLimitConfig = None):
+    def __init__(self, coinbase_service, rate_config: RateLimitConfig = None,
+                 clock: Callable[[], float] = time.monotonic, autostart: bool = True,
+                 rng: Optional[random.Random] = None,
+                 response_cache: Optional[ResponseCache] = None,
+                 rate_limiter: Optional[AdaptiveRateLimiter] = None):
         self.coinbase_service = coinbase_service
         self.rate_config = rate_config or RateLimitConfig()
+        self._clock = clock
+        self._autostart = autostart
+        self._rng = rng or random.Random()
         
-        # Request queue with priority ordering
-        self.request_queue: deque = deque()
-        self.processing_lock = threading.Lock()
+        # Scheduling state, all guarded by _condition
+        self._condition = threading.Condition()
+        self._ready: List[Tuple[int, float, int, APIRequest]] = []      # (priority, enqueued_at, seq, request)
+        self._delayed: List[Tuple[float, int, APIRequest]] = []         # (not_before, seq, request)
+        self._arrivals: deque = deque()                                 # Enqueue order, for the starvation guard
+        self._pending: Dict[Tuple, APIRequest] = {}                     # Dedup key -> queued/running request
+        self._sequence = itertools.count()
+        self._bucket = TokenBucket(self.rate_config.calls_per_minute / 60.0,
+                                   self.rate_config.burst_allowance, clock)
+        if rate_limiter is None:
+            rate_limiter = getattr(coinbase_service, 'rate_limiter', None)
+        self.rate_limiter = rate_limiter if isinstance(rate_limiter, AdaptiveRateLimiter) else None
+        self._in_flight = 0
+        self._wakeup = False
+        self._running = False
+        self._dispatcher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         # Rate limiting tracking
         self.call_timestamps: deque = deque()
         self.last_rate_limit_hit = None
         
-        # Cache for avoiding duplicate calls
-        self.response_cache: Dict[str, Dict] = {}
-        self.cache_ttl = 90  # seconds
+        # Cache for avoiding duplicate calls (bounded, per-method TTLs)
+        self.response_cache = response_cache if response_cache is not None else ResponseCache(clock=clock)
         
         # Statistics
         self.stats = {
             'total_requests': 0,
             'cache_hits': 0,
             'rate_limits_avoided': 0,
-            'queued_requests': 0
+            'queued_requests': 0,
+            'collapsed_requests': 0,
+            'retries_scheduled': 0,
+            'failed_requests': 0,
+            'timed_out_requests': 0,
+            'starvation_promotions': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0
         }
         
         logger.info("🔧 SyncAPICoordinator initialized with synchronous rate limiting")
     
-    def _generate_cache_key(self, method: str, args: tuple, kwargs: dict) -> str:
+    def _generate_cache_key(self, method: str, args: tuple, kwargs: dict) -> Tuple:
         """Generate cache key for request deduplication."""
-        # Create deterministic key from method and arguments
-        key_parts = [method]
-        key_parts.extend(str(arg) for arg in args)
-        key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-        return "|".join(key_parts)
+        return ResponseCache.make_key(method, args, kwargs)
+    
+    def start(self):
+        """Start the dispatcher thread and worker pool (idempotent)."""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.rate_config.max_concurrent_calls, thread_name_prefix="api-coordinator"
+            )
+            self._dispatcher = threading.Thread(
+                target=self._dispatch_loop, name="api-coordinator-dispatcher", daemon=True
+            )
+            self._dispatcher.start()
+        logger.info(
+            f"SyncAPICoordinator dispatcher started ({self.rate_config.calls_per_minute}/min, "
+            f"burst={self.rate_config.burst_allowance})"
+        )
     
-    def _is_cached_valid(self, cache_entry: Dict) -> bool:
-        """Check if cached response is still valid."""
-        if not cache_entry:
-            return False
+    def stop(self, wait: bool = True):
+        """Stop dispatching; queued requests fail with RuntimeError."""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            abandoned = [entry[-1] for entry in self._ready] + [entry[-1] for entry in self._delayed]
+            self._ready.clear()
+            self._delayed.clear()
+            self._arrivals.clear()
+            self._pending.clear()
+            self._condition.notify_all()
+        for request in abandoned:
+            if request.state == 'queued':
+                request.state = 'cancelled'
+                request.future.set_exception(RuntimeError("SyncAPICoordinator stopped"))
+        if self._dispatcher is not None:
+            self._dispatcher.join(timeout=5)
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+        logger.info("SyncAPICoordinator dispatcher stopped")
+    
+    def submit(self, method: str, *args, priority: RequestPriority = RequestPriority.MEDIUM,
+               **kwargs) -> Future:
+        """
+        Queue an API call without waiting for it.
+        
+        If an identical call (same method and arguments) is already queued or
+        running, its future is returned instead and no new call is made; a
+        more urgent priority is passed on to the queued request.
+        
+        Args:
+            method: Name of the coinbase_service method to call
+            *args: Positional arguments for the method
+            priority: Request priority level
+            **kwargs: Keyword arguments for the method
+        
+        Returns:
+            Future resolved with the call's result (or exception)
+        """
+        if self._autostart and not self._running:
+            self.start()
         
-        cached_time = cache_entry.get('timestamp', 0)
-        return (time.time() - cached_time) < self.cache_ttl
+        key = None if method in UNSHARED_METHODS else self._generate_cache_key(method, args, kwargs)
+        now = self._clock()
+        with self._condition:
+            pending = self._pending.get(key) if key is not None else None
+            if pending is not None:
+                pending.waiters += 1
+                self.stats['collapsed_requests'] += 1
+                if pending.state == 'queued' and priority.value < pending.priority.value:
+                    pending.priority = priority
+                    if pending.not_before <= now:
+                        self._push_ready(pending)   # The old heap entry is skipped once this one starts it
+                        self._wakeup = True
+                        self._condition.notify()
+                logger.debug(f"🔗 Collapsed {method}({args}) onto in-flight request {pending.id}")
+                return pending.future
+            
+            request = APIRequest(
+                id=f"{method}_{int(time.time() * 1000)}",
+                method=method,
+                args=args,
+                kwargs=kwargs,
+                priority=priority,
+                timestamp=datetime.now(),
+                enqueued_at=now,
+                not_before=now,
+                key=key
+            )
+            if key is not None:
+                self._pending[key] = request
+            self._push_ready(request)
+            self._arrivals.append(request)
+            self.stats['queued_requests'] += 1
+            self._wakeup = True
+            self._condition.notify()
+        return request.future
+    
+    def _push_ready(self, request: APIRequest):
+        """Caller holds the lock."""
+        heapq.heappush(self._ready, (request.priority.value, request.enqueued_at,
+                                     next(self._sequence), request))
     
-    def _should_rate_limit(self) -> bool:
-        """Check if we should apply rate limiting."""
-        now = time.time()
+    def _next_request(self, now: float) -> Optional[APIRequest]:
+        """Pop the request to start next, or None. Caller holds the lock."""
+        # Oldest waiting request first if it has been starved
+        while self._arrivals and self._arrivals[0].state != 'queued':
+            self._arrivals.popleft()
+        if self._arrivals:
+            oldest = self._arrivals[0]
+            if oldest.not_before <= now and now - oldest.enqueued_at >= self.rate_config.starvation_seconds:
+                top = self._ready[0][-1] if self._ready else None
+                if top is not oldest:
+                    self.stats['starvation_promotions'] += 1
+                self._arrivals.popleft()
+                return oldest
         
-        # Clean old timestamps
-        while self.call_timestamps and (now - self.call_timestamps[0]) > 60:
-            self.call_timestamps.popleft()
+        while self._ready:
+            request = heapq.heappop(self._ready)[-1]
+            if request.state == 'queued':
+                return request
+        return None
+    
+    def _take_ready(self) -> Tuple[List[APIRequest], Optional[float]]:
+        """
+        Pop every request that can start now, claiming a call slot for each.
         
-        # Check if we're at rate limit
-        if len(self.call_timestamps) >= self.rate_config.calls_per_minute:
-            return True
+        Takes the lock itself: the shared limiter's slot is claimed without
+        holding it (try_acquire may round-trip to Redis, and submit() must
+        not wait on that), the local token bucket under it.
         
-        # Check if we recently hit rate limit
-        if (self.last_rate_limit_hit and 
-            (now - self.last_rate_limit_hit) < self.rate_config.cooldown_seconds):
-            return True
+        Returns:
+            (requests to start, seconds until the next one could start or None if idle)
+        """
+        started = []
+        wait = None
+        while True:
+            with self._condition:
+                now = self._clock()
+                while self._delayed and self._delayed[0][0] <= now:
+                    request = heapq.heappop(self._delayed)[-1]
+                    if request.state == 'queued':
+                        self._push_ready(request)
+                if not self._has_queued_ready():
+                    break
+                if self.rate_limiter is None:
+                    token_wait = self._bucket.try_acquire()
+                    if token_wait > 0:
+                        wait = token_wait
+                        break
+                    started.append(self._start_next(now))
+                    continue
+            
+            token_wait = self.rate_limiter.try_acquire()
+            if token_wait > 0:
+                wait = token_wait
+                break
+            with self._condition:
+                if self._has_queued_ready():
+                    started.append(self._start_next(self._clock()))
+                # else every queued request was cancelled while we claimed; the slot goes unused
         
-        return False
+        with self._condition:
+            if self._delayed:
+                delayed_wait = max(self._delayed[0][0] - self._clock(), 0.0)
+                wait = delayed_wait if wait is None else min(wait, delayed_wait)
+        return started, wait
     
-    def _execute_request(self, request: APIRequest) -> Any:
-        """Execute a single API request with error handling."""
+    def _start_next(self, now: float) -> APIRequest:
+        """Mark the next request running. Caller holds the lock and has claimed its slot."""
+        request = self._next_request(now)
+        request.state = 'running'
+        self._in_flight += 1
+        waited = now - request.enqueued_at
+        self.stats['total_wait_seconds'] += waited
+        self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+        self.call_timestamps.append(time.time())
+        return request
+    
+    def _has_queued_ready(self) -> bool:
+        """Drop cancelled entries from the top of the heap; True if a queued one remains."""
+        while self._ready and self._ready[0][-1].state != 'queued':
+            heapq.heappop(self._ready)
+        return bool(self._ready)
+    
+    def dispatch_pending(self) -> Optional[float]:
+        """
+        Start every request the token bucket currently allows.
+        
+        Runs calls on the worker pool once the dispatcher is started, and
+        inline otherwise (the deterministic harness drives the coordinator
+        by advancing its clock and calling this).
+        
+        Returns:
+            Seconds until another request could start, or None if nothing is waiting
+        """
+        started, wait = self._take_ready()
+        with self._condition:
+            executor = self._executor if self._running else None
+        
+        for request in started:
+            if executor is not None:
+                executor.submit(self._run_request, request)
+            else:
+                self._run_request(request)
+        return wait
+    
+    def _dispatch_loop(self):
+        while True:
+            wait = self.dispatch_pending()
+            with self._condition:
+                if not self._running:
+                    return
+                if not self._wakeup:
+                    self._condition.wait(wait)
+                self._wakeup = False
+    
+    def _run_request(self, request: APIRequest):
+        """Execute one API call and resolve (or reschedule) its request."""
+        # The slot was claimed at dispatch; the client must not charge that call again
+        # (further calls the method makes are paced as usual)
+        prepaid = self.rate_limiter.prepaid() if self.rate_limiter is not None else nullcontext()
         try:
-            # Get the method from coinbase_service
-            method = getattr(self.coinbase_service, request.method)
-            
-            # Record the API call timestamp
-            self.call_timestamps.append(time.time())
-            
-            # Execute the call
-            result = method(*request.args, **request.kwargs)
-            
-            # Cache the result
-            cache_key = self._generate_cache_key(request.method, request.args, request.kwargs)
-            self.response_cache[cache_key] = {
-                'result': result,
-                'timestamp': time.time()
-            }
-            
-            logger.debug(f"✅ API call successful: {request.method}({request.args})")
-            return result
-            
+            with prepaid:
+                result = self._execute_request(request)
         except Exception as e:
-            if "429" in str(e) or "rate limit" in str(e).lower():
-                self.last_rate_limit_hit = time.time()
-                logger.warning(f"⚠️ Rate limit hit for {request.method}: {e}")
-                self.stats['rate_limits_avoided'] += 1
-                
-                # Requeue with exponential backoff
-                if request.retries < request.max_retries:
-                    request.retries += 1
-                    time.sleep(2 ** request.retries)  # Exponential backoff
-                    return self._execute_request(request)
-                
+            if _is_rate_limit_error(e) and request.retries < request.max_retries:
+                self._schedule_retry(request, e)
+                return
+            with self._condition:
+                self._in_flight -= 1
+                self.stats['failed_requests'] += 1
+                request.state = 'done'
+                self._release_key(request)
             logger.error(f"❌ API call failed: {request.method}: {e}")
-            raise
+            request.future.set_exception(e)
+            return
+        
+        with self._condition:
+            self._in_flight -= 1
+            self.stats['total_requests'] += 1
+            request.state = 'done'
+            self._release_key(request)
+        request.future.set_result(result)
     
-    def _process_queue(self):
-        """Process requests from the queue with rate limiting."""
-        with self.processing_lock:
-            if not self.request_queue:
-                return None
-            
-            # Check if we should rate limit
-            if self._should_rate_limit():
-                logger.debug("⏳ Rate limiting active, deferring request")
-                return None
-            
-            # Get highest priority request (sort by priority)
-            if not self.request_queue:
-                return None
-                
-            # Sort queue by priority (CRITICAL=1 first)
-            sorted_queue = sorted(self.request_queue, key=lambda r: r.priority.value)
-            request = sorted_queue[0]
-            self.request_queue.remove(request)
+    def _release_key(self, request: APIRequest):
+        """Stop collapsing new calls onto a finished request. Caller holds the lock."""
+        if request.key is not None and self._pending.get(request.key) is request:
+            del self._pending[request.key]
+    
+    def _execute_request(self, request: APIRequest) -> Any:
+        """Execute a single API call and cache its result."""
+        # Get the method from coinbase_service
+        method = getattr(self.coinbase_service, request.method)
+        
+        # Execute the call
+        result = method(*request.args, **request.kwargs)
+        
+        # Cache the result
+        cache_key = self._generate_cache_key(request.method, request.args, request.kwargs)
+        self.response_cache.set(cache_key, result)
+        
+        logger.debug(f"✅ API call successful: {request.method}({request.args})")
+        return result
+    
+    def _retry_delay(self, retries: int) -> float:
+        """Exponential backoff with equal jitter: half fixed, half random."""
+        backoff = min(self.rate_config.retry_max_seconds,
+                      self.rate_config.retry_base_seconds * (2 ** (retries - 1)))
+        return backoff / 2 + self._rng.uniform(0, backoff / 2)
+    
+    def _schedule_retry(self, request: APIRequest, error: Exception):
+        """Put a rate-limited request back in the queue after a jittered backoff."""
+        # The rate-limited client already recorded the 429 and paused the shared budget
+        # (read outside the lock: it may round-trip to Redis)
+        limiter_wait = self.rate_limiter.wait_time() if self.rate_limiter is not None else 0.0
+        with self._condition:
+            self.last_rate_limit_hit = time.time()
+            self.stats['rate_limits_avoided'] += 1
+            self.stats['retries_scheduled'] += 1
+            delay = self._retry_delay(request.retries + 1)
+            if self.rate_limiter is not None:
+                delay = max(delay, limiter_wait)
+            else:
+                self._bucket.pause(self.rate_config.cooldown_seconds)
             
-            try:
-                result = self._execute_request(request)
-                self.stats['total_requests'] += 1
-                return result
-            except Exception as e:
-                logger.error(f"❌ Request processing failed: {e}")
-                raise
+            request.retries += 1
+            request.not_before = self._clock() + delay
+            request.state = 'queued'
+            self._in_flight -= 1
+            heapq.heappush(self._delayed, (request.not_before, next(self._sequence), request))
+            self._arrivals.append(request)
+            self._wakeup = True
+            self._condition.notify()
+        logger.warning(
+            f"⚠️ Rate limit hit for {request.method}: {error}; "
+            f"retry {request.retries}/{request.max_retries} scheduled"
+        )
     
     def coordinated_call(self, method: str, *args, priority: RequestPriority = RequestPriority.MEDIUM, **kwargs) -> Any:
         """
@@ -186,92 +516,92 @@ class SyncAPICoordinator:
             *args: Positional arguments for the method
             priority: Request priority level
             **kwargs: Keyword arguments for the method
-            
+        
         Returns:
             Result from the API call
         """
         # Check cache first
         cache_key = self._generate_cache_key(method, args, kwargs)
-        cached_entry = self.response_cache.get(cache_key)
-        
-        if cached_entry and self._is_cached_valid(cached_entry):
-            self.stats['cache_hits'] += 1
+        hit, cached_result = self.response_cache.get(cache_key)
+        if hit:
+            with self._condition:
+                self.stats['cache_hits'] += 1
             logger.debug(f"💾 Cache hit for {method}({args})")
-            return cached_entry['result']
-        
-        # Create request
-        request = APIRequest(
-            id=f"{method}_{int(time.time() * 1000)}",
-            method=method,
-            args=args,
-            kwargs=kwargs,
-            priority=priority,
-            timestamp=datetime.now()
-        )
-        
-        # For high priority requests, try immediate execution
-        if priority in [RequestPriority.CRITICAL, RequestPriority.HIGH]:
-            if not self._should_rate_limit():
-                try:
-                    result = self._execute_request(request)
-                    self.stats['total_requests'] += 1
-                    return result
-                except Exception:
-                    # Fall back to queueing
-                    pass
-        
-        # Queue the request
-        self.request_queue.append(request)
-        self.stats['queued_requests'] += 1
-        
-        # Process queue with retry logic for trading requests
-        max_attempts = 10 if priority == RequestPriority.CRITICAL else 3
-        attempt = 0
+            return cached_result
         
-        while attempt < max_attempts:
-            result = self._process_queue()
-            if result is not None:
-                return result
-            
-            # Wait before retry (shorter wait for critical requests)
-            wait_time = 0.5 if priority == RequestPriority.CRITICAL else 1.0
-            time.sleep(wait_time)
-            attempt += 1
-        
-        # Last resort: try direct execution for critical requests
-        if priority == RequestPriority.CRITICAL:
-            logger.warning(f"⚠️ Critical request {method} failed queue processing, attempting direct execution")
-            try:
-                result = self._execute_request(request)
-                self.stats['total_requests'] += 1
-                return result
-            except Exception as e:
-                logger.error(f"❌ Direct execution failed for critical request: {e}")
-                raise
-        
-        raise Exception(f"Request {method} failed: queue processing timeout after {max_attempts} attempts")
+        future = self.submit(method, *args, priority=priority, **kwargs)
+        try:
+            return future.result(timeout=self.rate_config.queue_timeout_seconds)
+        except FutureTimeoutError:
+            self._cancel(future)
+            raise TimeoutError(
+                f"Request {method} failed: not completed within {self.rate_config.queue_timeout_seconds}s"
+            )
+    
+    def _cancel(self, future: Future):
+        """Withdraw a still-queued request once every caller sharing it gave up waiting."""
+        with self._condition:
+            self.stats['timed_out_requests'] += 1
+            for entry in itertools.chain(self._ready, self._delayed):
+                request = entry[-1]
+                if request.future is future and request.state == 'queued':
+                    request.waiters -= 1
+                    if request.waiters <= 0:
+                        request.state = 'cancelled'
+                        self._release_key(request)
+                        future.cancel()
+                    return
     
     def get_stats(self) -> Dict[str, Any]:
         """Get coordination statistics."""
         cache_hit_rate = 0
         if self.stats['total_requests'] > 0:
-            cache_hit_rate = (self.stats['cache_hits'] / 
+            cache_hit_rate = (self.stats['cache_hits'] /
                             (self.stats['cache_hits'] + self.stats['total_requests'])) * 100
         
-        return {
-            'total_requests': self.stats['total_requests'],
-            'cache_hits': self.stats['cache_hits'],
-            'cache_hit_rate_percent': round(cache_hit_rate, 2),
-            'rate_limits_avoided': self.stats['rate_limits_avoided'],
-            'queued_requests': self.stats['queued_requests'],
-            'queue_length': len(self.request_queue),
-            'cache_entries': len(self.response_cache),
-            'recent_api_calls': len(self.call_timestamps),
-            'rate_limit_cooldown': (
-                self.rate_config.cooldown_seconds - (time.time() - self.last_rate_limit_hit)
-                if self.last_rate_limit_hit else 0
-            )
-        }
+        response_cache_stats = self.response_cache.get_stats()
+        limiter_stats = self.rate_limiter.get_stats() if self.rate_limiter is not None else None
+        with self._condition:
+            now = time.time()
+            while self.call_timestamps and (now - self.call_timestamps[0]) > 60:
+                self.call_timestamps.popleft()
+            queued = len({id(entry[-1]) for entry in self._ready if entry[-1].state == 'queued'})
+            delayed = sum(1 for entry in self._delayed if entry[-1].state == 'queued')
+            started = self.stats['total_requests'] + self.stats['failed_requests']
+            avg_wait = self.stats['total_wait_seconds'] / started if started else 0.0
+            submitted = self.stats['queued_requests'] + self.stats['collapsed_requests']
+            collapse_rate = (self.stats['collapsed_requests'] / submitted * 100) if submitted else 0.0
+            
+            return {
+                'total_requests': self.stats['total_requests'],
+                'cache_hits': self.stats['cache_hits'],
+                'cache_hit_rate_percent': round(cache_hit_rate, 2),
+                'rate_limits_avoided': self.stats['rate_limits_avoided'],
+                'queued_requests': self.stats['queued_requests'],
+                'collapsed_requests': self.stats['collapsed_requests'],
+                'collapse_rate_percent': round(collapse_rate, 2),
+                'in_flight_keys': len(self._pending),
+                'queue_length': queued + delayed,
+                'retry_queue_length': delayed,
+                'in_flight': self._in_flight,
+                'retries_scheduled': self.stats['retries_scheduled'],
+                'failed_requests': self.stats['failed_requests'],
+                'timed_out_requests': self.stats['timed_out_requests'],
+                'starvation_promotions': self.stats['starvation_promotions'],
+                'avg_queue_wait_ms': round(avg_wait * 1000, 2),
+                'max_queue_wait_ms': round(self.stats['max_wait_seconds'] * 1000, 2),
+                'available_tokens': round(self._bucket.tokens, 2),
+                'adaptive_rate_limit': limiter_stats,
+                'dispatcher_running': self._running,
+                'cache_entries': response_cache_stats['entries'],
+                'response_cache': response_cache_stats,
+                'recent_api_calls': len(self.call_timestamps),
+                'rate_limit_cooldown': (
+                    limiter_stats['paused_for_seconds'] if limiter_stats is not None else
+                    max(0, self.rate_config.cooldown_seconds - (now - self.last_rate_limit_hit))
+                    if self.last_rate_limit_hit else 0
+                )
+            }
     
     def clear_cache(self):
         """Clear the response cache."""
@@ -300,4 +630,6 @@ def reset_coordinator():
     """Reset the global coordinator (for testing)."""
     global _coordinator_instance
     with _coordinator_lock:
-        _coordinator_instance = None
\ No newline at end of file
+        if _coordinator_instance is not None:
+            _coordinator_instance.stop(wait=False)
+        _coordinator_instance = None
@@ -3,16 +3,36 @@ Trend Detection Engine - Phase 1A Implementation
 Market Regime Intelligence Framework
 
 Provides multi-timeframe trend analysis for regime-adaptive trading bots.
+
+Each analysis reads two candle series through MarketDataService: one
+fine-grained series (15-minute candles covering the 50-hour moving average
+window) and the daily series. The hourly windows are resampled from the
+fine series in memory instead of being fetched separately.
+
+analyze_trends() scores many pairs at once: each window is stacked into a
+(pairs x time) matrix, left-padded with NaN for pairs with shorter history,
+and momentum, MA alignment, volume confirmation and regime are computed as
+array operations over all rows.
+
+Analyses are cached in two tiers with the same TTL: an in-process LRU (L1)
+and Redis (L2), shared by the API workers, the Celery worker and the
+streaming thread. A short Redis lock per pair makes the computation
+single-flight across processes; the others wait for the lock holder's
+result instead of recomputing it. Bulk analyses lock and compute pairs in
+chunks small enough to finish while those waiters are still waiting.
 """
 
+import json
+import time
+import uuid
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from collections import OrderedDict
 import threading
-from .coinbase_service import coinbase_service
+from .market_data_service import RELEASE_LOCK_SCRIPT, get_market_data_service
 
 logger = logging.getLogger(__name__)
 
@@ -22,11 +42,14 @@ class TrendDetectionEngine:
     Multi-timeframe trend analysis engine for regime detection.
     
     Features:
-    - Multi-timeframe momentum analysis (5min, 1hour, daily)
+    - Multi-timeframe momentum analysis (15min, 1hour, daily)
+    - Two cached series reads per pair (fine + daily); hourly data is resampled
+    - Bulk analysis of many pairs as vectorized matrix operations
     - Moving average trend confirmation  
     - Volume-confirmed trend validation
     - Regime classification with crypto-optimized thresholds
-    - Intelligent caching (5-minute TTL)
+    - Two-tier caching (5-minute TTL): in-process L1, shared Redis L2
+    - Single-flight computation across processes
     """
     
     # Regime classification thresholds (crypto-optimized)
@@ -37,21 +60,65 @@ class TrendDetectionEngine:
         "CHOPPY": -0.4             # Volatile/unclear
     }
     
-    def __init__(self, cache_ttl_seconds: int = 300):  # 5-minute cache
+    # Candle series read per analysis; everything else is derived from these
+    FINE_GRANULARITY = 900         # 15-minute candles
+    HOURLY_GRANULARITY = 3600
+    DAILY_GRANULARITY = 86400
+    SHORT_TERM_SECONDS = 3600      # Short-term momentum window (last hour)
+    MEDIUM_TERM_HOURS = 24
+    VOLUME_HOURS = 24
+    MA_PERIODS = 50                # Longest hourly moving average
+    DAILY_PERIODS = 7
+    
+    TIMEFRAME_WEIGHTS = {
+        'short_term': 0.3,   # 15min data - immediate price action
+        'medium_term': 0.4,  # 1hour data - most important for trading decisions
+        'long_term': 0.3     # Daily data - overall trend context
+    }
+    
+    def __init__(self, cache_ttl_seconds: int = 300, market_data_service=None,
+                 max_cache_size: int = 200, redis_client=None):  # 5-minute cache
         """
         Initialize trend detection engine.
         
         Args:
             cache_ttl_seconds: Cache TTL for trend analysis (default 5 minutes)
+            market_data_service: Cached candle source (defaults to the global MarketDataService)
+            max_cache_size: Number of pairs kept in the in-process L1 cache (LRU eviction)
+            redis_client: Redis client for the shared L2 cache (defaults to the
+                          market data service's client; no L2 if it has none)
         """
+        self._market_data_service = market_data_service
+        self._redis_client = redis_client
         self._cache = OrderedDict()
         self._cache_ttl = cache_ttl_seconds
+        self._max_cache_size = max_cache_size
         self._lock = threading.Lock()
+        
+        # Single-flight across processes: the lock outlives a slow analysis,
+        # and waiters give up (and compute themselves) well before it expires
+        self.lock_ttl_ms = 30000
+        self.single_flight_wait_seconds = 5.0
+        self.single_flight_poll_seconds = 0.05
+        # Pairs locked at once by analyze_trends; a chunk's series reads (a
+        # REST fetch each at worst) must finish inside the waiters' budget
+        self.bulk_lock_chunk_size = 8
+        
         self._stats = {
             'requests': 0,
             'cache_hits': 0,
             'cache_misses': 0,
-            'calculations': 0
+            'l1_hits': 0,
+            'l1_misses': 0,
+            'l2_hits': 0,
+            'l2_misses': 0,
+            'coalesced_requests': 0,
+            'lock_wait_timeouts': 0,
+            'redis_errors': 0,
+            'calculations': 0,
+            'series_reads': 0,
+            'bulk_analyses': 0,
+            'bulk_pairs': 0
         }
         
     def analyze_trend(self, product_id: str) -> Dict[str, Any]:
@@ -81,6 +148,16 @@ class TrendDetectionEngine:
             return cached_result
             
         self._stats['cache_misses'] += 1
+        
+        acquired, lock_token = self._acquire_analysis_lock(product_id)
+        if not acquired:
+            # Another process is already analyzing this pair
+            waited = self._wait_for_analyses([product_id], 0.0)
+            if product_id in waited:
+                self._stats['coalesced_requests'] += 1
+                return waited[product_id]
+            self._stats['lock_wait_timeouts'] += 1
+        
         logger.info(f"🔍 Calculating trend analysis for {product_id}")
         
         try:
@@ -96,21 +173,325 @@ class TrendDetectionEngine:
         except Exception as e:
             logger.error(f"Error analyzing trend for {product_id}: {e}")
             return self._get_default_trend_result(product_id, str(e))
+        finally:
+            if lock_token is not None:
+                self._release_analysis_lock(product_id, lock_token)
+    
+    def analyze_trends(self, product_ids: List[str], refresh: bool = False) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze trend strength and regime for many pairs in one pass.
+        
+        Cached analyses are reused (unless refresh); the rest are computed
+        together as matrix operations and cached. Pairs another process is
+        already analyzing are waited for rather than recomputed. Results have
+        the same shape as analyze_trend's.
+        
+        Args:
+            product_ids: Trading pairs to analyze
+            refresh: Recompute even pairs with a valid cached analysis
+            
+        Returns:
+            Dict of product_id -> trend analysis, in request order
+        """
+        product_ids = list(dict.fromkeys(product_ids))
+        results: Dict[str, Dict[str, Any]] = {}
+        to_compute = []
+        started_at = time.time()
+        
+        with self._lock:
+            self._stats['requests'] += len(product_ids)
+        cached = {} if refresh else self._get_cached_analyses([f"trend_{p}" for p in product_ids])
+        for product_id in product_ids:
+            cached_result = cached.get(f"trend_{product_id}")
+            if cached_result:
+                results[product_id] = cached_result
+            else:
+                to_compute.append(product_id)
+        with self._lock:
+            self._stats['cache_hits'] += len(product_ids) - len(to_compute)
+            self._stats['cache_misses'] += len(to_compute)
+        
+        # Lock one chunk at a time: locking every pair up front would leave
+        # waiters on the last pairs timing out while the first ones load
+        held = []
+        for start in range(0, len(to_compute), self.bulk_lock_chunk_size):
+            owned, lock_tokens = [], {}
+            for product_id in to_compute[start:start + self.bulk_lock_chunk_size]:
+                acquired, lock_token = self._acquire_analysis_lock(product_id)
+                (owned if acquired else held).append(product_id)
+                if lock_token is not None:
+                    lock_tokens[product_id] = lock_token
+            try:
+                results.update(self._analyze_and_cache(owned))
+            finally:
+                for product_id, lock_token in lock_tokens.items():
+                    self._release_analysis_lock(product_id, lock_token)
+        
+        if held:
+            # Other processes are analyzing these; take their results
+            waited = self._wait_for_analyses(held, started_at if refresh else 0.0)
+            results.update(waited)
+            late = [product_id for product_id in held if product_id not in waited]
+            with self._lock:
+                self._stats['coalesced_requests'] += len(waited)
+                self._stats['lock_wait_timeouts'] += len(late)
+            results.update(self._analyze_and_cache(late))
+        
+        return {product_id: results[product_id] for product_id in product_ids}
+    
+    def _analyze_and_cache(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Compute and cache the analyses of many pairs in one pass."""
+        if not product_ids:
+            return {}
+        
+        logger.info(f"🔍 Calculating trend analysis for {len(product_ids)} pairs in one pass")
+        results = {}
+        series = {}
+        for product_id in product_ids:
+            try:
+                series[product_id] = self._load_series(product_id)
+            except Exception as e:
+                logger.error(f"Error loading series for {product_id}: {e}")
+                results[product_id] = self._get_default_trend_result(product_id, str(e))
+        
+        computed = self._calculate_trend_analyses(series) if series else {}
+        for product_id, result in computed.items():
+            self._cache_analysis(f"trend_{product_id}", result)
+            results[product_id] = result
+        with self._lock:
+            self._stats['calculations'] += len(computed)
+            self._stats['bulk_analyses'] += 1
+            self._stats['bulk_pairs'] += len(computed)
+        return results
+    
+    @staticmethod
+    def _stack_tail(frames: List[Optional[pd.DataFrame]], column: str, periods: int) -> np.ndarray:
+        """
+        Stack the last `periods` values of a column into a (pairs x periods)
+        matrix, right-aligned and left-padded with NaN for shorter series.
+        """
+        matrix = np.full((len(frames), periods), np.nan)
+        for row, frame in enumerate(frames):
+            if frame is None or frame.empty or column not in frame:
+                continue
+            values = frame[column].to_numpy(dtype=float)[-periods:]
+            if len(values):
+                matrix[row, periods - len(values):] = values
+        return matrix
+    
+    @staticmethod
+    def _first_valid(matrix: np.ndarray) -> np.ndarray:
+        """First non-NaN value of each row (rows are left-padded)."""
+        counts = np.sum(~np.isnan(matrix), axis=1)
+        start = np.clip(matrix.shape[1] - counts, 0, matrix.shape[1] - 1)
+        return matrix[np.arange(matrix.shape[0]), start]
+    
+    def _window_momentum(self, closes: np.ndarray) -> Dict[str, np.ndarray]:
+        """Momentum, price change and volatility of every row of a close matrix."""
+        counts = np.sum(~np.isnan(closes), axis=1)
+        first = self._first_valid(closes)
+        last = closes[:, -1]
+        valid = (counts >= 3) & (first > 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.where(valid, (last - first) / first, 0.0)
+            returns = closes[:, 1:] / closes[:, :-1] - 1
+            return_counts = np.sum(~np.isnan(returns), axis=1)
+            means = np.nansum(returns, axis=1) / np.maximum(return_counts, 1)
+            squares = np.nansum((returns - means[:, None]) ** 2, axis=1)
+            volatility = np.sqrt(squares / np.maximum(return_counts - 1, 1)) * 100
+        return {
+            'enough': counts >= 3,
+            'data_points': counts,
+            'momentum': np.where(valid, np.tanh(change * 10), 0.0),
+            'price_change_pct': change * 100,
+            'volatility': np.where(return_counts > 1, volatility, 0.0)
+        }
+    
+    def _calculate_trend_analyses(self, series: Dict[str, Tuple[pd.DataFrame, pd.DataFrame]]) -> Dict[str, Dict[str, Any]]:
+        """Vectorized _calculate_trend_analysis over many pairs."""
+        pairs = list(series)
+        fines = [series[pair][0] for pair in pairs]
+        dailies = [series[pair][1] for pair in pairs]
+        hourlies = [self._resample_hourly(fine) for fine in fines]
+        
+        # 1. Multi-timeframe momentum: one (pairs x time) matrix per window
+        short_periods = self.SHORT_TERM_SECONDS // self.FINE_GRANULARITY + 1
+        windows = {
+            'short_term': ('15min', self._stack_tail(fines, 'close', short_periods)),
+            'medium_term': ('1hour', self._stack_tail(hourlies, 'close', self.MEDIUM_TERM_HOURS)),
+            'long_term': ('daily', self._stack_tail(dailies, 'close', self.DAILY_PERIODS))
+        }
+        momentum = {name: self._window_momentum(closes) for name, (_, closes) in windows.items()}
+        
+        # 2. Composite trend strength over the windows with enough data
+        weighted_sum = np.zeros(len(pairs))
+        total_weight = np.zeros(len(pairs))
+        for name, weight in self.TIMEFRAME_WEIGHTS.items():
+            enough = momentum[name]['enough']
+            weighted_sum += np.where(enough, momentum[name]['momentum'] * weight, 0.0)
+            total_weight += np.where(enough, weight, 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend_strength = np.clip(np.where(total_weight > 0, weighted_sum / total_weight, 0.0), -1.0, 1.0)
+        
+        # 3. Moving average alignment on the last MA_PERIODS hourly closes
+        closes = self._stack_tail(hourlies, 'close', self.MA_PERIODS)
+        full = ~np.isnan(closes).any(axis=1)
+        price = closes[:, -1]
+        ma5 = closes[:, -5:].mean(axis=1)
+        ma20 = closes[:, -20:].mean(axis=1)
+        ma50 = closes.mean(axis=1)
+        ma_alignment = np.select(
+            [full & (price > ma5) & (ma5 > ma20) & (ma20 > ma50),
+             full & (price < ma5) & (ma5 < ma20) & (ma20 < ma50),
+             full & (price > ma20) & (ma5 > ma20),
+             full & (price < ma20) & (ma5 < ma20)],
+            ['BULLISH', 'BEARISH', 'BULLISH', 'BEARISH'],
+            default='NEUTRAL'
+        )
+        
+        # 4. Volume confirmation: last 6 hours against the first 6 of the window
+        volumes = self._stack_tail(hourlies, 'volume', self.VOLUME_HOURS)
+        counts = np.sum(~np.isnan(volumes), axis=1)
+        start = np.clip(self.VOLUME_HOURS - counts, 0, self.VOLUME_HOURS - 6)
+        older = np.take_along_axis(volumes, start[:, None] + np.arange(6), axis=1).mean(axis=1)
+        recent = volumes[:, -6:].mean(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_change = (recent - older) / older
+        strength = np.abs(trend_strength)
+        volume_confirmation = (counts >= 12) & (older > 0) & np.select(
+            [strength > 0.3, strength > 0.1],
+            [volume_change > 0.1, volume_change > -0.2],
+            default=True
+        )
+        
+        # 5. Confidence from timeframe agreement, MA and volume
+        momentums = np.stack([momentum[name]['momentum'] for name in windows], axis=1)
+        enough = np.stack([momentum[name]['enough'] for name in windows], axis=1)
+        valid_timeframes = enough.sum(axis=1)
+        positive = (enough & (momentums > 0.1)).sum(axis=1)
+        negative = (enough & (momentums < -0.1)).sum(axis=1)
+        agreement = np.where((positive >= 2) | (negative >= 2), 0.3,
+                             np.where(positive + negative < valid_timeframes, 0.1, 0.0))
+        confidence = 0.5 + np.where(valid_timeframes >= 2, agreement, 0.0)
+        confidence += np.where(ma_alignment == 'NEUTRAL', 0.05, 0.15)
+        confidence += np.where(volume_confirmation, 0.05, 0.0)
+        confidence = np.clip(confidence, 0.0, 1.0)
+        
+        # 6. Regime classification
+        weighted_strength = strength * confidence
+        regime = np.select(
+            [weighted_strength >= self.REGIME_THRESHOLDS["STRONG_TRENDING"],
+             weighted_strength >= self.REGIME_THRESHOLDS["TRENDING"],
+             weighted_strength >= abs(self.REGIME_THRESHOLDS["RANGING"])],
+            ['STRONG_TRENDING', 'TRENDING', 'RANGING'],
+            default='CHOPPY'
+        )
+        
+        timestamp = datetime.utcnow().isoformat()
+        results = {}
+        for row, pair in enumerate(pairs):
+            timeframe_analysis = {}
+            for name, (timeframe_name, _) in windows.items():
+                window = momentum[name]
+                if window['enough'][row]:
+                    timeframe_analysis[name] = {
+                        'momentum': float(window['momentum'][row]),
+                        'data_points': int(window['data_points'][row]),
+                        'timeframe_name': timeframe_name,
+                        'price_change_pct': float(window['price_change_pct'][row]),
+                        'volatility': float(window['volatility'][row])
+                    }
+                else:
+                    timeframe_analysis[name] = {
+                        'momentum': 0.0,
+                        'data_points': 0,
+                        'timeframe_name': timeframe_name,
+                        'price_change_pct': 0.0,
+                        'volatility': 0.0,
+                        'error': 'insufficient_data'
+                    }
+            results[pair] = {
+                'product_id': pair,
+                'trend_strength': float(trend_strength[row]),
+                'confidence': float(confidence[row]),
+                'regime': str(regime[row]),
+                'timeframe_analysis': timeframe_analysis,
+                'volume_confirmation': bool(volume_confirmation[row]),
+                'moving_average_alignment': str(ma_alignment[row]),
+                'analysis_timestamp': timestamp,
+                'cache_ttl_seconds': int(self._cache_ttl)
+            }
+        
+        logger.info(f"✅ Bulk trend analysis complete for {len(pairs)} pairs")
+        return results
+    
+    def _get_market_data_service(self):
+        if self._market_data_service is None:
+            self._market_data_service = get_market_data_service()
+        return self._market_data_service
+    
+    @classmethod
+    def fine_periods(cls) -> int:
+        """Fine candles needed for MA_PERIODS complete hours plus the current one."""
+        per_hour = cls.HOURLY_GRANULARITY // cls.FINE_GRANULARITY
+        return (cls.MA_PERIODS + 2) * per_hour
+    
+    def _load_series(self, product_id: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Read the fine and daily series for a pair (two cached reads)."""
+        market_data = self._get_market_data_service()
+        fine = market_data.get_historical_data(
+            product_id=product_id,
+            granularity=self.FINE_GRANULARITY,
+            limit=self.fine_periods(),
+            require_volume=True   # Volume confirmation reads the hourly volumes
+        )
+        daily = market_data.get_historical_data(
+            product_id=product_id,
+            granularity=self.DAILY_GRANULARITY,
+            limit=self.DAILY_PERIODS
+        )
+        with self._lock:
+            self._stats['series_reads'] += 2
+        return fine, daily
+    
+    def _resample_hourly(self, fine: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aggregate fine candles into hourly OHLCV candles.
+        
+        A leading hour with missing fine candles (the series starts mid-hour)
+        is dropped; the trailing, in-progress hour is kept, as the exchange's
+        own hourly series does.
+        """
+        if fine is None or fine.empty:
+            return pd.DataFrame(columns=['open', 'high', 'low', 'close', 'volume'])
+        fine = fine.sort_index()
+        grouped = fine.resample(f"{self.HOURLY_GRANULARITY}s", label='left', closed='left')
+        hourly = grouped.agg({'open': 'first', 'high': 'max', 'low': 'min',
+                              'close': 'last', 'volume': 'sum'})
+        counts = grouped['close'].count()
+        hourly = hourly[counts > 0]
+        per_hour = self.HOURLY_GRANULARITY // self.FINE_GRANULARITY
+        if len(hourly) > 1 and counts[hourly.index[0]] < per_hour:
+            hourly = hourly.iloc[1:]
+        return hourly
     
     def _calculate_trend_analysis(self, product_id: str) -> Dict[str, Any]:
         """Calculate comprehensive trend analysis."""
         
+        fine, daily = self._load_series(product_id)
+        hourly = self._resample_hourly(fine)
+        
         # 1. Multi-timeframe momentum analysis
-        timeframe_analysis = self._analyze_multi_timeframe_momentum(product_id)
+        timeframe_analysis = self._analyze_multi_timeframe_momentum(product_id, fine, hourly, daily)
         
         # 2. Calculate composite trend strength
         trend_strength = self._calculate_composite_trend_strength(timeframe_analysis)
         
         # 3. Moving average confirmation
-        ma_alignment = self._analyze_moving_average_alignment(product_id)
+        ma_alignment = self._analyze_moving_average_alignment(product_id, hourly)
         
         # 4. Volume confirmation
-        volume_confirmation = self._analyze_volume_confirmation(product_id, trend_strength)
+        volume_confirmation = self._analyze_volume_confirmation(product_id, trend_strength, hourly)
         
         # 5. Calculate confidence based on alignment
         confidence = self._calculate_trend_confidence(
@@ -137,25 +518,27 @@ class TrendDetectionEngine:
         
         return result
     
-    def _analyze_multi_timeframe_momentum(self, product_id: str) -> Dict[str, Any]:
+    def _analyze_multi_timeframe_momentum(self, product_id: str, fine: pd.DataFrame,
+                                          hourly: pd.DataFrame, daily: pd.DataFrame) -> Dict[str, Any]:
         """Analyze momentum across multiple timeframes."""
         
+        # The short-term window includes the candle before the last hour, so the
+        # change is measured over the whole hour
+        short_periods = self.SHORT_TERM_SECONDS // self.FINE_GRANULARITY + 1
         timeframes = {
-            'short_term': {'granularity': 300, 'periods': 12, 'name': '5min'},    # 1 hour of 5min candles
-            'medium_term': {'granularity': 3600, 'periods': 24, 'name': '1hour'}, # 1 day of hourly candles  
-            'long_term': {'granularity': 86400, 'periods': 7, 'name': 'daily'}    # 1 week of daily candles
+            'short_term': {'data': fine, 'periods': short_periods, 'name': '15min'},           # Last hour of 15min candles
+            'medium_term': {'data': hourly, 'periods': self.MEDIUM_TERM_HOURS, 'name': '1hour'}, # 1 day of hourly candles
+            'long_term': {'data': daily, 'periods': self.DAILY_PERIODS, 'name': 'daily'}       # 1 week of daily candles
         }
         
         analysis = {}
         
         for timeframe, config in timeframes.items():
             try:
-                # Get market data for this timeframe
-                data = coinbase_service.get_historical_data(
-                    product_id=product_id,
-                    granularity=config['granularity'],
-                    limit=config['periods']
-                )
+                data = config['data']
+                if data is None:
+                    data = pd.DataFrame()
+                data = data.sort_index().tail(config['periods'])
                 
                 if data.empty or len(data) < 3:
                     logger.warning(f"Insufficient data for {product_id} {timeframe}")
@@ -246,11 +629,7 @@ class TrendDetectionEngine:
         """Calculate weighted composite trend strength from multiple timeframes."""
         
         # Timeframe weights (based on crypto market characteristics)
-        weights = {
-            'short_term': 0.3,   # 5min data - immediate price action
-            'medium_term': 0.4,  # 1hour data - most important for trading decisions
-            'long_term': 0.3     # Daily data - overall trend context
-        }
+        weights = self.TIMEFRAME_WEIGHTS
         
         weighted_sum = 0.0
         total_weight = 0.0
@@ -272,22 +651,17 @@ class TrendDetectionEngine:
         # Ensure result is in expected range
         return max(-1.0, min(1.0, composite_strength))
     
-    def _analyze_moving_average_alignment(self, product_id: str) -> str:
+    def _analyze_moving_average_alignment(self, product_id: str, hourly: pd.DataFrame) -> str:
         """Analyze moving average alignment for trend confirmation."""
         
         try:
-            # Get hourly data for MA analysis
-            data = coinbase_service.get_historical_data(
-                product_id=product_id,
-                granularity=3600,  # 1 hour
-                limit=50           # Need enough data for 50-period MA
-            )
+            # Hourly data for MA analysis (needs enough for the 50-period MA)
+            data = hourly.sort_index().tail(self.MA_PERIODS).copy()
             
-            if data.empty or len(data) < 50:
+            if data.empty or len(data) < self.MA_PERIODS:
                 return "NEUTRAL"  # Not enough data
                 
             # Calculate moving averages
-            data = data.sort_index()  # Ensure chronological order
             data['MA5'] = data['close'].rolling(window=5).mean()
             data['MA20'] = data['close'].rolling(window=20).mean() 
             data['MA50'] = data['close'].rolling(window=50).mean()
@@ -319,16 +693,13 @@ class TrendDetectionEngine:
             logger.error(f"Error analyzing MA alignment for {product_id}: {e}")
             return "NEUTRAL"
     
-    def _analyze_volume_confirmation(self, product_id: str, trend_strength: float) -> bool:
+    def _analyze_volume_confirmation(self, product_id: str, trend_strength: float,
+                                     hourly: pd.DataFrame) -> bool:
         """Analyze if volume confirms the trend."""
         
         try:
-            # Get recent hourly data with volume
-            data = coinbase_service.get_historical_data(
-                product_id=product_id,
-                granularity=3600,  # 1 hour
-                limit=24           # 24 hours
-            )
+            # Recent hourly data with volume (24 hours)
+            data = hourly.sort_index().tail(self.VOLUME_HOURS)
             
             if data.empty or len(data) < 12:
                 return False  # Not enough data
@@ -409,33 +780,164 @@ class TrendDetectionEngine:
             return "CHOPPY"
     
     def _get_cached_analysis(self, cache_key: str) -> Optional[Dict[str, Any]]:
-        """Get cached trend analysis if still valid."""
+        """Get cached trend analysis if still valid, from L1 or else L2."""
+        return self._get_cached_analyses([cache_key]).get(cache_key)
+    
+    def _get_cached_analyses(self, cache_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the still-valid cached analyses of many keys: L1, then one L2 read for the rest."""
+        results = {}
+        misses = []
         with self._lock:
-            if cache_key in self._cache:
-                cached_data, timestamp = self._cache[cache_key]
-                age_seconds = (datetime.utcnow() - timestamp).total_seconds()
-                
-                if age_seconds < self._cache_ttl:
-                    # Move to end for LRU
-                    self._cache.move_to_end(cache_key)
-                    return cached_data
-                else:
+            for cache_key in cache_keys:
+                if cache_key in self._cache:
+                    cached_data, timestamp = self._cache[cache_key]
+                    age_seconds = (datetime.utcnow() - timestamp).total_seconds()
+                    
+                    if age_seconds < self._cache_ttl:
+                        # Move to end for LRU
+                        self._cache.move_to_end(cache_key)
+                        results[cache_key] = cached_data
+                        continue
                     # Expired, remove from cache
                     del self._cache[cache_key]
+                misses.append(cache_key)
+            self._stats['l1_hits'] += len(results)
+            self._stats['l1_misses'] += len(misses)
         
-        return None
+        if not misses:
+            return results
+        shared = self._load_shared_analyses(misses)
+        with self._lock:
+            self._stats['l2_hits'] += len(shared)
+            self._stats['l2_misses'] += len(misses) - len(shared)
+        for cache_key, (result, cached_at) in shared.items():
+            self._store_local(cache_key, result, cached_at)
+            results[cache_key] = result
+        return results
     
     def _cache_analysis(self, cache_key: str, result: Dict[str, Any]):
-        """Cache trend analysis result."""
+        """Cache trend analysis result in both tiers."""
+        cached_at = time.time()
+        self._store_local(cache_key, result, cached_at)
+        
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return
+        try:
+            redis_client.setex(
+                self._shared_key(cache_key),
+                int(self._cache_ttl),
+                json.dumps({'result': result, 'cached_at': cached_at})
+            )
+        except Exception as e:
+            self._redis_error(f"Trend cache write error for {cache_key}: {e}")
+    
+    def _store_local(self, cache_key: str, result: Dict[str, Any], cached_at: float):
+        """Put an analysis in L1; it expires when its L2 copy does."""
         with self._lock:
-            self._cache[cache_key] = (result, datetime.utcnow())
+            self._cache[cache_key] = (result, datetime.utcfromtimestamp(cached_at))
+            self._cache.move_to_end(cache_key)
             
             # LRU eviction (keep cache size reasonable)
-            max_cache_size = 50  # Cache up to 50 products
-            while len(self._cache) > max_cache_size:
+            while len(self._cache) > self._max_cache_size:
                 oldest_key = next(iter(self._cache))
                 del self._cache[oldest_key]
     
+    def _get_redis_client(self):
+        if self._redis_client is None:
+            self._redis_client = getattr(self._get_market_data_service(), 'redis_client', None)
+        return self._redis_client
+    
+    @staticmethod
+    def _shared_key(cache_key: str) -> str:
+        return f"trend_analysis:{cache_key}"
+    
+    def _redis_error(self, message: str):
+        with self._lock:
+            self._stats['redis_errors'] += 1
+        logger.warning(message)
+    
+    def _load_shared_analyses(self, cache_keys: List[str]) -> Dict[str, Tuple[Dict[str, Any], float]]:
+        """
+        Read analyses from L2 in one round trip.
+        
+        Returns:
+            Dict of cache_key -> (result, cached_at); missing, expired and
+            unreadable entries are omitted
+        """
+        redis_client = self._get_redis_client()
+        if redis_client is None or not cache_keys:
+            return {}
+        try:
+            payloads = redis_client.mget([self._shared_key(cache_key) for cache_key in cache_keys])
+        except Exception as e:
+            self._redis_error(f"Trend cache read error for {len(cache_keys)} analyses: {e}")
+            return {}
+        
+        now = time.time()
+        analyses = {}
+        for cache_key, payload in zip(cache_keys, payloads):
+            if payload is None:
+                continue
+            try:
+                cached = json.loads(payload)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Discarding unreadable trend cache entry {cache_key}: {e}")
+                continue
+            # Redis expiry is whole seconds; keep the TTL as exact as L1's
+            if now - cached['cached_at'] < self._cache_ttl:
+                analyses[cache_key] = (cached['result'], cached['cached_at'])
+        return analyses
+    
+    def _acquire_analysis_lock(self, product_id: str):
+        """
+        Try to take the pair's analysis lock.
+        
+        Returns:
+            (acquired, token): acquired is False if another process holds the
+            lock; token is None when no lock was taken (nothing to release)
+        """
+        redis_client = self._get_redis_client()
+        if redis_client is None:
+            return True, None
+        token = uuid.uuid4().hex
+        try:
+            acquired = redis_client.set(
+                self._shared_key(f"lock:{product_id}"),
+                token,
+                nx=True,
+                px=self.lock_ttl_ms
+            )
+        except Exception as e:
+            self._redis_error(f"Trend lock error for {product_id}: {e}")
+            return True, None
+        return (True, token) if acquired else (False, None)
+    
+    def _release_analysis_lock(self, product_id: str, token: str):
+        """Release the analysis lock if we still own it (it may have expired and been retaken)."""
+        lock_key = self._shared_key(f"lock:{product_id}")
+        try:
+            self._redis_client.eval(RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+        except Exception as e:
+            self._redis_error(f"Trend lock release error for {product_id}: {e}")
+    
+    def _wait_for_analyses(self, product_ids: List[str], cached_after: float) -> Dict[str, Dict[str, Any]]:
+        """Poll L2 for analyses the lock holders write, up to single_flight_wait_seconds."""
+        results = {}
+        pending = list(product_ids)
+        deadline = time.monotonic() + self.single_flight_wait_seconds
+        while pending and time.monotonic() < deadline:
+            time.sleep(self.single_flight_poll_seconds)
+            shared = self._load_shared_analyses([f"trend_{product_id}" for product_id in pending])
+            for product_id in list(pending):
+                cache_key = f"trend_{product_id}"
+                cached = shared.get(cache_key)
+                if cached is not None and cached[1] >= cached_after:
+                    results[product_id] = cached[0]
+                    self._store_local(cache_key, *cached)
+                    pending.remove(product_id)
+        return results
+    
     def _get_default_trend_result(self, product_id: str, error_msg: str) -> Dict[str, Any]:
         """Return default result when analysis fails."""
         return {
@@ -454,23 +956,53 @@ class TrendDetectionEngine:
         """Get trend detection engine statistics."""
         with self._lock:
             cache_hit_rate = (self._stats['cache_hits'] / max(self._stats['requests'], 1)) * 100
+            l1_lookups = self._stats['l1_hits'] + self._stats['l1_misses']
+            l2_lookups = self._stats['l2_hits'] + self._stats['l2_misses']
+            l1_hit_rate = (self._stats['l1_hits'] / l1_lookups * 100) if l1_lookups > 0 else 0
+            l2_hit_rate = (self._stats['l2_hits'] / l2_lookups * 100) if l2_lookups > 0 else 0
             
             return {
                 'requests': self._stats['requests'],
                 'cache_hits': self._stats['cache_hits'],
                 'cache_misses': self._stats['cache_misses'],
                 'cache_hit_rate': round(cache_hit_rate, 1),
+                'l1_hits': self._stats['l1_hits'],
+                'l1_hit_rate': round(l1_hit_rate, 1),
+                'l2_hits': self._stats['l2_hits'],
+                'l2_hit_rate': round(l2_hit_rate, 1),
+                'l2_enabled': self._redis_client is not None,
+                'coalesced_requests': self._stats['coalesced_requests'],
+                'lock_wait_timeouts': self._stats['lock_wait_timeouts'],
+                'redis_errors': self._stats['redis_errors'],
                 'calculations': self._stats['calculations'],
+                'series_reads': self._stats['series_reads'],
+                'bulk_analyses': self._stats['bulk_analyses'],
+                'bulk_pairs': self._stats['bulk_pairs'],
                 'cached_products': len(self._cache),
                 'cache_ttl_seconds': self._cache_ttl
             }
     
     def clear_cache(self) -> int:
-        """Clear trend detection cache."""
+        """Clear trend detection cache (L1 and the shared L2)."""
         with self._lock:
             cleared_count = len(self._cache)
             self._cache.clear()
-            return cleared_count
+        
+        redis_client = self._get_redis_client()
+        if redis_client is not None:
+            try:
+                # SCAN in batches: KEYS would block the shared Redis while it walks every key
+                batch = []
+                for key in redis_client.scan_iter(match=self._shared_key("trend_*"), count=500):
+                    batch.append(key)
+                    if len(batch) >= 500:
+                        redis_client.delete(*batch)
+                        batch = []
+                if batch:
+                    redis_client.delete(*batch)
+            except Exception as e:
+                self._redis_error(f"Trend cache clear error: {e}")
+        return cleared_count
 
 
 # Global trend detection engine instance
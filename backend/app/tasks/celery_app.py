@@ -22,11 +22,17 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     beat_schedule={
-        # PHASE 7: Market Data Service - TEMPORARILY DISABLED to prevent rate limiting
-        # "market-data-refresh": {
-        #     "task": "app.tasks.market_data_tasks.refresh_all_market_data",
-        #     "schedule": 120.0,  # Every 2 minutes - DISABLED due to 41 API calls per run
-        # },
+        # PHASE 7: Market Data Service - batched refresh costs 2 API calls per run
+        "market-data-refresh": {
+            "task": "app.tasks.market_data_tasks.refresh_all_market_data",
+            "schedule": 120.0,  # Every 2 minutes
+        },
+        # Regimes for every RUNNING pair, refreshed inside the trend cache TTL (300s)
+        # so evaluation cycles always hit the cache
+        "regime-precompute": {
+            "task": "app.tasks.market_data_tasks.precompute_regimes",
+            "schedule": 240.0,  # Every 4 minutes
+        },
         # "products-list-refresh": {
         #     "task": "app.tasks.market_data_tasks.refresh_products_list",
         #     "schedule": 300.0,  # Every 5 minutes - DISABLED (products change rarely)
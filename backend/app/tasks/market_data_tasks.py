@@ -93,6 +93,58 @@ def refresh_all_market_data(product_ids: List[str] = None) -> Dict[str, Any]:
         }
 
 
+@celery_app.task(name="app.tasks.market_data_tasks.precompute_regimes")
+def precompute_regimes(product_ids: List[str] = None) -> Dict[str, Any]:
+    """
+    Celery task to precompute trend regimes for every active trading pair.
+    
+    Runs ahead of the evaluation cycle (more often than the trend cache TTL)
+    so the trading path's regime lookups are cache hits. All pairs are
+    analyzed in one vectorized pass.
+    
+    Args:
+        product_ids: Optional list of specific products to analyze.
+                    If None, analyzes all RUNNING bot pairs.
+    
+    Returns:
+        Dict with per-pair regimes and task metadata.
+    """
+    try:
+        from ..services.trend_detection_engine import get_trend_engine
+        
+        if product_ids is None:
+            db = SessionLocal()
+            try:
+                from ..models.models import Bot
+                active_bots = db.query(Bot).filter(Bot.status == 'RUNNING').all()
+                product_ids = sorted(set(bot.pair for bot in active_bots if bot.pair))
+            finally:
+                db.close()
+        
+        results = get_trend_engine().analyze_trends(product_ids, refresh=True) if product_ids else {}
+        failed = [pair for pair, result in results.items() if 'error' in result]
+        
+        logger.info(f"🧭 Precomputed regimes for {len(results) - len(failed)}/{len(results)} pairs")
+        
+        return {
+            'success': True,
+            'pairs_analyzed': len(results),
+            'failed_pairs': failed,
+            'regimes': {pair: result.get('regime') for pair, result in results.items()},
+            'task_name': 'precompute_regimes',
+            'completed_at': datetime.now(timezone.utc).isoformat()
+        }
+        
+    except Exception as e:
+        logger.error(f"❌ Regime precompute task failed: {e}")
+        return {
+            'success': False,
+            'error': str(e),
+            'task_name': 'precompute_regimes',
+            'completed_at': datetime.now(timezone.utc).isoformat()
+        }
+
+
 @celery_app.task(name="app.tasks.market_data_tasks.refresh_products_list")
 def refresh_products_list() -> Dict[str, Any]:
     """
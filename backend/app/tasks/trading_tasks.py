@@ -5,6 +5,8 @@ from ..core.database import SessionLocal
 from ..models.models import Bot, MarketData
 from ..services.sync_coordinated_coinbase_service import get_coordinated_coinbase_service
 from ..services.sync_api_coordinator import RequestPriority
+from ..services.evaluation_write_sink import EvaluationWriteSink
+from ..services.regime_snapshot import RegimeSnapshot, publish_regime_snapshot
 from .celery_app import celery_app
 
 logger = logging.getLogger(__name__)
@@ -37,43 +39,45 @@ def evaluate_bot_signals(enable_automatic_trading: bool = False):
                     "message": "No running bots found for evaluation"
                 }
             
-            # Initialize evaluator with confirmation disabled for automated trading
-            evaluator = BotSignalEvaluator(db, enable_confirmation=False)
+            # Initialize evaluator with confirmation disabled for automated trading;
+            # all evaluation writes are collected and committed once per cycle
+            write_sink = EvaluationWriteSink(db)
+            evaluator = BotSignalEvaluator(db, enable_confirmation=False, write_sink=write_sink)
             evaluation_results = []
             
-            # Cache for market data to avoid duplicate API calls
+            # PHASE 7: Use centralized Market Data Service (eliminates rate limiting)
+            from ..services.market_data_service import get_market_data_service
+            market_service = get_market_data_service()
+            
+            # One cached fetch per pair, shared by every bot trading it
             market_data_cache = {}
+            for pair in set(bot.pair for bot in active_bots):
+                try:
+                    logger.info(f"📊 Getting cached market data for {pair} from Phase 7 service")
+                    market_data = market_service.get_historical_data(pair, 3600, 30)
+                except Exception as e:
+                    logger.warning(f"Failed to get cached market data for {pair}: {e}")
+                    continue
+                if market_data.empty:
+                    logger.warning(f"No market data available for {pair}, skipping its bots")
+                    continue
+                market_data_cache[pair] = market_data
+            
+            # Evaluate all bots in one batch (includes automatic trading if enabled);
+            # each pair's regime is analyzed once for the whole cycle
+            regime_snapshot = RegimeSnapshot()
+            batch_results = evaluator.evaluate_bots_batch(active_bots, market_data_cache, regime_snapshot)
+            publish_regime_snapshot(regime_snapshot)
             
             for i, bot in enumerate(active_bots):
                 try:
-                    logger.info(f"Evaluating bot {bot.id} ({bot.name}) - {i+1}/{len(active_bots)}")
-                    
-                    # PHASE 7: Use centralized Market Data Service (eliminates rate limiting)
-                    from ..services.market_data_service import get_market_data_service
-                    market_service = get_market_data_service()
-                    
-                    # Get market data from Phase 7 service (always cached, no API calls)
-                    logger.info(f"� Getting cached market data for {bot.pair} from Phase 7 service")
-                    market_data = market_service.get_candles(bot.pair, granularity='ONE_HOUR', limit=30)
-                    
-                    # Update legacy cache for backward compatibility
-                    market_data_cache[bot.pair] = market_data
-                    
-                    if market_data.empty:
-                        logger.warning(f"No market data available for {bot.pair}, skipping bot {bot.id}")
+                    if bot.pair not in market_data_cache:
                         continue
                     
-                    # Evaluate bot (includes automatic trading if enabled)
-                    result = evaluator.evaluate_bot(bot, market_data)
-                    
-                    # Update bot's current_combined_score in database for UI display
-                    try:
-                        bot.current_combined_score = result.get("overall_score", 0.0)
-                        db.commit()
-                        logger.debug(f"✅ Updated bot {bot.id} current_combined_score: {bot.current_combined_score:.6f}")
-                    except Exception as update_error:
-                        db.rollback()
-                        logger.error(f"Failed to update current_combined_score for bot {bot.id}: {update_error}")
+                    logger.info(f"Recording evaluation for bot {bot.id} ({bot.name}) - {i+1}/{len(active_bots)}")
+                    result = batch_results.get(bot.id)
+                    if result is None:
+                        raise ValueError("batch evaluation failed")
                     
                     # Store evaluation results back to the bot for UI display
                     try:
@@ -89,9 +93,12 @@ def evaluate_bot_signals(enable_automatic_trading: bool = False):
                             "market_context": result.get("market_context")
                         }
                         
-                        bot.evaluation_metadata = json.dumps(evaluation_data)
-                        db.commit()
-                        logger.info(f"💾 Stored evaluation results for bot {bot.id}")
+                        write_sink.update_bot(
+                            bot,
+                            current_combined_score=result.get("overall_score", 0.0),
+                            evaluation_metadata=json.dumps(evaluation_data)
+                        )
+                        logger.info(f"💾 Queued evaluation results for bot {bot.id}")
                         
                     except Exception as store_error:
                         logger.error(f"Failed to store evaluation results for bot {bot.id}: {store_error}")
@@ -113,6 +120,10 @@ def evaluate_bot_signals(enable_automatic_trading: bool = False):
                         "error": str(e)
                     })
             
+            # One transaction for scores, metadata, history and signal predictions
+            written = write_sink.flush()
+            logger.info(f"💾 Flushed evaluation writes: {written}")
+            
             return {
                 "status": "evaluation_complete", 
                 "running_bots": len(active_bots),
@@ -147,8 +158,10 @@ def fast_trading_evaluation():
             if not active_bots:
                 return {"status": "no_active_bots", "running_bots": 0}
             
-            # Initialize evaluator with confirmation disabled for automated trading
-            evaluator = BotSignalEvaluator(db, enable_confirmation=False)
+            # Initialize evaluator with confirmation disabled for automated trading;
+            # all evaluation writes are collected and committed once per cycle
+            write_sink = EvaluationWriteSink(db)
+            evaluator = BotSignalEvaluator(db, enable_confirmation=False, write_sink=write_sink)
             trade_attempts = 0
             successful_trades = 0
             
@@ -160,30 +173,26 @@ def fast_trading_evaluation():
             for pair in unique_pairs:
                 try:
                     # Use Phase 7 cached data (eliminates rate limiting)
-                    market_data_cache[pair] = market_service.get_candles(pair, granularity='ONE_HOUR', limit=100)
+                    market_data_cache[pair] = market_service.get_historical_data(pair, 3600, 100)
                 except Exception as e:
                     logger.warning(f"Failed to get cached market data for {pair}: {e}")
                     continue
             
+            # Evaluate all bots in one batch with automatic trading enabled
+            market_data_cache = {
+                pair: data for pair, data in market_data_cache.items()
+                if data is not None and not data.empty
+            }
+            regime_snapshot = RegimeSnapshot()
+            batch_results = evaluator.evaluate_bots_batch(active_bots, market_data_cache, regime_snapshot)
+            publish_regime_snapshot(regime_snapshot)
+            
             for bot in active_bots:
                 try:
-                    # Get market data for this bot's pair
-                    market_data = market_data_cache.get(bot.pair)
-                    if market_data is None or market_data.empty:
+                    result = batch_results.get(bot.id)
+                    if result is None:
                         continue
                     
-                    # Evaluate bot with automatic trading enabled
-                    result = evaluator.evaluate_bot(bot, market_data)
-                    
-                    # Update bot's current_combined_score in database for UI display
-                    try:
-                        bot.current_combined_score = result.get("overall_score", 0.0)
-                        db.commit()
-                        logger.debug(f"✅ Updated bot {bot.id} current_combined_score: {bot.current_combined_score:.6f}")
-                    except Exception as update_error:
-                        db.rollback()
-                        logger.error(f"Failed to update current_combined_score for bot {bot.id}: {update_error}")
-                    
                     # Store evaluation results back to the bot for UI display
                     try:
                         import json
@@ -197,9 +206,12 @@ def fast_trading_evaluation():
                             "market_context": result.get("market_context")
                         }
                         
-                        bot.evaluation_metadata = json.dumps(evaluation_data)
-                        db.commit()
-                        logger.debug(f"💾 Stored evaluation results for bot {bot.id}: {result.get('action')} (score: {result.get('overall_score', 0):.3f})")
+                        write_sink.update_bot(
+                            bot,
+                            current_combined_score=result.get("overall_score", 0.0),
+                            evaluation_metadata=json.dumps(evaluation_data)
+                        )
+                        logger.debug(f"💾 Queued evaluation results for bot {bot.id}: {result.get('action')} (score: {result.get('overall_score', 0):.3f})")
                         
                     except Exception as store_error:
                         logger.error(f"Failed to store evaluation results for bot {bot.id}: {store_error}")
@@ -215,6 +227,9 @@ def fast_trading_evaluation():
                     logger.error(f"Error in fast evaluation for bot {bot.id}: {str(e)}")
                     continue
             
+            # One transaction for scores, metadata, history and signal predictions
+            write_sink.flush()
+            
             return {
                 "status": "fast_evaluation_complete",
                 "evaluated_bots": len(active_bots),
@@ -247,7 +262,7 @@ def fetch_market_data(product_id: str = "BTC-USD"):
             # PHASE 7: Use cached market data service (no API calls)
             from ..services.market_data_service import get_market_data_service
             market_service = get_market_data_service()
-            df = market_service.get_candles(product_id, granularity='ONE_HOUR', limit=100)
+            df = market_service.get_historical_data(product_id, 3600, 100)
             
             if df.empty:
                 logger.warning(f"No market data received for {product_id}")
@@ -0,0 +1,144 @@
+"""
+Shared test fixtures.
+
+Provides an in-memory stand-in for the binary Redis client used by the
+candle cache, the trend engine's shared cache and their locks, and a fake
+clock and Coinbase service for driving the SyncAPICoordinator by hand.
+"""
+
+import fnmatch
+import os
+import random
+import sys
+import threading
+
+import pytest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.sync_api_coordinator import RateLimitConfig, SyncAPICoordinator
+
+
+class FakeRedis:
+    """Thread-safe dict-backed binary Redis stand-in with SET NX support."""
+
+    def __init__(self):
+        self.data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self.data.get(key)
+
+    def mget(self, keys):
+        with self._lock:
+            return [self.data.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        with self._lock:
+            self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value, nx=False, px=None):
+        with self._lock:
+            if nx and key in self.data:
+                return None
+            self.data[key] = value.encode() if isinstance(value, str) else value
+            return True
+
+    def delete(self, *keys):
+        with self._lock:
+            return sum(1 for key in keys if self.data.pop(key, None) is not None)
+
+    def eval(self, script, numkeys, key, token):
+        # RELEASE_LOCK_SCRIPT: compare-and-delete
+        with self._lock:
+            if self.data.get(key) == (token.encode() if isinstance(token, str) else token):
+                del self.data[key]
+                return 1
+            return 0
+
+    def scan_iter(self, match=None, count=None):
+        with self._lock:
+            keys = [key for key in self.data if match is None or fnmatch.fnmatch(key, match)]
+        return iter(keys)
+
+
+@pytest.fixture
+def fake_redis():
+    """Empty FakeRedis shared by everything a test builds."""
+    return FakeRedis()
+
+
+class FakeClock:
+    """Manually advanced clock for the coordinator and its cache."""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeCoinbase:
+    """Records the (fake) time, method and arguments of every call; can answer with 429s first."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.calls = []
+        self.rate_limited = {}   # product_id -> number of 429s to raise before answering
+
+    def _record(self, method, *args):
+        self.calls.append((self.clock(), method, args))
+
+    def count(self, method, *args) -> int:
+        return sum(1 for _, called, called_args in self.calls if (called, called_args) == (method, args))
+
+    def call_times(self):
+        return [at for at, _, _ in self.calls]
+
+    def product_ids(self):
+        return [args[0] for _, _, args in self.calls]
+
+    def get_product_ticker(self, product_id):
+        self._record('get_product_ticker', product_id)
+        if self.rate_limited.get(product_id, 0) > 0:
+            self.rate_limited[product_id] -= 1
+            raise Exception("429 Too Many Requests")
+        if product_id == 'BROKEN-USD':
+            raise ValueError("unknown product")
+        return {'product_id': product_id, 'price': 1.0}
+
+    def get_order_status(self, order_id):
+        self._record('get_order_status', order_id)
+        return {'order_id': order_id, 'status': 'OPEN'}
+
+    def get_accounts(self):
+        self._record('get_accounts')
+        return [{'currency': 'USD', 'available_balance': 100.0}]
+
+    def place_market_order(self, product_id, side, size):
+        self._record('place_market_order', product_id, side, size)
+        return {'order_id': f"order-{len(self.calls)}"}
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def coinbase(clock):
+    return FakeCoinbase(clock)
+
+
+@pytest.fixture
+def make_coordinator(clock):
+    """Build a SyncAPICoordinator on the fake clock whose calls run inline from dispatch_pending."""
+    def make(coinbase, response_cache=None, **config):
+        return SyncAPICoordinator(coinbase, RateLimitConfig(**config), clock=clock, autostart=False,
+                                  rng=random.Random(7), response_cache=response_cache)
+    return make
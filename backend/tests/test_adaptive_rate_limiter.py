@@ -0,0 +1,360 @@
+"""
+Tests for the adaptive Coinbase rate limiter.
+
+Runs the limiter against a simulated exchange that enforces a fixed-window
+call budget (and, like Coinbase, reports it in x-ratelimit-* headers) on a
+fake clock. With headers the limiter sustains far more than the old fixed
+8 calls/min without a single 429; without headers it backs off on 429s and
+honours Retry-After. Two limiters sharing one (fake) Redis stand in for the
+API and Celery processes. The coordinator prepays only the call it
+dispatched and claims slots without holding its own lock.
+"""
+
+import pytest
+import random
+import threading
+import sys
+import os
+
+from coinbase.rest.types.base_response import BaseResponse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.adaptive_rate_limiter import (
+    AdaptiveRateLimiter, RateLimitTimeout, RateLimitedClient, parse_reset
+)
+from backend.app.services.sync_api_coordinator import RateLimitConfig, SyncAPICoordinator
+
+
+OLD_FIXED_CALLS_PER_MINUTE = 8
+
+
+class FakeClock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers):
+        self.status_code = status_code
+        self.headers = headers
+
+
+class HTTPError(Exception):
+    def __init__(self, message, response):
+        super().__init__(message)
+        self.response = response
+
+
+class SimulatedExchange:
+    """Fixed-window budget of `limit` calls per `window` seconds, shared by every caller."""
+
+    def __init__(self, clock: FakeClock, limit: int = 30, window: float = 10.0,
+                 headers: bool = True, retry_after: float = 5.0, latency: float = 0.05):
+        self.clock = clock
+        self.limit = limit
+        self.window = window
+        self.headers = headers
+        self.retry_after = retry_after
+        self.latency = latency
+        self.calls = []
+        self.rejections = []
+        self._window_start = None
+        self._count = 0
+
+    def _budget(self):
+        now = self.clock()
+        window_start = now - (now % self.window)
+        if window_start != self._window_start:
+            self._window_start = window_start
+            self._count = 0
+        return window_start + self.window - now
+
+    def get_product(self, product_id):
+        reset_in = self._budget()
+        if self._count >= self.limit:
+            self.rejections.append(self.clock())
+            raise HTTPError("429 Client Error: Too Many Requests",
+                            FakeResponse(429, {'Retry-After': str(self.retry_after),
+                                               'x-ratelimit-reset': str(reset_in)}))
+        self._count += 1
+        self.calls.append(self.clock())
+        self.clock.advance(self.latency)
+        fields = {'product_id': product_id, 'price': '1.0'}
+        if self.headers:
+            fields.update({
+                'x-ratelimit-limit': str(self.limit),
+                'x-ratelimit-remaining': str(self.limit - self._count),
+                'x-ratelimit-reset': str(reset_in),
+            })
+        return BaseResponse(**fields)
+
+
+class FakeRedis:
+    """Dict-backed Redis stand-in with PX expiry on the fake clock."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.data = {}
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= self.clock():
+            del self.data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[0] if entry else None
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and self._live(key) is not None:
+            return None
+        self.data[key] = (value, self.clock() + px / 1000.0 if px else None)
+        return True
+
+    def setex(self, key, ttl, value):
+        self.data[key] = (value, self.clock() + ttl)
+
+    def incr(self, key):
+        entry = self._live(key)
+        value = int(entry[0]) + 1 if entry else 1
+        self.data[key] = (value, entry[1] if entry else None)
+        return value
+
+    def expire(self, key, seconds):
+        entry = self._live(key)
+        if entry is not None:
+            self.data[key] = (entry[0], self.clock() + seconds)
+        return entry is not None
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Error 111 connecting to localhost:6379")
+        return fail
+
+
+def make_limiter(clock, redis_client=None, **options):
+    return AdaptiveRateLimiter(redis_client=redis_client, clock=clock, sleep=clock.advance, **options)
+
+
+def drive(limiter, exchange, clock, seconds):
+    """Call the exchange as fast as the limiter allows for `seconds` of fake time."""
+    rate_limited = 0
+    end = clock() + seconds
+    while clock() < end:
+        try:
+            limiter.call(exchange.get_product, 'BTC-USD')
+        except HTTPError:
+            rate_limited += 1
+    return rate_limited
+
+
+class TestLearning:
+    """Test learning the budget from the exchange."""
+
+    def test_headers_beat_fixed_rate_with_zero_429s(self):
+        clock = FakeClock()
+        exchange = SimulatedExchange(clock, limit=30, window=10.0)
+        limiter = make_limiter(clock)
+
+        rate_limited = drive(limiter, exchange, clock, 120)
+
+        calls_per_minute = len(exchange.calls) / 2
+        assert rate_limited == 0
+        assert exchange.rejections == []
+        assert calls_per_minute > 10 * OLD_FIXED_CALLS_PER_MINUTE
+        assert calls_per_minute <= 0.85 * 30 * 6        # Leaves the reserve unspent
+        assert limiter.get_stats()['header_updates'] == len(exchange.calls)
+
+    def test_without_headers_backs_off_and_honours_retry_after(self):
+        clock = FakeClock()
+        exchange = SimulatedExchange(clock, limit=30, window=10.0, headers=False, retry_after=5.0)
+        limiter = make_limiter(clock)
+
+        rate_limited = drive(limiter, exchange, clock, 120)
+
+        assert 0 < rate_limited <= 10
+        assert len(exchange.calls) / 2 > 5 * OLD_FIXED_CALLS_PER_MINUTE
+        for rejected_at in exchange.rejections:
+            next_call = next(t for t in exchange.calls if t > rejected_at)
+            assert next_call - rejected_at >= 5.0
+        assert limiter.get_stats()['rate_limited'] == rate_limited
+
+    def test_exhausted_budget_pauses_until_reset(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+
+        limiter.observe_headers({'x-ratelimit-remaining': '0', 'x-ratelimit-reset': '7'})
+
+        assert limiter.wait_time() == pytest.approx(7.0)
+        assert limiter.try_acquire() == pytest.approx(7.0)
+
+    def test_acquire_times_out_instead_of_waiting_forever(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock, max_wait_seconds=5)
+        limiter.record_rate_limited(retry_after=60)
+
+        with pytest.raises(RateLimitTimeout):
+            limiter.acquire()
+        assert clock() == 1_700_000_000.0               # Didn't sleep first
+
+    @pytest.mark.parametrize("value,expected", [
+        ('12', 1_700_000_012.0),
+        ('1700000030', 1_700_000_030.0),
+        ('1700000030000', 1_700_000_030.0),
+        ('2023-11-14T22:13:50Z', 1_700_000_030.0),
+        ('soon', None),
+    ])
+    def test_reset_header_formats(self, value, expected):
+        assert parse_reset(value, 1_700_000_000.0) == expected
+
+
+class TestSharedState:
+    """Test two processes spending one budget through Redis."""
+
+    def test_two_processes_share_one_budget(self):
+        clock = FakeClock()
+        redis_client = FakeRedis(clock)
+        exchange = SimulatedExchange(clock, limit=30, window=10.0)
+        api_process = make_limiter(clock, redis_client)
+        celery_process = make_limiter(clock, redis_client)
+
+        rate_limited = 0
+        end = clock() + 120
+        while clock() < end:
+            for limiter in (api_process, celery_process):
+                try:
+                    limiter.call(exchange.get_product, 'BTC-USD')
+                except HTTPError:
+                    rate_limited += 1
+
+        assert rate_limited == 0
+        assert len(exchange.calls) / 2 > 10 * OLD_FIXED_CALLS_PER_MINUTE
+        assert api_process.get_stats()['shared'] is True
+
+    def test_pause_is_shared(self):
+        clock = FakeClock()
+        redis_client = FakeRedis(clock)
+        api_process = make_limiter(clock, redis_client)
+        celery_process = make_limiter(clock, redis_client)
+
+        api_process.record_rate_limited(headers={'Retry-After': '20'})
+
+        assert celery_process.wait_time() == pytest.approx(20.0)
+        assert celery_process.try_acquire() > 0
+        assert celery_process.get_stats()['calls_per_minute'] == api_process.get_stats()['calls_per_minute']
+
+    def test_one_slot_per_interval_across_processes(self):
+        clock = FakeClock()
+        redis_client = FakeRedis(clock)
+        api_process = make_limiter(clock, redis_client, initial_rate=1.0)
+        celery_process = make_limiter(clock, redis_client, initial_rate=1.0)
+
+        assert api_process.try_acquire() == 0.0
+        assert celery_process.try_acquire() > 0.0
+        clock.advance(1.0)
+        assert celery_process.try_acquire() == 0.0
+
+    def test_falls_back_to_local_pacing_without_redis(self):
+        clock = FakeClock()
+        exchange = SimulatedExchange(clock, limit=30, window=10.0)
+        limiter = make_limiter(clock, BrokenRedis())
+
+        rate_limited = drive(limiter, exchange, clock, 20)
+
+        stats = limiter.get_stats()
+        assert rate_limited == 0
+        assert len(exchange.calls) > 20
+        assert stats['shared'] is False
+        assert stats['redis_errors'] == 1
+
+
+class TestCoordinatorIntegration:
+    """Test the coordinator dispatching on the shared limiter."""
+
+    def test_coordinator_paces_on_learned_budget_without_double_charging(self):
+        clock = FakeClock()
+        exchange = SimulatedExchange(clock, limit=30, window=10.0)
+        limiter = make_limiter(clock)
+        service = RateLimitedClient(exchange, limiter)
+        service.rate_limiter = limiter
+        coordinator = SyncAPICoordinator(service, RateLimitConfig(), clock=clock, autostart=False,
+                                         rng=random.Random(5))
+        futures = [coordinator.submit('get_product', f"P{i}-USD") for i in range(400)]
+
+        for _ in range(600):             # 60s of fake time
+            coordinator.dispatch_pending()
+            clock.advance(0.1)
+
+        done = sum(1 for future in futures if future.done())
+        assert coordinator.rate_limiter is limiter
+        assert exchange.rejections == []
+        assert done > 10 * OLD_FIXED_CALLS_PER_MINUTE
+        stats = limiter.get_stats()
+        assert stats['prepaid_calls'] == len(exchange.calls)
+        assert stats['acquired'] == len(exchange.calls)
+        assert coordinator.get_stats()['adaptive_rate_limit']['header_updates'] == len(exchange.calls)
+
+    def test_only_the_dispatched_call_is_prepaid(self):
+        clock = FakeClock()
+        exchange = SimulatedExchange(clock, limit=30, window=10.0)
+        limiter = make_limiter(clock)
+
+        class PagingService:
+            """A coordinated method that makes several client calls (like paginated fills)."""
+            rate_limiter = limiter
+            client = RateLimitedClient(exchange, limiter)
+
+            def get_pages(self, pages):
+                return [self.client.get_product(f"P{page}-USD") for page in range(pages)]
+
+        coordinator = SyncAPICoordinator(PagingService(), RateLimitConfig(), clock=clock, autostart=False,
+                                         rng=random.Random(5))
+        future = coordinator.submit('get_pages', 3)
+        coordinator.dispatch_pending()
+
+        assert len(future.result()) == 3
+        stats = limiter.get_stats()
+        assert stats['prepaid_calls'] == 1
+        assert stats['acquired'] == 3       # The dispatcher's slot plus one per later page
+
+    def test_slot_is_claimed_outside_the_coordinator_lock(self):
+        clock = FakeClock()
+        limiter = make_limiter(clock)
+        claiming = threading.Event()
+        release = threading.Event()
+        claim = limiter.try_acquire
+
+        def slow_try_acquire():
+            claiming.set()
+            release.wait(2)                 # A slow Redis round trip
+            return claim()
+
+        limiter.try_acquire = slow_try_acquire
+        service = RateLimitedClient(SimulatedExchange(clock), limiter)
+        service.rate_limiter = limiter
+        coordinator = SyncAPICoordinator(service, RateLimitConfig(), clock=clock, autostart=False,
+                                         rng=random.Random(5))
+        first = coordinator.submit('get_product', 'BTC-USD')
+        dispatcher = threading.Thread(target=coordinator.dispatch_pending)
+        dispatcher.start()
+        assert claiming.wait(2)
+
+        submitted = threading.Event()
+        threading.Thread(target=lambda: (coordinator.submit('get_product', 'ETH-USD'), submitted.set())).start()
+        assert submitted.wait(0.5)          # submit() did not wait for the claim
+        release.set()
+        dispatcher.join(2)
+
+        assert first.done()
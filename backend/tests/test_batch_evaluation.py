@@ -0,0 +1,133 @@
+"""
+Tests for vectorized multi-bot evaluation (BotSignalEvaluator.evaluate_bots_batch).
+
+Validates that batch evaluation matches per-bot evaluate_bot results and
+that each distinct (pair, signal, parameters) indicator is computed once.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.bot_evaluator import BotSignalEvaluator
+from backend.app.models.models import Bot
+
+
+DEFAULT_CONFIG = {
+    'rsi': {'enabled': True, 'weight': 0.4, 'period': 14, 'buy_threshold': 30, 'sell_threshold': 70},
+    'moving_average': {'enabled': True, 'weight': 0.35, 'fast_period': 10, 'slow_period': 20},
+    'macd': {'enabled': True, 'weight': 0.25, 'fast_period': 12, 'slow_period': 26, 'signal_period': 9}
+}
+
+CUSTOM_CONFIG = {
+    'rsi': {'enabled': True, 'weight': 0.6, 'period': 7, 'buy_threshold': 25, 'sell_threshold': 75},
+    'moving_average': {'enabled': False, 'weight': 0.4, 'fast_period': 10, 'slow_period': 20},
+    'macd': {'enabled': True, 'weight': 0.4, 'fast_period': 12, 'slow_period': 26, 'signal_period': 9},
+    'trading_thresholds': {'buy_threshold': -0.1, 'sell_threshold': 0.1}
+}
+
+
+def create_bot(bot_id: int, pair: str, config: dict) -> Bot:
+    """Create an in-memory running bot."""
+    bot = Bot()
+    bot.id = bot_id
+    bot.name = f"Bot {bot_id}"
+    bot.pair = pair
+    bot.status = 'RUNNING'
+    bot.signal_config = json.dumps(config)
+    bot.confirmation_minutes = 5
+    bot.position_size_usd = 10.0
+    return bot
+
+
+def create_market_data(seed: int, n: int = 100) -> pd.DataFrame:
+    """Create deterministic hourly candles."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2025-01-01', periods=n, freq='1h', name='timestamp')
+    return pd.DataFrame({'close': 100 + np.cumsum(rng.normal(0, 1, n))}, index=index)
+
+
+@pytest.fixture
+def evaluator(monkeypatch):
+    """Evaluator with balance/cooldown pre-checks and automatic trading stubbed out."""
+    evaluator = BotSignalEvaluator(db=None, enable_confirmation=False)
+    monkeypatch.setattr(evaluator, '_check_pre_evaluation_blocks', lambda bot, data: None)
+    monkeypatch.setattr(evaluator, '_should_execute_automatic_trade', lambda bot, result: False)
+    return evaluator
+
+
+class TestBatchEvaluation:
+    """Test evaluate_bots_batch against evaluate_bot."""
+
+    def test_batch_matches_individual_evaluation(self, evaluator):
+        bots = [
+            create_bot(1, 'BTC-USD', DEFAULT_CONFIG),
+            create_bot(2, 'BTC-USD', DEFAULT_CONFIG),
+            create_bot(3, 'BTC-USD', CUSTOM_CONFIG),
+            create_bot(4, 'ETH-USD', DEFAULT_CONFIG),
+            create_bot(5, 'ETH-USD', CUSTOM_CONFIG),
+        ]
+        market_data = {'BTC-USD': create_market_data(1), 'ETH-USD': create_market_data(2)}
+
+        batch = evaluator.evaluate_bots_batch(bots, market_data)
+
+        assert set(batch) == {1, 2, 3, 4, 5}
+        for bot in bots:
+            individual = evaluator.evaluate_bot(bot, market_data[bot.pair])
+            assert batch[bot.id]['overall_score'] == pytest.approx(individual['overall_score'], abs=1e-12)
+            assert batch[bot.id]['confidence'] == pytest.approx(individual['confidence'], abs=1e-12)
+            assert batch[bot.id]['action'] == individual['action']
+            assert set(batch[bot.id]['signal_results']) == set(individual['signal_results'])
+
+    def test_distinct_indicators_computed_once(self, evaluator, monkeypatch):
+        calls = []
+        original = evaluator._calculate_signal
+
+        def counting_calculate(signal_instance, bot, market_data):
+            calls.append((bot.pair, signal_instance.name, tuple(sorted(signal_instance.parameters.items()))))
+            return original(signal_instance, bot, market_data)
+
+        monkeypatch.setattr(evaluator, '_calculate_signal', counting_calculate)
+
+        bots = [create_bot(i, 'BTC-USD', DEFAULT_CONFIG) for i in range(1, 41)]
+        bots.append(create_bot(41, 'BTC-USD', CUSTOM_CONFIG))
+        evaluator.evaluate_bots_batch(bots, {'BTC-USD': create_market_data(3)})
+
+        # 3 default indicators + custom RSI(7); the custom MACD matches the default one
+        assert len(calls) == 4
+        assert len(set(calls)) == 4
+
+    def test_bots_without_market_data_are_omitted(self, evaluator):
+        bots = [create_bot(1, 'BTC-USD', DEFAULT_CONFIG), create_bot(2, 'SOL-USD', DEFAULT_CONFIG)]
+
+        batch = evaluator.evaluate_bots_batch(bots, {'BTC-USD': create_market_data(4)})
+
+        assert list(batch) == [1]
+
+    def test_low_confidence_forces_hold(self, evaluator):
+        # Flat prices give near-zero confidence from every signal
+        flat = pd.DataFrame(
+            {'close': np.full(100, 50.0)},
+            index=pd.date_range('2025-01-01', periods=100, freq='1h', name='timestamp')
+        )
+        bot = create_bot(1, 'BTC-USD', DEFAULT_CONFIG)
+
+        batch = evaluator.evaluate_bots_batch([bot], {'BTC-USD': flat})
+
+        assert batch[1]['confidence'] < BotSignalEvaluator.MIN_SIGNAL_CONFIDENCE
+        assert batch[1]['action'] == 'hold'
+
+    def test_no_enabled_signals_returns_error_result(self, evaluator):
+        config = {'rsi': {'enabled': False, 'weight': 1.0}}
+        bot = create_bot(1, 'BTC-USD', config)
+
+        batch = evaluator.evaluate_bots_batch([bot], {'BTC-USD': create_market_data(5)})
+
+        assert batch[1]['action'] == 'hold'
+        assert batch[1]['metadata']['error'] == "No enabled signals with valid weights"
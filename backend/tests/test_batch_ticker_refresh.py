@@ -0,0 +1,132 @@
+"""
+Tests for the batched ticker refresh.
+
+Validates that MarketDataService.refresh_all_market_data fetches every
+product through CoinbaseService.get_product_tickers (one list-products and
+one best bid/ask call per batch) and writes the results with a single
+Redis pipeline.
+"""
+
+import pytest
+import json
+import sys
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.coinbase_service import CoinbaseService
+from backend.app.services.market_data_service import MarketDataService
+
+
+PRODUCT_IDS = [f"COIN{i}-USD" for i in range(100)]
+
+
+def mock_rest_client():
+    """REST client mock answering for whichever product_ids it is asked about."""
+    client = MagicMock()
+    client.get_products.side_effect = lambda product_ids=None, **kwargs: SimpleNamespace(products=[
+        SimpleNamespace(product_id=product_id, price=str(100 + i), volume_24h="1000")
+        for i, product_id in enumerate(product_ids)
+    ])
+    client.get_best_bid_ask.side_effect = lambda product_ids=None, **kwargs: SimpleNamespace(pricebooks=[
+        SimpleNamespace(product_id=product_id,
+                        bids=[SimpleNamespace(price=str(99 + i), size="1")],
+                        asks=[SimpleNamespace(price=str(101 + i), size="1")])
+        for i, product_id in enumerate(product_ids)
+    ])
+    return client
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+        return self
+
+    def execute(self):
+        self.redis_client.round_trips += 1
+        for key, value in self.commands:
+            self.redis_client.data[key] = value
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """Dict-backed Redis stand-in that counts round trips."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def coinbase():
+    service = CoinbaseService()
+    service.client = mock_rest_client()
+    return service
+
+
+class TestBatchTickerRefresh:
+    """Test the batched refresh path."""
+
+    def test_hundred_products_cost_two_calls(self, coinbase):
+        redis_client = FakeRedis()
+        service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+
+        result = service.refresh_all_market_data(PRODUCT_IDS)
+
+        rest_calls = coinbase.client.get_products.call_count + coinbase.client.get_best_bid_ask.call_count
+        assert rest_calls == 2
+        coinbase.client.get_product.assert_not_called()
+        assert result['success_count'] == 100
+        assert result['error_count'] == 0
+        assert redis_client.round_trips == 1
+
+    def test_cached_tickers_carry_price_and_book(self, coinbase):
+        redis_client = FakeRedis()
+        service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+
+        service.refresh_all_market_data(PRODUCT_IDS)
+        ticker = service.get_ticker('COIN5-USD')
+
+        assert ticker.price == 105.0
+        assert ticker.best_bid == 104.0
+        assert ticker.best_ask == 106.0
+        assert ticker.data_source == "batch_refresh"
+        assert json.loads(redis_client.data['market_data:batch_info'])['success_count'] == 100
+
+    def test_large_refresh_is_split_into_batches(self, coinbase):
+        product_ids = [f"COIN{i}-USD" for i in range(300)]
+
+        tickers = coinbase.get_product_tickers(product_ids, batch_size=250)
+
+        assert coinbase.client.get_products.call_count == 2
+        assert coinbase.client.get_best_bid_ask.call_count == 2
+        assert len(tickers) == 300
+
+    def test_missing_products_are_reported_as_errors(self, coinbase):
+        coinbase.client.get_products.side_effect = lambda product_ids=None, **kwargs: SimpleNamespace(
+            products=[SimpleNamespace(product_id=product_ids[0], price="1", volume_24h="0")]
+        )
+        service = MarketDataService(coinbase_service=coinbase, redis_client=FakeRedis())
+
+        result = service.refresh_all_market_data(PRODUCT_IDS[:3])
+
+        assert result['success_count'] == 1
+        assert result['error_count'] == 2
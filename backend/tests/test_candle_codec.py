@@ -0,0 +1,157 @@
+"""
+Tests for the binary columnar candle codec.
+
+Validates exact round-trips of API-shaped candle frames, zero-copy decoding,
+header validation, and that MarketDataService cache hits return the same
+frame as a fresh fetch. Includes a size/speed comparison against the JSON
+records format it replaces.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.candle_codec import (
+    can_encode_candles, decode_candles, encode_candles, is_encoded_candles
+)
+from backend.app.services.candle_store import CandleStore
+from backend.app.services.market_data_service import MarketDataService
+
+
+def api_candles(count: int = 100) -> pd.DataFrame:
+    """Frame shaped exactly like CoinbaseService._fetch_historical_data_from_api output."""
+    rng = np.random.default_rng(7)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    data = []
+    for i in range(count):
+        data.append({
+            'timestamp': pd.to_datetime(1700000000 + i * 3600, unit='s'),
+            'open': float(close[i] - 0.1),
+            'high': float(close[i] + 0.5),
+            'low': float(close[i] - 0.5),
+            'close': float(close[i]),
+            'volume': float(rng.uniform(1, 1000))
+        })
+    df = pd.DataFrame(data)
+    df.set_index('timestamp', inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+def legacy_json(df: pd.DataFrame) -> str:
+    return json.dumps({'data': df.to_dict('records'), 'cached_at': time.time()}, default=str)
+
+
+class CountingCoinbase:
+    def __init__(self, candles: pd.DataFrame):
+        self.candles = candles
+        self.calls = 0
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        self.calls += 1
+        candles = self.candles
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        return candles.tail(limit)
+
+
+class TestCandleCodec:
+    """Test encoding and decoding."""
+
+    def test_round_trip_is_exact(self):
+        df = api_candles()
+        df.iloc[3, 4] = np.nan
+
+        decoded = decode_candles(encode_candles(df))
+
+        pd.testing.assert_frame_equal(decoded, df, check_freq=True)
+        assert decoded.index.name == 'timestamp'
+        assert list(decoded.columns) == ['open', 'high', 'low', 'close', 'volume']
+
+    def test_decode_is_zero_copy_and_read_only(self):
+        payload = encode_candles(api_candles())
+
+        decoded = decode_candles(payload)
+
+        closes = decoded['close'].to_numpy()
+        assert np.shares_memory(closes, np.frombuffer(payload, dtype=np.uint8))
+        assert not closes.flags.writeable
+
+    def test_empty_frame_round_trips(self):
+        df = api_candles().iloc[:0]
+        pd.testing.assert_frame_equal(decode_candles(encode_candles(df)), df)
+
+    def test_header_is_validated(self):
+        payload = bytearray(encode_candles(api_candles(5)))
+
+        assert is_encoded_candles(bytes(payload))
+        assert not is_encoded_candles('{"data": []}')
+        with pytest.raises(ValueError):
+            decode_candles(bytes(payload[:-8]))
+        payload[4] = 99   # version
+        with pytest.raises(ValueError, match='version'):
+            decode_candles(bytes(payload))
+
+    def test_only_candle_frames_are_encodable(self):
+        df = api_candles(5)
+
+        assert can_encode_candles(df)
+        assert not can_encode_candles(df.reset_index())
+        assert not can_encode_candles(df[['close']])
+        with pytest.raises(ValueError):
+            encode_candles(df.reset_index())
+
+    def test_smaller_and_faster_than_json(self):
+        df = api_candles(100)
+        payload = encode_candles(df)
+        legacy = legacy_json(df)
+        rounds = 50
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            decode_candles(payload)
+        binary_decode = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(rounds):
+            pd.DataFrame(json.loads(legacy)['data'])
+        json_decode = time.perf_counter() - started
+
+        assert len(payload) < len(legacy.encode()) / 2
+        assert binary_decode < json_decode
+
+
+class TestMarketDataServiceEncoding:
+    """Test the historical data cache path."""
+
+    def test_cache_hit_matches_fresh_fetch(self, fake_redis):
+        coinbase = CountingCoinbase(api_candles(100))
+        redis_client = fake_redis
+        service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+        service.candle_store = CandleStore(max_idle_seconds=-1)   # Never serve from the store
+
+        fresh = service.get_historical_data('BTC-USD', 3600, 50)
+        cached = service.get_historical_data('BTC-USD', 3600, 50)
+
+        assert coinbase.calls == 1
+        assert is_encoded_candles(redis_client.data['market_data:candles:BTC-USD:3600'])
+        pd.testing.assert_frame_equal(cached, fresh, check_freq=True)
+
+    def test_non_candle_frames_are_returned_uncached(self, fake_redis):
+        df = api_candles(10).reset_index()   # No DatetimeIndex, so not encodable
+        coinbase = CountingCoinbase(df)
+        redis_client = fake_redis
+        service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+        service.candle_store = CandleStore()
+
+        result = service.get_historical_data('BTC-USD', 3600, 10)
+
+        assert len(result) == 10
+        assert redis_client.data == {}
@@ -0,0 +1,145 @@
+"""
+Tests for incremental historical candle fetching.
+
+Validates that MarketDataService keeps one canonical series per
+(product, granularity), serves every limit it covers as a slice, and
+extends a stale series with only the candles since its last one.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.candle_codec import decode_candles, encode_candles
+from backend.app.services.candle_store import CandleStore
+from backend.app.services.market_data_service import MarketDataService
+
+
+GRANULARITY = 3600
+SERIES_KEY = 'market_data:candles:BTC-USD:3600'
+META_KEY = 'market_data:candles_meta:BTC-USD:3600'
+
+
+def exchange_candles(count: int) -> pd.DataFrame:
+    """Candles ending with the currently open hour, shaped like the API output."""
+    last_start = int(time.time() // GRANULARITY) * GRANULARITY
+    index = pd.date_range(end=pd.Timestamp(last_start, unit='s'), periods=count,
+                          freq=f'{GRANULARITY}s', name='timestamp')
+    index.freq = None
+    close = np.arange(count, dtype=float) + 100
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': 2.0}, index=index)
+
+
+class FakeExchange:
+    """Serves candles like Coinbase, honouring the delta ``start`` parameter."""
+
+    def __init__(self, candles: pd.DataFrame):
+        self.candles = candles
+        self.requests = []
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        candles = self.candles
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        result = candles.tail(limit)
+        self.requests.append({'limit': limit, 'start': start, 'returned': len(result)})
+        return result
+
+
+def make_service(exchange, redis_client):
+    service = MarketDataService(coinbase_service=exchange, redis_client=redis_client)
+    service.candle_store = CandleStore(max_idle_seconds=-1)   # Never serve from the store
+    service.stale_while_revalidate = False                     # Refresh on the caller's thread
+    return service, redis_client
+
+
+def age_series(redis_client, seconds):
+    meta = json.loads(redis_client.data[META_KEY])
+    meta['fetched_at'] -= seconds
+    redis_client.data[META_KEY] = json.dumps(meta).encode()
+
+
+class TestCanonicalSeries:
+    """Test that limits are served from one series."""
+
+    def test_smaller_limits_are_slices_of_one_fetch(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(300))
+        service, _ = make_service(exchange, fake_redis)
+
+        widest = service.get_historical_data('BTC-USD', GRANULARITY, 100)
+        for limit in (24, 50, 100):
+            frame = service.get_historical_data('BTC-USD', GRANULARITY, limit)
+            pd.testing.assert_frame_equal(frame, widest.tail(limit))
+
+        assert len(exchange.requests) == 1
+        assert service.get_cache_stats()['full_fetches'] == 1
+
+    def test_longer_limit_refetches_the_wider_window(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(300))
+        service, _ = make_service(exchange, fake_redis)
+
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        longer = service.get_historical_data('BTC-USD', GRANULARITY, 200)
+        shorter = service.get_historical_data('BTC-USD', GRANULARITY, 150)
+
+        assert [r['limit'] for r in exchange.requests] == [50, 200]
+        assert len(longer) == 200
+        pd.testing.assert_frame_equal(shorter, longer.tail(150))
+
+
+class TestDeltaFetch:
+    """Test refreshing a stale series."""
+
+    def test_stale_series_fetches_only_new_candles(self, fake_redis):
+        candles = exchange_candles(300)
+        exchange = FakeExchange(candles.iloc[:-2])          # Two hours behind the exchange
+        service, redis_client = make_service(exchange, fake_redis)
+        service.get_historical_data('BTC-USD', GRANULARITY, 100)
+
+        exchange.candles = candles.copy()
+        exchange.candles.iloc[-3, exchange.candles.columns.get_loc('close')] = 999.0  # Open candle moved on
+        age_series(redis_client, service.historical_refresh_seconds + 1)
+
+        refreshed = service.get_historical_data('BTC-USD', GRANULARITY, 100)
+
+        delta = exchange.requests[-1]
+        assert delta['start'] == int(candles.index[-3].timestamp())
+        assert delta['returned'] == 3
+        assert service.get_cache_stats()['delta_fetches'] == 1
+        assert service.get_cache_stats()['candles_fetched'] == 100 + 3
+        pd.testing.assert_frame_equal(refreshed, exchange.candles.tail(100))
+
+    def test_empty_delta_serves_the_stale_series(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 60)
+
+        exchange.candles = exchange.candles.iloc[0:0]
+        age_series(redis_client, service.historical_refresh_seconds + 1)
+        stale = service.get_historical_data('BTC-USD', GRANULARITY, 60)
+
+        pd.testing.assert_frame_equal(stale, first)
+        assert service.get_cache_stats()['delta_fetches'] == 0
+
+    def test_series_too_far_behind_is_refetched(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        service.get_historical_data('BTC-USD', GRANULARITY, 24)
+
+        age_series(redis_client, 48 * GRANULARITY)
+        # Pretend the stored series ends two days ago
+        old = decode_candles(redis_client.data[SERIES_KEY]).copy()
+        old.index = old.index - pd.Timedelta(hours=48)
+        redis_client.data[SERIES_KEY] = encode_candles(old)
+
+        service.get_historical_data('BTC-USD', GRANULARITY, 24)
+
+        assert [r['start'] for r in exchange.requests] == [None, None]
+        assert service.get_cache_stats()['full_fetches'] == 2
@@ -0,0 +1,216 @@
+"""
+Tests for the ticker-fed candle store.
+
+Validates ring-buffer wraparound, read-only views, snapshot frames, tick
+aggregation into the open candle, rolling at boundaries, gap detection,
+volume completeness and that MarketDataService serves current series without
+REST calls.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.candle_store import CandleStore, CandleRingBuffer, OHLCV_COLUMNS
+from backend.app.services.market_data_service import MarketDataService
+
+
+GRANULARITY = 60
+
+
+def make_candles(count: int, last_start: int = None) -> pd.DataFrame:
+    if last_start is None:
+        last_start = int(time.time() // GRANULARITY) * GRANULARITY
+    index = pd.date_range(end=pd.Timestamp(last_start, unit='s'), periods=count,
+                          freq=f'{GRANULARITY}s', name='timestamp')
+    close = np.arange(count, dtype=float) + 100
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': 2.0}, index=index)
+
+
+class CountingCoinbase:
+    def __init__(self, candles: pd.DataFrame):
+        self.candles = candles
+        self.calls = 0
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        self.calls += 1
+        candles = self.candles
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        return candles.tail(limit)
+
+
+class TestCandleRingBuffer:
+    """Test the preallocated ring buffer."""
+
+    def test_window_stays_contiguous_across_wraparound(self):
+        buffer = CandleRingBuffer(GRANULARITY, capacity=4)
+        candles = make_candles(3)
+        starts = candles.index.asi8 // 1_000_000_000
+        buffer.seed(starts, candles[OHLCV_COLUMNS].to_numpy())
+
+        start = int(starts[-1])
+        for step in range(1, 7):
+            assert buffer.apply_tick(start + step * GRANULARITY, 200.0 + step) == 'rolled'
+
+        starts_view, ohlcv_view = buffer.view(4)
+        assert list(ohlcv_view[:, 3]) == [203.0, 204.0, 205.0, 206.0]
+        assert list(np.diff(starts_view)) == [GRANULARITY * 1_000_000_000] * 3
+        assert np.shares_memory(ohlcv_view, buffer._ohlcv)
+        assert buffer.view(5) is None
+
+    def test_views_are_read_only(self):
+        buffer = CandleRingBuffer(GRANULARITY, capacity=8)
+        candles = make_candles(5)
+        buffer.seed(candles.index.asi8 // 1_000_000_000, candles[OHLCV_COLUMNS].to_numpy())
+
+        _, ohlcv_view = buffer.view(3)
+        with pytest.raises(ValueError):
+            ohlcv_view[0, 0] = 1.0
+
+
+class TestCandleStore:
+    """Test tick aggregation and store lookups."""
+
+    def test_ticks_update_open_candle(self):
+        store = CandleStore()
+        candles = make_candles(10)
+        store.seed('BTC-USD', GRANULARITY, candles)
+        open_start = candles.index[-1].timestamp()
+
+        store.on_tick('BTC-USD', 150.0, open_start + 1, size=0.5)
+        store.on_tick('BTC-USD', 90.0, open_start + 2, size=0.25)
+        store.on_tick('BTC-USD', 120.0, open_start + 3)
+
+        last = store.get_candles('BTC-USD', GRANULARITY, 10).iloc[-1]
+        assert last['open'] == 109.0
+        assert last['high'] == 150.0
+        assert last['low'] == 90.0
+        assert last['close'] == 120.0
+        assert last['volume'] == 2.75
+
+    def test_frame_is_snapshot(self):
+        store = CandleStore()
+        candles = make_candles(10)
+        store.seed('BTC-USD', GRANULARITY, candles)
+
+        frame = store.get_candles('BTC-USD', GRANULARITY, 5)
+        buffer = store._buffers[('BTC-USD', GRANULARITY)]
+        assert not np.shares_memory(frame['close'].to_numpy(), buffer._ohlcv)
+        assert frame.index.name == 'timestamp'
+        assert frame['close'].equals(candles['close'].tail(5))
+
+        store.on_tick('BTC-USD', 500.0, candles.index[-1].timestamp() + 1)
+        store.seed('BTC-USD', GRANULARITY, make_candles(10) * 2)
+        assert frame['close'].equals(candles['close'].tail(5))
+
+    def test_size_less_ticks_make_volume_incomplete(self):
+        store = CandleStore()
+        candles = make_candles(10)
+        store.seed('BTC-USD', GRANULARITY, candles)
+        next_start = candles.index[-1].timestamp() + GRANULARITY
+
+        assert store.get_candles('BTC-USD', GRANULARITY, 10, require_volume=True) is not None
+        store.on_tick('BTC-USD', 111.0, next_start + 1, size=0.5)
+        assert store.get_candles('BTC-USD', GRANULARITY, 10, require_volume=True) is not None
+
+        store.on_tick('BTC-USD', 112.0, next_start + 2)
+        assert store.get_candles('BTC-USD', GRANULARITY, 10, require_volume=True) is None
+        assert store.get_candles('BTC-USD', GRANULARITY, 10) is not None
+
+    def test_boundary_tick_rolls_new_candle(self):
+        store = CandleStore()
+        candles = make_candles(10)
+        store.seed('BTC-USD', GRANULARITY, candles)
+        next_start = candles.index[-1].timestamp() + GRANULARITY
+
+        store.on_tick('BTC-USD', 111.0, next_start + 5)
+
+        frame = store.get_candles('BTC-USD', GRANULARITY, 10)
+        assert frame.index[-1].timestamp() == next_start
+        assert frame.iloc[-1][['open', 'high', 'low', 'close']].tolist() == [111.0] * 4
+        assert frame['close'].iloc[-2] == candles['close'].iloc[-1]
+        assert store.get_stats()['rolls'] == 1
+
+    def test_missed_boundary_requires_reseed(self):
+        store = CandleStore()
+        candles = make_candles(10)
+        store.seed('BTC-USD', GRANULARITY, candles)
+
+        store.on_tick('BTC-USD', 111.0, candles.index[-1].timestamp() + 3 * GRANULARITY)
+
+        assert store.get_candles('BTC-USD', GRANULARITY, 10) is None
+        assert store.get_stats()['gaps'] == 1
+        store.seed('BTC-USD', GRANULARITY, make_candles(10))
+        assert store.get_candles('BTC-USD', GRANULARITY, 10) is not None
+
+    def test_mark_gap_and_idle_series_are_not_served(self):
+        store = CandleStore(max_idle_seconds=0.05)
+        store.seed('BTC-USD', GRANULARITY, make_candles(10))
+        store.seed('ETH-USD', GRANULARITY, make_candles(10))
+
+        assert store.mark_gap(['BTC-USD']) == 1
+        assert store.get_candles('BTC-USD', GRANULARITY, 5) is None
+        assert store.get_candles('ETH-USD', GRANULARITY, 5) is not None
+
+        time.sleep(0.1)
+        assert store.get_candles('ETH-USD', GRANULARITY, 5) is None
+
+    def test_seed_larger_than_capacity_grows_buffer(self):
+        store = CandleStore(capacity=16)
+        store.seed('BTC-USD', GRANULARITY, make_candles(40))
+
+        frame = store.get_candles('BTC-USD', GRANULARITY, 40)
+        assert len(frame) == 40
+        assert frame['close'].iloc[0] == 100.0
+
+
+class TestMarketDataServiceCandleStore:
+    """Test that the market data service reads through the candle store."""
+
+    def test_current_series_served_without_rest(self, fake_redis):
+        coinbase = CountingCoinbase(make_candles(100))
+        service = MarketDataService(coinbase_service=coinbase, redis_client=fake_redis)
+        service.candle_store = CandleStore()
+
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        service.candle_store.on_tick('BTC-USD', 500.0, first.index[-1].timestamp() + 1, size=1.0)
+        second = service.get_historical_data('BTC-USD', GRANULARITY, 30)
+
+        assert coinbase.calls == 1
+        assert len(second) == 30
+        assert second['close'].iloc[-1] == 500.0
+        assert second['volume'].iloc[-1] == 3.0
+        assert service.get_cache_stats()['candle_store_hits'] == 1
+
+    def test_tick_built_volume_is_not_served_to_volume_readers(self, fake_redis):
+        coinbase = CountingCoinbase(make_candles(100))
+        service = MarketDataService(coinbase_service=coinbase, redis_client=fake_redis)
+        service.candle_store = CandleStore()
+
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        service.candle_store.on_tick('BTC-USD', 500.0, first.index[-1].timestamp() + GRANULARITY + 1)
+        second = service.get_historical_data('BTC-USD', GRANULARITY, 30, require_volume=True)
+
+        assert (second['volume'] == 2.0).all()
+        assert service.get_cache_stats()['candle_store_hits'] == 0
+
+    def test_tick_built_volume_is_served_to_close_readers(self, fake_redis):
+        coinbase = CountingCoinbase(make_candles(100))
+        service = MarketDataService(coinbase_service=coinbase, redis_client=fake_redis)
+        service.candle_store = CandleStore()
+
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        service.candle_store.on_tick('BTC-USD', 500.0, first.index[-1].timestamp() + GRANULARITY + 1)
+        second = service.get_historical_data('BTC-USD', GRANULARITY, 30)
+
+        assert coinbase.calls == 1
+        assert second['close'].iloc[-1] == 500.0
+        assert service.get_cache_stats()['candle_store_hits'] == 1
@@ -0,0 +1,161 @@
+"""
+Tests for the coordinator's bounded response cache.
+
+Validates per-method TTLs (order status expires long before accounts, orders
+are never cached), LRU eviction by entry count and by approximate memory,
+removal of expired entries, structured keys, and that the cache's numbers
+reach get_coordination_stats.
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.response_cache import ResponseCache, estimate_size
+from backend.app.services.sync_coordinated_coinbase_service import SyncCoordinatedCoinbaseService
+
+
+UNLIMITED = {'calls_per_minute': 6000, 'burst_allowance': 100}   # Never rate limited
+
+
+def run(coordinator, method, *args, **kwargs):
+    """coordinated_call without the dispatcher thread: serve from cache or run inline."""
+    hit, result = coordinator.response_cache.get(coordinator._generate_cache_key(method, args, kwargs))
+    if hit:
+        return result
+    future = coordinator.submit(method, *args, **kwargs)
+    coordinator.dispatch_pending()
+    return future.result(timeout=0)
+
+
+class TestTTLs:
+    """Test per-method freshness."""
+
+    def test_order_status_expires_before_accounts(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, ResponseCache(clock=clock), **UNLIMITED)
+        run(coordinator, 'get_order_status', 'abc')
+        run(coordinator, 'get_accounts')
+
+        clock.advance(5)
+        run(coordinator, 'get_order_status', 'abc')
+        run(coordinator, 'get_accounts')
+
+        assert coinbase.count('get_order_status', 'abc') == 2
+        assert coinbase.count('get_accounts') == 1
+
+        clock.advance(30)
+        run(coordinator, 'get_accounts')
+        assert coinbase.count('get_accounts') == 2
+
+    def test_orders_are_never_cached(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, ResponseCache(clock=clock), **UNLIMITED)
+
+        first = run(coordinator, 'place_market_order', 'BTC-USD', 'BUY', 0.1)
+        second = run(coordinator, 'place_market_order', 'BTC-USD', 'BUY', 0.1)
+
+        assert first != second
+        assert len(coinbase.calls) == 2
+        assert len(coordinator.response_cache) == 0
+
+    def test_expired_entries_are_removed_not_just_skipped(self, clock):
+        cache = ResponseCache(clock=clock)
+        for i in range(50):
+            cache.set(ResponseCache.make_key('get_order_status', (f"order-{i}",), {}), {'status': 'OPEN'})
+        cache.set(ResponseCache.make_key('get_products', (), {}), ['BTC-USD'])
+
+        clock.advance(3)
+        cache.set(ResponseCache.make_key('get_accounts', (), {}), [])
+
+        stats = cache.get_stats()
+        assert stats['entries'] == 2
+        assert stats['expirations'] == 50
+        assert stats['entries_by_method'] == {'get_products': 1, 'get_accounts': 1}
+
+
+class TestBounds:
+    """Test entry and memory bounds."""
+
+    def test_lru_eviction_by_entry_count(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, ResponseCache(clock=clock, max_entries=3), **UNLIMITED)
+        for product_id in ['A-USD', 'B-USD', 'C-USD']:
+            run(coordinator, 'get_product_ticker', product_id)
+        run(coordinator, 'get_product_ticker', 'A-USD')         # Touch A
+        run(coordinator, 'get_product_ticker', 'D-USD')         # Evicts B
+
+        assert len(coordinator.response_cache) == 3
+        run(coordinator, 'get_product_ticker', 'A-USD')
+        run(coordinator, 'get_product_ticker', 'B-USD')
+        assert coinbase.product_ids() == ['A-USD', 'B-USD', 'C-USD', 'D-USD', 'B-USD']
+        assert coordinator.response_cache.get_stats()['evictions'] == 2
+
+    def test_memory_bound(self, clock):
+        frame = pd.DataFrame({'close': np.arange(1000, dtype=float)})
+        frame_size = estimate_size(frame)
+        cache = ResponseCache(max_bytes=int(frame_size * 2.5), clock=clock)
+
+        for granularity in [60, 300, 900, 3600]:
+            cache.set(ResponseCache.make_key('get_historical_data', ('BTC-USD', granularity), {}), frame)
+
+        stats = cache.get_stats()
+        assert stats['entries'] == 2
+        assert stats['memory_bytes'] == 2 * frame_size
+        assert stats['evictions'] == 2
+        assert cache.get(ResponseCache.make_key('get_historical_data', ('BTC-USD', 3600), {}))[0]
+        assert not cache.get(ResponseCache.make_key('get_historical_data', ('BTC-USD', 60), {}))[0]
+
+    def test_oversized_response_is_not_cached(self, clock):
+        cache = ResponseCache(max_bytes=100, clock=clock)
+
+        assert not cache.set(ResponseCache.make_key('get_products', (), {}), ['X' * 1000])
+        assert cache.get_stats()['uncacheable'] == 1
+
+
+class TestKeys:
+    """Test structured cache keys."""
+
+    def test_kwarg_order_does_not_matter(self):
+        assert (ResponseCache.make_key('get_historical_data', ('BTC-USD',), {'granularity': 60, 'limit': 10}) ==
+                ResponseCache.make_key('get_historical_data', ('BTC-USD',), {'limit': 10, 'granularity': 60}))
+
+    def test_distinct_arguments_with_same_str_do_not_collide(self):
+        assert (ResponseCache.make_key('get_order_status', (1,), {}) !=
+                ResponseCache.make_key('get_order_status', ('1',), {}))
+        assert (ResponseCache.make_key('get_fills', ('a|b',), {}) !=
+                ResponseCache.make_key('get_fills', ('a', 'b'), {}))
+
+    def test_unhashable_arguments(self):
+        key = ResponseCache.make_key('get_products', ([1, 2], {'b': [3]}), {})
+        assert hash(key) == hash(ResponseCache.make_key('get_products', ([1, 2], {'b': [3]}), {}))
+
+
+class TestStats:
+    """Test statistics exposure."""
+
+    def test_cache_stats_reach_coordination_stats(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, ResponseCache(clock=clock), **UNLIMITED)
+        service = SyncCoordinatedCoinbaseService.__new__(SyncCoordinatedCoinbaseService)
+        service.coordinator = coordinator
+
+        run(coordinator, 'get_accounts')
+        run(coordinator, 'get_accounts')
+
+        stats = service.get_coordination_stats()
+        cache_stats = stats['response_cache']
+        assert stats['cache_entries'] == 1
+        assert cache_stats['hits'] == 1
+        assert cache_stats['misses'] == 1
+        assert cache_stats['memory_bytes'] > 0
+        assert cache_stats['evictions'] == 0
+
+    def test_clear_cache(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, ResponseCache(clock=clock), **UNLIMITED)
+        run(coordinator, 'get_accounts')
+
+        coordinator.clear_cache()
+
+        assert coordinator.get_stats()['response_cache']['entries'] == 0
+        assert coordinator.get_stats()['response_cache']['memory_bytes'] == 0
@@ -0,0 +1,162 @@
+"""
+Tests for compiled per-bot evaluation plans.
+
+Validates plan compilation from signal_config, cache reuse keyed by bot id
+and updated_at, and recompilation when the configuration changes.
+"""
+
+import pytest
+import json
+import sys
+import os
+from datetime import datetime, timezone
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services import evaluation_plan
+from backend.app.services.evaluation_plan import EvaluationPlan, EvaluationPlanCache
+from backend.app.services.signals.technical import RSISignal, MovingAverageSignal, MACDSignal
+from backend.app.models.models import Bot
+from backend.app.utils.error_reporting import ErrorType
+
+
+CONFIG = {
+    'rsi': {'enabled': True, 'weight': 0.5, 'period': 7, 'buy_threshold': 25, 'sell_threshold': 75},
+    'moving_average': {'enabled': False, 'weight': 0.3},
+    'macd': {'enabled': True, 'weight': 0.5},
+    'trading_thresholds': {'buy_threshold': -0.1, 'sell_threshold': 0.1}
+}
+
+
+def create_bot(bot_id, config, updated_at=None) -> Bot:
+    bot = Bot()
+    bot.id = bot_id
+    bot.pair = 'BTC-USD'
+    bot.signal_config = json.dumps(config) if isinstance(config, dict) else config
+    bot.updated_at = updated_at
+    return bot
+
+
+class TestEvaluationPlanCompile:
+    """Test EvaluationPlan.compile."""
+
+    def test_resolves_enabled_signals_weights_and_thresholds(self):
+        plan = EvaluationPlan.compile(json.dumps(CONFIG))
+
+        assert plan.error is None
+        assert [signal.name for signal in plan.signals] == ['rsi', 'macd']
+        rsi, macd = (signal.instance for signal in plan.signals)
+        assert isinstance(rsi, RSISignal)
+        assert rsi.parameters == {'period': 7, 'oversold': 25, 'overbought': 75}
+        assert isinstance(macd, MACDSignal)
+        assert macd.parameters == {'fast_period': 12, 'slow_period': 26, 'signal_period': 9}
+        assert plan.total_weight == pytest.approx(1.0)
+        assert [signal.normalized_weight for signal in plan.signals] == pytest.approx([0.5, 0.5])
+        assert plan.thresholds == (-0.1, 0.1)
+        assert plan.custom_thresholds
+
+    def test_default_thresholds(self):
+        plan = EvaluationPlan.compile({'moving_average': {'enabled': True, 'weight': 1.0}})
+
+        assert isinstance(plan.signals[0].instance, MovingAverageSignal)
+        assert plan.thresholds == (-0.05, 0.05)
+        assert not plan.custom_thresholds
+
+    @pytest.mark.parametrize("raw, error", [
+        ("not json", "Invalid signal configuration"),
+        (None, "No signal configuration found"),
+        ("{}", "No signal configuration found"),
+    ])
+    def test_unusable_configuration(self, raw, error):
+        plan = EvaluationPlan.compile(raw)
+
+        assert plan.error == error
+        assert plan.signals == []
+        assert plan.thresholds == (-0.05, 0.05)
+
+    def test_invalid_signal_is_reported_and_skipped(self, monkeypatch):
+        reported = []
+        create = evaluation_plan.create_signal_instance
+
+        def create_or_fail(signal_type, parameters):
+            if signal_type == 'RSI':
+                raise ValueError("period must be an integer")
+            return create(signal_type, parameters)
+
+        monkeypatch.setattr(evaluation_plan, 'create_signal_instance', create_or_fail)
+        monkeypatch.setattr(evaluation_plan, 'report_bot_error', lambda **error: reported.append(error))
+        bot = create_bot(3, {'rsi': {'enabled': True, 'weight': 0.5}, 'macd': {'enabled': True, 'weight': 0.5}})
+        bot.name = 'Broken RSI'
+
+        plan = EvaluationPlanCache().get_plan(bot)
+
+        assert [signal.name for signal in plan.signals] == ['macd']
+        assert len(reported) == 1
+        assert reported[0]['error_type'] == ErrorType.SIGNAL_CALCULATION
+        assert (reported[0]['bot_id'], reported[0]['bot_name']) == (3, 'Broken RSI')
+        assert reported[0]['details']['signal_name'] == 'rsi'
+
+
+class TestEvaluationPlanCache:
+    """Test plan reuse and invalidation."""
+
+    def test_plan_reused_for_unchanged_bot(self):
+        cache = EvaluationPlanCache()
+        bot = create_bot(1, CONFIG, datetime(2025, 1, 1, tzinfo=timezone.utc))
+
+        assert cache.get_plan(bot) is cache.get_plan(bot)
+        stats = cache.get_stats()
+        assert stats['compilations'] == 1
+        assert stats['hits'] == 1
+
+    def test_updated_at_change_recompiles(self):
+        cache = EvaluationPlanCache()
+        bot = create_bot(1, CONFIG, datetime(2025, 1, 1, tzinfo=timezone.utc))
+        first = cache.get_plan(bot)
+
+        bot.updated_at = datetime(2025, 1, 2, tzinfo=timezone.utc)
+
+        assert cache.get_plan(bot) is not first
+
+    def test_config_change_recompiles_even_with_same_updated_at(self):
+        cache = EvaluationPlanCache()
+        bot = create_bot(1, CONFIG)
+        cache.get_plan(bot)
+
+        bot.signal_config = json.dumps({'rsi': {'enabled': True, 'weight': 1.0}})
+        plan = cache.get_plan(bot)
+
+        assert [signal.name for signal in plan.signals] == ['rsi']
+
+    def test_dict_config_edited_in_place_recompiles(self):
+        cache = EvaluationPlanCache()
+        config = json.loads(json.dumps(CONFIG))
+        bot = create_bot(1, CONFIG)
+        bot.signal_config = config
+        cache.get_plan(bot)
+
+        config['macd']['enabled'] = False
+        plan = cache.get_plan(bot)
+
+        assert [signal.name for signal in plan.signals] == ['rsi']
+
+    def test_unsaved_bot_is_not_cached(self):
+        cache = EvaluationPlanCache()
+        bot = create_bot(None, CONFIG)
+
+        cache.get_plan(bot)
+        cache.get_plan(bot)
+
+        assert cache.get_stats()['compilations'] == 2
+        assert cache.get_stats()['cached_plans'] == 0
+
+    def test_invalidate(self):
+        cache = EvaluationPlanCache()
+        for bot_id in [1, 2]:
+            cache.get_plan(create_bot(bot_id, CONFIG))
+
+        assert cache.invalidate(1) == 1
+        assert cache.invalidate(1) == 0
+        assert cache.invalidate() == 1
+        assert cache.get_stats()['cached_plans'] == 0
@@ -0,0 +1,176 @@
+"""
+Tests for the event-driven evaluation scheduler.
+
+Validates latest-wins coalescing, per-product debounce, one in-flight
+evaluation per product, metrics, and that the websocket handler only
+enqueues ticker updates.
+"""
+
+import pytest
+import threading
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services import evaluation_scheduler
+from backend.app.services.evaluation_scheduler import EvaluationScheduler
+from backend.app.services.coinbase_service import CoinbaseService
+
+
+class RecordingEvaluator:
+    """Evaluation callback that records calls and can be held open."""
+
+    def __init__(self):
+        self.calls = []
+        self.active = {}
+        self.max_concurrent_per_product = 0
+        self.release = threading.Event()
+        self.release.set()
+        self.lock = threading.Lock()
+
+    def __call__(self, product_id, ticker):
+        with self.lock:
+            self.calls.append((product_id, ticker['price'], time.monotonic()))
+            self.active[product_id] = self.active.get(product_id, 0) + 1
+            self.max_concurrent_per_product = max(self.max_concurrent_per_product, self.active[product_id])
+        self.release.wait(5)
+        with self.lock:
+            self.active[product_id] -= 1
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+@pytest.fixture
+def evaluator():
+    return RecordingEvaluator()
+
+
+@pytest.fixture
+def scheduler(evaluator):
+    scheduler = EvaluationScheduler(evaluate=evaluator, debounce_seconds=0.2, max_workers=4)
+    yield scheduler
+    evaluator.release.set()
+    scheduler.stop()
+
+
+class TestEvaluationScheduler:
+    """Test EvaluationScheduler coalescing and debounce."""
+
+    def test_updates_coalesce_latest_wins(self, scheduler, evaluator):
+        evaluator.release.clear()
+        scheduler.submit('BTC-USD', {'price': '1'})
+        assert wait_for(lambda: len(evaluator.calls) == 1)
+
+        # While the first evaluation runs, a burst of updates collapses into one
+        for price in range(2, 12):
+            scheduler.submit('BTC-USD', {'price': str(price)})
+        assert scheduler.get_stats()['queue_depth'] == 1
+
+        evaluator.release.set()
+        assert wait_for(lambda: len(evaluator.calls) == 2)
+        time.sleep(0.3)
+
+        assert [call[1] for call in evaluator.calls] == ['1', '11']
+        stats = scheduler.get_stats()
+        assert stats['submitted'] == 11
+        assert stats['coalesced'] == 9
+        assert stats['evaluations'] == 2
+        assert stats['queue_depth'] == 0
+        assert evaluator.max_concurrent_per_product == 1
+
+    def test_debounce_spaces_evaluations_per_product(self, scheduler, evaluator):
+        scheduler.submit('BTC-USD', {'price': '1'})
+        assert wait_for(lambda: len(evaluator.calls) == 1)
+        scheduler.submit('BTC-USD', {'price': '2'})
+
+        assert wait_for(lambda: len(evaluator.calls) == 2)
+        assert evaluator.calls[1][2] - evaluator.calls[0][2] >= 0.19
+
+    def test_products_are_evaluated_independently(self, scheduler, evaluator):
+        evaluator.release.clear()
+        for product_id in ['BTC-USD', 'ETH-USD', 'SOL-USD']:
+            scheduler.submit(product_id, {'price': '1'})
+
+        # All three run concurrently on the worker pool
+        assert wait_for(lambda: len(evaluator.calls) == 3)
+        assert scheduler.get_stats()['in_flight'] == 3
+        evaluator.release.set()
+        assert wait_for(lambda: scheduler.get_stats()['in_flight'] == 0)
+
+    def test_failures_are_counted_and_lag_reported(self):
+        def failing(product_id, ticker):
+            raise RuntimeError("boom")
+
+        scheduler = EvaluationScheduler(evaluate=failing, debounce_seconds=0.01)
+        try:
+            scheduler.submit('BTC-USD', {'price': '1'})
+            assert wait_for(lambda: scheduler.get_stats()['evaluations'] == 1)
+            stats = scheduler.get_stats()
+            assert stats['failures'] == 1
+            assert stats['max_lag_ms'] >= 0
+        finally:
+            scheduler.stop()
+
+    def test_submit_after_stop_does_not_restart(self, scheduler, evaluator):
+        scheduler.submit('BTC-USD', {'price': '1'})
+        assert wait_for(lambda: len(evaluator.calls) == 1)
+        scheduler.stop()
+
+        scheduler.submit('BTC-USD', {'price': '2'})
+
+        stats = scheduler.get_stats()
+        assert not stats['running']
+        assert stats['queue_depth'] == 0
+        assert stats['submitted'] == 1
+
+    def test_rejected_dispatch_releases_the_product(self, scheduler, evaluator):
+        scheduler.start()
+
+        def reject(*args, **kwargs):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+        executor_submit = scheduler._executor.submit
+        scheduler._executor.submit = reject
+        scheduler.submit('BTC-USD', {'price': '1'})
+        assert wait_for(lambda: scheduler.get_stats()['failures'] == 1)
+        assert scheduler.get_stats()['in_flight'] == 0
+
+        # The product is dispatched again once the executor accepts work
+        scheduler._executor.submit = executor_submit
+        scheduler.submit('BTC-USD', {'price': '2'})
+        assert wait_for(lambda: [call[1] for call in evaluator.calls] == ['2'])
+
+
+class TestWebsocketHandlerEnqueues:
+    """Test that the websocket receive path only submits to the scheduler."""
+
+    def test_ticker_message_is_submitted(self, monkeypatch):
+        submitted = []
+
+        class StubScheduler:
+            def submit(self, product_id, ticker):
+                submitted.append((product_id, ticker['price']))
+
+        monkeypatch.setattr(evaluation_scheduler, 'get_evaluation_scheduler', lambda: StubScheduler())
+        service = CoinbaseService()
+
+        service._handle_ws_message({
+            'channel': 'ticker',
+            'events': [{'tickers': [
+                {'product_id': 'BTC-USD', 'price': '100'},
+                {'product_id': 'ETH-USD', 'price': '10'},
+                {'product_id': 'SOL-USD'}
+            ]}]
+        })
+
+        assert submitted == [('BTC-USD', '100'), ('ETH-USD', '10')]
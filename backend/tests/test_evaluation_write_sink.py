@@ -0,0 +1,154 @@
+"""
+Tests for the evaluation write sink (deferred, batched evaluation side effects).
+
+Validates that an evaluator given a sink makes no commits while evaluating,
+and that one flush persists signal history, signal predictions and bot
+updates in a single transaction.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import sys
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import Bot, BotSignalHistory, SignalPredictionRecord
+from backend.app.services import signal_performance_tracker
+from backend.app.services.signal_performance_tracker import SignalPerformanceTracker
+from backend.app.services.bot_evaluator import BotSignalEvaluator
+from backend.app.services.evaluation_write_sink import EvaluationWriteSink
+
+
+CONFIG = {
+    'rsi': {'enabled': True, 'weight': 0.4, 'period': 14},
+    'moving_average': {'enabled': True, 'weight': 0.35, 'fast_period': 10, 'slow_period': 20},
+    'macd': {'enabled': True, 'weight': 0.25},
+    'trading_thresholds': {'buy_threshold': -0.001, 'sell_threshold': 0.001}
+}
+
+
+@pytest.fixture
+def db():
+    """In-memory database session."""
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def commits(db):
+    """List that records every commit of the session."""
+    recorded = []
+    event.listen(db, 'after_commit', lambda session: recorded.append(1))
+    return recorded
+
+
+@pytest.fixture
+def bots(db):
+    created = []
+    for i in range(3):
+        bot = Bot(name=f"Bot {i}", pair='BTC-USD', status='RUNNING', signal_config=json.dumps(CONFIG),
+                  confirmation_minutes=5, position_size_usd=10.0)
+        db.add(bot)
+        created.append(bot)
+    db.commit()
+    return created
+
+
+def create_evaluator(db, monkeypatch, write_sink):
+    evaluator = BotSignalEvaluator(db, enable_confirmation=True, write_sink=write_sink)
+    monkeypatch.setattr(evaluator, '_check_pre_evaluation_blocks', lambda bot, data: None)
+    monkeypatch.setattr(evaluator, '_should_execute_automatic_trade', lambda bot, result: False)
+    # Fresh tracker that persists through the test database
+    monkeypatch.setattr(signal_performance_tracker, '_signal_performance_tracker', SignalPerformanceTracker(db))
+    return evaluator
+
+
+class RecordingQueue:
+    """Stand-in prediction write queue that keeps enqueued rows."""
+
+    def __init__(self):
+        self.rows = []
+
+    def enqueue(self, values):
+        self.rows.append(values)
+        return True
+
+
+def trending_candles(n: int = 100) -> pd.DataFrame:
+    index = pd.date_range('2025-01-01', periods=n, freq='1h', name='timestamp')
+    return pd.DataFrame({'close': 100 + np.linspace(0, 20, n) + np.sin(np.arange(n))}, index=index)
+
+
+class TestEvaluationWriteSink:
+    """Test deferred evaluation writes."""
+
+    def test_evaluation_defers_all_writes_to_one_flush(self, db, bots, commits, monkeypatch):
+        sink = EvaluationWriteSink(db)
+        evaluator = create_evaluator(db, monkeypatch, sink)
+        commits.clear()
+
+        results = evaluator.evaluate_bots_batch(bots, {'BTC-USD': trending_candles()})
+        for bot in bots:
+            sink.update_bot(bot, current_combined_score=results[bot.id]['overall_score'])
+
+        assert commits == []
+        assert db.query(BotSignalHistory).count() == 0
+        assert sink.pending == 3 + 9 + 3
+
+        written = sink.flush()
+
+        assert len(commits) == 1
+        assert written == {'signal_history': 3, 'signal_predictions': 9, 'bot_updates': 3}
+        assert db.query(BotSignalHistory).count() == 3
+        assert db.query(SignalPredictionRecord).count() == 9
+        db.expire_all()
+        for bot in db.query(Bot).all():
+            assert bot.current_combined_score == pytest.approx(results[bot.id]['overall_score'])
+            # Every evaluated bot started a confirmation (no bot was on 'hold')
+            assert results[bot.id]['action'] != 'hold'
+            assert bot.signal_confirmation_start is not None
+
+    def test_flush_with_nothing_pending_does_not_commit(self, db, commits):
+        sink = EvaluationWriteSink(db)
+
+        assert sink.flush() == {'signal_history': 0, 'signal_predictions': 0, 'bot_updates': 0}
+        assert commits == []
+
+    def test_failed_flush_rolls_back(self, db, bots):
+        sink = EvaluationWriteSink(db)
+        # A value the driver can't bind makes the whole transaction fail
+        sink.add_signal_history({'bot_id': object()})
+        sink.update_bot(bots[0], current_combined_score=0.5)
+
+        assert sink.flush() == {'signal_history': 0, 'signal_predictions': 0, 'bot_updates': 0}
+        assert sink.get_stats()['failed_flushes'] == 1
+        assert sink.pending == 0
+        assert db.query(BotSignalHistory).count() == 0
+
+    def test_without_sink_history_is_committed_immediately(self, db, bots, monkeypatch):
+        evaluator = create_evaluator(db, monkeypatch, None)
+        monkeypatch.setattr(
+            'backend.app.core.database.SessionLocal', lambda: db
+        )
+        monkeypatch.setattr(db, 'close', lambda: None)
+
+        write_queue = RecordingQueue()
+        monkeypatch.setattr(signal_performance_tracker, 'get_prediction_write_queue', lambda: write_queue)
+
+        evaluator.evaluate_bot(bots[0], trending_candles())
+
+        assert db.query(BotSignalHistory).count() == 1
+        # Predictions go to the write-behind queue instead of the database
+        assert len(write_queue.rows) == 3
+        assert db.query(SignalPredictionRecord).count() == 0
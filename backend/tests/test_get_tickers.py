@@ -0,0 +1,133 @@
+"""
+Tests for multi-product ticker reads.
+
+Validates that MarketDataService.get_tickers costs a constant number of
+Redis round trips and upstream calls however many products are asked for:
+one MGET, one batched fetch for the misses and one pipelined write.
+"""
+
+import pytest
+import json
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.market_data_service import MarketDataService, TickerData
+
+
+class FakePipeline:
+    def __init__(self, redis_client):
+        self.redis_client = redis_client
+        self.commands = []
+
+    def setex(self, key, ttl, value):
+        self.commands.append((key, value))
+        return self
+
+    def execute(self):
+        self.redis_client.round_trips += 1
+        for key, value in self.commands:
+            self.redis_client.data[key] = value
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    """Dict-backed Redis stand-in that counts round trips."""
+
+    def __init__(self):
+        self.data = {}
+        self.round_trips = 0
+
+    def get(self, key):
+        self.round_trips += 1
+        return self.data.get(key)
+
+    def mget(self, keys):
+        self.round_trips += 1
+        return [self.data.get(key) for key in keys]
+
+    def setex(self, key, ttl, value):
+        self.round_trips += 1
+        self.data[key] = value
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class CountingCoinbase:
+    """Batched ticker source that knows every product except DELISTED-USD."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_product_tickers(self, product_ids):
+        self.calls.append(list(product_ids))
+        return {
+            product_id: {'product_id': product_id, 'price': 10.0 + i, 'volume_24h': 5.0,
+                         'best_bid': 9.5 + i, 'best_ask': 10.5 + i}
+            for i, product_id in enumerate(product_ids) if product_id != 'DELISTED-USD'
+        }
+
+
+def cache_ticker(redis_client, product_id, price):
+    ticker = TickerData(product_id=product_id, price=price, data_source="batch_refresh")
+    redis_client.data[f"market_data:ticker:{product_id}"] = json.dumps(ticker.to_dict())
+
+
+class TestGetTickers:
+    """Test batched ticker lookups."""
+
+    @pytest.mark.parametrize("count", [5, 50, 500])
+    def test_round_trips_are_constant(self, count):
+        redis_client = FakeRedis()
+        coinbase = CountingCoinbase()
+        service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+        product_ids = [f"COIN{i}-USD" for i in range(count)]
+        for product_id in product_ids[::2]:
+            cache_ticker(redis_client, product_id, 1.0)
+
+        tickers = service.get_tickers(product_ids)
+
+        assert len(tickers) == count
+        assert redis_client.round_trips == 2          # MGET + pipelined write-back
+        assert coinbase.calls == [product_ids[1::2]]  # Misses only, in one call
+
+    def test_all_cached_needs_no_upstream_call(self):
+        redis_client = FakeRedis()
+        coinbase = CountingCoinbase()
+        service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+        cache_ticker(redis_client, 'BTC-USD', 50000.0)
+        cache_ticker(redis_client, 'ETH-USD', 3000.0)
+
+        tickers = service.get_tickers(['ETH-USD', 'BTC-USD', 'ETH-USD'])
+
+        assert list(tickers) == ['ETH-USD', 'BTC-USD']
+        assert tickers['BTC-USD'].price == 50000.0
+        assert redis_client.round_trips == 1
+        assert coinbase.calls == []
+
+    def test_misses_are_written_back(self):
+        redis_client = FakeRedis()
+        service = MarketDataService(coinbase_service=CountingCoinbase(), redis_client=redis_client)
+
+        fetched = service.get_tickers(['BTC-USD', 'DELISTED-USD'])
+        again = service.get_tickers(['BTC-USD'])
+
+        assert list(fetched) == ['BTC-USD']
+        assert fetched['BTC-USD'].data_source == "api_fallback"
+        assert again['BTC-USD'].to_dict() == fetched['BTC-USD'].to_dict()
+        assert 'market_data:ticker:DELISTED-USD' not in redis_client.data
+        assert service.get_cache_stats()['cache_hits'] == 1
+
+    def test_matches_single_ticker_reads(self):
+        redis_client = FakeRedis()
+        service = MarketDataService(coinbase_service=CountingCoinbase(), redis_client=redis_client)
+        cache_ticker(redis_client, 'BTC-USD', 50000.0)
+        cache_ticker(redis_client, 'SOL-USD', 150.0)
+
+        batched = service.get_tickers(['BTC-USD', 'SOL-USD'])
+
+        for product_id, ticker in batched.items():
+            assert service.get_ticker(product_id).to_dict() == ticker.to_dict()
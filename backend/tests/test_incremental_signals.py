@@ -0,0 +1,209 @@
+"""
+Parity tests for incremental (streaming) indicator state.
+
+Validates that RSI, MA crossover and MACD signals computed from O(1)
+incremental state produce exactly the same results as the batch pandas
+path over the same candle sequence, including live-candle ticks, sliding
+windows, state rebuilds and LRU eviction in the IndicatorStateStore.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.signals.technical import RSISignal, MovingAverageSignal, MACDSignal
+from backend.app.services.signals.incremental import (
+    RollingMean, ExponentialMean, IndicatorStateStore
+)
+
+
+def make_prices(kind: str, n: int = 150, seed: int = 7) -> np.ndarray:
+    """Generate deterministic price paths that exercise different numeric edge cases."""
+    rng = np.random.default_rng(seed)
+    if kind == 'random_walk':
+        return 100 + np.cumsum(rng.normal(0, 1, n))
+    if kind == 'flat_with_burst':
+        prices = np.full(n, 50.0)
+        prices[n // 3:n // 2] += rng.normal(0, 1, n // 2 - n // 3)
+        return prices
+    if kind == 'steps':
+        return np.repeat(rng.integers(1, 5, n // 5 + 1).astype(float), 5)[:n]
+    if kind == 'micro_cap':
+        return 0.0001 + np.cumsum(rng.normal(0, 1e-6, n))
+    raise ValueError(kind)
+
+
+SIGNALS = [
+    RSISignal(),
+    RSISignal(period=7, oversold=20, overbought=80),
+    MovingAverageSignal(),
+    MovingAverageSignal(fast_period=5, slow_period=50),
+    MACDSignal(),
+    MACDSignal(fast_period=5, slow_period=35, signal_period=5),
+]
+
+PRICE_KINDS = ['random_walk', 'flat_with_burst', 'steps', 'micro_cap']
+
+
+def candles(prices: np.ndarray, start: str = '2025-01-01') -> pd.DataFrame:
+    """Build a candle DataFrame indexed by timestamp like CoinbaseService returns."""
+    index = pd.date_range(start, periods=len(prices), freq='1h', name='timestamp')
+    return pd.DataFrame({'close': prices}, index=index)
+
+
+class TestRunningMeans:
+    """Test the pandas-compatible running mean kernels."""
+
+    @pytest.mark.parametrize("kind", PRICE_KINDS)
+    @pytest.mark.parametrize("window", [1, 3, 14, 50])
+    def test_rolling_mean_matches_pandas(self, kind, window):
+        values = make_prices(kind)
+        expected = pd.Series(values).rolling(window=window).mean().to_numpy()
+
+        mean = RollingMean(window)
+        actual = [mean.push(v) for v in values]
+
+        np.testing.assert_array_equal(np.array(actual), expected)
+
+    @pytest.mark.parametrize("kind", PRICE_KINDS)
+    @pytest.mark.parametrize("span", [5, 9, 12, 26])
+    def test_exponential_mean_matches_pandas(self, kind, span):
+        values = make_prices(kind)
+        expected = pd.Series(values).ewm(span=span).mean().to_numpy()
+
+        mean = ExponentialMean(span)
+        actual = [mean.push(v) for v in values]
+
+        np.testing.assert_array_equal(np.array(actual), expected)
+
+    def test_peek_does_not_mutate(self):
+        mean = RollingMean(3)
+        for v in [1.0, 2.0, 3.0]:
+            mean.push(v)
+
+        assert mean.peek(10.0) == pytest.approx(5.0)
+        assert mean.value == pytest.approx(2.0)
+        assert mean.push(10.0) == pytest.approx(5.0)
+
+
+class TestIncrementalSignalParity:
+    """Test incremental signal results against the batch path candle by candle."""
+
+    @pytest.mark.parametrize("kind", PRICE_KINDS)
+    @pytest.mark.parametrize("signal", SIGNALS, ids=lambda s: f"{s.name}-{s.get_required_periods()}")
+    def test_candle_by_candle_parity(self, kind, signal):
+        prices = make_prices(kind)
+        state = signal.create_state()
+
+        for i in range(len(prices)):
+            incremental = signal.calculate_from_state(state, prices[i])
+            batch = signal.calculate(pd.DataFrame({'close': prices[:i + 1]}))
+            # repr() compares bit-for-bit and treats NaN metadata as equal
+            assert repr(incremental) == repr(batch), \
+                f"{signal.name} diverged at candle {i}: {incremental} != {batch}"
+            state.update(prices[i])
+
+    def test_insufficient_history_returns_hold(self):
+        signal = MACDSignal()
+        state = signal.create_state()
+        state.update(100.0)
+
+        result = signal.calculate_from_state(state, 101.0)
+
+        assert result == {"score": 0, "action": "hold", "confidence": 0, "metadata": {}}
+
+
+class TestIndicatorStateStore:
+    """Test store syncing against growing, ticking and sliding candle frames."""
+
+    @pytest.mark.parametrize("signal", SIGNALS, ids=lambda s: f"{s.name}-{s.get_required_periods()}")
+    def test_live_candle_ticks_match_batch(self, signal):
+        store = IndicatorStateStore()
+        prices = make_prices('random_walk', n=120)
+        rng = np.random.default_rng(3)
+
+        for end in range(60, 120):
+            # Several ticks move the live candle's close before it closes
+            for _ in range(3):
+                ticking = prices[:end + 1].copy()
+                ticking[-1] += rng.normal(0, 0.5)
+                data = candles(ticking)
+                assert repr(store.calculate(signal, data, 'BTC-USD')) == repr(signal.calculate(data))
+
+        stats = store.get_stats()
+        assert stats['rebuilds'] == 0
+        # Seeded once with 60 closed candles, then one candle per new bar
+        assert stats['candles_advanced'] == 60 + 59
+
+    @pytest.mark.parametrize("signal", SIGNALS, ids=lambda s: f"{s.name}-{s.get_required_periods()}")
+    def test_sliding_window_ticks_match_batch(self, signal):
+        store = IndicatorStateStore()
+        prices = make_prices('random_walk', n=140)
+        rng = np.random.default_rng(5)
+
+        for end in range(99, 140):
+            # A fixed 100-candle window, like the production candle fetch
+            for _ in range(3):
+                window = prices[end - 99:end + 1].copy()
+                window[-1] += rng.normal(0, 0.5)
+                data = candles(window, start=str(pd.Timestamp('2025-01-01') + pd.Timedelta(hours=end - 99)))
+                assert repr(store.calculate(signal, data, 'BTC-USD')) == repr(signal.calculate(data))
+
+        stats = store.get_stats()
+        # Each slide starts the frame at a new candle; ticks within a candle reuse the state
+        assert stats['rebuilds'] == 40
+        assert stats['candles_advanced'] == 41 * 99
+
+    def test_states_are_bounded_lru(self):
+        store = IndicatorStateStore(max_states=2)
+        data = candles(make_prices('random_walk', n=40))
+        signal = RSISignal()
+
+        store.calculate(signal, data, 'BTC-USD')
+        store.calculate(signal, data, 'ETH-USD')
+        store.calculate(signal, data, 'BTC-USD')      # Most recently used
+        store.calculate(signal, data, 'SOL-USD')
+
+        stats = store.get_stats()
+        assert stats['tracked_states'] == 2
+        assert stats['evictions'] == 1
+        store.calculate(signal, data, 'BTC-USD')
+        assert store.get_stats()['candles_advanced'] == 3 * 39     # BTC-USD was kept
+
+    def test_gap_triggers_rebuild(self):
+        store = IndicatorStateStore()
+        signal = RSISignal()
+        prices = make_prices('random_walk', n=200)
+
+        store.calculate(signal, candles(prices[:100]), 'ETH-USD')
+        # A frame that no longer contains the last committed candle forces a reseed
+        later = candles(prices[150:200], start='2025-02-01')
+        result = store.calculate(signal, later, 'ETH-USD')
+
+        assert repr(result) == repr(signal.calculate(later))
+        assert store.get_stats()['rebuilds'] == 1
+
+    def test_states_are_keyed_by_pair_and_params(self):
+        store = IndicatorStateStore()
+        data = candles(make_prices('random_walk', n=80))
+
+        store.calculate(RSISignal(period=14), data, 'BTC-USD')
+        store.calculate(RSISignal(period=7), data, 'BTC-USD')
+        store.calculate(RSISignal(period=14), data, 'ETH-USD')
+
+        assert store.get_stats()['tracked_states'] == 3
+        assert store.reset('BTC-USD') == 2
+        assert store.get_stats()['tracked_states'] == 1
+
+    def test_frame_without_timestamps_falls_back_to_batch(self):
+        store = IndicatorStateStore()
+        signal = MovingAverageSignal()
+        data = pd.DataFrame({'close': make_prices('random_walk', n=40)})
+
+        assert store.calculate(signal, data, 'BTC-USD') == signal.calculate(data)
+        assert store.get_stats()['batch_fallbacks'] == 1
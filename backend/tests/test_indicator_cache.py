@@ -0,0 +1,161 @@
+"""
+Tests for the shared indicator result cache.
+
+Validates content-addressed hits, invalidation when a new candle closes,
+LRU eviction and the bypass paths for frames that can't be addressed.
+"""
+
+import pandas as pd
+import numpy as np
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.indicator_cache import IndicatorCache
+from backend.app.services.signals.technical import RSISignal, MACDSignal
+
+
+def candles(n: int = 60, seed: int = 1, start: str = '2025-01-01') -> pd.DataFrame:
+    """Build deterministic hourly candles indexed by timestamp."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(start, periods=n, freq='1h', name='timestamp')
+    return pd.DataFrame({'close': 100 + np.cumsum(rng.normal(0, 1, n))}, index=index)
+
+
+class CountingCompute:
+    """Compute callback that records how often the cache misses."""
+
+    def __init__(self, signal, data):
+        self.signal = signal
+        self.data = data
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.signal.calculate(self.data)
+
+
+class TestIndicatorCache:
+    """Test IndicatorCache keying, invalidation and eviction."""
+
+    def test_repeat_calculation_hits(self):
+        cache = IndicatorCache()
+        signal = RSISignal()
+        data = candles()
+        compute = CountingCompute(signal, data)
+
+        first = cache.get_or_compute('BTC-USD', signal, data, compute)
+        second = cache.get_or_compute('BTC-USD', signal, data.copy(), compute)
+
+        assert compute.calls == 1
+        assert second == first
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+
+    def test_cached_result_is_a_copy(self):
+        cache = IndicatorCache()
+        signal = RSISignal()
+        data = candles()
+        compute = CountingCompute(signal, data)
+
+        first = cache.get_or_compute('BTC-USD', signal, data, compute)
+        first['metadata']['mutated'] = True
+        second = cache.get_or_compute('BTC-USD', signal, data, compute)
+
+        assert 'mutated' not in second['metadata']
+
+    def test_parameters_and_pairs_are_separate_entries(self):
+        cache = IndicatorCache()
+        data = candles()
+
+        for pair, signal in [('BTC-USD', RSISignal(period=14)), ('BTC-USD', RSISignal(period=7)),
+                             ('ETH-USD', RSISignal(period=14))]:
+            cache.get_or_compute(pair, signal, data, CountingCompute(signal, data))
+
+        assert cache.get_stats()['misses'] == 3
+        assert cache.get_stats()['cache_size'] == 3
+
+    def test_live_candle_change_misses(self):
+        cache = IndicatorCache()
+        signal = MACDSignal()
+        data = candles()
+        ticked = data.copy()
+        ticked.iloc[-1, 0] += 0.5
+
+        cache.get_or_compute('BTC-USD', signal, data, CountingCompute(signal, data))
+        result = cache.get_or_compute('BTC-USD', signal, ticked, CountingCompute(signal, ticked))
+
+        assert repr(result) == repr(signal.calculate(ticked))
+        assert cache.get_stats()['misses'] == 2
+
+    def test_new_candle_invalidates_series(self):
+        cache = IndicatorCache()
+        full = candles(n=61)
+        older, newer = full.iloc[:60], full.iloc[1:]
+
+        for signal in [RSISignal(), MACDSignal()]:
+            cache.get_or_compute('BTC-USD', signal, older, CountingCompute(signal, older))
+        cache.get_or_compute('ETH-USD', RSISignal(), older, CountingCompute(RSISignal(), older))
+
+        signal = RSISignal()
+        cache.get_or_compute('BTC-USD', signal, newer, CountingCompute(signal, newer))
+
+        stats = cache.get_stats()
+        assert stats['invalidations'] == 2
+        # The ETH-USD entry and the new BTC-USD entry remain
+        assert stats['cache_size'] == 2
+
+    def test_older_window_is_not_cached(self):
+        cache = IndicatorCache()
+        signal = RSISignal()
+        full = candles(n=61)
+        older, newer = full.iloc[:60], full.iloc[1:]
+
+        cache.get_or_compute('BTC-USD', signal, newer, CountingCompute(signal, newer))
+        compute = CountingCompute(signal, older)
+        cache.get_or_compute('BTC-USD', signal, older, compute)
+        cache.get_or_compute('BTC-USD', signal, older, compute)
+
+        assert compute.calls == 2
+        assert cache.get_stats()['bypassed'] == 2
+        assert cache.get_stats()['cache_size'] == 1
+
+    def test_frame_without_timestamps_bypasses(self):
+        cache = IndicatorCache()
+        signal = RSISignal()
+        data = candles().reset_index(drop=True)
+        compute = CountingCompute(signal, data)
+
+        cache.get_or_compute('BTC-USD', signal, data, compute)
+        cache.get_or_compute('BTC-USD', signal, data, compute)
+
+        assert compute.calls == 2
+        assert cache.get_stats()['bypassed'] == 2
+
+    def test_lru_eviction(self):
+        cache = IndicatorCache(max_entries=2)
+        data = candles()
+        signals = [RSISignal(period=7), RSISignal(period=14), RSISignal(period=21)]
+
+        for signal in signals:
+            cache.get_or_compute('BTC-USD', signal, data, CountingCompute(signal, data))
+
+        assert cache.get_stats()['cache_size'] == 2
+        assert cache.get_stats()['evictions'] == 1
+        # The least recently used entry (period=7) was evicted
+        compute = CountingCompute(signals[0], data)
+        cache.get_or_compute('BTC-USD', signals[0], data, compute)
+        assert compute.calls == 1
+
+    def test_invalidate_by_pair(self):
+        cache = IndicatorCache()
+        data = candles()
+        for pair in ['BTC-USD', 'ETH-USD']:
+            cache.get_or_compute(pair, RSISignal(), data, CountingCompute(RSISignal(), data))
+
+        assert cache.invalidate('BTC-USD') == 1
+        assert cache.get_stats()['cache_size'] == 1
+        assert cache.invalidate() == 1
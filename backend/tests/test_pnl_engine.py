@@ -0,0 +1,159 @@
+"""
+Tests for the one-pass P&L engine behind RawTradeService.
+
+Validates per-product holdings, average-cost realized P&L, fees and
+long/short unrealized P&L, that every fill counts (no 1000-trade cap), and
+that a full unrealized P&L report costs one raw trade query and one batch
+ticker lookup regardless of the number of products.
+"""
+
+import pytest
+from types import SimpleNamespace
+import sys
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import RawTrade
+from backend.app.services.pnl_engine import PnLEngine
+from backend.app.services.raw_trade_service import RawTradeService
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    """In-memory database session."""
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def add_fills(db, product_id, fills, start=0):
+    """fills: (side, size, price, commission[, size_in_quote]) oldest first."""
+    for n, (side, size, price, commission, *quote) in enumerate(fills, start):
+        db.add(RawTrade(fill_id=f"{product_id}-{n}", order_id=f"order-{n}", product_id=product_id,
+                        side=side, size=size, size_in_quote=bool(quote and quote[0]), price=price,
+                        commission=commission, created_at=f"2025-01-01T00:00:00.{n:06d}Z"))
+    db.commit()
+
+
+class FakeTickers:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    def __call__(self, product_ids):
+        self.calls.append(list(product_ids))
+        return {product_id: SimpleNamespace(price=self.prices[product_id])
+                for product_id in product_ids if product_id in self.prices}
+
+
+class TestAccounting:
+    """Test the per-product numbers."""
+
+    def test_long_position(self, db):
+        add_fills(db, 'BTC-USD', [
+            ('BUY', 1.0, 100.0, 1.0),
+            ('BUY', 1.0, 200.0, 1.0),
+            ('SELL', 1.0, 180.0, 1.0),       # Average cost 150
+            ('BUY', 2.0, 100.0, None, True),  # size_in_quote: counted, not applied
+        ])
+
+        data = PnLEngine(db).calculate(include_unrealized=True, get_tickers=FakeTickers({'BTC-USD': 170.0}))['BTC-USD']
+
+        assert (data['total_trades'], data['buy_trades'], data['sell_trades']) == (4, 2, 1)
+        assert data['total_spent'] == 302.0
+        assert data['total_received'] == 179.0
+        assert data['total_fees'] == 3.0
+        assert data['realized_pnl'] == pytest.approx(29.0)
+        assert data['current_holdings'] == 1.0
+        assert data['average_buy_price'] == 150.0
+        assert data['unrealized_pnl'] == pytest.approx(20.0)
+        assert data['net_pnl'] == pytest.approx(49.0)
+
+    def test_realized_uses_only_earlier_buys(self, db):
+        add_fills(db, 'ETH-USD', [
+            ('BUY', 1.0, 100.0, 0.0),
+            ('SELL', 1.0, 110.0, 0.0),
+            ('BUY', 1.0, 300.0, 0.0),
+        ])
+
+        data = PnLEngine(db).calculate()['ETH-USD']
+
+        assert data['realized_pnl'] == pytest.approx(10.0)
+        assert data['current_holdings'] == 0.0       # Realized-only report leaves holdings out
+
+    def test_short_position(self, db):
+        add_fills(db, 'SOL-USD', [
+            ('SELL', 2.0, 50.0, 0.0),
+            ('SELL', 2.0, 70.0, 0.0),
+            ('BUY', 1.0, 40.0, 0.0),
+        ])
+
+        data = PnLEngine(db).calculate(include_unrealized=True, get_tickers=FakeTickers({'SOL-USD': 55.0}))['SOL-USD']
+
+        assert data['current_holdings'] == -3.0
+        assert data['average_short_price'] == 60.0
+        assert data['unrealized_pnl'] == pytest.approx(3 * 60.0 - 3 * 55.0)
+
+    def test_unpriced_open_position_keeps_realized_only(self, db):
+        add_fills(db, 'NEW-USD', [('BUY', 1.0, 10.0, 0.0), ('SELL', 0.5, 12.0, 0.0)])
+
+        data = PnLEngine(db).calculate(include_unrealized=True, get_tickers=FakeTickers({}))['NEW-USD']
+
+        assert data['current_holdings'] == 0.5
+        assert data['unrealized_pnl'] == 0.0
+        assert data['net_pnl'] == data['realized_pnl'] == pytest.approx(1.0)
+
+
+class TestSingleScan:
+    """Test the query and ticker costs."""
+
+    def test_no_truncation_at_1000_trades(self, db):
+        add_fills(db, 'BTC-USD', [('BUY', 0.01, 100.0, 0.01)] * 1500 + [('SELL', 0.01, 110.0, 0.01)] * 1000)
+
+        data = RawTradeService(db).calculate_pnl_by_product()['BTC-USD']
+
+        assert data['total_trades'] == 2500
+        assert data['sell_trades'] == 1000
+        assert data['realized_pnl'] == pytest.approx(1000 * (0.01 * 10 - 0.01))
+
+    def test_one_query_and_one_ticker_lookup(self, db, engine):
+        prices = {}
+        for i in range(20):
+            product_id = f"P{i}-USD"
+            add_fills(db, product_id, [('BUY', 1.0, 10.0, 0.1), ('SELL', 0.5 if i % 2 else 1.0, 12.0, 0.1)])
+            prices[product_id] = 11.0
+        tickers = FakeTickers(prices)
+        statements = []
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        results = PnLEngine(db).calculate(include_unrealized=True, get_tickers=tickers)
+
+        assert len(results) == 20
+        assert len([statement for statement in statements if 'FROM raw_trades' in statement]) == 1
+        assert len(tickers.calls) == 1
+        assert sorted(tickers.calls[0]) == sorted(f"P{i}-USD" for i in range(20) if i % 2)
+
+    def test_unrealized_report_through_the_service(self, db, monkeypatch):
+        from backend.app.utils import service_registry
+        add_fills(db, 'BTC-USD', [('BUY', 2.0, 100.0, 0.0)])
+        tickers = FakeTickers({'BTC-USD': 110.0})
+        monkeypatch.setattr(service_registry, 'get_market_service', lambda: SimpleNamespace(get_tickers=tickers))
+
+        data = RawTradeService(db).calculate_unrealized_pnl_by_product()['BTC-USD']
+
+        assert data['unrealized_pnl'] == pytest.approx(20.0)
+        assert tickers.calls == [['BTC-USD']]
@@ -0,0 +1,285 @@
+"""
+Tests for the persisted FIFO position ledger.
+
+Validates that fills stored through RawTradeService keep the ledger equal
+to a from-scratch FIFO replay (including partial lots, over-selling,
+size_in_quote fills and late out-of-order fills), that a fill is only
+stored together with its ledger update, that fills inserted around the
+ledger are caught up per product, that position reads no longer scan raw
+trades, and that the consistency checker and rebuild catch
+and repair drift.
+"""
+
+import pytest
+import random
+from decimal import Decimal
+import sys
+import os
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import RawTrade, PositionLedger
+from backend.app.services.position_ledger_service import PositionLedgerService
+from backend.app.services.position_tracking_service import PositionTrackingService
+from backend.app.services.raw_trade_service import RawTradeService
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def db(engine):
+    """In-memory database session."""
+    session = sessionmaker(bind=engine, autoflush=False)()
+    yield session
+    session.close()
+
+
+def fill(n, product_id, side, size, price, commission=0.1, size_in_quote=False, minute=None):
+    minute = n if minute is None else minute
+    return {
+        'trade_id': f"fill-{n}",
+        'order_id': f"order-{n}",
+        'product_id': product_id,
+        'side': side,
+        'size': size,
+        'size_in_quote': size_in_quote,
+        'price': price,
+        'commission': commission,
+        'trade_time': f"2025-01-{1 + minute // 1440:02d}T{minute // 60 % 24:02d}:{minute % 60:02d}:00Z"
+    }
+
+
+def random_fills(count, seed=7):
+    rng = random.Random(seed)
+    fills = []
+    for n in range(count):
+        product_id = rng.choice(['BTC-USD', 'ETH-USD', 'SOL-USD'])
+        side = 'BUY' if rng.random() < 0.55 else 'SELL'
+        fills.append(fill(n, product_id, side, round(rng.uniform(0.01, 2.0), 6),
+                          round(rng.uniform(50, 150), 2), round(rng.uniform(0, 0.5), 4),
+                          size_in_quote=rng.random() < 0.05))
+    return fills
+
+
+def assert_matches_replay(service):
+    ledger = service.calculate_positions()
+    replay = service.replay_positions()
+    assert set(ledger) == set(replay)
+    for product_id, position in replay.items():
+        ours = ledger[product_id]
+        assert ours.total_quantity == pytest.approx(position.total_quantity, abs=Decimal('1e-9'))
+        assert ours.realized_pnl == pytest.approx(position.realized_pnl, abs=Decimal('1e-9'))
+        assert ours.total_fees == pytest.approx(position.total_fees, abs=Decimal('1e-9'))
+        assert [lot.fill_id for lot in ours.lots] == [lot.fill_id for lot in position.lots]
+
+
+class TestIncrementalUpdates:
+    """Test the ledger maintained by store_raw_trade."""
+
+    def test_stored_fills_match_full_replay(self, db):
+        raw_trades = RawTradeService(db)
+        for fill_data in random_fills(300):
+            raw_trades.store_raw_trade(fill_data)
+
+        service = PositionTrackingService(db)
+        assert_matches_replay(service)
+        assert PositionLedgerService(db).check_consistency()['consistent']
+
+    def test_partial_lots_and_realized_pnl(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+        raw_trades.store_raw_trade(fill(2, 'BTC-USD', 'BUY', 2.0, 110.0))
+        raw_trades.store_raw_trade(fill(3, 'BTC-USD', 'SELL', 1.5, 120.0))
+
+        position = PositionTrackingService(db).get_position_by_product('BTC-USD')
+
+        assert position.total_quantity == Decimal('1.5')
+        assert position.realized_pnl == Decimal('25')        # 1 x 20 + 0.5 x 10
+        assert position.total_fees == Decimal('0.3')
+        assert [(lot.fill_id, lot.quantity) for lot in position.lots] == [('fill-2', Decimal('1.5'))]
+        assert position.lots[0].purchase_date.isoformat() == '2025-01-01T00:02:00+00:00'
+
+    def test_overselling_closes_the_position(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'ETH-USD', 'BUY', 1.0, 100.0))
+        raw_trades.store_raw_trade(fill(2, 'ETH-USD', 'SELL', 3.0, 90.0))
+
+        position = PositionTrackingService(db).get_position_by_product('ETH-USD')
+
+        assert position.total_quantity == 0
+        assert position.lots == []
+        assert position.realized_pnl == Decimal('-10')
+
+    def test_duplicate_fill_is_applied_once(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+
+        entry = PositionLedgerService(db).get_entry('BTC-USD')
+
+        assert entry.trade_count == 1
+        assert entry.total_quantity == Decimal('1')
+
+    def test_late_fill_replays_its_product(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0, minute=10))
+        raw_trades.store_raw_trade(fill(2, 'BTC-USD', 'SELL', 1.0, 120.0, minute=30))
+        raw_trades.store_raw_trade(fill(3, 'ETH-USD', 'BUY', 1.0, 50.0, minute=40))
+
+        # Bought before the sell, but synced after it
+        raw_trades.store_raw_trade(fill(4, 'BTC-USD', 'BUY', 1.0, 80.0, minute=5))
+
+        position = PositionTrackingService(db).get_position_by_product('BTC-USD')
+        assert position.realized_pnl == Decimal('40')        # The sell closed the 80 lot first
+        assert [lot.fill_id for lot in position.lots] == ['fill-1']
+        assert PositionLedgerService(db).check_consistency()['consistent']
+
+
+    def test_ledger_failure_does_not_store_the_fill(self, db, monkeypatch):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+
+        def fail(self, trade):
+            raise RuntimeError('ledger unavailable')
+        monkeypatch.setattr(PositionLedgerService, 'apply_trade', fail)
+        assert raw_trades.store_raw_trade(fill(2, 'BTC-USD', 'BUY', 2.0, 90.0)) is None
+        monkeypatch.undo()
+
+        assert db.query(RawTrade).count() == 1
+        raw_trades.store_raw_trade(fill(3, 'ETH-USD', 'BUY', 1.0, 50.0))
+        raw_trades.store_raw_trade(fill(2, 'BTC-USD', 'BUY', 2.0, 90.0))   # Re-fetched by the next fill sync
+        assert PositionLedgerService(db).get_entry('BTC-USD').total_quantity == Decimal('3')
+        assert PositionLedgerService(db).check_consistency()['consistent']
+
+
+class TestReads:
+    """Test that position reads are ledger lookups."""
+
+    def test_reads_do_not_scan_raw_trades(self, db, engine):
+        raw_trades = RawTradeService(db)
+        for fill_data in random_fills(200):
+            raw_trades.store_raw_trade(fill_data)
+        statements = []
+        event.listen(engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: statements.append(statement))
+
+        service = PositionTrackingService(db)
+        summaries = service.get_position_summaries()
+        service.get_position_by_product('BTC-USD')
+
+        assert not [statement for statement in statements if 'raw_trades' in statement]
+        assert not [statement for statement in statements if not statement.lstrip().upper().startswith('SELECT')]
+        assert sum(summary.trade_count for summary in summaries) == 200
+
+    def test_summaries_keep_trade_counts(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'SOL-USD', 'BUY', 1.0, 10.0))
+        raw_trades.store_raw_trade(fill(2, 'SOL-USD', 'BUY', 1.0, 11.0, size_in_quote=True))
+        raw_trades.store_raw_trade(fill(3, 'SOL-USD', 'SELL', 0.5, 12.0))
+
+        summary = PositionTrackingService(db).get_position_summaries()[0]
+
+        assert (summary.trade_count, summary.buy_count, summary.sell_count) == (3, 2, 1)
+        assert summary.current_quantity == Decimal('0.5')
+
+    def test_fills_inserted_directly_are_caught_up_by_sync(self, db):
+        RawTradeService(db).store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+        # Bulk sync scripts insert RawTrade rows without RawTradeService
+        db.add(RawTrade(fill_id='fill-2', order_id='order-2', product_id='BTC-USD', side='BUY',
+                        size=2.0, size_in_quote=False, price=90.0, commission=0.2,
+                        created_at='2025-01-01T00:02:00Z'))
+        db.commit()
+        assert PositionTrackingService(db).get_position_by_product('BTC-USD').total_quantity == Decimal('1')
+
+        assert PositionLedgerService(db).sync() == 1
+
+        assert PositionTrackingService(db).get_position_by_product('BTC-USD').total_quantity == Decimal('3')
+        assert PositionLedgerService(db).check_consistency()['consistent']
+
+    def test_direct_fill_behind_another_products_fill_is_caught_up(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+        db.add(RawTrade(fill_id='fill-2', order_id='order-2', product_id='BTC-USD', side='BUY',
+                        size=2.0, size_in_quote=False, price=90.0, commission=0.2,
+                        created_at='2025-01-01T00:02:00Z'))
+        db.commit()
+        # A later fill of another product must not hide the BTC fill from sync()
+        raw_trades.store_raw_trade(fill(3, 'ETH-USD', 'BUY', 1.0, 50.0))
+
+        assert PositionLedgerService(db).sync() == 1
+        assert PositionLedgerService(db).get_entry('BTC-USD').total_quantity == Decimal('3')
+        assert PositionLedgerService(db).check_consistency()['consistent']
+
+    def test_store_catches_up_its_products_direct_fills(self, db):
+        raw_trades = RawTradeService(db)
+        raw_trades.store_raw_trade(fill(1, 'BTC-USD', 'BUY', 1.0, 100.0))
+        db.add(RawTrade(fill_id='fill-2', order_id='order-2', product_id='BTC-USD', side='BUY',
+                        size=2.0, size_in_quote=False, price=90.0, commission=0.2,
+                        created_at='2025-01-01T00:02:00Z'))
+        db.commit()
+        raw_trades.store_raw_trade(fill(3, 'BTC-USD', 'SELL', 2.5, 110.0))
+
+        entry = PositionLedgerService(db).get_entry('BTC-USD')
+        assert entry.trade_count == 3
+        assert entry.total_quantity == Decimal('0.5')
+        assert PositionLedgerService(db).check_consistency()['consistent']
+
+    def test_empty_ledger_is_built_on_first_sync(self, db):
+        for fill_data in random_fills(50):
+            db.add(RawTrade(fill_id=fill_data['trade_id'], order_id=fill_data['order_id'],
+                            product_id=fill_data['product_id'], side=fill_data['side'],
+                            size=fill_data['size'], size_in_quote=fill_data['size_in_quote'],
+                            price=fill_data['price'], commission=fill_data['commission'],
+                            created_at=fill_data['trade_time']))
+        db.commit()
+        assert PositionTrackingService(db).calculate_positions() == {}
+
+        assert PositionLedgerService(db).sync() == 50
+
+        assert_matches_replay(PositionTrackingService(db))
+
+
+class TestConsistency:
+    """Test the consistency checker and rebuild."""
+
+    def test_checker_reports_drift_and_rebuild_repairs_it(self, db):
+        raw_trades = RawTradeService(db)
+        for fill_data in random_fills(100):
+            raw_trades.store_raw_trade(fill_data)
+        ledger = PositionLedgerService(db)
+        entry = ledger.get_entry('ETH-USD')
+        entry.realized_pnl = Decimal(entry.realized_pnl) + 1
+        entry.trade_count += 1
+        db.commit()
+
+        result = ledger.check_consistency()
+
+        assert not result['consistent']
+        assert {(m['product_id'], m['field']) for m in result['mismatches']} == {
+            ('ETH-USD', 'realized_pnl'), ('ETH-USD', 'trade_counts')
+        }
+
+        ledger.rebuild(['ETH-USD'])
+        assert ledger.check_consistency()['consistent']
+
+    def test_rebuild_from_zero(self, db):
+        raw_trades = RawTradeService(db)
+        for fill_data in random_fills(100):
+            raw_trades.store_raw_trade(fill_data)
+        ledger = PositionLedgerService(db)
+
+        result = ledger.rebuild()
+
+        assert result == {'products_rebuilt': 3, 'trades_replayed': 100}
+        assert db.query(PositionLedger).count() == 3
+        assert ledger.check_consistency()['consistent']
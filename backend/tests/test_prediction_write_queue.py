@@ -0,0 +1,134 @@
+"""
+Tests for the SignalPredictionRecord write-behind queue.
+
+Validates batched background inserts, drop counting when the queue is
+full, that a dead flusher thread is restarted, and that stop() flushes
+everything still queued.
+"""
+
+import pytest
+import threading
+import sys
+import os
+from datetime import datetime
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import SignalPredictionRecord
+from backend.app.services.prediction_write_queue import PredictionWriteQueue
+
+
+def prediction_row(i: int) -> dict:
+    return {
+        'timestamp': datetime(2025, 1, 1),
+        'pair': 'BTC-USD',
+        'regime': 'RANGING',
+        'signal_type': 'rsi',
+        'signal_score': i / 100,
+        'prediction': 'hold',
+        'confidence': 0.5,
+        'trade_executed': False,
+        'evaluation_period_minutes': 60
+    }
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def statements(engine):
+    """Records (statement, executemany) for every insert into signal_predictions."""
+    recorded = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO signal_predictions'):
+            recorded.append(executemany)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    return recorded
+
+
+class TestPredictionWriteQueue:
+    """Test PredictionWriteQueue batching, backpressure and shutdown."""
+
+    def test_rows_are_written_in_batches_on_stop(self, engine, statements):
+        write_queue = PredictionWriteQueue(batch_size=100, flush_interval=0.05,
+                                           session_factory=sessionmaker(bind=engine))
+
+        for i in range(250):
+            assert write_queue.enqueue(prediction_row(i))
+        assert write_queue.stop()
+
+        session = sessionmaker(bind=engine)()
+        assert session.query(SignalPredictionRecord).count() == 250
+        stats = write_queue.get_stats()
+        assert stats['written'] == 250
+        assert stats['dropped'] == 0
+        assert stats['queue_depth'] == 0
+        assert stats['batches'] == len(statements) >= 3
+        assert all(statements)
+
+    def test_full_queue_drops_without_blocking(self, engine):
+        blocker = threading.Event()
+
+        def blocked_session():
+            # Hold the flusher so the queue fills up
+            blocker.wait(5)
+            return sessionmaker(bind=engine)()
+
+        write_queue = PredictionWriteQueue(max_size=10, batch_size=1, flush_interval=0.01,
+                                           session_factory=blocked_session)
+        results = [write_queue.enqueue(prediction_row(i)) for i in range(30)]
+        blocker.set()
+        write_queue.stop()
+
+        stats = write_queue.get_stats()
+        assert results.count(False) == stats['dropped'] > 0
+        assert stats['enqueued'] + stats['dropped'] == 30
+        assert stats['written'] == stats['enqueued']
+        assert stats['max_queue_depth'] == 10
+        assert stats['backpressure_events'] > 0
+
+    def test_failed_batch_is_counted(self):
+        def broken_session():
+            raise RuntimeError("database unavailable")
+
+        write_queue = PredictionWriteQueue(flush_interval=0.01, session_factory=broken_session)
+        write_queue.enqueue(prediction_row(1))
+        write_queue.stop()
+
+        assert write_queue.get_stats()['failed'] == 1
+        assert write_queue.get_stats()['written'] == 0
+
+    def test_dead_flusher_is_restarted(self, engine):
+        Session = sessionmaker(bind=engine)
+        write_queue = PredictionWriteQueue(flush_interval=0.01, session_factory=Session)
+        # A flusher that died (or was lost across a fork)
+        dead_thread = threading.Thread(target=lambda: None)
+        dead_thread.start()
+        dead_thread.join()
+        write_queue._thread = dead_thread
+
+        write_queue.enqueue(prediction_row(1))
+
+        assert write_queue.get_stats()['running']
+        assert write_queue.stop()
+        session = Session()
+        assert session.query(SignalPredictionRecord).count() == 1
+        session.close()
+
+    def test_enqueue_after_stop_is_dropped(self, engine):
+        write_queue = PredictionWriteQueue(session_factory=sessionmaker(bind=engine))
+        write_queue.stop()
+
+        assert not write_queue.enqueue(prediction_row(1))
+        assert write_queue.get_stats()['dropped'] == 1
@@ -0,0 +1,202 @@
+"""
+Tests for per-cycle regime snapshots.
+
+Validates that an evaluation cycle analyzes each pair's regime once and
+shares it across threshold selection, prediction tagging and position
+sizing, and that the snapshot a worker publishes to Redis is served by
+the trends API.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import sys
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import Bot
+from backend.app.services import position_sizing_engine, regime_snapshot, signal_performance_tracker, trend_detection_engine
+from backend.app.services.signal_performance_tracker import SignalPerformanceTracker
+from backend.app.services.bot_evaluator import BotSignalEvaluator
+from backend.app.services.regime_snapshot import RegimeSnapshot, publish_regime_snapshot
+from backend.app.api.trends import get_regime_snapshot
+
+
+CONFIG = {
+    'rsi': {'enabled': True, 'weight': 0.5, 'period': 14},
+    'moving_average': {'enabled': True, 'weight': 0.5, 'fast_period': 10, 'slow_period': 20}
+}
+
+
+class CountingTrendEngine:
+    """Trend engine stand-in that counts analyze_trend calls per pair."""
+
+    def __init__(self):
+        self.calls = []
+
+    def analyze_trend(self, product_id):
+        self.calls.append(product_id)
+        return {
+            'product_id': product_id,
+            'trend_strength': 0.5,
+            'confidence': 0.8,
+            'regime': 'STRONG_TRENDING',
+            'timeframe_analysis': {},
+            'analysis_timestamp': '2025-01-01T00:00:00'
+        }
+
+
+class FakeRedis:
+    """Dict-backed stand-in for the Redis calls the snapshot publisher makes."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+
+class RecordingSink:
+    """Write sink stand-in that keeps the queued rows."""
+
+    def __init__(self):
+        self.predictions = []
+
+    def add_signal_prediction(self, values):
+        self.predictions.append(values)
+
+    def add_signal_history(self, values):
+        pass
+
+    def update_bot(self, bot, **fields):
+        pass
+
+
+@pytest.fixture
+def db():
+    """In-memory database session."""
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def bots(db):
+    created = []
+    for pair in ['BTC-USD', 'ETH-USD']:
+        for i in range(3):
+            bot = Bot(name=f"{pair} {i}", pair=pair, status='RUNNING', signal_config=json.dumps(CONFIG),
+                      confirmation_minutes=5, position_size_usd=10.0,
+                      use_trend_detection=True, use_position_sizing=True)
+            db.add(bot)
+            created.append(bot)
+    db.commit()
+    return created
+
+
+@pytest.fixture
+def trend_engine(monkeypatch):
+    engine = CountingTrendEngine()
+    # Any lookup that bypasses the snapshot would show up as an extra call
+    monkeypatch.setattr(trend_detection_engine, '_global_trend_engine', engine)
+    monkeypatch.setattr(position_sizing_engine, 'get_trend_engine', lambda: engine)
+    return engine
+
+
+def create_evaluator(db, monkeypatch, write_sink):
+    evaluator = BotSignalEvaluator(db, enable_confirmation=False, write_sink=write_sink)
+    monkeypatch.setattr(evaluator, '_check_pre_evaluation_blocks', lambda bot, data: None)
+    monkeypatch.setattr(evaluator, '_should_execute_automatic_trade', lambda bot, result: False)
+    monkeypatch.setattr(signal_performance_tracker, '_signal_performance_tracker', SignalPerformanceTracker(db))
+    return evaluator
+
+
+def falling_candles(n: int = 100) -> pd.DataFrame:
+    index = pd.date_range('2025-01-01', periods=n, freq='1h', name='timestamp')
+    close = 100 - np.linspace(0, 30, n) + np.sin(np.arange(n))
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': 1.0}, index=index)
+
+
+class TestRegimeSnapshot:
+    """Test regime lookups per evaluation cycle."""
+
+    def test_snapshot_memoizes_per_pair(self, trend_engine):
+        snapshot = RegimeSnapshot()
+
+        for _ in range(5):
+            assert snapshot.get_regime('BTC-USD') == 'STRONG_TRENDING'
+        snapshot.get('ETH-USD')
+
+        assert trend_engine.calls == ['BTC-USD', 'ETH-USD']
+        summary = snapshot.to_dict()
+        assert summary['lookups'] == 6
+        assert summary['computations'] == 2
+        assert summary['pairs']['BTC-USD']['trend_strength'] == 0.5
+
+    def test_batch_cycle_looks_up_each_pair_once(self, db, bots, trend_engine, monkeypatch):
+        sink = RecordingSink()
+        evaluator = create_evaluator(db, monkeypatch, sink)
+        snapshot = RegimeSnapshot()
+        candles = falling_candles()
+
+        results = evaluator.evaluate_bots_batch(bots, {'BTC-USD': candles, 'ETH-USD': candles}, snapshot)
+
+        assert sorted(trend_engine.calls) == ['BTC-USD', 'ETH-USD']
+        assert len(results) == 6
+        # Predictions are tagged with the snapshot's regime
+        assert sink.predictions
+        assert {row['regime'] for row in sink.predictions} == {'STRONG_TRENDING'}
+        # Sized bots used the snapshot's regime
+        sized = [r['position_sizing'] for r in results.values() if r['action'] in ('buy', 'sell')]
+        assert sized
+        assert all(s['regime_analysis']['regime'] == 'STRONG_TRENDING' for s in sized)
+
+    def test_single_evaluation_looks_up_once(self, db, bots, trend_engine, monkeypatch):
+        evaluator = create_evaluator(db, monkeypatch, RecordingSink())
+
+        evaluator.evaluate_bot(bots[0], falling_candles())
+
+        assert trend_engine.calls == ['BTC-USD']
+
+    def test_published_snapshot_is_served(self, trend_engine, monkeypatch):
+        redis_client = FakeRedis()
+        monkeypatch.setattr(regime_snapshot, '_get_redis_client', lambda: redis_client)
+        monkeypatch.setattr(regime_snapshot, '_latest_regime_snapshot', None)
+        assert get_regime_snapshot() == {'available': False, 'pairs': {}}
+
+        snapshot = RegimeSnapshot()
+        snapshot.get('BTC-USD')
+        publish_regime_snapshot(snapshot)
+        assert redis_client.ttls[regime_snapshot.REGIME_SNAPSHOT_KEY] == regime_snapshot.REGIME_SNAPSHOT_TTL_SECONDS
+
+        # The API runs in another process: only Redis carries the snapshot there
+        monkeypatch.setattr(regime_snapshot, '_latest_regime_snapshot', None)
+        response = get_regime_snapshot()
+        assert response['available'] is True
+        assert response['pairs']['BTC-USD']['regime'] == 'STRONG_TRENDING'
+        assert response['published_at'] is not None
+
+    def test_snapshot_served_in_process_without_redis(self, trend_engine, monkeypatch):
+        monkeypatch.setattr(regime_snapshot, '_get_redis_client', lambda: None)
+        monkeypatch.setattr(regime_snapshot, '_latest_regime_snapshot', None)
+
+        snapshot = RegimeSnapshot()
+        snapshot.get('ETH-USD')
+        publish_regime_snapshot(snapshot)
+
+        assert get_regime_snapshot()['pairs']['ETH-USD']['regime'] == 'STRONG_TRENDING'
@@ -0,0 +1,187 @@
+"""
+Tests for single-flight historical candle refreshes.
+
+Validates that concurrent misses across MarketDataService instances (standing
+in for API workers, the Celery worker and the streaming evaluator) share one
+upstream fetch through the Redis fetch lock, that stale series are served
+while another caller refreshes, and that XFetch refreshes hot series early.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import threading
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services import market_data_service as market_data_module
+from backend.app.services.candle_store import CandleStore
+from backend.app.services.market_data_service import MarketDataService
+
+
+GRANULARITY = 3600
+LOCK_KEY = 'market_data:lock:candles:BTC-USD:3600'
+META_KEY = 'market_data:candles_meta:BTC-USD:3600'
+
+
+def exchange_candles(count: int) -> pd.DataFrame:
+    last_start = int(time.time() // GRANULARITY) * GRANULARITY
+    index = pd.date_range(end=pd.Timestamp(last_start, unit='s'), periods=count,
+                          freq=f'{GRANULARITY}s', name='timestamp')
+    index.freq = None
+    close = np.arange(count, dtype=float) + 100
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': 2.0}, index=index)
+
+
+class SlowExchange:
+    """Counts upstream fetches; each one takes a while, like the real rate-limited call."""
+
+    def __init__(self, candles: pd.DataFrame, delay: float = 0.2):
+        self.candles = candles
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        candles = self.candles
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        return candles.tail(limit)
+
+
+def make_service(exchange, redis_client):
+    service = MarketDataService(coinbase_service=exchange, redis_client=redis_client)
+    service.candle_store = CandleStore(max_idle_seconds=-1)   # Never serve from the store
+    service.stale_while_revalidate = False                     # Refresh on the caller's thread
+    service.xfetch_beta = 0.0
+    return service
+
+
+def age_series(redis_client, seconds):
+    meta = json.loads(redis_client.data[META_KEY])
+    meta['fetched_at'] -= seconds
+    redis_client.data[META_KEY] = json.dumps(meta).encode()
+
+
+class TestSingleFlight:
+    """Test that concurrent misses are coalesced."""
+
+    def test_concurrent_cold_misses_fetch_once(self, fake_redis):
+        redis_client = fake_redis
+        exchange = SlowExchange(exchange_candles(100))
+        services = [make_service(exchange, redis_client) for _ in range(6)]
+        results = [None] * len(services)
+
+        def worker(i):
+            results[i] = services[i].get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(services))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert exchange.calls == 1
+        assert sum(s.get_cache_stats()['coalesced_requests'] for s in services) == len(services) - 1
+        for result in results:
+            pd.testing.assert_frame_equal(result, results[0])
+        assert LOCK_KEY not in redis_client.data
+
+    def test_stale_series_served_while_another_caller_refreshes(self, fake_redis):
+        redis_client = fake_redis
+        exchange = SlowExchange(exchange_candles(100), delay=0)
+        service = make_service(exchange, redis_client)
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_refresh_seconds + 1)
+        redis_client.set(LOCK_KEY, 'other-worker', nx=True)
+
+        stale = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        pd.testing.assert_frame_equal(stale, first)
+        assert exchange.calls == 1
+        assert service.get_cache_stats()['coalesced_requests'] == 1
+        assert redis_client.data[LOCK_KEY] == b'other-worker'   # Not ours to release
+
+    def test_release_keeps_a_lock_retaken_after_expiry(self, fake_redis):
+        redis_client = fake_redis
+        service = make_service(SlowExchange(exchange_candles(100), delay=0), redis_client)
+        acquired, token = service._acquire_fetch_lock('BTC-USD', GRANULARITY)
+        assert acquired
+        # Our lock expired mid-fetch and another worker took it
+        redis_client.data[LOCK_KEY] = b'other-worker'
+
+        service._release_fetch_lock('BTC-USD', GRANULARITY, token)
+
+        assert redis_client.data[LOCK_KEY] == b'other-worker'
+
+    def test_abandoned_lock_times_out_to_own_fetch(self, fake_redis):
+        redis_client = fake_redis
+        exchange = SlowExchange(exchange_candles(100), delay=0)
+        service = make_service(exchange, redis_client)
+        service.single_flight_wait_seconds = 0.1
+        redis_client.set(LOCK_KEY, 'crashed-worker', nx=True)
+
+        result = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        assert len(result) == 50
+        assert exchange.calls == 1
+        assert service.get_cache_stats()['lock_wait_timeouts'] == 1
+
+
+class TestEarlyRefresh:
+    """Test XFetch probabilistic early refresh."""
+
+    def test_fresh_series_is_not_refreshed_without_xfetch(self, fake_redis):
+        redis_client = fake_redis
+        exchange = SlowExchange(exchange_candles(100), delay=0)
+        service = make_service(exchange, redis_client)
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_refresh_seconds - 1)
+
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        assert exchange.calls == 1
+
+    def test_hot_series_refreshes_before_expiry(self, fake_redis, monkeypatch):
+        redis_client = fake_redis
+        exchange = SlowExchange(exchange_candles(100), delay=0)
+        service = make_service(exchange, redis_client)
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        meta = json.loads(redis_client.data[META_KEY])
+        meta['fetch_seconds'] = 2.0
+        meta['fetched_at'] -= service.historical_refresh_seconds - 5    # Expires in 5s
+        redis_client.data[META_KEY] = json.dumps(meta).encode()
+
+        service.xfetch_beta = 1.0
+        monkeypatch.setattr(market_data_module.random, 'random', lambda: 0.99)   # -log(0.01) * 2s > 5s
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        stats = service.get_cache_stats()
+        assert exchange.calls == 2
+        assert stats['early_refreshes'] == 1
+        assert stats['delta_fetches'] == 1
+
+    def test_unlucky_draw_keeps_serving_cache(self, fake_redis, monkeypatch):
+        redis_client = fake_redis
+        exchange = SlowExchange(exchange_candles(100), delay=0)
+        service = make_service(exchange, redis_client)
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        meta = json.loads(redis_client.data[META_KEY])
+        meta['fetch_seconds'] = 2.0
+        meta['fetched_at'] -= service.historical_refresh_seconds - 5
+        redis_client.data[META_KEY] = json.dumps(meta).encode()
+
+        service.xfetch_beta = 1.0
+        monkeypatch.setattr(market_data_module.random, 'random', lambda: 0.5)   # -log(0.5) * 2s < 5s
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        assert exchange.calls == 1
+        assert service.get_cache_stats()['early_refreshes'] == 0
@@ -0,0 +1,176 @@
+"""
+Tests for stale-while-revalidate historical candle serving.
+
+Validates that series past their soft TTL are returned immediately while a
+background refresh runs, and that series past their hard TTL are served
+flagged stale while the Coinbase circuit breaker is open or a refresh fails.
+"""
+
+import pandas as pd
+import numpy as np
+import json
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services import market_data_service as market_data_module
+from backend.app.services.candle_store import CandleStore
+from backend.app.services.market_data_service import MarketDataService
+
+
+GRANULARITY = 3600
+META_KEY = 'market_data:candles_meta:BTC-USD:3600'
+
+
+def exchange_candles(count: int) -> pd.DataFrame:
+    last_start = int(time.time() // GRANULARITY) * GRANULARITY
+    index = pd.date_range(end=pd.Timestamp(last_start, unit='s'), periods=count,
+                          freq=f'{GRANULARITY}s', name='timestamp')
+    index.freq = None
+    close = np.arange(count, dtype=float) + 100
+    return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                         'close': close, 'volume': 2.0}, index=index)
+
+
+class FakeExchange:
+    """Candle source with a slow fetch and a CoinbaseService-style circuit breaker."""
+
+    def __init__(self, candles: pd.DataFrame, delay: float = 0.0):
+        self.candles = candles
+        self.delay = delay
+        self.calls = 0
+        self.rate_limit_circuit_breaker = {'circuit_open': False, 'circuit_open_until': 0}
+
+    def open_circuit(self, seconds: float = 60):
+        self.rate_limit_circuit_breaker = {'circuit_open': True, 'circuit_open_until': time.time() + seconds}
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        self.calls += 1
+        time.sleep(self.delay)
+        candles = self.candles
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        return candles.tail(limit)
+
+
+def make_service(exchange, redis_client):
+    service = MarketDataService(coinbase_service=exchange, redis_client=redis_client)
+    service.candle_store = CandleStore(max_idle_seconds=-1)   # Never serve from the store
+    service.xfetch_beta = 0.0
+    return service, redis_client
+
+
+def age_series(redis_client, seconds):
+    meta = json.loads(redis_client.data[META_KEY])
+    meta['fetched_at'] -= seconds
+    redis_client.data[META_KEY] = json.dumps(meta).encode()
+
+
+def wait_for_background_refreshes(service):
+    if service._refresh_executor is not None:
+        service._refresh_executor.shutdown(wait=True)
+
+
+class TestSoftExpiry:
+    """Test serving past the soft TTL."""
+
+    def test_soft_expired_series_is_served_without_blocking(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_refresh_seconds + 1)
+
+        exchange.delay = 0.5
+        started = time.perf_counter()
+        served = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        elapsed = time.perf_counter() - started
+        wait_for_background_refreshes(service)
+
+        assert elapsed < 0.25
+        pd.testing.assert_frame_equal(served, first)
+        assert not served.attrs.get('stale', False)
+        assert exchange.calls == 2
+        stats = service.get_cache_stats()
+        assert stats['background_refreshes'] == 1
+        assert stats['delta_fetches'] == 1
+        assert time.time() - json.loads(redis_client.data[META_KEY])['fetched_at'] < 5
+
+    def test_one_background_refresh_per_series(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_refresh_seconds + 1)
+
+        exchange.delay = 0.3
+        for _ in range(5):
+            service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        wait_for_background_refreshes(service)
+
+        assert service.get_cache_stats()['background_refreshes'] == 1
+        assert exchange.calls == 2
+
+    def test_early_refresh_runs_in_background(self, fake_redis, monkeypatch):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        meta = json.loads(redis_client.data[META_KEY])
+        meta['fetch_seconds'] = 2.0
+        meta['fetched_at'] -= service.historical_refresh_seconds - 5    # Soft TTL in 5s
+        redis_client.data[META_KEY] = json.dumps(meta).encode()
+        seen_fetched_at = meta['fetched_at']
+
+        service.xfetch_beta = 1.0
+        monkeypatch.setattr(market_data_module.random, 'random', lambda: 0.99)   # XFetch fires early
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        wait_for_background_refreshes(service)
+
+        stats = service.get_cache_stats()
+        assert stats['early_refreshes'] == 1
+        assert stats['background_refreshes'] == 1
+        assert exchange.calls == 2
+        assert json.loads(redis_client.data[META_KEY])['fetched_at'] > seen_fetched_at
+
+
+class TestHardExpiry:
+    """Test serving past the hard TTL."""
+
+    def test_served_stale_while_circuit_open(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_hard_ttl_seconds + 1)
+        exchange.open_circuit()
+
+        served = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        assert served.attrs['stale'] is True
+        pd.testing.assert_frame_equal(served, first)
+        assert exchange.calls == 1
+        assert service.get_cache_stats()['stale_served'] == 1
+
+    def test_refreshed_synchronously_when_circuit_closed(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_hard_ttl_seconds + 1)
+
+        served = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        assert not served.attrs.get('stale', False)
+        assert exchange.calls == 2
+        assert service.get_cache_stats()['background_refreshes'] == 0
+
+    def test_failed_refresh_serves_stale_instead_of_empty(self, fake_redis):
+        exchange = FakeExchange(exchange_candles(100))
+        service, redis_client = make_service(exchange, fake_redis)
+        first = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+        age_series(redis_client, service.historical_hard_ttl_seconds + 1)
+        exchange.candles = exchange.candles.iloc[0:0]
+
+        served = service.get_historical_data('BTC-USD', GRANULARITY, 50)
+
+        assert served.attrs['stale'] is True
+        pd.testing.assert_frame_equal(served, first)
@@ -0,0 +1,151 @@
+"""
+Tests for the long-lived streaming bot evaluator.
+
+Validates that steady-state ticks are served from the candle store without
+REST calls, that ticks reach the live candle and roll new ones, that a gap
+triggers one reseed, and that the running-bot index drives which products
+are evaluated.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import time
+import sys
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import Bot
+from backend.app.services import signal_performance_tracker
+from backend.app.services.signal_performance_tracker import SignalPerformanceTracker
+from backend.app.services.bot_evaluator import BotSignalEvaluator
+from backend.app.services.candle_store import CandleStore
+from backend.app.services.streaming_bot_evaluator import StreamingBotEvaluator
+
+
+CONFIG = {'rsi': {'enabled': True, 'weight': 1.0, 'period': 14}}
+
+
+class CountingFetcher:
+    """Candle fetcher that records every REST-equivalent call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, product_id, granularity, limit):
+        self.calls.append(product_id)
+        last_start = pd.Timestamp(int(time.time() // granularity) * granularity, unit='s')
+        index = pd.date_range(end=last_start, periods=limit, freq=f'{granularity}s', name='timestamp')
+        close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 1, limit))
+        return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                             'close': close, 'volume': 1.0}, index=index)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    for name, pair, status in [('A', 'BTC-USD', 'RUNNING'), ('B', 'BTC-USD', 'RUNNING'),
+                               ('C', 'ETH-USD', 'STOPPED')]:
+        db.add(Bot(name=name, pair=pair, status=status, signal_config=json.dumps(CONFIG),
+                   confirmation_minutes=5, position_size_usd=10.0))
+    db.commit()
+    db.close()
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def isolated_evaluation(monkeypatch):
+    """Skip balance/trade side checks and keep predictions in memory."""
+    monkeypatch.setattr(BotSignalEvaluator, '_check_pre_evaluation_blocks', lambda self, bot, data: None)
+    monkeypatch.setattr(BotSignalEvaluator, '_should_execute_automatic_trade', lambda self, bot, result: False)
+    monkeypatch.setattr(signal_performance_tracker, '_signal_performance_tracker', SignalPerformanceTracker(None))
+
+
+class TestStreamingBotEvaluator:
+    """Test the streaming evaluator's candle store and bot index."""
+
+    def test_steady_state_ticks_make_no_rest_calls(self, session_factory):
+        fetcher = CountingFetcher()
+        evaluator = StreamingBotEvaluator(session_factory=session_factory, candle_fetcher=fetcher,
+                                          candle_store=CandleStore())
+
+        for i in range(50):
+            evaluator.evaluate_bots_on_ticker_update('BTC-USD', {'price': str(100 + i * 0.01)})
+
+        assert fetcher.calls == ['BTC-USD']
+        stats = evaluator.get_cache_stats()
+        assert stats['ticks'] == 50
+        assert stats['candle_cache_hits'] == 49
+        assert stats['evaluations'] == 100
+        assert stats['bot_index_refreshes'] == 1
+
+    def test_ticks_reach_live_candle_and_roll_without_refetch(self, session_factory):
+        fetcher = CountingFetcher()
+        store = CandleStore()
+        evaluator = StreamingBotEvaluator(session_factory=session_factory, candle_fetcher=fetcher,
+                                          candle_store=store)
+        seeded = evaluator._get_market_data_for_evaluation('BTC-USD').copy()
+        open_start = seeded.index[-1].timestamp()
+
+        store.on_tick('BTC-USD', 1000.0, open_start + 10)
+        ticked = evaluator._get_market_data_for_evaluation('BTC-USD')
+        assert ticked['close'].iloc[-1] == 1000.0
+        assert ticked['high'].iloc[-1] == 1000.0
+        assert ticked.index[-1] == seeded.index[-1]
+
+        store.on_tick('BTC-USD', 999.0, open_start + 3600 + 1)
+        rolled = evaluator._get_market_data_for_evaluation('BTC-USD')
+        assert rolled.index[-1].timestamp() == open_start + 3600
+        assert rolled['close'].iloc[-2] == 1000.0
+        assert rolled['close'].iloc[-1] == 999.0
+        assert len(fetcher.calls) == 1
+
+    def test_gap_triggers_one_reseed(self, session_factory):
+        fetcher = CountingFetcher()
+        store = CandleStore()
+        evaluator = StreamingBotEvaluator(session_factory=session_factory, candle_fetcher=fetcher,
+                                          candle_store=store)
+        open_start = evaluator._get_market_data_for_evaluation('BTC-USD').index[-1].timestamp()
+
+        # Two boundaries later: the candle in between was never seen
+        store.on_tick('BTC-USD', 1000.0, open_start + 2 * 3600 + 1)
+        evaluator._get_market_data_for_evaluation('BTC-USD')
+        evaluator._get_market_data_for_evaluation('BTC-USD')
+
+        assert len(fetcher.calls) == 2
+        assert store.get_stats()['gaps'] == 1
+
+    def test_products_without_running_bots_are_skipped(self, session_factory):
+        fetcher = CountingFetcher()
+        evaluator = StreamingBotEvaluator(session_factory=session_factory, candle_fetcher=fetcher,
+                                          candle_store=CandleStore())
+
+        evaluator.evaluate_bots_on_ticker_update('ETH-USD', {'price': '10'})
+
+        assert fetcher.calls == []
+        assert evaluator.get_cache_stats()['skipped_no_bots'] == 1
+        assert evaluator.get_active_products() == ['BTC-USD']
+
+    def test_refresh_bot_index_picks_up_started_bots(self, session_factory):
+        evaluator = StreamingBotEvaluator(session_factory=session_factory, candle_fetcher=CountingFetcher(),
+                                          candle_store=CandleStore())
+        assert evaluator.get_running_bot_ids('ETH-USD') == []
+
+        db = session_factory()
+        db.query(Bot).filter(Bot.name == 'C').update({'status': 'RUNNING'})
+        db.commit()
+        evaluator.refresh_bot_index(db)
+        db.close()
+
+        assert len(evaluator.get_running_bot_ids('ETH-USD')) == 1
+        assert sorted(evaluator.get_active_products()) == ['BTC-USD', 'ETH-USD']
@@ -0,0 +1,303 @@
+"""
+Tests for the SyncAPICoordinator scheduler.
+
+Drives the coordinator with a fake clock (autostart=False, calls run inline
+from dispatch_pending) to show that throughput stays at the token-bucket
+rate, requests start in (priority, enqueue time) order, old requests are not
+starved, rate-limited calls are retried after a jittered backoff without
+blocking the dispatcher, and identical concurrent calls share one upstream
+call. Some tests run the real dispatcher thread.
+"""
+
+import pytest
+import random
+import threading
+import time
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.services.sync_api_coordinator import (
+    RateLimitConfig, RequestPriority, SyncAPICoordinator, TokenBucket
+)
+
+
+class SlowHistory:
+    """Thread-safe call counter whose historical fetch takes a while."""
+
+    def __init__(self, delay: float = 0.2):
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get_historical_data(self, product_id, granularity, limit):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return {'product_id': product_id, 'candles': list(range(limit))}
+
+
+def run_for(coordinator, clock, seconds, step=0.1):
+    for _ in range(int(round(seconds / step))):
+        coordinator.dispatch_pending()
+        clock.advance(step)
+    coordinator.dispatch_pending()
+
+
+class TestTokenBucket:
+    """Test the limiter on its own."""
+
+    def test_burst_then_steady_rate(self, clock):
+        bucket = TokenBucket(rate=0.5, capacity=3, clock=clock)
+
+        assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert bucket.try_acquire() == pytest.approx(2.0)
+        clock.advance(2.0)
+        assert bucket.try_acquire() == 0.0
+
+    def test_pause_drains_and_delays_refill(self, clock):
+        bucket = TokenBucket(rate=1.0, capacity=5, clock=clock)
+        bucket.pause(8)
+
+        assert bucket.try_acquire() == pytest.approx(9.0)
+        clock.advance(8.5)
+        assert bucket.try_acquire() == pytest.approx(0.5)
+        clock.advance(0.5)
+        assert bucket.try_acquire() == 0.0
+
+
+class TestScheduling:
+    """Test throughput, ordering and fairness under a fake clock."""
+
+    def test_throughput_stays_at_configured_rate(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, calls_per_minute=60, burst_allowance=5)
+        priorities = list(RequestPriority)
+        futures = [
+            coordinator.submit('get_product_ticker', f"P{i}-USD", priority=priorities[i % 4])
+            for i in range(200)
+        ]
+
+        run_for(coordinator, clock, 100)
+        done_after_100s = sum(1 for future in futures if future.done())
+        run_for(coordinator, clock, 100)
+
+        # Burst of 5, then one per second
+        assert done_after_100s == pytest.approx(105, abs=1)
+        call_times = coinbase.call_times()
+        for start in call_times:
+            in_window = sum(1 for t in call_times if start <= t < start + 10)
+            assert in_window <= 5 + 10
+        # Nothing lost: every future resolved with its own product
+        assert [f.result()['product_id'] for f in futures] == [f"P{i}-USD" for i in range(200)]
+        assert coordinator.get_stats()['queue_length'] == 0
+
+    def test_requests_start_in_priority_then_fifo_order(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, calls_per_minute=60, burst_allowance=1,
+                                       starvation_seconds=1000)
+        coordinator.submit('get_product_ticker', 'FIRST', priority=RequestPriority.LOW)
+        coordinator.dispatch_pending()   # Uses the only token
+        submitted = [
+            ('LOW-1', RequestPriority.LOW), ('MED-1', RequestPriority.MEDIUM),
+            ('CRIT-1', RequestPriority.CRITICAL), ('HIGH-1', RequestPriority.HIGH),
+            ('CRIT-2', RequestPriority.CRITICAL), ('LOW-2', RequestPriority.LOW),
+        ]
+        for product_id, priority in submitted:
+            clock.advance(0.01)
+            coordinator.submit('get_product_ticker', product_id, priority=priority)
+
+        run_for(coordinator, clock, 10)
+
+        assert coinbase.product_ids() == [
+            'FIRST', 'CRIT-1', 'CRIT-2', 'HIGH-1', 'MED-1', 'LOW-1', 'LOW-2'
+        ]
+
+    def test_low_priority_is_not_starved(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, calls_per_minute=60, burst_allowance=1,
+                                       starvation_seconds=10)
+        low = coordinator.submit('get_product_ticker', 'ANALYTICS', priority=RequestPriority.LOW)
+        started = clock()
+
+        # Twice as many critical requests as the rate allows, for a minute
+        for second in range(60):
+            for j in range(2):
+                coordinator.submit('get_product_ticker', f"ORDER-{second}-{j}",
+                                   priority=RequestPriority.CRITICAL)
+            run_for(coordinator, clock, 1.0)
+
+        low_started = coinbase.call_times()[coinbase.product_ids().index('ANALYTICS')]
+        assert low.done()
+        assert low_started - started <= 10 + 1
+        assert coordinator.get_stats()['starvation_promotions'] >= 1
+
+
+class TestRetries:
+    """Test rate-limit retries."""
+
+    def test_rate_limited_call_is_retried_after_jittered_backoff(self, clock, coinbase, make_coordinator):
+        coinbase.rate_limited['BTC-USD'] = 2
+        coordinator = make_coordinator(coinbase, calls_per_minute=60, burst_allowance=5,
+                                       cooldown_seconds=8, retry_base_seconds=2.0)
+        future = coordinator.submit('get_product_ticker', 'BTC-USD', priority=RequestPriority.CRITICAL)
+
+        real_started = time.perf_counter()
+        coordinator.dispatch_pending()
+        assert time.perf_counter() - real_started < 0.1     # The 429 didn't sleep
+        assert not future.done()
+
+        run_for(coordinator, clock, 60)
+
+        assert future.result()['price'] == 1.0
+        call_times = coinbase.call_times()
+        assert len(call_times) == 3
+        for earlier, later in zip(call_times, call_times[1:]):
+            assert later - earlier >= 8          # Bucket paused for the cooldown
+        stats = coordinator.get_stats()
+        assert stats['retries_scheduled'] == 2
+        assert stats['total_requests'] == 1
+
+    def test_retry_delays_are_jittered(self):
+        coordinator = SyncAPICoordinator(None, RateLimitConfig(retry_base_seconds=2.0),
+                                         autostart=False, rng=random.Random(1))
+        delays = [coordinator._retry_delay(3) for _ in range(20)]
+
+        assert all(4.0 <= delay <= 8.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_other_errors_fail_the_future(self, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase)
+        future = coordinator.submit('get_product_ticker', 'BROKEN-USD')
+
+        coordinator.dispatch_pending()
+
+        with pytest.raises(ValueError):
+            future.result(timeout=0)
+        assert coordinator.get_stats()['failed_requests'] == 1
+
+
+class TestDispatcherThread:
+    """Test the coordinator with its real dispatcher thread."""
+
+    def test_coordinated_call_waits_on_future(self, coinbase):
+        coordinator = SyncAPICoordinator(coinbase, RateLimitConfig(calls_per_minute=600, burst_allowance=10))
+        try:
+            results = [coordinator.coordinated_call('get_product_ticker', f"P{i}-USD") for i in range(5)]
+            cached = coordinator.coordinated_call('get_product_ticker', 'P0-USD')
+        finally:
+            coordinator.stop()
+
+        assert [r['product_id'] for r in results] == [f"P{i}-USD" for i in range(5)]
+        assert cached is results[0]
+        assert len(coinbase.calls) == 5
+
+    def test_timed_out_request_is_withdrawn(self, coinbase):
+        coordinator = SyncAPICoordinator(coinbase, RateLimitConfig(
+            calls_per_minute=1, burst_allowance=1, queue_timeout_seconds=0.2
+        ))
+        try:
+            coordinator.coordinated_call('get_product_ticker', 'FIRST')
+            with pytest.raises(TimeoutError):
+                coordinator.coordinated_call('get_product_ticker', 'SECOND')
+        finally:
+            coordinator.stop()
+
+        assert coinbase.product_ids() == ['FIRST']
+        assert coordinator.get_stats()['timed_out_requests'] == 1
+
+
+class TestInFlightDedup:
+    """Test collapsing of identical concurrent requests."""
+
+    def test_identical_requests_share_one_call(self, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, calls_per_minute=60, burst_allowance=5)
+        futures = [coordinator.submit('get_product_ticker', 'BTC-USD') for _ in range(10)]
+        other = coordinator.submit('get_product_ticker', 'ETH-USD')
+
+        coordinator.dispatch_pending()
+
+        assert len(coinbase.calls) == 2
+        assert all(f.result(timeout=0) is futures[0].result() for f in futures)
+        assert other.result(timeout=0)['product_id'] == 'ETH-USD'
+        stats = coordinator.get_stats()
+        assert stats['collapsed_requests'] == 9
+        assert stats['queued_requests'] == 2
+        assert stats['in_flight_keys'] == 0
+
+    def test_exception_is_shared(self, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase)
+        futures = [coordinator.submit('get_product_ticker', 'BROKEN-USD') for _ in range(3)]
+
+        coordinator.dispatch_pending()
+
+        assert len(coinbase.calls) == 1
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(timeout=0)
+
+    def test_finished_request_is_not_reused(self, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase)
+        coordinator.submit('get_product_ticker', 'BTC-USD')
+        coordinator.dispatch_pending()
+
+        coordinator.submit('get_product_ticker', 'BTC-USD')
+        coordinator.dispatch_pending()
+
+        assert len(coinbase.calls) == 2
+        assert coordinator.get_stats()['collapsed_requests'] == 0
+
+    def test_orders_are_never_collapsed(self, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase)
+        futures = [coordinator.submit('place_market_order', 'BTC-USD', 'BUY', 0.1) for _ in range(2)]
+
+        coordinator.dispatch_pending()
+
+        assert len(coinbase.calls) == 2
+        assert futures[0].result(timeout=0) != futures[1].result(timeout=0)
+
+    def test_urgent_duplicate_raises_queued_priority(self, clock, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase, calls_per_minute=60, burst_allowance=1,
+                                       starvation_seconds=1000)
+        coordinator.submit('get_product_ticker', 'FIRST')
+        coordinator.dispatch_pending()   # Uses the only token
+        coordinator.submit('get_product_ticker', 'MED', priority=RequestPriority.MEDIUM)
+        low = coordinator.submit('get_product_ticker', 'SHARED', priority=RequestPriority.LOW)
+        critical = coordinator.submit('get_product_ticker', 'SHARED', priority=RequestPriority.CRITICAL)
+
+        run_for(coordinator, clock, 5)
+
+        assert low is critical
+        assert coinbase.product_ids() == ['FIRST', 'SHARED', 'MED']
+        assert coordinator.get_stats()['queue_length'] == 0
+
+    def test_one_waiter_giving_up_keeps_the_shared_request(self, coinbase, make_coordinator):
+        coordinator = make_coordinator(coinbase)
+        future = coordinator.submit('get_product_ticker', 'BTC-USD')
+        coordinator.submit('get_product_ticker', 'BTC-USD')
+
+        coordinator._cancel(future)
+        coordinator.dispatch_pending()
+
+        assert future.result(timeout=0)['product_id'] == 'BTC-USD'
+
+    def test_concurrent_callers_collapse_onto_one_upstream_call(self):
+        coinbase = SlowHistory()
+        coordinator = SyncAPICoordinator(coinbase, RateLimitConfig(calls_per_minute=600, burst_allowance=10))
+        results = [None] * 8
+
+        def worker(i):
+            results[i] = coordinator.coordinated_call('get_historical_data', 'BTC-USD', 3600, 100)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(results))]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            coordinator.stop()
+
+        assert coinbase.calls == 1
+        assert all(result is results[0] for result in results)
+        stats = coordinator.get_stats()
+        assert stats['collapsed_requests'] + stats['cache_hits'] == len(results) - 1
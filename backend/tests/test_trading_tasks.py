@@ -0,0 +1,111 @@
+"""
+Tests for the Celery bot evaluation tasks.
+
+Validates that both evaluation tasks fetch candles through
+MarketDataService.get_historical_data, evaluate every running bot in one
+batch, record their scores and publish the cycle's regime snapshot.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import json
+import sys
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import Bot
+from backend.app.services import market_data_service, signal_performance_tracker
+from backend.app.services.bot_evaluator import BotSignalEvaluator
+from backend.app.services.signal_performance_tracker import SignalPerformanceTracker
+from backend.app.tasks import trading_tasks
+
+
+CONFIG = {
+    'rsi': {'enabled': True, 'weight': 0.5, 'period': 14},
+    'moving_average': {'enabled': True, 'weight': 0.5, 'fast_period': 10, 'slow_period': 20}
+}
+
+
+class FakeMarketDataService:
+    """Serves hourly candles and records each get_historical_data call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_historical_data(self, product_id, granularity=3600, limit=100):
+        self.calls.append((product_id, granularity, limit))
+        index = pd.date_range('2025-01-01', periods=limit, freq='1h', name='timestamp')
+        close = 100 + np.sin(np.arange(limit) / 3) * 5
+        return pd.DataFrame({'open': close, 'high': close + 1, 'low': close - 1,
+                             'close': close, 'volume': 1.0}, index=index)
+
+
+@pytest.fixture
+def Session(monkeypatch):
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(trading_tasks, 'SessionLocal', Session)
+    monkeypatch.setattr(signal_performance_tracker, '_signal_performance_tracker', SignalPerformanceTracker(Session()))
+    return Session
+
+
+@pytest.fixture
+def bots(Session):
+    db = Session()
+    for i, pair in enumerate(['BTC-USD', 'BTC-USD', 'ETH-USD']):
+        db.add(Bot(name=f"Bot {i}", pair=pair, status='RUNNING', signal_config=json.dumps(CONFIG),
+                   confirmation_minutes=5, position_size_usd=10.0))
+    db.commit()
+    ids = [bot.id for bot in db.query(Bot).all()]
+    db.close()
+    return ids
+
+
+@pytest.fixture
+def market_service(monkeypatch):
+    service = FakeMarketDataService()
+    monkeypatch.setattr(market_data_service, 'get_market_data_service', lambda: service)
+    return service
+
+
+@pytest.fixture
+def published(monkeypatch):
+    snapshots = []
+    monkeypatch.setattr(trading_tasks, 'publish_regime_snapshot', snapshots.append)
+    monkeypatch.setattr(BotSignalEvaluator, '_check_pre_evaluation_blocks', lambda self, bot, data: None)
+    monkeypatch.setattr(BotSignalEvaluator, '_should_execute_automatic_trade', lambda self, bot, result: False)
+    return snapshots
+
+
+class TestEvaluationTasks:
+    """Test that the tasks evaluate every running bot."""
+
+    def test_evaluate_bot_signals_evaluates_every_bot(self, Session, bots, market_service, published):
+        result = trading_tasks.evaluate_bot_signals()
+
+        assert result['status'] == 'evaluation_complete'
+        assert sorted(market_service.calls) == [('BTC-USD', 3600, 30), ('ETH-USD', 3600, 30)]
+        assert sorted(r['bot_id'] for r in result['results'] if 'error' not in r) == sorted(bots)
+        assert len(published) == 1
+        db = Session()
+        assert all(bot.current_combined_score is not None for bot in db.query(Bot).all())
+        db.close()
+
+    def test_fast_trading_evaluation_evaluates_every_bot(self, Session, bots, market_service, published):
+        result = trading_tasks.fast_trading_evaluation()
+
+        assert result['status'] == 'fast_evaluation_complete'
+        assert sorted(market_service.calls) == [('BTC-USD', 3600, 100), ('ETH-USD', 3600, 100)]
+        assert result['evaluated_bots'] == len(bots)
+        assert len(published) == 1
+        db = Session()
+        assert all(bot.current_combined_score is not None for bot in db.query(Bot).all())
+        db.close()
@@ -0,0 +1,454 @@
+"""
+Tests for TrendDetectionEngine's single-fetch multi-timeframe analysis.
+
+Validates that an uncached analysis costs at most two upstream candle
+fetches (the 15-minute series and the daily series) through the cached
+MarketDataService, and that the hourly windows resampled from the fine
+series match what the exchange's own hourly candles would give. The bulk
+analyze_trends() path must give the same results as per-pair analysis and
+leave every pair cached for the trading path. Engines sharing one (fake)
+Redis stand in for separate processes sharing the L2 regime cache.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+import threading
+import time
+import json
+import sys
+import os
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from backend.app.core.database import Base
+from backend.app.models.models import Bot
+from backend.app.services import trend_detection_engine
+from backend.app.services.candle_store import CandleStore
+from backend.app.services.market_data_service import MarketDataService
+from backend.app.services.trend_detection_engine import TrendDetectionEngine
+
+
+def minute_candles(minutes: int, end: int) -> pd.DataFrame:
+    """Steady uptrend of one-minute candles ending at `end` (Unix seconds)."""
+    index = pd.date_range(end=pd.Timestamp(end, unit='s'), periods=minutes, freq='60s', name='timestamp')
+    close = 100 + np.arange(minutes, dtype=float) * 0.01
+    volume = 1.0 + np.arange(minutes, dtype=float) * 0.001
+    return pd.DataFrame({'open': close - 0.005, 'high': close + 0.02, 'low': close - 0.02,
+                         'close': close, 'volume': volume}, index=index)
+
+
+def aggregate(candles: pd.DataFrame, seconds: int) -> pd.DataFrame:
+    grouped = candles.resample(f"{seconds}s", label='left', closed='left')
+    frame = grouped.agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'})
+    frame = frame[grouped['close'].count() > 0]
+    frame.index.freq = None
+    return frame
+
+
+class BrokenRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Error 111 connecting to localhost:6379")
+        return fail
+
+
+def random_walk(minutes: int, end: int, seed: int, drift: float) -> pd.DataFrame:
+    """Noisy one-minute candles with a per-pair drift and volume trend."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end=pd.Timestamp(end, unit='s'), periods=minutes, freq='60s', name='timestamp')
+    close = 100 * np.exp(np.cumsum(rng.normal(drift, 0.002, minutes)))
+    volume = rng.uniform(0.5, 1.5, minutes) * (1 + np.linspace(0, rng.uniform(-0.5, 1.0), minutes))
+    return pd.DataFrame({'open': close, 'high': close * 1.001, 'low': close * 0.999,
+                         'close': close, 'volume': volume}, index=index)
+
+
+class CountingCoinbase:
+    """Candle source aggregating one minute-level history to any granularity; counts fetches."""
+
+    def __init__(self, days: int = 10):
+        now = int(time.time() // 60) * 60
+        self.minutes = minute_candles(days * 1440, now)
+        self.calls = []
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        self.calls.append((product_id, granularity, limit))
+        candles = aggregate(self.minutes, granularity)
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        return candles.tail(limit)
+
+
+class ManyPairsCoinbase(CountingCoinbase):
+    """Distinct histories per pair, including recently listed ones."""
+
+    HISTORY_MINUTES = {
+        'BTC-USD': 10 * 1440, 'ETH-USD': 10 * 1440, 'SOL-USD': 9 * 1440, 'DOGE-USD': 8 * 1440,
+        'NEW-USD': 30 * 60, 'WEEK-USD': 4 * 1440, 'DAY-USD': 1440 + 90, 'HOUR-USD': 50,
+    }
+
+    def __init__(self):
+        now = int(time.time() // 60) * 60
+        drifts = np.linspace(-0.0003, 0.0003, len(self.HISTORY_MINUTES))
+        self.series = {product_id: random_walk(minutes, now, seed, drifts[seed])
+                       for seed, (product_id, minutes) in enumerate(self.HISTORY_MINUTES.items())}
+        self.calls = []
+
+    def get_historical_data(self, product_id, granularity, limit, start=None):
+        self.calls.append((product_id, granularity, limit))
+        if product_id not in self.series:
+            raise ValueError(f"Unknown product {product_id}")
+        candles = aggregate(self.series[product_id], granularity)
+        if start is not None:
+            candles = candles[candles.index >= pd.Timestamp(start, unit='s')]
+        return candles.tail(limit)
+
+
+def make_engine(coinbase, redis_client):
+    service = MarketDataService(coinbase_service=coinbase, redis_client=redis_client)
+    service.candle_store = CandleStore(max_idle_seconds=-1)   # Never serve from the store
+    service.xfetch_beta = 0.0
+    return TrendDetectionEngine(market_data_service=service)
+
+
+class TestUpstreamCalls:
+    """Test the number of upstream fetches per analysis."""
+
+    def test_uncached_analysis_makes_at_most_two_upstream_calls(self, fake_redis):
+        coinbase = CountingCoinbase()
+        engine = make_engine(coinbase, fake_redis)
+
+        result = engine.analyze_trend('BTC-USD')
+
+        assert len(coinbase.calls) <= 2
+        assert sorted(granularity for _, granularity, _ in coinbase.calls) == [900, 86400]
+        assert 'error' not in result
+        assert set(result['timeframe_analysis']) == {'short_term', 'medium_term', 'long_term'}
+        assert engine.get_stats()['series_reads'] == 2
+
+    def test_each_pair_costs_two_calls(self, fake_redis):
+        coinbase = CountingCoinbase(days=8)
+        engine = make_engine(coinbase, fake_redis)
+
+        for pair in ['BTC-USD', 'ETH-USD', 'SOL-USD']:
+            engine.analyze_trend(pair)
+
+        assert len(coinbase.calls) == 6
+
+    def test_reanalysis_is_served_by_the_data_layer(self, fake_redis):
+        coinbase = CountingCoinbase()
+        engine = make_engine(coinbase, fake_redis)
+        engine.analyze_trend('BTC-USD')
+        engine.clear_cache()
+
+        engine.analyze_trend('BTC-USD')
+
+        assert len(coinbase.calls) == 2
+
+
+class TestDerivedWindows:
+    """Test the windows derived from the fine series."""
+
+    def test_hourly_resample_matches_exchange_hourly_candles(self):
+        coinbase = CountingCoinbase(days=3)
+        engine = TrendDetectionEngine(market_data_service=object())
+        fine = coinbase.get_historical_data('BTC-USD', 900, engine.fine_periods())
+        exchange_hourly = coinbase.get_historical_data('BTC-USD', 3600, 50)
+
+        hourly = engine._resample_hourly(fine)
+
+        assert len(hourly) >= 50
+        pd.testing.assert_frame_equal(hourly.tail(50), exchange_hourly, check_freq=False)
+
+    def test_leading_partial_hour_is_dropped(self):
+        coinbase = CountingCoinbase(days=1)
+        engine = TrendDetectionEngine(market_data_service=object())
+        fine = coinbase.get_historical_data('BTC-USD', 900, 20)
+        fine = fine[fine.index >= fine.index[fine.index.minute == 15][0]]   # Start mid-hour
+
+        hourly = engine._resample_hourly(fine)
+
+        assert hourly.index[0] > fine.index[0]
+
+    def test_steady_uptrend_reads_bullish_across_timeframes(self, fake_redis):
+        engine = make_engine(CountingCoinbase(), fake_redis)
+
+        result = engine.analyze_trend('BTC-USD')
+
+        assert result['moving_average_alignment'] == 'BULLISH'
+        timeframes = result['timeframe_analysis']
+        assert timeframes['short_term']['data_points'] == 5
+        assert timeframes['medium_term']['data_points'] == 24
+        assert timeframes['long_term']['data_points'] == 7
+        assert all(tf['momentum'] > 0 for tf in timeframes.values())
+        assert result['trend_strength'] > 0
+
+
+def comparable(result):
+    return {key: value for key, value in result.items() if key != 'analysis_timestamp'}
+
+
+class TestBulkAnalysis:
+    """Test analyze_trends() over many pairs."""
+
+    def test_bulk_matches_per_pair_analysis(self, fake_redis):
+        coinbase = ManyPairsCoinbase()
+        pairs = list(coinbase.HISTORY_MINUTES)
+        single = make_engine(coinbase, fake_redis)
+        bulk = make_engine(coinbase, fake_redis)
+
+        expected = {pair: single.analyze_trend(pair) for pair in pairs}
+        results = bulk.analyze_trends(pairs, refresh=True)   # Not single's shared copies
+
+        assert list(results) == pairs
+        assert {result['regime'] for result in results.values()} != {'CHOPPY'}
+        for pair in pairs:
+            actual, wanted = comparable(results[pair]), comparable(expected[pair])
+            assert actual.keys() == wanted.keys()
+            for key in ('regime', 'moving_average_alignment', 'volume_confirmation', 'product_id'):
+                assert actual[key] == wanted[key], (pair, key)
+            assert actual['trend_strength'] == pytest.approx(wanted['trend_strength'], abs=1e-9)
+            assert actual['confidence'] == pytest.approx(wanted['confidence'], abs=1e-9)
+            for name, timeframe in wanted['timeframe_analysis'].items():
+                assert actual['timeframe_analysis'][name] == pytest.approx(timeframe), (pair, name)
+
+    def test_short_histories_are_marked_insufficient(self, fake_redis):
+        engine = make_engine(ManyPairsCoinbase(), fake_redis)
+
+        results = engine.analyze_trends(['HOUR-USD', 'NEW-USD'])
+
+        assert results['HOUR-USD']['timeframe_analysis']['medium_term']['error'] == 'insufficient_data'
+        assert results['HOUR-USD']['timeframe_analysis']['long_term']['error'] == 'insufficient_data'
+        assert results['NEW-USD']['moving_average_alignment'] == 'NEUTRAL'
+        assert results['NEW-USD']['volume_confirmation'] is False
+
+    def test_failed_pair_does_not_sink_the_batch(self, fake_redis):
+        engine = make_engine(ManyPairsCoinbase(), fake_redis)
+
+        results = engine.analyze_trends(['BTC-USD', 'MISSING-USD'])
+
+        assert 'error' not in results['BTC-USD']
+        missing = results['MISSING-USD']['timeframe_analysis']
+        assert all(timeframe['error'] == 'insufficient_data' for timeframe in missing.values())
+        assert results['MISSING-USD']['regime'] == 'CHOPPY'
+        assert engine.analyze_trend('BTC-USD') is results['BTC-USD']
+
+    def test_populates_cache_for_the_trading_path(self, fake_redis):
+        coinbase = ManyPairsCoinbase()
+        engine = make_engine(coinbase, fake_redis)
+        pairs = ['BTC-USD', 'ETH-USD', 'SOL-USD']
+        engine.analyze_trends(pairs)
+        calls = len(coinbase.calls)
+
+        for pair in pairs:
+            engine.analyze_trend(pair)
+
+        stats = engine.get_stats()
+        assert len(coinbase.calls) == calls
+        assert stats['cache_hits'] == 3
+        assert stats['calculations'] == 3
+        assert stats['bulk_pairs'] == 3
+
+    def test_refresh_recomputes_cached_pairs(self, fake_redis):
+        engine = make_engine(ManyPairsCoinbase(), fake_redis)
+        first = engine.analyze_trends(['BTC-USD'])
+        cached = engine.analyze_trends(['BTC-USD'])
+
+        refreshed = engine.analyze_trends(['BTC-USD'], refresh=True)
+
+        assert cached['BTC-USD'] is first['BTC-USD']
+        assert refreshed['BTC-USD'] is not first['BTC-USD']
+        assert engine.get_stats()['calculations'] == 2
+
+
+class TestSharedCache:
+    """Test the Redis L2 tier shared between processes."""
+
+    def test_second_process_reads_the_first_ones_analysis(self, fake_redis):
+        coinbase = CountingCoinbase()
+        redis_client = fake_redis
+        api_process = make_engine(coinbase, redis_client)
+        celery_process = make_engine(coinbase, redis_client)
+        computed = api_process.analyze_trend('BTC-USD')
+        calls = len(coinbase.calls)
+
+        shared = celery_process.analyze_trend('BTC-USD')
+        celery_process.analyze_trend('BTC-USD')
+
+        assert comparable(shared) == comparable(computed)
+        assert len(coinbase.calls) == calls
+        stats = celery_process.get_stats()
+        assert stats['calculations'] == 0
+        assert (stats['l1_hits'], stats['l2_hits']) == (1, 1)
+        assert stats['l1_hit_rate'] == 50.0
+        assert stats['l2_hit_rate'] == 100.0
+        assert stats['l2_enabled'] is True
+
+    def test_bulk_precompute_is_shared(self, fake_redis):
+        coinbase = ManyPairsCoinbase()
+        redis_client = fake_redis
+        pairs = ['BTC-USD', 'ETH-USD', 'SOL-USD']
+        make_engine(coinbase, redis_client).analyze_trends(pairs, refresh=True)
+        calls = len(coinbase.calls)
+        api_process = make_engine(coinbase, redis_client)
+
+        for pair in pairs:
+            api_process.analyze_trend(pair)
+
+        assert len(coinbase.calls) == calls
+        assert api_process.get_stats()['l2_hits'] == 3
+
+    def test_bulk_reads_l2_in_one_round_trip(self, fake_redis):
+        coinbase = ManyPairsCoinbase()
+        redis_client = fake_redis
+        pairs = ['BTC-USD', 'ETH-USD', 'SOL-USD', 'DOGE-USD']
+        make_engine(coinbase, redis_client).analyze_trends(pairs)
+        engine = make_engine(coinbase, redis_client)
+        reads = []
+        get, mget = redis_client.get, redis_client.mget
+        redis_client.get = lambda key: reads.append(('get', key)) or get(key)
+        redis_client.mget = lambda keys: reads.append(('mget', len(keys))) or mget(keys)
+
+        engine.analyze_trends(pairs)
+
+        assert reads == [('mget', 4)]
+        assert engine.get_stats()['l2_hits'] == 4
+
+    def test_bulk_locks_one_chunk_at_a_time(self, fake_redis):
+        redis_client = fake_redis
+        engine = make_engine(ManyPairsCoinbase(), redis_client)
+        engine.bulk_lock_chunk_size = 2
+        held = []
+        set_key = redis_client.set
+
+        def set_and_count(key, value, nx=False, px=None):
+            acquired = set_key(key, value, nx=nx, px=px)
+            held.append(sum(1 for k in redis_client.data if k.startswith('trend_analysis:lock:')))
+            return acquired
+
+        redis_client.set = set_and_count
+        results = engine.analyze_trends(['BTC-USD', 'ETH-USD', 'SOL-USD', 'DOGE-USD', 'WEEK-USD'])
+
+        assert max(held) == 2
+        assert not any('error' in result for result in results.values())
+        assert engine.get_stats()['bulk_analyses'] == 3
+        assert not any(k.startswith('trend_analysis:lock:') for k in redis_client.data)
+
+    def test_l2_entry_expires_with_the_ttl(self, fake_redis, monkeypatch):
+        coinbase = CountingCoinbase()
+        redis_client = fake_redis
+        make_engine(coinbase, redis_client).analyze_trend('BTC-USD')
+        later = time.time() + 301
+        monkeypatch.setattr(time, 'time', lambda: later)
+
+        engine = make_engine(coinbase, redis_client)
+        engine.analyze_trend('BTC-USD')
+
+        assert engine.get_stats()['calculations'] == 1
+
+    def test_waits_for_the_process_holding_the_lock(self, fake_redis):
+        coinbase = CountingCoinbase()
+        redis_client = fake_redis
+        lock_holder = make_engine(coinbase, redis_client)
+        waiter = make_engine(coinbase, redis_client)
+        acquired, token = lock_holder._acquire_analysis_lock('BTC-USD')
+        assert acquired
+
+        def finish():
+            time.sleep(0.2)
+            lock_holder._cache_analysis('trend_BTC-USD', lock_holder._calculate_trend_analysis('BTC-USD'))
+            lock_holder._release_analysis_lock('BTC-USD', token)
+
+        thread = threading.Thread(target=finish)
+        thread.start()
+        result = waiter.analyze_trend('BTC-USD')
+        thread.join()
+
+        stats = waiter.get_stats()
+        assert 'error' not in result
+        assert stats['calculations'] == 0
+        assert stats['coalesced_requests'] == 1
+        assert len(coinbase.calls) == 2
+
+    def test_computes_itself_when_the_lock_holder_is_too_slow(self, fake_redis):
+        redis_client = fake_redis
+        waiter = make_engine(CountingCoinbase(), redis_client)
+        waiter.single_flight_wait_seconds = 0.1
+        waiter._acquire_analysis_lock('BTC-USD')       # Held by a process that never finishes
+
+        result = waiter.analyze_trend('BTC-USD')
+
+        assert 'error' not in result
+        assert waiter.get_stats()['lock_wait_timeouts'] == 1
+        assert waiter.get_stats()['calculations'] == 1
+
+    def test_works_without_redis(self, fake_redis):
+        engine = TrendDetectionEngine(market_data_service=make_engine(CountingCoinbase(), fake_redis)._market_data_service,
+                                      redis_client=BrokenRedis())
+
+        first = engine.analyze_trend('BTC-USD')
+        second = engine.analyze_trend('BTC-USD')
+
+        stats = engine.get_stats()
+        assert 'error' not in first
+        assert second is first
+        assert stats['calculations'] == 1
+        assert stats['redis_errors'] >= 1
+
+    def test_clear_cache_clears_both_tiers(self, fake_redis):
+        coinbase = CountingCoinbase()
+        redis_client = fake_redis
+        engine = make_engine(coinbase, redis_client)
+        engine.analyze_trend('BTC-USD')
+        redis_client.setex('market_data:ticker:BTC-USD', 30, '{}')
+
+        engine.clear_cache()
+        assert not any(key.startswith('trend_analysis:trend_') for key in redis_client.data)
+        assert 'market_data:ticker:BTC-USD' in redis_client.data
+        engine.analyze_trend('BTC-USD')
+
+        assert engine.get_stats()['calculations'] == 2
+        assert engine.get_stats()['l2_hits'] == 0
+
+    def test_release_keeps_a_lock_retaken_after_expiry(self, fake_redis):
+        redis_client = fake_redis
+        engine = make_engine(CountingCoinbase(), redis_client)
+        acquired, token = engine._acquire_analysis_lock('BTC-USD')
+        assert acquired
+        # Our lock expired mid-analysis and another process took it
+        redis_client.data['trend_analysis:lock:BTC-USD'] = b'other-process'
+
+        engine._release_analysis_lock('BTC-USD', token)
+
+        assert redis_client.data['trend_analysis:lock:BTC-USD'] == b'other-process'
+
+
+class TestPrecomputeTask:
+    """Test the regime precompute beat task."""
+
+    def test_precomputes_every_running_pair(self, fake_redis, monkeypatch):
+        from backend.app.tasks import market_data_tasks
+
+        db_engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+        Base.metadata.create_all(db_engine)
+        Session = sessionmaker(bind=db_engine)
+        session = Session()
+        for i, (pair, status) in enumerate([('BTC-USD', 'RUNNING'), ('BTC-USD', 'RUNNING'),
+                                            ('ETH-USD', 'RUNNING'), ('SOL-USD', 'STOPPED')]):
+            session.add(Bot(name=f"Bot {i}", pair=pair, status=status, signal_config=json.dumps({})))
+        session.commit()
+        session.close()
+        engine = make_engine(ManyPairsCoinbase(), fake_redis)
+        monkeypatch.setattr(market_data_tasks, 'SessionLocal', Session)
+        monkeypatch.setattr(trend_detection_engine, '_global_trend_engine', engine)
+
+        result = market_data_tasks.precompute_regimes()
+
+        assert result['success'] is True
+        assert sorted(result['regimes']) == ['BTC-USD', 'ETH-USD']
+        assert engine._get_cached_analysis('trend_BTC-USD') is not None
+        assert engine._get_cached_analysis('trend_SOL-USD') is None
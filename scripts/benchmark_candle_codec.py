@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark: binary columnar candle encoding vs the legacy JSON records format.
+
+Measures encode/decode time and cached value size for typical candle
+windows. If a local Redis is reachable, also reports MEMORY USAGE for each
+format.
+"""
+
+import sys
+import os
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.services.candle_codec import encode_candles, decode_candles
+
+ROUNDS = 500
+
+
+def api_candles(count):
+    """Frame shaped like CoinbaseService._fetch_historical_data_from_api output."""
+    rng = np.random.default_rng(42)
+    close = 100 + np.cumsum(rng.normal(0, 1, count))
+    df = pd.DataFrame({
+        'timestamp': pd.to_datetime(1700000000 + np.arange(count) * 3600, unit='s'),
+        'open': close - 0.1,
+        'high': close + 0.5,
+        'low': close - 0.5,
+        'close': close,
+        'volume': rng.uniform(1, 1000, count)
+    })
+    return df.set_index('timestamp').sort_index()
+
+
+def json_encode(df):
+    return json.dumps({'data': df.to_dict('records'), 'cached_at': time.time()}, default=str)
+
+
+def json_decode(payload):
+    return pd.DataFrame(json.loads(payload)['data'])
+
+
+def time_per_call(func, arg):
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        func(arg)
+    return (time.perf_counter() - started) / ROUNDS * 1e6
+
+
+def redis_memory(payloads):
+    """Return {name: bytes} from Redis MEMORY USAGE, or None without a server."""
+    try:
+        import redis
+        client = redis.Redis(host='localhost', port=6379, db=0, socket_connect_timeout=1)
+        client.ping()
+    except Exception:
+        return None
+
+    usage = {}
+    for name, payload in payloads.items():
+        key = f"benchmark:candle_codec:{name}"
+        client.set(key, payload)
+        usage[name] = client.memory_usage(key)
+        client.delete(key)
+    return usage
+
+
+def main():
+    print("📦 CANDLE CACHE ENCODING BENCHMARK")
+    print("=" * 78)
+    print(f"{'candles':>8} {'format':>7} {'bytes':>9} {'redis':>9} {'encode µs':>11} {'decode µs':>11}")
+
+    for count in (24, 100, 300):
+        df = api_candles(count)
+        binary = encode_candles(df)
+        legacy = json_encode(df)
+        assert decode_candles(binary).equals(df)
+
+        memory = redis_memory({'binary': binary, 'json': legacy}) or {}
+        rows = [
+            ('binary', len(binary), memory.get('binary'),
+             time_per_call(encode_candles, df), time_per_call(decode_candles, binary)),
+            ('json', len(legacy.encode()), memory.get('json'),
+             time_per_call(json_encode, df), time_per_call(json_decode, legacy)),
+        ]
+        for name, size, redis_bytes, encode_us, decode_us in rows:
+            redis_column = redis_bytes if redis_bytes is not None else '-'
+            print(f"{count:>8} {name:>7} {size:>9} {redis_column:>9} {encode_us:>11.1f} {decode_us:>11.1f}")
+
+        print(f"{'':>8} {'ratio':>7} {len(legacy.encode()) / len(binary):>8.1f}x "
+              f"{'':>9} {rows[1][3] / rows[0][3]:>10.1f}x {rows[1][4] / rows[0][4]:>10.1f}x")
+
+    print()
+    print("'redis' is MEMORY USAGE per key ('-' when no local Redis is reachable).")
+
+
+if __name__ == "__main__":
+    main()
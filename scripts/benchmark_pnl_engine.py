@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one-pass P&L engine vs the per-product query pattern it replaced.
+
+Loads 100k synthetic fills into an in-memory SQLite database and times a
+full unrealized P&L report both ways, counting SQL queries and how many
+fills each approach actually saw. The legacy pattern is reproduced here:
+the newest 1000 trades overall, then three 1000-capped queries per product
+(net position, average buy price, average short price).
+"""
+
+import sys
+import os
+import time
+import random
+from types import SimpleNamespace
+
+from sqlalchemy import create_engine, desc, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from app.core.database import Base
+from app.models.models import RawTrade
+from app.services.pnl_engine import PnLEngine
+
+FILLS = 100_000
+PRODUCTS = 50
+
+
+def load_fills(db):
+    rng = random.Random(42)
+    products = [f"C{i:02d}-USD" for i in range(PRODUCTS)]
+    rows = []
+    for n in range(FILLS):
+        rows.append({
+            'fill_id': f"fill-{n}",
+            'order_id': f"order-{n}",
+            'product_id': rng.choice(products),
+            'side': 'BUY' if rng.random() < 0.55 else 'SELL',
+            'size': round(rng.uniform(0.01, 2.0), 6),
+            'size_in_quote': False,
+            'price': round(rng.uniform(50, 150), 2),
+            'commission': round(rng.uniform(0, 0.5), 4),
+            'created_at': f"2025-01-01T00:00:00.{n:06d}Z",
+        })
+    db.bulk_insert_mappings(RawTrade, rows)
+    db.commit()
+    return {product_id: SimpleNamespace(price=100.0) for product_id in products}
+
+
+def legacy_report(db, tickers):
+    """The old 3N+1 query pattern, each query capped at 1000 trades."""
+    def product_trades(product_id):
+        return db.query(RawTrade).filter(RawTrade.product_id == product_id) \
+            .order_by(desc(RawTrade.created_at)).limit(1000).all()
+
+    recent = db.query(RawTrade).order_by(desc(RawTrade.created_at)).limit(1000).all()
+    seen = len(recent)
+    results = {}
+    for product_id in sorted({trade.product_id for trade in recent}):
+        net = sum(t.size if t.side == 'BUY' else -t.size for t in product_trades(product_id))
+        buys = [t for t in product_trades(product_id) if t.side == 'BUY']
+        sells = [t for t in product_trades(product_id) if t.side == 'SELL']
+        seen = max(seen, len(buys) + len(sells))
+        avg_buy = sum(t.size * t.price for t in buys) / max(sum(t.size for t in buys), 1e-12)
+        avg_sell = sum(t.size * t.price for t in sells) / max(sum(t.size for t in sells), 1e-12)
+        price = tickers[product_id].price
+        results[product_id] = net * (price - avg_buy) if net > 0 else -net * (avg_sell - price)
+    return results, seen
+
+
+def measure(engine, fn):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', listener)
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    event.remove(engine, 'before_cursor_execute', listener)
+    return result, elapsed, len(statements)
+
+
+def main():
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    print(f"Loading {FILLS:,} fills across {PRODUCTS} products...")
+    tickers = load_fills(db)
+    get_tickers = lambda product_ids: {product_id: tickers[product_id] for product_id in product_ids}
+
+    (legacy, legacy_seen), legacy_seconds, legacy_queries = measure(engine, lambda: legacy_report(db, tickers))
+    db.expunge_all()
+    report, engine_seconds, engine_queries = measure(
+        engine, lambda: PnLEngine(db).calculate(include_unrealized=True, get_tickers=get_tickers))
+    engine_seen = sum(data['total_trades'] for data in report.values())
+
+    print()
+    print(f"{'':>10} {'seconds':>9} {'queries':>8} {'fills seen':>11} {'products':>9}")
+    print(f"{'legacy':>10} {legacy_seconds:>9.3f} {legacy_queries:>8} {legacy_seen:>11,} {len(legacy):>9}")
+    print(f"{'one-pass':>10} {engine_seconds:>9.3f} {engine_queries:>8} {engine_seen:>11,} {len(report):>9}")
+    print()
+    print("'fills seen' for legacy is the most any single query returned (each is capped at 1000).")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,6 +19,7 @@ from sqlalchemy.orm import Session
 from app.core.database import SessionLocal
 from app.services.coinbase_service import CoinbaseService
 from app.models.models import RawTrade
+from app.services.position_ledger_service import PositionLedgerService
 
 
 def sync_raw_trades_from_coinbase(days_back: int = 7):
@@ -75,6 +76,9 @@ def sync_raw_trades_from_coinbase(days_back: int = 7):
         # Commit all changes
         db.commit()
         
+        # Apply the new fills to the position ledger
+        PositionLedgerService(db).sync()
+        
         print(f"\n🎉 Sync completed!")
         print(f"   📈 New trades added: {new_trades_count}")
         print(f"   ⏭️  Existing trades skipped: {skipped_count}")
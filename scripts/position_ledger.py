@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Position ledger maintenance: catch-up sync, replay-from-zero rebuild and
+consistency check.
+
+    python scripts/position_ledger.py check
+    python scripts/position_ledger.py sync
+    python scripts/position_ledger.py rebuild [--product BTC-USD ...]
+
+'sync' applies raw trades inserted without RawTradeService (position reads
+do not). 'check' compares the persisted ledger against a from-scratch FIFO
+replay of every raw trade and exits non-zero on any mismatch.
+"""
+
+import sys
+import os
+import argparse
+
+# Add backend to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+# Change to project root directory to ensure proper path resolution
+os.chdir(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.core.database import Base, SessionLocal, engine
+from app.services.position_ledger_service import PositionLedgerService
+
+
+def sync():
+    db = SessionLocal()
+    try:
+        applied = PositionLedgerService(db).sync()
+        print(f"📒 Applied {applied} fills to the position ledger")
+        return 0
+    finally:
+        db.close()
+
+
+def rebuild(products):
+    db = SessionLocal()
+    try:
+        result = PositionLedgerService(db).rebuild(products or None)
+        print(f"📒 Rebuilt {result['products_rebuilt']} products from {result['trades_replayed']} fills")
+        return 0
+    finally:
+        db.close()
+
+
+def check():
+    db = SessionLocal()
+    try:
+        result = PositionLedgerService(db).check_consistency()
+        if result['consistent']:
+            print(f"✅ Position ledger matches a full replay ({result['products_checked']} products)")
+            return 0
+        print(f"❌ {len(result['mismatches'])} mismatches across {result['products_checked']} products:")
+        for mismatch in result['mismatches']:
+            print(f"   {mismatch['product_id']} {mismatch['field']}: "
+                  f"ledger={mismatch['ledger']} replay={mismatch['replay']}")
+        print("\n💡 Repair with: python scripts/position_ledger.py rebuild")
+        return 1
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    rebuild_parser = commands.add_parser('rebuild', help='Replay every raw trade into the ledger')
+    rebuild_parser.add_argument('--product', action='append', dest='products',
+                                help='Only rebuild this product (repeatable)')
+    commands.add_parser('sync', help='Apply raw trades missing from the ledger')
+    commands.add_parser('check', help='Compare the ledger with a full FIFO replay')
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)   # Ledger tables on databases created before them
+    if args.command == 'rebuild':
+        return rebuild(args.products)
+    if args.command == 'sync':
+        return sync()
+    return check()
+
+
+if __name__ == "__main__":
+    sys.exit(main())